@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
     enable_tracing: bool = False
     max_concurrent_requests: int = 5
+    data_dir: str = "data"
 
     # LLM settings
     default_llm_provider: Literal["openai", "anthropic", "cohere"] = "openai"
@@ -41,13 +42,34 @@ class Settings(BaseSettings):
     embedding_model: str = "text-embedding-3-small"
     fastembed_model: str = "BAAI/bge-small-en-v1.5"
     fastembed_device: Literal["cpu", "cuda"] = "cpu"
+    fastembed_max_length: int = 512
     vector_dimension: int = 384
+    embedding_batch_size: int = Field(default=64, gt=0)
+    embedding_max_workers: int = Field(default=2, gt=0)
+    embedding_cache_enabled: bool = True
+    embedding_cache_memory_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+    embedding_cache_persist: bool = True
+    embedding_cache_disk_bytes: int | None = Field(default=1024 * 1024 * 1024, gt=0)
+    embedding_coalesce_window_ms: float = Field(default=3.0, ge=0)
 
     # Qdrant settings
     qdrant_url: str = "http://localhost:6333"
     qdrant_api_key: str | None = None
     qdrant_collection_name: str = "emvr_vectors"
     qdrant_location: Literal["local", "http"] = "local"
+    # None keeps the type an existing collection was created with ("flat" for a new one)
+    qdrant_local_index: Literal["flat", "hnsw"] | None = None
+    hnsw_m: int = Field(default=16, ge=2)
+    hnsw_ef_construction: int = Field(default=200, gt=0)
+    hnsw_ef_search: int = Field(default=64, gt=0)
+    # None keeps the mode an existing collection was created with ("none" for a new one)
+    qdrant_quantization: Literal["none", "int8", "pq"] | None = None
+    qdrant_pq_subvectors: int | None = Field(default=None, gt=0)
+    qdrant_rescore_multiplier: int | None = Field(default=None, gt=0)
+    qdrant_payload_indexes: str = "source,source_type,file_type,file_path,ingestion_time,tenant_id"
+    qdrant_write_batch_size: int = Field(default=1024, gt=0)
+    qdrant_write_flush_ms: float = Field(default=50.0, ge=0)
+    qdrant_write_concurrency: int = Field(default=4, gt=0)
 
     # Mem0 settings
     mem0_url: str = "http://localhost:7891"
@@ -59,6 +81,14 @@ class Settings(BaseSettings):
     neo4j_username: str = "neo4j"
     neo4j_password: str = "password"
     neo4j_database: str = "emvr"
+    neo4j_batch_size: int = Field(default=1000, gt=0)
+    neo4j_page_size: int = Field(default=1000, gt=0)
+    neo4j_neighborhood_cache_edges: int = Field(default=1_000_000, gt=0)
+    neo4j_max_pool_size: int = Field(default=50, gt=0)
+    neo4j_acquisition_timeout: float = Field(default=30.0, gt=0)
+    neo4j_max_connection_lifetime: float = Field(default=3600.0, gt=0)
+    neo4j_warm_connections: int = Field(default=4, ge=0)
+    connection_drain_timeout: float = Field(default=30.0, ge=0)
 
     # Graphiti settings
     graphiti_uri: str = "http://localhost:2342"
@@ -81,10 +111,34 @@ class Settings(BaseSettings):
     mcp_api_key: str | None = None
     mcp_timeout: int = 30
 
+    # Retrieval settings (seconds)
+    retrieval_vector_timeout: float = Field(default=2.0, gt=0)
+    retrieval_graph_timeout: float = Field(default=2.0, gt=0)
+    retrieval_vector_hedge_delay: float | None = Field(default=0.5, gt=0)
+    retrieval_graph_hedge_delay: float | None = Field(default=0.5, gt=0)
+
+    # Retrieval cache settings (0 entries disables a cache)
+    retrieval_cache_size: int = Field(default=1024, ge=0)
+    retrieval_cache_ttl: float = Field(default=30.0, gt=0)
+    retrieval_semantic_cache_size: int = Field(default=256, ge=0)
+    retrieval_semantic_cache_threshold: float = Field(default=0.95, gt=0, le=1)
+    retrieval_semantic_cache_admit_after: int = Field(default=2, gt=0)
+
+    # Rank fusion strategy of the fusion retriever
+    retrieval_fusion: Literal["rrf", "minmax", "zscore", "dbsf"] = "rrf"
+
     # Chunking settings
     default_chunk_size: int = 512
     default_chunk_overlap: int = 50
 
+    # Streaming ingestion settings
+    ingestion_load_workers: int = Field(default=4, gt=0)
+    ingestion_embed_batch_size: int = Field(default=256, gt=0)
+    ingestion_write_workers: int = Field(default=2, gt=0)
+    ingestion_queue_size: int = Field(default=8, gt=0)
+    ingestion_max_file_size: int | None = Field(default=None, gt=0)
+    ingestion_stream_threshold: int = Field(default=16 * 1024 * 1024, gt=0)
+
     # Chainlit UI settings
     chainlit_host: str = "0.0.0.0"
     chainlit_port: int = Field(default=8501, gt=0, lt=65536)
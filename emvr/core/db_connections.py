@@ -1,37 +1,330 @@
-"""Database connection management for the EMVR system."""
+"""
+Database connection management for the EMVR system.
 
+Neo4j drivers and Qdrant clients hold connection pools; one per server is
+enough for the whole process. ``ConnectionRegistry`` creates them on first
+use, hands the same instance to every component asking for the same server
+and owns their lifecycle:
+
+- pool sizing from settings (``NEO4J_MAX_POOL_SIZE`` etc.)
+- warm-up on startup: connectivity is verified and a few pooled
+  connections are opened before the first request needs them
+- health checks with per-backend latency
+- graceful close: new sessions are refused, sessions in flight are given
+  ``CONNECTION_DRAIN_TIMEOUT`` seconds to finish, then pools are closed
+"""
+
+import asyncio
 import logging
-from typing import Dict, Any
+import threading
+import time
+from typing import Any
+
+from neo4j import AsyncDriver, AsyncGraphDatabase, AsyncSession
+
+from emvr.config import get_settings
 
+# Configure logging
 logger = logging.getLogger(__name__)
 
 
-def initialize_connections() -> None:
+class TrackedNeo4jDriver:
+    """
+    Shared Neo4j driver that counts the sessions in flight.
+
+    Behaves like the wrapped ``AsyncDriver``; only ``session`` is tracked so
+    that closing can wait for the work using it.
+    """
+
+    def __init__(self, driver: AsyncDriver) -> None:
+        """
+        Wrap a driver.
+
+        Args:
+            driver: Neo4j async driver
+
+        """
+        self._driver = driver
+        self._in_flight = 0
+        self._closing = False
+        self._idle: asyncio.Event | None = None
+
+    @property
+    def in_flight(self) -> int:
+        """Number of open sessions."""
+        return self._in_flight
+
+    def session(self, **kwargs: Any) -> "_TrackedSession":
+        """
+        Open a session borrowing connections from the shared pool.
+
+        Args:
+            **kwargs: Session configuration, e.g. ``database``
+
+        Returns:
+            Async context manager yielding the session
+
+        """
+        return _TrackedSession(self, kwargs)
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Refuse new sessions and wait for the open ones to finish.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            bool: Whether all sessions finished in time
+
+        """
+        self._closing = True
+        if self._in_flight == 0:
+            return True
+        self._idle = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    async def close(self) -> None:
+        """Close the driver and its pool."""
+        self._closing = True
+        await self._driver.close()
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate everything else to the driver."""
+        return getattr(self._driver, name)
+
+
+class _TrackedSession:
+    """Session context manager that keeps the driver's in-flight count."""
+
+    def __init__(self, owner: TrackedNeo4jDriver, config: dict[str, Any]) -> None:
+        self._owner = owner
+        self._config = config
+        self._session: AsyncSession | None = None
+
+    async def __aenter__(self) -> AsyncSession:
+        owner = self._owner
+        if owner._closing:
+            msg = "Neo4j connections are closing"
+            raise RuntimeError(msg)
+        owner._in_flight += 1
+        try:
+            session = owner._driver.session(**self._config)
+            self._session = session
+            return await session.__aenter__()
+        except BaseException:
+            self._release()
+            raise
+
+    async def __aexit__(self, *exc: Any) -> None:
+        try:
+            if self._session is not None:
+                await self._session.__aexit__(*exc)
+        finally:
+            self._session = None
+            self._release()
+
+    def _release(self) -> None:
+        owner = self._owner
+        owner._in_flight -= 1
+        if owner._in_flight == 0 and owner._idle is not None:
+            owner._idle.set()
+
+
+class ConnectionRegistry:
+    """Process-wide registry of shared database drivers and clients."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._settings = get_settings()
+        self._neo4j: dict[tuple[str, str], TrackedNeo4jDriver] = {}
+        self._qdrant: dict[tuple[str, str | None], Any] = {}
+        self._lock = threading.Lock()
+
+    def neo4j_driver(
+        self,
+        uri: str | None = None,
+        username: str | None = None,
+        password: str | None = None,
+    ) -> TrackedNeo4jDriver:
+        """
+        Get the shared driver of a Neo4j server, creating it on first use.
+
+        Args:
+            uri: Server URI (defaults to settings)
+            username: Username (defaults to settings)
+            password: Password (defaults to settings)
+
+        Returns:
+            TrackedNeo4jDriver: Driver shared by all callers with the same
+            URI and username
+
+        """
+        uri = uri or self._settings.neo4j_uri
+        username = username or self._settings.neo4j_username
+        password = password or self._settings.neo4j_password
+
+        with self._lock:
+            driver = self._neo4j.get((uri, username))
+            if driver is None:
+                logger.info(
+                    f"Creating Neo4j driver for {uri} "
+                    f"(pool size {self._settings.neo4j_max_pool_size})"
+                )
+                driver = TrackedNeo4jDriver(
+                    AsyncGraphDatabase.driver(
+                        uri,
+                        auth=(username, password),
+                        max_connection_pool_size=self._settings.neo4j_max_pool_size,
+                        connection_acquisition_timeout=self._settings.neo4j_acquisition_timeout,
+                        max_connection_lifetime=self._settings.neo4j_max_connection_lifetime,
+                    )
+                )
+                self._neo4j[(uri, username)] = driver
+            return driver
+
+    def qdrant_client(self, url: str | None = None, api_key: str | None = None) -> Any:
+        """
+        Get the shared async client of a Qdrant server, creating it on first use.
+
+        Args:
+            url: Server URL (defaults to settings)
+            api_key: API key (defaults to settings)
+
+        Returns:
+            AsyncQdrantClient: Client shared by all callers with the same
+            URL and API key
+
+        """
+        from qdrant_client import AsyncQdrantClient
+
+        url = url or self._settings.qdrant_url
+        api_key = api_key or self._settings.qdrant_api_key
+
+        with self._lock:
+            client = self._qdrant.get((url, api_key))
+            if client is None:
+                logger.info(f"Creating Qdrant client for {url}")
+                client = AsyncQdrantClient(url=url, api_key=api_key)
+                self._qdrant[(url, api_key)] = client
+            return client
+
+    async def warm_up(self) -> None:
+        """
+        Verify connectivity and pre-open pooled connections.
+
+        Opens ``NEO4J_WARM_CONNECTIONS`` connections per Neo4j driver
+        concurrently, so the first requests do not pay for connection setup.
+
+        Raises:
+            Exception: If a server cannot be reached
+
+        """
+        warm = min(self._settings.neo4j_warm_connections, self._settings.neo4j_max_pool_size)
+        for (uri, _), driver in list(self._neo4j.items()):
+            await driver.verify_connectivity()
+            await asyncio.gather(*(self._ping_neo4j(driver) for _ in range(warm)))
+            logger.info(f"Neo4j pool for {uri} warmed up with {warm} connections")
+
+        for (url, _), client in list(self._qdrant.items()):
+            await client.get_collections()
+            logger.info(f"Qdrant client for {url} connected")
+
+    async def health(self) -> dict[str, dict[str, Any]]:
+        """
+        Check every registered backend.
+
+        Returns:
+            Dictionary mapping "neo4j:<uri>" / "qdrant:<url>" to its status
+            ("ok" or "error"), latency in seconds and error, if any
+
+        """
+        checks = {
+            f"neo4j:{uri}": self._ping_neo4j(driver) for (uri, _), driver in self._neo4j.items()
+        }
+        checks.update(
+            {f"qdrant:{url}": client.get_collections() for (url, _), client in self._qdrant.items()}
+        )
+
+        async def timed(check: Any) -> dict[str, Any]:
+            start = time.perf_counter()
+            try:
+                await check
+            except Exception as e:
+                return {"status": "error", "latency": time.perf_counter() - start, "error": str(e)}
+            return {"status": "ok", "latency": time.perf_counter() - start}
+
+        results = await asyncio.gather(*(timed(check) for check in checks.values()))
+        return dict(zip(checks, results, strict=True))
+
+    async def close(self) -> None:
+        """Drain in-flight Neo4j sessions, then close all drivers and clients."""
+        with self._lock:
+            drivers = list(self._neo4j.items())
+            clients = list(self._qdrant.items())
+            self._neo4j.clear()
+            self._qdrant.clear()
+
+        timeout = self._settings.connection_drain_timeout
+        drained = await asyncio.gather(*(driver.drain(timeout) for _, driver in drivers))
+        for ((uri, _), driver), done in zip(drivers, drained, strict=True):
+            if not done:
+                logger.warning(
+                    f"Closing Neo4j driver for {uri} with {driver.in_flight} sessions "
+                    f"still open after {timeout}s"
+                )
+            await driver.close()
+
+        for _, client in clients:
+            await client.close()
+
+        logger.info(f"Closed {len(drivers)} Neo4j drivers and {len(clients)} Qdrant clients")
+
+    @staticmethod
+    async def _ping_neo4j(driver: TrackedNeo4jDriver) -> None:
+        """Run a trivial query, holding one pooled connection while it runs."""
+        async with driver.session() as session:
+            result = await session.run("RETURN 1")
+            await result.consume()
+
+
+# Singleton instance
+connection_registry = ConnectionRegistry()
+
+
+async def initialize_connections() -> None:
     """Initialize all database connections."""
     logger.info("Initializing database connections")
-    # In the real implementation, this would initialize connections to
-    # Qdrant, Neo4j, Supabase, etc.
-    pass
+    await connection_registry.warm_up()
 
 
-def close_connections() -> None:
-    """Close all database connections."""
+async def close_connections() -> None:
+    """Close all database connections, letting in-flight work finish."""
     logger.info("Closing database connections")
-    # In the real implementation, this would close connections to
-    # Qdrant, Neo4j, Supabase, etc.
-    pass
+    await connection_registry.close()
 
 
-def get_connection(db_type: str) -> Dict[str, Any]:
+def get_connection(db_type: str) -> Any:
     """
     Get a database connection.
-    
+
     Args:
-        db_type: Type of database connection to get (e.g. "qdrant", "neo4j", "supabase")
-        
+        db_type: Type of database connection to get ("neo4j" or "qdrant")
+
     Returns:
-        Database connection
+        Shared driver or client
+
+    Raises:
+        ValueError: If the database type is unknown
+
     """
-    logger.info(f"Getting {db_type} connection")
-    # In the real implementation, this would return the appropriate connection
-    return {}
\ No newline at end of file
+    if db_type == "neo4j":
+        return connection_registry.neo4j_driver()
+    if db_type == "qdrant":
+        return connection_registry.qdrant_client()
+    msg = f"Unknown database type: {db_type}"
+    raise ValueError(msg)
@@ -1,11 +1,16 @@
 """Embedding management for the EMVR system."""
 
+import asyncio
 import logging
-from typing import List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 import numpy as np
 
 from emvr.config import get_settings
+from emvr.core.embedding_cache import EmbeddingCache
+from emvr.core.embedding_coalescer import EmbeddingCoalescer
 
 logger = logging.getLogger(__name__)
 
@@ -13,54 +18,289 @@ logger = logging.getLogger(__name__)
 class EmbeddingManager:
     """
     Manages embedding generation and retrieval.
-    
-    This class handles embedding generation using various providers.
+
+    Embeddings are produced by a local fastembed (ONNX, CPU) model. Texts are
+    grouped into length-sorted micro-batches so that padding inside a batch is
+    minimal, and batches run on a dedicated worker thread pool so the event
+    loop is never blocked by model inference. Results are written straight
+    into a single preallocated float32 matrix. An optional content-addressed
+    cache sits in front of the model, and concurrent single-text ``embed``
+    calls are coalesced into shared batches.
     """
-    
-    def __init__(self) -> None:
-        """Initialize the embedding manager."""
+
+    def __init__(
+        self,
+        model_name: str | None = None,
+        batch_size: int | None = None,
+        max_workers: int | None = None,
+        cache: EmbeddingCache | None = None,
+    ) -> None:
+        """
+        Initialize the embedding manager.
+
+        Args:
+            model_name: fastembed model name (defaults to settings.fastembed_model)
+            batch_size: Texts per micro-batch (defaults to settings.embedding_batch_size)
+            max_workers: Worker threads for inference
+                (defaults to settings.embedding_max_workers)
+            cache: Embedding cache (defaults to one built from settings when
+                settings.embedding_cache_enabled is set)
+
+        """
         self._settings = get_settings()
+        self._model_name = model_name or self._settings.fastembed_model
+        self._batch_size = batch_size or self._settings.embedding_batch_size
+        self._max_workers = max_workers or self._settings.embedding_max_workers
+        self._dimension = self._settings.vector_dimension
+        self._model: Any = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._cache = cache
+        # An injected cache belongs to the caller, who closes it
+        self._owns_cache = False
+        self._coalescer = EmbeddingCoalescer(
+            self.get_embeddings,
+            window_seconds=self._settings.embedding_coalesce_window_ms / 1000,
+            max_batch_size=self._batch_size,
+        )
+        self._init_lock = asyncio.Lock()
         self._initialized = False
-        
+
+    @property
+    def model_name(self) -> str:
+        """Name of the embedding model."""
+        return self._model_name
+
+    @property
+    def dimension(self) -> int:
+        """Dimension of the produced embedding vectors."""
+        return self._dimension
+
     async def initialize(self) -> None:
-        """Initialize the embedding manager."""
+        """Initialize the embedding manager and load the model."""
         if self._initialized:
             return
-            
-        logger.info("Initializing embedding manager")
-        # In the real implementation, this would initialize the appropriate
-        # embedding model based on the provider in settings
-        self._initialized = True
-        
-    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+
+        async with self._init_lock:
+            if self._initialized:
+                return
+
+            logger.info(f"Initializing embedding manager with model {self._model_name}")
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="emvr-embedding",
+            )
+
+            # Model loading downloads/opens the ONNX session, keep it off the loop
+            loop = asyncio.get_running_loop()
+            self._model = await loop.run_in_executor(self._executor, self._load_model)
+
+            if self._cache is None and self._settings.embedding_cache_enabled:
+                self._cache = await loop.run_in_executor(self._executor, self._build_cache)
+                self._owns_cache = True
+
+            self._initialized = True
+
+    def _load_model(self) -> Any:
+        """
+        Load the fastembed model and probe its output dimension.
+
+        Returns:
+            Loaded fastembed TextEmbedding model
+
+        Raises:
+            ImportError: If fastembed is not installed
+
+        """
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            msg = (
+                "fastembed is required for local embeddings: "
+                "pip install 'enhanced-mem-vector-rag[local]'"
+            )
+            raise ImportError(msg) from e
+
+        model = TextEmbedding(
+            model_name=self._model_name,
+            max_length=self._settings.fastembed_max_length,
+        )
+
+        probe = next(iter(model.embed(["dimension probe"], batch_size=1)))
+        dimension = int(np.asarray(probe).shape[-1])
+        if dimension != self._settings.vector_dimension:
+            logger.warning(
+                f"Model {self._model_name} produces {dimension}-d vectors, "
+                f"settings.vector_dimension is {self._settings.vector_dimension}"
+            )
+        self._dimension = dimension
+
+        return model
+
+    def _build_cache(self) -> EmbeddingCache:
+        """Build the embedding cache from settings."""
+        path = None
+        if self._settings.embedding_cache_persist:
+            path = os.path.join(self._settings.data_dir, "embedding_cache.sqlite3")
+
+        return EmbeddingCache(
+            model_name=self._model_name,
+            memory_budget_bytes=self._settings.embedding_cache_memory_bytes,
+            path=path,
+            disk_budget_bytes=self._settings.embedding_cache_disk_bytes,
+        )
+
+    def _micro_batches(self, texts: list[str]) -> list[np.ndarray]:
+        """
+        Group text indices into length-sorted micro-batches.
+
+        Args:
+            texts: Texts to batch
+
+        Returns:
+            List of index arrays, one per micro-batch
+
+        """
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        order = np.argsort(lengths, kind="stable")
+        return [
+            order[start : start + self._batch_size]
+            for start in range(0, len(order), self._batch_size)
+        ]
+
+    def _embed_batch(self, texts: list[str], indices: np.ndarray, out: np.ndarray) -> None:
+        """
+        Embed one micro-batch and scatter the rows into the output matrix.
+
+        Runs on a worker thread; batches own disjoint rows of ``out``.
+
+        Args:
+            texts: All texts of the request
+            indices: Indices of the texts in this batch
+            out: Output matrix to fill
+
+        """
+        batch = [texts[i] for i in indices]
+        for row, vector in zip(
+            indices,
+            self._model.embed(batch, batch_size=len(batch)),
+            strict=True,
+        ):
+            out[row] = vector
+
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Generate the embedding for a single text, such as a search query.
+
+        Concurrent calls are collected for a few milliseconds and embedded in
+        one batch; identical in-flight texts are embedded only once.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            float32 embedding vector
+
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        return await self._coalescer.embed(text)
+
+    async def get_embeddings(self, texts: list[str]) -> np.ndarray:
         """
         Generate embeddings for texts.
-        
+
+        Cached texts are served from the cache; duplicates within the request
+        are embedded only once.
+
         Args:
             texts: List of text strings to embed
-            
+
         Returns:
-            List of embedding vectors
+            C-contiguous float32 matrix of shape (len(texts), dimension), rows
+            in the same order as ``texts``
+
         """
         if not self._initialized:
             await self.initialize()
-            
-        logger.info(f"Generating embeddings for {len(texts)} texts")
-        # In the real implementation, this would call the appropriate embedding model
-        # For now, we return random vectors of the correct dimension
-        return [
-            np.random.rand(self._settings.vector_dimension).tolist()
-            for _ in range(len(texts))
-        ]
-        
+
+        if self._cache is None:
+            unique = list(dict.fromkeys(texts))
+            if len(unique) == len(texts):
+                return await self._embed_texts(texts)
+            vectors = await self._embed_texts(unique)
+            rows = {text: row for row, text in enumerate(unique)}
+            return vectors[[rows[text] for text in texts]]
+
+        if not texts:
+            return await self._embed_texts(texts)
+
+        loop = asyncio.get_running_loop()
+        keys = [self._cache.key(text) for text in texts]
+        cached = await loop.run_in_executor(self._executor, self._cache.get_many, keys)
+
+        out = np.empty((len(texts), self._dimension), dtype=np.float32)
+        missing: dict[bytes, list[int]] = {}
+        for i, key in enumerate(keys):
+            vector = cached.get(key)
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                out[i] = vector
+
+        if missing:
+            miss_keys = list(missing)
+            vectors = await self._embed_texts([texts[missing[key][0]] for key in miss_keys])
+            for key, vector in zip(miss_keys, vectors, strict=True):
+                out[missing[key]] = vector
+            await loop.run_in_executor(self._executor, self._cache.put_many, miss_keys, vectors)
+
+        return out
+
+    async def _embed_texts(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts with the model, bypassing the cache.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            float32 matrix of shape (len(texts), dimension)
+
+        """
+        out = np.empty((len(texts), self._dimension), dtype=np.float32)
+        if not texts:
+            return out
+
+        batches = self._micro_batches(texts)
+        logger.debug(f"Embedding {len(texts)} texts in {len(batches)} micro-batches")
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, self._embed_batch, texts, batch, out)
+                for batch in batches
+            )
+        )
+
+        return out
+
     def close(self) -> None:
         """Clean up resources."""
         if not self._initialized:
             return
-            
+
         logger.info("Cleaning up embedding manager")
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._owns_cache and self._cache is not None:
+            self._cache.close()
+            self._cache = None
+            self._owns_cache = False
+        self._model = None
         self._initialized = False
 
 
 # Singleton instance
-embedding_manager = EmbeddingManager()
\ No newline at end of file
+embedding_manager = EmbeddingManager()
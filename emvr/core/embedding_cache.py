@@ -0,0 +1,278 @@
+"""Content-addressed embedding cache for the EMVR system."""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+from emvr.core.metrics import (
+    record_embedding_cache_evictions,
+    record_embedding_cache_hits,
+    record_embedding_cache_misses,
+    update_embedding_cache_bytes,
+)
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# SQLite limits the number of bound parameters per statement
+_SQLITE_LOOKUP_CHUNK = 500
+# The disk tier is evicted down to this fraction of its budget, so a full
+# cache does not evict on every write
+_DISK_LOW_WATER = 0.9
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text before hashing it into a cache key.
+
+    Args:
+        text: Raw text
+
+    Returns:
+        NFC-normalized text with collapsed, trimmed whitespace
+
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by a hash of (model name, normalized text).
+
+    The memory tier is an LRU bounded by a byte budget. The optional disk tier
+    is a SQLite table of float32 blobs that survives restarts, so re-ingesting
+    unchanged chunks and repeating popular queries never reach the model. It
+    is bounded by its own byte budget, evicting the least recently used rows.
+    All methods are thread-safe and blocking; call them off the event loop.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        memory_budget_bytes: int,
+        path: str | None = None,
+        disk_budget_bytes: int | None = None,
+    ) -> None:
+        """
+        Initialize the embedding cache.
+
+        Args:
+            model_name: Embedding model name, part of every cache key
+            memory_budget_bytes: Maximum bytes held by the in-memory LRU tier
+            path: SQLite file for the disk tier (None disables the disk tier)
+            disk_budget_bytes: Maximum size of the disk tier's database
+                (None for unbounded)
+
+        """
+        self.model_name = model_name
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self.path = path
+        # Logical clock stamping disk rows when written or read, for LRU eviction
+        self._clock = 0
+
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key BLOB PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, "
+                "used INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+            if "used" not in columns:
+                # Databases written before the disk tier was bounded
+                self._db.execute(
+                    "ALTER TABLE embeddings ADD COLUMN used INTEGER NOT NULL DEFAULT 0"
+                )
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+            self._db.commit()
+            (self._clock,) = self._db.execute(
+                "SELECT COALESCE(MAX(used), 0) FROM embeddings"
+            ).fetchone()
+
+    def key(self, text: str) -> bytes:
+        """
+        Compute the cache key for a text.
+
+        Args:
+            text: Text to key
+
+        Returns:
+            SHA-256 digest of the model name and normalized text
+
+        """
+        digest = hashlib.sha256(self.model_name.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """
+        Look up vectors for keys, memory tier first, then disk.
+
+        Disk hits are promoted into the memory tier.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of found keys to float32 vectors
+
+        """
+        found: dict[bytes, np.ndarray] = {}
+        pending: list[bytes] = []
+
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    pending.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+        memory_hits = len(found)
+
+        disk_hits = 0
+        if pending and self._db is not None:
+            for key, vector in self._read_disk(pending).items():
+                found[key] = vector
+                disk_hits += 1
+            with self._lock:
+                for key in pending:
+                    if key in found:
+                        self._remember(key, found[key])
+
+        record_embedding_cache_hits("memory", memory_hits)
+        record_embedding_cache_hits("disk", disk_hits)
+        record_embedding_cache_misses(len(keys) - len(found))
+        return found
+
+    def put_many(self, keys: list[bytes], vectors: np.ndarray) -> None:
+        """
+        Store vectors in both tiers.
+
+        Args:
+            keys: Cache keys, one per row of ``vectors``
+            vectors: float32 matrix of embeddings
+
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        with self._lock:
+            for key, vector in zip(keys, vectors, strict=True):
+                # Copy the row so the cache never pins the caller's matrix
+                self._remember(key, vector.copy())
+
+        if self._db is not None:
+            with self._lock:
+                self._clock += 1
+                rows = [
+                    (key, self.model_name, vector.tobytes(), self._clock)
+                    for key, vector in zip(keys, vectors, strict=True)
+                ]
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector, used) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                if rows:
+                    self._evict_disk(len(rows[0][0]) + len(rows[0][2]))
+                self._db.commit()
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        """Insert into the memory tier and evict down to the byte budget (lock held)."""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes + len(key)
+
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes + len(key)
+
+        evicted = 0
+        while self._memory_bytes > self.memory_budget_bytes and self._memory:
+            old_key, old_vector = self._memory.popitem(last=False)
+            self._memory_bytes -= old_vector.nbytes + len(old_key)
+            evicted += 1
+
+        record_embedding_cache_evictions(evicted)
+        update_embedding_cache_bytes(self._memory_bytes)
+
+    def _evict_disk(self, row_bytes: int) -> None:
+        """
+        Delete the least recently used disk rows once the database exceeds its
+        budget, down to the low-water mark (lock held).
+
+        Args:
+            row_bytes: Estimated size of one row
+
+        """
+        if self.disk_budget_bytes is None:
+            return
+
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        pages = self._db.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        used_bytes = (pages - free_pages) * page_size
+        if used_bytes <= self.disk_budget_bytes:
+            return
+
+        excess = used_bytes - int(self.disk_budget_bytes * _DISK_LOW_WATER)
+        cursor = self._db.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY used LIMIT ?)",
+            (-(-excess // row_bytes),),
+        )
+        record_embedding_cache_evictions(cursor.rowcount, tier="disk")
+
+    def _read_disk(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Fetch vectors for keys from the SQLite tier, marking them as used."""
+        found: dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), _SQLITE_LOOKUP_CHUNK):
+                chunk = keys[start : start + _SQLITE_LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",  # noqa: S608
+                    chunk,
+                )
+                for key, blob in cursor:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+            if found and self.disk_budget_bytes is not None:
+                self._clock += 1
+                self._db.executemany(
+                    "UPDATE embeddings SET used = ? WHERE key = ?",
+                    [(self._clock, key) for key in found],
+                )
+                self._db.commit()
+        return found
+
+    def clear(self) -> None:
+        """Drop the memory tier (the disk tier is left intact)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        update_embedding_cache_bytes(0)
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,108 @@
+"""Request coalescing for single-text embedding calls."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCoalescer:
+    """
+    Coalesces concurrent single-text embedding requests into batched calls.
+
+    Calls to ``embed`` are collected for a short window (or until the batch is
+    full), embedded with one call to the batch function, and each caller's
+    future is resolved with its own row. Identical texts that are queued or
+    already in flight share a single future, so they are embedded once.
+    """
+
+    def __init__(
+        self,
+        embed_many: Callable[[list[str]], Awaitable[np.ndarray]],
+        window_seconds: float = 0.003,
+        max_batch_size: int = 64,
+    ) -> None:
+        """
+        Initialize the coalescer.
+
+        Args:
+            embed_many: Coroutine function embedding a list of texts into a matrix
+            window_seconds: Time to wait for more requests before dispatching
+            max_batch_size: Dispatch immediately once this many texts are queued
+
+        """
+        self._embed_many = embed_many
+        self._window_seconds = window_seconds
+        self._max_batch_size = max_batch_size
+
+        # text -> future shared by every caller waiting on that text
+        self._futures: dict[str, asyncio.Future[np.ndarray]] = {}
+        self._queue: list[str] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a single text, batched together with concurrent callers.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            float32 embedding vector
+
+        """
+        future = self._futures.get(text)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[text] = future
+            self._queue.append(text)
+
+            if len(self._queue) >= self._max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self._window_seconds, self._dispatch)
+
+        # Shield so one cancelled caller does not cancel the shared future
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        """Send the queued texts to the batch function as one request."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._queue:
+            return
+
+        batch, self._queue = self._queue, []
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[str]) -> None:
+        """Embed a batch and resolve the waiting futures."""
+        try:
+            vectors = await self._embed_many(batch)
+        except Exception as e:
+            logger.exception(f"Coalesced embedding of {len(batch)} texts failed: {e}")
+            for text in batch:
+                future = self._futures.pop(text)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, vector in zip(batch, vectors, strict=True):
+            future = self._futures.pop(text)
+            if not future.done():
+                future.set_result(vector)
+
+    async def drain(self) -> None:
+        """Dispatch anything still queued and wait for in-flight batches."""
+        self._dispatch()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,123 @@
+"""
+Prometheus metrics of the storage and caching layers.
+
+Only depends on prometheus_client, so core, memory and retrieval modules can
+record metrics without importing the server stack. The metrics live in the
+default registry and are served by the MCP server's ``/metrics`` endpoint
+(see ``emvr.mcp_server.monitoring.prometheus``).
+"""
+
+from prometheus_client import Counter, Gauge
+
+VECTOR_COUNT = Gauge(
+    "emvr_qdrant_vector_count",
+    "Number of vectors stored in Qdrant",
+    ["collection"],
+)
+
+VECTOR_BYTES_PER_VECTOR = Gauge(
+    "emvr_vector_index_bytes_per_vector",
+    "Bytes held in memory per vector by the local vector index",
+    ["collection", "quantization"],
+)
+
+VECTOR_INDEX_MEMORY_BYTES = Gauge(
+    "emvr_vector_index_memory_bytes",
+    "Bytes held in memory by the local vector index",
+    ["collection", "quantization"],
+)
+
+EMBEDDING_CACHE_HITS = Counter(
+    "emvr_embedding_cache_hits_total",
+    "Number of embedding cache hits",
+    ["tier"],
+)
+
+EMBEDDING_CACHE_MISSES = Counter(
+    "emvr_embedding_cache_misses_total",
+    "Number of embedding cache misses",
+)
+
+EMBEDDING_CACHE_EVICTIONS = Counter(
+    "emvr_embedding_cache_evictions_total",
+    "Number of embeddings evicted from the embedding cache",
+    ["tier"],
+)
+
+EMBEDDING_CACHE_BYTES = Gauge(
+    "emvr_embedding_cache_memory_bytes",
+    "Bytes held by the in-memory embedding cache tier",
+)
+
+RETRIEVAL_CACHE_REQUESTS = Counter(
+    "emvr_retrieval_cache_requests_total",
+    "Number of retrieval cache lookups by outcome",
+    ["layer", "result"],
+)
+
+RETRIEVAL_CACHE_HIT_RATIO = Gauge(
+    "emvr_retrieval_cache_hit_ratio",
+    "Fraction of retrieval cache lookups served without a new computation",
+    ["layer"],
+)
+
+RETRIEVAL_CACHE_ENTRIES = Gauge(
+    "emvr_retrieval_cache_entries",
+    "Number of results held by the retrieval cache",
+    ["layer"],
+)
+
+
+def update_vector_count(collection: str, count: int) -> None:
+    """Update the vector count metric for a collection."""
+    VECTOR_COUNT.labels(collection=collection).set(count)
+
+
+def update_vector_index_memory(
+    collection: str,
+    quantization: str,
+    bytes_per_vector: float,
+    count: int,
+) -> None:
+    """Update the memory metrics of a local vector index."""
+    VECTOR_BYTES_PER_VECTOR.labels(collection=collection, quantization=quantization).set(
+        bytes_per_vector
+    )
+    VECTOR_INDEX_MEMORY_BYTES.labels(collection=collection, quantization=quantization).set(
+        bytes_per_vector * count
+    )
+
+
+def record_embedding_cache_hits(tier: str, count: int) -> None:
+    """Record embedding cache hits for a tier ("memory" or "disk")."""
+    if count:
+        EMBEDDING_CACHE_HITS.labels(tier=tier).inc(count)
+
+
+def record_embedding_cache_misses(count: int) -> None:
+    """Record embedding cache misses."""
+    if count:
+        EMBEDDING_CACHE_MISSES.inc(count)
+
+
+def record_embedding_cache_evictions(count: int, tier: str = "memory") -> None:
+    """Record embeddings evicted from a cache tier ("memory" or "disk")."""
+    if count:
+        EMBEDDING_CACHE_EVICTIONS.labels(tier=tier).inc(count)
+
+
+def update_embedding_cache_bytes(size: int) -> None:
+    """Update the in-memory embedding cache size metric."""
+    EMBEDDING_CACHE_BYTES.set(size)
+
+
+def record_retrieval_cache_request(
+    layer: str,
+    result: str,
+    hit_ratio: float,
+    entries: int,
+) -> None:
+    """Record a retrieval cache lookup ("hit", "shared" or "miss") of a layer."""
+    RETRIEVAL_CACHE_REQUESTS.labels(layer=layer, result=result).inc()
+    RETRIEVAL_CACHE_HIT_RATIO.labels(layer=layer).set(hit_ratio)
+    RETRIEVAL_CACHE_ENTRIES.labels(layer=layer).set(entries)
@@ -0,0 +1,239 @@
+"""
+Text chunking for the EMVR system.
+
+This module provides a sentence- and token-aware splitter used on the hot
+path of every ingest. It makes a single regex pass over the input, tracking
+only token offsets, and slices the text once per emitted chunk.
+"""
+
+import re
+from collections.abc import Generator, Iterable, Iterator
+from dataclasses import dataclass
+
+# Words first (the common case), then
+# group 1: sentence terminator followed by whitespace/end (counted as a token),
+# group 2: paragraph break (a boundary, not a token),
+# otherwise a single punctuation token
+_TOKEN_PATTERN = re.compile(r"\w+|([.!?]+)(?=\s|$)|(\n[^\S\n]*\n)|[^\w\s]")
+
+_WHITESPACE = re.compile(r"\s")
+
+_SENTENCE_END = 1
+_PARAGRAPH_BREAK = 2
+
+
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    """A chunk of text with its character offsets in the source text."""
+
+    text: str
+    start: int
+    end: int
+    token_count: int
+
+
+class TextChunker:
+    """
+    Sentence-aware splitter with a token budget and token overlap.
+
+    Tokens are words and punctuation marks, which tracks model tokenizers
+    closely enough for sizing chunks without running one. A chunk is closed
+    at the last sentence or paragraph boundary inside the budget when that
+    boundary keeps at least half the budget; otherwise it is cut at the
+    token limit. Consecutive chunks share ``chunk_overlap`` tokens.
+    """
+
+    def __init__(self, chunk_size: int = 512, chunk_overlap: int = 50) -> None:
+        """
+        Initialize the chunker.
+
+        Args:
+            chunk_size: Maximum tokens per chunk
+            chunk_overlap: Tokens shared by consecutive chunks
+
+        Raises:
+            ValueError: If the sizes are inconsistent
+
+        """
+        if chunk_size <= 0:
+            msg = f"chunk_size must be positive, got {chunk_size}"
+            raise ValueError(msg)
+        if not 0 <= chunk_overlap < chunk_size:
+            msg = f"chunk_overlap must be in [0, chunk_size), got {chunk_overlap}"
+            raise ValueError(msg)
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def iter_spans(self, text: str) -> Iterator[tuple[int, int, int]]:
+        """
+        Yield chunk spans without materializing any substrings.
+
+        Args:
+            text: Text to split
+
+        Yields:
+            Tuples of (start offset, end offset, token count)
+
+        """
+        return self._scan(text, len(text), final=True)
+
+    def _scan(
+        self,
+        text: str,
+        endpos: int,
+        final: bool,
+    ) -> Generator[tuple[int, int, int], None, int]:
+        """
+        Yield chunk spans of ``text[:endpos]``.
+
+        Chunks are emitted as soon as the token window is full, so every span
+        yielded for a prefix is also a span of any longer text. With
+        ``final=False`` the trailing partial window is not emitted; scanning
+        the continuation from the returned offset reproduces the same state.
+
+        Args:
+            text: Text to split
+            endpos: Offset at which to stop (must not fall inside a token)
+            final: Whether to emit the trailing partial window
+
+        Yields:
+            Tuples of (start offset, end offset, token count)
+
+        Returns:
+            Offset of the first token not yet emitted in a full window
+
+        """
+        size = self.chunk_size
+        overlap = self.chunk_overlap
+        min_sentence_cut = max(size // 2, 1)
+
+        # Offsets of the tokens in the current window
+        starts: list[int] = []
+        ends: list[int] = []
+        # Window length at the most recent sentence boundary (0 = none)
+        boundary = 0
+        append_start = starts.append
+        append_end = ends.append
+
+        for match in _TOKEN_PATTERN.finditer(text, 0, endpos):
+            kind = match.lastindex
+            if kind == _PARAGRAPH_BREAK:
+                boundary = len(starts)
+                continue
+
+            if len(starts) == size:
+                cut = boundary if boundary >= min_sentence_cut else size
+                yield starts[0], ends[cut - 1], cut
+
+                keep = max(cut - overlap, 1)
+                del starts[:keep]
+                del ends[:keep]
+                boundary = boundary - keep if boundary > keep else 0
+
+            start, end = match.span()
+            append_start(start)
+            append_end(end)
+            if kind == _SENTENCE_END:
+                boundary = len(starts)
+
+        if not final:
+            return starts[0] if starts else endpos
+
+        if starts:
+            yield starts[0], ends[-1], len(starts)
+        return endpos
+
+    def split(self, text: str) -> list[Chunk]:
+        """
+        Split text into chunks.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List of chunks with character offsets
+
+        """
+        return [
+            Chunk(text=text[start:end], start=start, end=end, token_count=tokens)
+            for start, end, tokens in self.iter_spans(text)
+        ]
+
+    def split_stream(self, segments: Iterable[str]) -> Iterator[Chunk]:
+        """
+        Split a stream of text segments into chunks.
+
+        Produces the same chunks as ``split`` on the concatenated segments,
+        while holding only the current segment and the unfinished window in
+        memory. Offsets are relative to the start of the stream.
+
+        Args:
+            segments: Consecutive pieces of the text (e.g. decoded file blocks)
+
+        Yields:
+            Chunks with character offsets
+
+        """
+        buffer = ""
+        # Segments without whitespace cannot end a token; they are joined to
+        # the buffer once one that can arrives, not one by one (quadratic)
+        pending: list[str] = []
+        # Stream offset of buffer[0]
+        base = 0
+
+        for segment in segments:
+            if not _WHITESPACE.search(segment):
+                pending.append(segment)
+                continue
+
+            buffer = "".join([buffer, *pending, segment])
+            pending = []
+            endpos = _last_token_gap(buffer)
+            if endpos == 0:
+                continue
+
+            resume = yield from self._chunks(buffer, base, endpos, final=False)
+            buffer = buffer[resume:]
+            base += resume
+
+        buffer = "".join([buffer, *pending])
+        if buffer:
+            yield from self._chunks(buffer, base, len(buffer), final=True)
+
+    def _chunks(
+        self,
+        text: str,
+        base: int,
+        endpos: int,
+        final: bool,
+    ) -> Generator[Chunk, None, int]:
+        """Wrap ``_scan`` spans into chunks shifted by ``base``."""
+        scan = self._scan(text, endpos, final)
+        while True:
+            try:
+                start, end, tokens = next(scan)
+            except StopIteration as stop:
+                return stop.value
+            yield Chunk(
+                text=text[start:end],
+                start=base + start,
+                end=base + end,
+                token_count=tokens,
+            )
+
+
+def _last_token_gap(text: str) -> int:
+    """
+    Find a safe place to pause tokenizing a text that may continue.
+
+    Returns the start of the last whitespace run that is followed only by
+    non-whitespace, so no token, sentence terminator or paragraph break can
+    straddle the returned offset. Returns 0 if the text has no such run.
+    """
+    index = len(text)
+    while index > 0 and not text[index - 1].isspace():
+        index -= 1
+    while index > 0 and text[index - 1].isspace():
+        index -= 1
+    return index
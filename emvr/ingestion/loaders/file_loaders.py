@@ -4,14 +4,20 @@ File-based document loaders for the EMVR system.
 This module provides loaders for various file types using LlamaIndex.
 """
 
+import fnmatch
 import logging
 import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 # Will use LlamaIndex loaders when integrated
 # from llama_index.core.readers import SimpleDirectoryReader
 # from llama_index.core.schema import Document as LlamaDocument
 from emvr.config import get_settings
+from emvr.ingestion.loaders.readers import get_reader
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -77,24 +83,15 @@ class FileLoader:
             # This will be replaced with actual LlamaIndex usage
             file_path = os.path.abspath(file_path)
 
-            if not os.path.exists(file_path):
+            try:
+                file_size = os.stat(file_path).st_size
+            except FileNotFoundError:
                 logger.error(f"File not found: {file_path}")
                 return []
 
-            # Basic file read as a placeholder
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
-
-            # Create a document dict
-            doc_metadata = metadata or {}
-            doc_metadata.update(
-                {
-                    "source": file_path,
-                    "file_name": os.path.basename(file_path),
-                    "file_type": os.path.splitext(file_path)[1][1:],
-                    "file_size": os.path.getsize(file_path),
-                }
-            )
+            # Decoded incrementally, so invalid bytes are replaced rather than fatal
+            content = "".join(self.iter_segments(file_path))
+            doc_metadata = self.file_metadata(file_path, file_size, metadata)
 
             # Return as a list of documents (single document in this case)
             return [
@@ -124,6 +121,220 @@ class FileLoader:
             logger.exception(f"Failed to load file {file_path}: {e}")
             return []
 
+    def iter_segments(self, file_path: str) -> Iterator[str]:
+        """
+        Stream the text of a file without reading it into one string.
+
+        The file is memory-mapped and decoded incrementally by the reader
+        registered for its extension (JSONL, CSV and Markdown are rendered
+        record by record; anything else is read as plain text).
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Iterator[str]: Text segments which concatenate to the document text
+
+        """
+        return get_reader(file_path).iter_text(file_path)
+
+    @staticmethod
+    def file_metadata(
+        file_path: str,
+        file_size: int,
+        metadata: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Build the metadata of a file document.
+
+        Args:
+            file_path: Absolute path to the file
+            file_size: File size in bytes
+            metadata: Optional metadata for the document
+
+        Returns:
+            Dict: Document metadata (a copy, so callers' metadata is never shared)
+
+        """
+        doc_metadata = dict(metadata or {})
+        doc_metadata.update(
+            {
+                "source": file_path,
+                "file_name": os.path.basename(file_path),
+                "file_type": os.path.splitext(file_path)[1][1:],
+                "file_size": file_size,
+            }
+        )
+        return doc_metadata
+
+    def scan_files(
+        self,
+        directory_path: str,
+        recursive: bool = True,
+        exclude_hidden: bool = True,
+        file_extensions: list[str] | None = None,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
+        max_file_size: int | None = None,
+    ) -> Iterator[os.DirEntry]:
+        """
+        Lazily yield the directory entries of matching files.
+
+        The tree is walked with ``os.scandir``, so file/directory checks use
+        the type information returned with each directory listing instead of
+        one ``stat`` call per entry. Only the size guard needs a ``stat``, and
+        its result is cached on the entry for later consumers.
+
+        Glob patterns are matched against both the entry name and its path
+        relative to ``directory_path``. Exclude patterns also prune
+        directories. Symlinked directories are not followed.
+
+        Args:
+            directory_path: Path to the directory
+            recursive: Whether to search subdirectories
+            exclude_hidden: Whether to exclude hidden files/dirs
+            file_extensions: List of file extensions to include
+            include_patterns: Glob patterns a file must match (any of)
+            exclude_patterns: Glob patterns excluding files and directories
+            max_file_size: Skip files larger than this many bytes
+
+        Yields:
+            Directory entries of matching files (``entry.path`` is absolute)
+
+        """
+        root = os.path.abspath(directory_path)
+        prefix_length = len(root.rstrip(os.sep)) + 1
+        extensions = (
+            {e.lower().lstrip(".") for e in file_extensions} if file_extensions else None
+        )
+        include = _compile_globs(include_patterns)
+        exclude = _compile_globs(exclude_patterns)
+
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    # Sorted so the walk order is stable across runs
+                    entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError as e:
+                logger.warning(f"Cannot list directory {current}: {e}")
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                name = entry.name
+
+                # Skip hidden files/dirs if requested
+                if exclude_hidden and name.startswith("."):
+                    continue
+
+                relative_path = entry.path[prefix_length:]
+                if exclude is not None and (exclude(name) or exclude(relative_path)):
+                    continue
+
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            subdirectories.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+
+                    # Check file extension if specified
+                    if extensions is not None:
+                        ext = os.path.splitext(name)[1][1:].lower()
+                        if ext not in extensions:
+                            continue
+
+                    if include is not None and not (include(name) or include(relative_path)):
+                        continue
+
+                    if max_file_size is not None and entry.stat().st_size > max_file_size:
+                        logger.info(f"Skipping {entry.path}: larger than {max_file_size} bytes")
+                        continue
+
+                except OSError as e:
+                    logger.warning(f"Cannot inspect {entry.path}: {e}")
+                    continue
+
+                yield entry
+
+            # Reversed so subdirectories are visited in name order
+            stack.extend(reversed(subdirectories))
+
+    def find_files(
+        self,
+        directory_path: str,
+        recursive: bool = True,
+        exclude_hidden: bool = True,
+        file_extensions: list[str] | None = None,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
+        max_file_size: int | None = None,
+    ) -> Iterator[str]:
+        """
+        Lazily yield the paths of matching files in a directory.
+
+        Args:
+            directory_path: Path to the directory
+            recursive: Whether to search subdirectories
+            exclude_hidden: Whether to exclude hidden files/dirs
+            file_extensions: List of file extensions to include
+            include_patterns: Glob patterns a file must match (any of)
+            exclude_patterns: Glob patterns excluding files and directories
+            max_file_size: Skip files larger than this many bytes
+
+        Yields:
+            Absolute file paths
+
+        """
+        for entry in self.scan_files(
+            directory_path,
+            recursive,
+            exclude_hidden,
+            file_extensions,
+            include_patterns,
+            exclude_patterns,
+            max_file_size,
+        ):
+            yield entry.path
+
+    def iter_documents(
+        self,
+        file_paths: Iterable[str | os.PathLike[str]],
+        metadata: dict[str, Any] | None = None,
+        max_workers: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Lazily load files on a bounded thread pool.
+
+        At most ``2 * max_workers`` files are read ahead of the consumer, and
+        documents are yielded in the order of ``file_paths``.
+
+        Args:
+            file_paths: Files to load
+            metadata: Optional metadata for all documents
+            max_workers: Number of reader threads (defaults to the
+                ``ingestion_load_workers`` setting)
+
+        Yields:
+            Document dictionaries with "text" and "metadata"
+
+        """
+        max_workers = max_workers or self._settings.ingestion_load_workers
+        max_in_flight = 2 * max_workers
+
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="emvr-file-loader") as pool:
+            pending: deque[Future[list[dict[str, Any]]]] = deque()
+            for file_path in file_paths:
+                pending.append(pool.submit(self.load_file, os.fspath(file_path), metadata))
+                if len(pending) >= max_in_flight:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+
     def load_directory(
         self,
         directory_path: str,
@@ -131,6 +342,9 @@ class FileLoader:
         metadata: dict[str, Any] | None = None,
         exclude_hidden: bool = True,
         file_extensions: list[str] | None = None,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
+        max_file_size: int | None = None,
     ) -> list[dict[str, Any]]:
         """
         Load all files from a directory.
@@ -141,6 +355,10 @@ class FileLoader:
             metadata: Optional metadata for all documents
             exclude_hidden: Whether to exclude hidden files/dirs
             file_extensions: List of file extensions to include
+            include_patterns: Glob patterns a file must match (any of)
+            exclude_patterns: Glob patterns excluding files and directories
+            max_file_size: Skip files larger than this many bytes (defaults
+                to the ``ingestion_max_file_size`` setting)
 
         Returns:
             List[Dict]: List of document dictionaries with "text" and "metadata"
@@ -151,73 +369,48 @@ class FileLoader:
         try:
             logger.info(f"Loading directory: {directory_path} (recursive={recursive})")
 
-            # Placeholder implementation
-            # This will be replaced with actual LlamaIndex usage
             directory_path = os.path.abspath(directory_path)
 
-            if not os.path.exists(directory_path):
+            if not os.path.isdir(directory_path):
                 logger.error(f"Directory not found: {directory_path}")
                 return []
 
-            documents = []
-
-            # Define a helper function to get files
-            def get_files(path):
-                files = []
-                for item in os.listdir(path):
-                    item_path = os.path.join(path, item)
-
-                    # Skip hidden files/dirs if requested
-                    if exclude_hidden and item.startswith("."):
-                        continue
-
-                    if os.path.isfile(item_path):
-                        # Check file extension if specified
-                        if file_extensions:
-                            ext = os.path.splitext(item)[1][1:].lower()
-                            if ext not in [e.lower().lstrip(".") for e in file_extensions]:
-                                continue
-                        files.append(item_path)
-                    elif os.path.isdir(item_path) and recursive:
-                        files.extend(get_files(item_path))
-                return files
-
-            # Get all matching files
-            file_paths = get_files(directory_path)
-
-            # Load each file
-            for file_path in file_paths:
-                try:
-                    file_docs = self.load_file(file_path, metadata)
-                    documents.extend(file_docs)
-                except Exception as e:
-                    logger.exception(f"Error loading file {file_path}: {e}")
+            entries = self.scan_files(
+                directory_path,
+                recursive,
+                exclude_hidden,
+                file_extensions,
+                include_patterns,
+                exclude_patterns,
+                max_file_size or self._settings.ingestion_max_file_size,
+            )
+            documents = list(self.iter_documents(entries, metadata))
 
             logger.info(f"Loaded {len(documents)} documents from {directory_path}")
             return documents
 
-            # TODO: Implement with LlamaIndex SimpleDirectoryReader
-            # documents = SimpleDirectoryReader(
-            #     input_dir=directory_path,
-            #     recursive=recursive,
-            #     filename_as_id=True,
-            #     exclude_hidden=exclude_hidden,
-            #     required_exts=file_extensions
-            # ).load_data()
-            #
-            # # Convert LlamaIndex documents to our format
-            # return [
-            #     {
-            #         "text": doc.text,
-            #         "metadata": {**doc.metadata, **(metadata or {})}
-            #     }
-            #     for doc in documents
-            # ]
-
         except Exception as e:
             logger.exception(f"Failed to load directory {directory_path}: {e}")
             return []
 
 
+def _compile_globs(patterns: list[str] | None) -> Callable[[str], bool] | None:
+    """
+    Compile glob patterns into a single matcher.
+
+    Args:
+        patterns: Glob patterns (``fnmatch`` syntax)
+
+    Returns:
+        A function testing a string against any of the patterns, or None if
+        there are no patterns
+
+    """
+    if not patterns:
+        return None
+    regex = re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+    return lambda value: regex.match(value) is not None
+
+
 # Create a singleton instance for import
 file_loader = FileLoader()
@@ -0,0 +1,330 @@
+"""
+Streaming file readers for the EMVR system.
+
+Readers turn a file into a stream of text segments without materializing
+the whole file as one string. Files are memory-mapped and decoded
+incrementally with an error-tolerant codec, so invalid bytes are replaced
+instead of failing the file. Structured formats get their own reader,
+selected by file extension, that renders records as text.
+"""
+
+import codecs
+import csv
+import itertools
+import json
+import logging
+import mmap
+import os
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bytes decoded per segment
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+# Fields used as the text of a JSON record, in order of preference
+_JSON_TEXT_FIELDS = ("text", "content", "body", "message")
+
+
+def iter_decoded(
+    file_path: str,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    encoding: str = "utf-8",
+    errors: str = "replace",
+) -> Iterator[str]:
+    """
+    Decode a file incrementally through a memory map.
+
+    Multi-byte characters split across blocks are handled by the incremental
+    decoder, and a UTF-8 byte order mark is dropped.
+
+    Args:
+        file_path: Path to the file
+        block_size: Bytes decoded per segment
+        encoding: Text encoding
+        errors: Codec error handler (``replace`` keeps going on bad bytes)
+
+    Yields:
+        Decoded text segments
+
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+            first = True
+            for offset in range(0, size, block_size):
+                text = decoder.decode(mapped[offset : offset + block_size])
+                if first:
+                    text = text.removeprefix("\ufeff")
+                    first = False
+                if text:
+                    yield text
+
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_lines(segments: Iterable[str]) -> Iterator[str]:
+    """
+    Re-split a stream of text segments into lines.
+
+    Args:
+        segments: Consecutive pieces of a text
+
+    Yields:
+        Lines, including their line terminators
+
+    """
+    # Pieces of the last line, joined once its end arrives (re-concatenating
+    # on every segment would be quadratic in the length of a long line)
+    pending: list[str] = []
+    for segment in segments:
+        end = segment.find("\n")
+        if end == -1:
+            pending.append(segment)
+            continue
+
+        pending.append(segment[: end + 1])
+        yield "".join(pending)
+        start = end + 1
+        while (end := segment.find("\n", start)) != -1:
+            yield segment[start : end + 1]
+            start = end + 1
+        # The last line may continue in the next segment
+        pending = [segment[start:]] if start < len(segment) else []
+
+    tail = "".join(pending)
+    if tail:
+        yield tail
+
+
+class DocumentReader:
+    """
+    Reader streaming a file as plain text.
+
+    Subclasses override ``iter_text`` to render structured formats.
+    """
+
+    #: File extensions (lowercase, without the dot) handled by the reader
+    extensions: tuple[str, ...] = ()
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        """
+        Initialize the reader.
+
+        Args:
+            block_size: Bytes decoded per segment
+
+        """
+        self.block_size = block_size
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream the text of a file.
+
+        Args:
+            file_path: Path to the file
+
+        Yields:
+            Text segments which concatenate to the document text
+
+        """
+        return iter_decoded(file_path, self.block_size)
+
+
+class JsonlReader(DocumentReader):
+    """Reader rendering one JSON record per line as one paragraph."""
+
+    extensions = ("jsonl", "ndjson")
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream JSON Lines records as paragraphs.
+
+        The text of a record is its first non-empty field among ``text``,
+        ``content``, ``body`` and ``message``; other records are rendered as
+        compact JSON. Lines that are not valid JSON are kept verbatim.
+
+        Args:
+            file_path: Path to the file
+
+        Yields:
+            One paragraph per record
+
+        """
+        for line in iter_lines(iter_decoded(file_path, self.block_size)):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield line + "\n\n"
+                continue
+            yield self.render(record) + "\n\n"
+
+    @staticmethod
+    def render(record: Any) -> str:
+        """
+        Render a decoded JSON record as text.
+
+        Args:
+            record: Decoded JSON value
+
+        Returns:
+            str: Record text
+
+        """
+        if isinstance(record, dict):
+            for key in _JSON_TEXT_FIELDS:
+                value = record.get(key)
+                if isinstance(value, str) and value.strip():
+                    return value
+        if isinstance(record, str):
+            return record
+        return json.dumps(record, ensure_ascii=False)
+
+
+class CsvReader(DocumentReader):
+    """Reader rendering each CSV row as a paragraph of ``column: value`` lines."""
+
+    extensions = ("csv", "tsv")
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream CSV rows as paragraphs.
+
+        The first row is used as the header. Empty cells are omitted.
+
+        Args:
+            file_path: Path to the file
+
+        Yields:
+            One paragraph per row
+
+        """
+        delimiter = "\t" if file_path.lower().endswith(".tsv") else ","
+        rows = csv.reader(iter_lines(iter_decoded(file_path, self.block_size)), delimiter=delimiter)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [column.strip() for column in header]
+
+        for row in rows:
+            lines = [
+                f"{column}: {value.strip()}" if column else value.strip()
+                for column, value in zip(header, row, strict=False)
+                if value.strip()
+            ]
+            if lines:
+                yield "\n".join(lines) + "\n\n"
+
+
+class MarkdownReader(DocumentReader):
+    """Reader streaming Markdown section by section."""
+
+    extensions = ("md", "markdown")
+
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Stream Markdown sections, dropping YAML front matter.
+
+        Each heading starts a new paragraph, so sections become chunk
+        boundaries. Headings inside fenced code blocks are left alone, and
+        sections longer than the block size are yielded in pieces.
+
+        Args:
+            file_path: Path to the file
+
+        Yields:
+            One segment per section
+
+        """
+        lines = iter_lines(iter_decoded(file_path, self.block_size))
+
+        first = next(lines, None)
+        if first is None:
+            return
+        if first.rstrip() == "---":
+            front_matter = [first]
+            for line in lines:
+                front_matter.append(line)
+                if line.rstrip() == "---":
+                    break
+            else:
+                # No closing marker, so it was not front matter after all
+                yield "".join(front_matter)
+                return
+            first = None
+
+        section: list[str] = []
+        section_size = 0
+        in_fence = False
+
+        for line in itertools.chain((first,) if first is not None else (), lines):
+            stripped = line.lstrip()
+            if stripped.startswith(("```", "~~~")):
+                in_fence = not in_fence
+            elif not in_fence and stripped.startswith("#") and section:
+                yield "".join(section).rstrip("\n") + "\n\n"
+                section = []
+                section_size = 0
+            elif section_size >= self.block_size:
+                # Long section: pass it on in pieces
+                yield "".join(section)
+                section = []
+                section_size = 0
+
+            section.append(line)
+            section_size += len(line)
+
+        if section:
+            yield "".join(section)
+
+
+_default_reader = DocumentReader()
+_readers: dict[str, DocumentReader] = {}
+
+
+def register_reader(reader: DocumentReader, extensions: Iterable[str] | None = None) -> None:
+    """
+    Register a reader for file extensions.
+
+    Args:
+        reader: Reader instance
+        extensions: Extensions to handle (defaults to ``reader.extensions``)
+
+    """
+    for extension in extensions if extensions is not None else reader.extensions:
+        _readers[extension.lower().lstrip(".")] = reader
+
+
+def get_reader(file_path: str) -> DocumentReader:
+    """
+    Get the reader for a file, based on its extension.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        DocumentReader: Registered reader, or the plain-text reader
+
+    """
+    extension = os.path.splitext(file_path)[1][1:].lower()
+    return _readers.get(extension, _default_reader)
+
+
+for _reader in (JsonlReader(), CsvReader(), MarkdownReader()):
+    register_reader(_reader)
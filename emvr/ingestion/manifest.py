@@ -0,0 +1,253 @@
+"""
+Ingestion manifest for incremental re-ingestion.
+
+The manifest records, per ingested file, what was stored for it last time:
+its mtime/size, a content hash, the IDs of its chunks and the names of its
+graph entities. Re-ingesting a directory consults it to skip unchanged files,
+re-embed only the chunks that changed, and clean up after deleted files.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    """What was stored for one file during its last ingestion."""
+
+    path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+    chunk_ids: list[str] = field(default_factory=list)
+    entity_names: list[str] = field(default_factory=list)
+
+
+class IngestionManifest:
+    """
+    SQLite-backed manifest of ingested files.
+
+    Every file seen during a run is stamped with the run ID, so files that
+    were not seen (deleted, or not selected) can be found afterwards with one
+    range scan. Entity names are also indexed on their own, since files with
+    the same name share their Document entity. Writes are committed in
+    batches. All methods are thread-safe.
+    """
+
+    def __init__(self, path: str, commit_every: int = 500) -> None:
+        """
+        Initialize the manifest.
+
+        Args:
+            path: SQLite file holding the manifest
+            commit_every: Number of writes between commits
+
+        """
+        self.path = path
+        self._commit_every = commit_every
+        self._pending_writes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "content_hash TEXT NOT NULL, chunk_ids TEXT NOT NULL, "
+            "entity_names TEXT NOT NULL, run_id INTEGER NOT NULL)"
+        )
+        backfill = not self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'file_entities'"
+        ).fetchone()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS file_entities ("
+            "path TEXT NOT NULL, entity_name TEXT NOT NULL, PRIMARY KEY (path, entity_name))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS file_entities_name ON file_entities (entity_name)"
+        )
+        if backfill:
+            # Manifest written before entity names were indexed
+            self._db.execute(
+                "INSERT OR IGNORE INTO file_entities (path, entity_name) "
+                "SELECT files.path, names.value FROM files, json_each(files.entity_names) AS names"
+            )
+        self._db.commit()
+
+    @staticmethod
+    def new_run_id() -> int:
+        """Return a fresh, monotonically increasing run ID."""
+        return time.time_ns()
+
+    def get(self, path: str) -> ManifestEntry | None:
+        """
+        Get the entry for a file.
+
+        Args:
+            path: Absolute file path
+
+        Returns:
+            The file's entry, or None if it was never ingested
+
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path, mtime_ns, size, content_hash, chunk_ids, entity_names "
+                "FROM files WHERE path = ?",
+                (path,),
+            ).fetchone()
+        return self._to_entry(row) if row else None
+
+    def put(self, entry: ManifestEntry, run_id: int) -> None:
+        """
+        Insert or replace the entry for a file.
+
+        Args:
+            entry: Manifest entry
+            run_id: ID of the current run
+
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files "
+                "(path, mtime_ns, size, content_hash, chunk_ids, entity_names, run_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.path,
+                    entry.mtime_ns,
+                    entry.size,
+                    entry.content_hash,
+                    json.dumps(entry.chunk_ids),
+                    json.dumps(entry.entity_names),
+                    run_id,
+                ),
+            )
+            self._db.execute("DELETE FROM file_entities WHERE path = ?", (entry.path,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO file_entities (path, entity_name) VALUES (?, ?)",
+                [(entry.path, name) for name in entry.entity_names],
+            )
+            self._maybe_commit()
+
+    def touch(self, path: str, run_id: int) -> None:
+        """
+        Mark a file as seen in the current run.
+
+        Args:
+            path: Absolute file path
+            run_id: ID of the current run
+
+        """
+        with self._lock:
+            self._db.execute("UPDATE files SET run_id = ? WHERE path = ?", (run_id, path))
+            self._maybe_commit()
+
+    def iter_unseen(self, directory: str, run_id: int) -> Iterator[ManifestEntry]:
+        """
+        Yield entries under a directory that were not seen in a run.
+
+        Args:
+            directory: Absolute directory path
+            run_id: ID of the run that walked the directory
+
+        Yields:
+            Entries of files that no longer exist, or were not selected by
+            the run (callers check which)
+
+        """
+        prefix = directory.rstrip(os.sep) + os.sep
+        # Range scan on the primary key: every path starting with the prefix
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+
+        self.flush()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, mtime_ns, size, content_hash, chunk_ids, entity_names "
+                "FROM files WHERE path >= ? AND path < ? AND run_id != ?",
+                (prefix, upper, run_id),
+            ).fetchall()
+
+        for row in rows:
+            yield self._to_entry(row)
+
+    def entity_names_in_use(self, names: list[str], excluding: list[str]) -> set[str]:
+        """
+        Find entity names still referenced by other files.
+
+        Args:
+            names: Entity names
+            excluding: Absolute paths of the files whose references are ignored
+                (the ones being deleted or replaced)
+
+        Returns:
+            The names referenced by at least one other file
+
+        """
+        excluded = set(excluding)
+        in_use = set()
+        with self._lock:
+            for name in set(names):
+                rows = self._db.execute(
+                    "SELECT path FROM file_entities WHERE entity_name = ?", (name,)
+                )
+                if any(path not in excluded for (path,) in rows):
+                    in_use.add(name)
+        return in_use
+
+    def delete(self, paths: list[str]) -> None:
+        """
+        Remove entries.
+
+        Args:
+            paths: Absolute file paths
+
+        """
+        with self._lock:
+            self._db.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in paths])
+            self._db.executemany(
+                "DELETE FROM file_entities WHERE path = ?", [(p,) for p in paths]
+            )
+            self._maybe_commit()
+
+    def flush(self) -> None:
+        """Commit pending writes."""
+        with self._lock:
+            self._db.commit()
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        """Commit pending writes and close the manifest."""
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+    def _maybe_commit(self) -> None:
+        """Commit once enough writes are pending (lock held)."""
+        self._pending_writes += 1
+        if self._pending_writes >= self._commit_every:
+            self._db.commit()
+            self._pending_writes = 0
+
+    @staticmethod
+    def _to_entry(row: tuple) -> ManifestEntry:
+        """Convert a database row into an entry."""
+        path, mtime_ns, size, content_hash, chunk_ids, entity_names = row
+        return ManifestEntry(
+            path=path,
+            mtime_ns=mtime_ns,
+            size=size,
+            content_hash=content_hash,
+            chunk_ids=json.loads(chunk_ids),
+            entity_names=json.loads(entity_names),
+        )
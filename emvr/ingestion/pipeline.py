@@ -5,17 +5,25 @@ This module provides the main ingestion pipeline that processes documents
 and stores them in the memory system.
 """
 
+import asyncio
+import hashlib
 import logging
+import os
 import uuid
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
 from typing import Any
 
-# Will use LlamaIndex for text splitting
-# from llama_index.core.node_parser import SentenceSplitter
+import numpy as np
+
 from emvr.config import get_settings
 from emvr.core.embedding import embedding_manager
+from emvr.ingestion.chunking import TextChunker
 from emvr.ingestion.loaders.file_loaders import file_loader
 from emvr.ingestion.loaders.web_loaders import web_loader
+from emvr.ingestion.manifest import IngestionManifest
+from emvr.ingestion.streaming import ProgressCallback, StreamingIngestion, iterate_in_thread
+from emvr.memory.base import Entity
 from emvr.memory.memory_manager import memory_manager
 
 # Configure logging
@@ -40,6 +48,11 @@ class IngestionPipeline:
         self._memory_manager = memory_manager
         self._file_loader = file_loader
         self._web_loader = web_loader
+        self._manifest: IngestionManifest | None = None
+        self._text_splitter = TextChunker(
+            chunk_size=self._settings.default_chunk_size,
+            chunk_overlap=self._settings.default_chunk_overlap,
+        )
         self._initialized = False
 
     async def initialize(self) -> None:
@@ -51,17 +64,11 @@ class IngestionPipeline:
             logger.info("Initializing ingestion pipeline")
 
             # Initialize components
-            self._embedding_manager.initialize()
+            await self._embedding_manager.initialize()
             await self._memory_manager.initialize()
             self._file_loader.initialize()
             self._web_loader.initialize()
 
-            # Initialize text splitter with default settings
-            # self._text_splitter = SentenceSplitter(
-            #     chunk_size=self._settings.default_chunk_size,
-            #     chunk_overlap=self._settings.default_chunk_overlap
-            # )
-
             self._initialized = True
             logger.info("Ingestion pipeline initialized")
 
@@ -87,30 +94,251 @@ class IngestionPipeline:
             metadata: Optional metadata for the chunks
 
         Returns:
-            List[Dict]: List of chunk dictionaries with "text" and "metadata"
+            List[Dict]: List of chunk dictionaries with "text" and "metadata",
+            where the metadata records the chunk's character offsets
+
+        """
+        base_metadata = metadata or {}
+
+        return [
+            {
+                "text": chunk.text,
+                "metadata": {
+                    **base_metadata,
+                    "start_char_idx": chunk.start,
+                    "end_char_idx": chunk.end,
+                },
+            }
+            for chunk in self._text_splitter.split(text)
+        ]
+
+    def _split_stream(
+        self,
+        segments: Iterable[str],
+        metadata: dict[str, Any] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Split a stream of text segments into chunks, lazily.
+
+        Args:
+            segments: Consecutive pieces of the text
+            metadata: Optional metadata for the chunks
+
+        Yields:
+            Chunk dictionaries with "text" and "metadata", where the metadata
+            records the chunk's character offsets in the whole stream
+
+        """
+        base_metadata = metadata or {}
+
+        for chunk in self._text_splitter.split_stream(segments):
+            yield {
+                "text": chunk.text,
+                "metadata": {
+                    **base_metadata,
+                    "start_char_idx": chunk.start,
+                    "end_char_idx": chunk.end,
+                },
+            }
+
+    def _prepare_chunks(
+        self,
+        text: str,
+        metadata: dict[str, Any] | None = None,
+        source_name: str | None = None,
+    ) -> tuple[str, str, list[dict[str, Any]]]:
+        """
+        Split a document into chunks carrying their full metadata.
+
+        Args:
+            text: Text to split
+            metadata: Optional metadata for the text
+            source_name: Optional source name for the text
+
+        Returns:
+            Tuple of (source ID, graph entity name, chunk dictionaries)
+
+        """
+        source_id, entity_name, full_metadata, id_namespace = self._chunk_context(
+            metadata,
+            source_name,
+        )
+        chunks = list(
+            self._identify_chunks(self._split_text(text, full_metadata), id_namespace),
+        )
+        for chunk in chunks:
+            chunk["metadata"]["chunk_count"] = len(chunks)
+
+        return source_id, entity_name, chunks
+
+    def _prepare_chunk_stream(
+        self,
+        segments: Iterable[str],
+        metadata: dict[str, Any] | None = None,
+        source_name: str | None = None,
+    ) -> tuple[str, str, Iterator[dict[str, Any]]]:
+        """
+        Lazily split a streamed document into chunks carrying their metadata.
+
+        Unlike ``_prepare_chunks`` the chunk metadata has no ``chunk_count``,
+        since the count is only known once the stream is exhausted.
+
+        Args:
+            segments: Consecutive pieces of the document text
+            metadata: Optional metadata for the text
+            source_name: Optional source name for the text
+
+        Returns:
+            Tuple of (source ID, graph entity name, chunk dictionary iterator)
+
+        """
+        source_id, entity_name, full_metadata, id_namespace = self._chunk_context(
+            metadata,
+            source_name,
+        )
+        chunks = self._identify_chunks(self._split_stream(segments, full_metadata), id_namespace)
+        return source_id, entity_name, chunks
+
+    @staticmethod
+    def _chunk_context(
+        metadata: dict[str, Any] | None,
+        source_name: str | None,
+    ) -> tuple[str, str, dict[str, Any], str]:
+        """
+        Resolve the source, entity name, metadata and ID namespace of a document.
+
+        Args:
+            metadata: Optional metadata for the text
+            source_name: Optional source name for the text
+
+        Returns:
+            Tuple of (source ID, graph entity name, chunk metadata, ID namespace)
+
+        """
+        # Generate a unique ID if source name not provided
+        source_id = source_name or f"text_{uuid.uuid4().hex[:8]}"
+
+        # Add timestamp metadata
+        full_metadata = dict(metadata or {})
+        full_metadata.update(
+            {
+                "source": source_id,
+                "source_type": "text",
+                "ingestion_time": datetime.now(UTC).isoformat(),
+            }
+        )
+
+        # Chunk IDs are content-addressed within their source, so unchanged
+        # chunks keep their IDs when a document is re-ingested
+        id_namespace = (metadata or {}).get("source") or source_id
+
+        entity_name = source_name or f"Document: {source_id}"
+        return source_id, entity_name, full_metadata, id_namespace
+
+    def _identify_chunks(
+        self,
+        chunks: Iterable[dict[str, Any]],
+        id_namespace: str,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Assign stable IDs and positions to chunks.
+
+        Args:
+            chunks: Chunk dictionaries in document order
+            id_namespace: Source the chunks belong to
+
+        Yields:
+            Chunk dictionaries with "id" and chunk ID/index metadata
+
+        """
+        # Keyed by the ID of a text's first occurrence, so chunk texts are not retained
+        occurrences: dict[str, int] = {}
+
+        for i, chunk in enumerate(chunks):
+            chunk_id = self._chunk_id(id_namespace, chunk["text"], 0)
+            occurrence = occurrences.get(chunk_id, 0)
+            occurrences[chunk_id] = occurrence + 1
+            if occurrence:
+                chunk_id = self._chunk_id(id_namespace, chunk["text"], occurrence)
+            chunk["id"] = chunk_id
+
+            chunk_metadata = chunk["metadata"].copy()
+            chunk_metadata.update(
+                {
+                    "chunk_id": chunk_id,
+                    "chunk_index": i,
+                }
+            )
+            chunk["metadata"] = chunk_metadata
+            yield chunk
+
+    @staticmethod
+    def _chunk_id(namespace: str, text: str, occurrence: int) -> str:
+        """
+        Derive a stable chunk ID from its source and content.
+
+        Args:
+            namespace: Source the chunk belongs to (e.g. the file path)
+            text: Chunk text
+            occurrence: How many identical chunks precede this one in the source
+
+        Returns:
+            str: UUID-formatted chunk ID
+
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(namespace.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        digest.update(occurrence.to_bytes(4, "little"))
+        return str(uuid.UUID(bytes=digest.digest()))
+
+    @staticmethod
+    def _document_entity(entity_name: str, text: str, chunk_count: int) -> Entity:
+        """
+        Build the graph entity representing an ingested document.
+
+        Args:
+            entity_name: Name of the document entity
+            text: Document text (only a short preview is kept)
+            chunk_count: Number of chunks the document was split into
+
+        Returns:
+            Entity: Document entity
+
+        """
+        return Entity(
+            name=entity_name,
+            entity_type="Document",
+            observations=[
+                f"Text content with {chunk_count} chunks. First 100 chars: {text[:100]}..."
+            ],
+        )
+
+    async def _store_chunks(
+        self,
+        chunks: list[dict[str, Any]],
+        embeddings: np.ndarray,
+    ) -> list[dict[str, Any]]:
+        """
+        Store embedded chunks in vector memory.
+
+        Args:
+            chunks: Chunk dictionaries with "text" and "metadata"
+            embeddings: Embedding matrix, one row per chunk
+
+        Returns:
+            List[Dict]: Stored chunk references
 
         """
-        # Placeholder implementation
-        # This will be replaced with actual LlamaIndex usage
-
-        # For now, simply treat the entire text as a single chunk
-        chunk = {
-            "text": text,
-            "metadata": metadata or {},
-        }
-
-        return [chunk]
-
-        # TODO: Implement with LlamaIndex SentenceSplitter
-        # nodes = self._text_splitter.get_nodes_from_documents([LlamaDocument(text=text, metadata=metadata or {})])
-        #
-        # return [
-        #     {
-        #         "text": node.text,
-        #         "metadata": node.metadata
-        #     }
-        #     for node in nodes
-        # ]
+        # TODO: Also add to Supabase for original content storage
+        await self._memory_manager.vector_store.upsert_many(
+            [chunk["id"] for chunk in chunks],
+            embeddings,
+            [{"text": chunk["text"], "metadata": chunk["metadata"]} for chunk in chunks],
+        )
+
+        return [{"id": chunk["id"], "metadata": chunk["metadata"]} for chunk in chunks]
 
     async def ingest_text(
         self,
@@ -135,67 +363,19 @@ class IngestionPipeline:
         try:
             logger.info(f"Ingesting text (length: {len(text)})")
 
-            # Generate a unique ID if source name not provided
-            source_id = source_name or f"text_{uuid.uuid4().hex[:8]}"
-
-            # Add timestamp metadata
-            full_metadata = metadata or {}
-            full_metadata.update(
-                {
-                    "source": source_id,
-                    "source_type": "text",
-                    "ingestion_time": datetime.now(UTC).isoformat(),
-                }
-            )
-
-            # Split text into chunks
-            chunks = self._split_text(text, full_metadata)
+            source_id, entity_name, chunks = self._prepare_chunks(text, metadata, source_name)
             logger.info(f"Text split into {len(chunks)} chunks")
 
-            # Process each chunk
-            stored_chunks = []
-            for i, chunk in enumerate(chunks):
-                chunk_metadata = chunk["metadata"].copy()
-                chunk_metadata.update(
-                    {
-                        "chunk_index": i,
-                        "chunk_count": len(chunks),
-                    }
-                )
-
-                # Generate embedding
-                embedding = self._embedding_manager.generate_embedding(chunk["text"])
-
-                # Store in memory
-                # For now, we'll add it to vector memory via Mem0
-                # TODO: Also add to Supabase for original content storage
-                mem0_id = self._memory_manager._mem0.add(
-                    content=chunk["text"],
-                    user_id=self._settings.mem0_memory_id,
-                    metadata=chunk_metadata,
-                    embedding=embedding,
-                )
+            # Embed all chunks in one batched call (rows follow chunk order)
+            embeddings = await self._embedding_manager.get_embeddings(
+                [chunk["text"] for chunk in chunks]
+            )
 
-                stored_chunks.append(
-                    {
-                        "mem0_id": mem0_id,
-                        "metadata": chunk_metadata,
-                    }
-                )
+            stored_chunks = await self._store_chunks(chunks, embeddings)
 
             # Create an entity in the graph for this document
-            entity_name = source_name or f"Document: {source_id}"
-
             await self._memory_manager.create_entities(
-                [
-                    {
-                        "name": entity_name,
-                        "entityType": "Document",
-                        "observations": [
-                            f"Text content with {len(chunks)} chunks. First 100 chars: {text[:100]}..."
-                        ],
-                    }
-                ]
+                [self._document_entity(entity_name, text, len(chunks))]
             )
 
             logger.info(f"Successfully ingested text as '{entity_name}'")
@@ -236,6 +416,23 @@ class IngestionPipeline:
         try:
             logger.info(f"Ingesting file: {file_path}")
 
+            if (
+                os.path.isfile(file_path)
+                and os.path.getsize(file_path) >= self._settings.ingestion_stream_threshold
+            ):
+                # Too large to read into memory: split it as a stream instead
+                result = await self._streaming_ingestion().run(
+                    iterate_in_thread(iter([os.path.abspath(file_path)])),
+                    metadata,
+                )
+                return {
+                    "success": result["files_processed"] > 0,
+                    "file_path": file_path,
+                    "document_count": result["files_processed"],
+                    "total_chunks": result["total_chunks"],
+                    "failed_files": result["failed_files"],
+                }
+
             # Load the file
             documents = self._file_loader.load_file(file_path, metadata)
 
@@ -276,16 +473,34 @@ class IngestionPipeline:
         metadata: dict[str, Any] | None = None,
         exclude_hidden: bool = True,
         file_extensions: list[str] | None = None,
+        progress_callback: ProgressCallback | None = None,
+        incremental: bool = True,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
+        max_file_size: int | None = None,
     ) -> dict[str, Any]:
         """
         Ingest all files from a directory.
 
+        Files are streamed through bounded load -> split -> embed -> store
+        stages, so memory use does not grow with the size of the directory.
+        In incremental mode a manifest of previously ingested files is used to
+        skip unchanged files, re-embed only modified chunks, and remove the
+        vectors and graph entities of files that were deleted.
+
         Args:
             directory_path: Path to the directory
             recursive: Whether to search subdirectories
             metadata: Optional metadata for all documents
             exclude_hidden: Whether to exclude hidden files/dirs
             file_extensions: List of file extensions to include
+            progress_callback: Optional callable (sync or async) receiving
+                IngestionProgress events, e.g. to drive a UI progress bar
+            incremental: Whether to use the ingestion manifest
+            include_patterns: Glob patterns a file must match (any of)
+            exclude_patterns: Glob patterns excluding files and directories
+            max_file_size: Skip files larger than this many bytes (defaults
+                to the ``ingestion_max_file_size`` setting)
 
         Returns:
             Dict: Ingestion result
@@ -296,37 +511,54 @@ class IngestionPipeline:
         try:
             logger.info(f"Ingesting directory: {directory_path}")
 
-            # Load the directory
-            documents = self._file_loader.load_directory(
+            if not os.path.isdir(directory_path):
+                return {
+                    "success": False,
+                    "error": f"Directory not found: {directory_path}",
+                }
+
+            directory_path = os.path.abspath(directory_path)
+            # Directory entries carry their stat info on to the manifest check
+            file_entries = self._file_loader.scan_files(
                 directory_path,
                 recursive,
-                metadata,
                 exclude_hidden,
                 file_extensions,
+                include_patterns,
+                exclude_patterns,
+                max_file_size or self._settings.ingestion_max_file_size,
             )
 
-            if not documents:
+            manifest = self._get_manifest() if incremental else None
+            run_id = IngestionManifest.new_run_id()
+
+            streaming = self._streaming_ingestion(progress_callback, manifest, run_id)
+            result = await streaming.run(iterate_in_thread(file_entries), metadata)
+
+            result["files_deleted"] = 0
+            if manifest is not None:
+                deleted_files, deleted_chunks = await self._remove_deleted_files(
+                    manifest,
+                    directory_path,
+                    run_id,
+                )
+                result["files_deleted"] = deleted_files
+                result["chunks_deleted"] += deleted_chunks
+
+            if not any(
+                result[key]
+                for key in ("files_processed", "files_unchanged", "files_failed", "files_deleted")
+            ):
                 return {
                     "success": False,
                     "error": f"No documents found in directory: {directory_path}",
                 }
 
-            # Process each document
-            results = []
-            for doc in documents:
-                result = await self.ingest_text(
-                    text=doc["text"],
-                    metadata=doc["metadata"],
-                    source_name=f"File: {doc['metadata'].get('file_name', 'unknown')}",
-                )
-                results.append(result)
-
-            return {
-                "success": True,
-                "directory_path": directory_path,
-                "document_count": len(documents),
-                "results": results,
-            }
+            logger.info(
+                f"Ingested {result['files_processed']} files "
+                f"({result['total_chunks']} chunks) from {directory_path}"
+            )
+            return {"directory_path": directory_path, **result}
 
         except Exception as e:
             logger.exception(f"Failed to ingest directory {directory_path}: {e}")
@@ -335,6 +567,80 @@ class IngestionPipeline:
                 "error": str(e),
             }
 
+    def _streaming_ingestion(
+        self,
+        progress_callback: ProgressCallback | None = None,
+        manifest: IngestionManifest | None = None,
+        run_id: int | None = None,
+    ) -> StreamingIngestion:
+        """Create a streaming ingestion configured from the settings."""
+        return StreamingIngestion(
+            self,
+            load_workers=self._settings.ingestion_load_workers,
+            embed_batch_size=self._settings.ingestion_embed_batch_size,
+            write_workers=self._settings.ingestion_write_workers,
+            queue_size=self._settings.ingestion_queue_size,
+            progress_callback=progress_callback,
+            manifest=manifest,
+            run_id=run_id,
+            stream_threshold=self._settings.ingestion_stream_threshold,
+        )
+
+    def _get_manifest(self) -> IngestionManifest:
+        """Get the ingestion manifest, opening it on first use."""
+        if self._manifest is None:
+            self._manifest = IngestionManifest(
+                os.path.join(self._settings.data_dir, "ingestion_manifest.sqlite3")
+            )
+        return self._manifest
+
+    async def _remove_deleted_files(
+        self,
+        manifest: IngestionManifest,
+        directory_path: str,
+        run_id: int,
+    ) -> tuple[int, int]:
+        """
+        Remove the stored data of files that disappeared from a directory.
+
+        Files not walked by the run but still on disk (e.g. left out by a
+        narrower selection) keep their data.
+
+        Args:
+            manifest: Ingestion manifest
+            directory_path: Absolute directory path that was walked
+            run_id: ID of the run that walked it
+
+        Returns:
+            Tuple of (deleted file count, deleted chunk count)
+
+        """
+        unseen = list(manifest.iter_unseen(directory_path, run_id))
+        deleted = await asyncio.to_thread(
+            lambda: [entry for entry in unseen if not os.path.exists(entry.path)]
+        )
+        if not deleted:
+            return 0, 0
+
+        chunk_ids = [chunk_id for entry in deleted for chunk_id in entry.chunk_ids]
+        entity_names = list(dict.fromkeys(name for entry in deleted for name in entry.entity_names))
+        # Same-named files share their Document entity; keep it while one remains
+        in_use = manifest.entity_names_in_use(entity_names, [entry.path for entry in deleted])
+        entity_names = [name for name in entity_names if name not in in_use]
+        logger.info(
+            f"Removing {len(deleted)} deleted files ({len(chunk_ids)} chunks) "
+            f"under {directory_path}"
+        )
+
+        if chunk_ids:
+            await self._memory_manager.vector_store.delete(chunk_ids)
+        if entity_names:
+            await self._memory_manager.delete_entities(entity_names)
+
+        manifest.delete([entry.path for entry in deleted])
+        manifest.flush()
+        return len(deleted), len(chunk_ids)
+
     async def ingest_url(
         self,
         url: str,
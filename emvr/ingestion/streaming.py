@@ -0,0 +1,639 @@
+"""
+Streaming ingestion for the EMVR system.
+
+This module runs directory ingestion as a staged pipeline:
+
+    file paths -> load -> split -> embed -> store (vector + graph)
+
+Stages are joined by bounded queues and each has its own concurrency limit,
+so peak memory depends on the queue sizes, not on the size of the corpus.
+Files above a size threshold are decoded and split as a stream, and their
+chunks are forwarded in batches, so they never need to fit in memory.
+With a manifest, unchanged files are skipped and only new or modified
+chunks of changed files are embedded and stored.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import logging
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
+
+import numpy as np
+from pydantic import BaseModel
+
+from emvr.ingestion.manifest import IngestionManifest, ManifestEntry
+from emvr.memory.base import Entity
+
+if TYPE_CHECKING:
+    from emvr.ingestion.pipeline import IngestionPipeline
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Number of paths pulled from the directory walker per executor hop
+_PATH_BATCH = 256
+
+
+IngestionEvent = Literal[
+    "file_loaded",
+    "file_unchanged",
+    "file_failed",
+    "chunks_embedded",
+    "chunks_stored",
+    "completed",
+]
+
+
+class IngestionProgress(BaseModel):
+    """Progress event emitted by the streaming ingestion pipeline."""
+
+    event: IngestionEvent
+    files_loaded: int = 0
+    files_unchanged: int = 0
+    files_failed: int = 0
+    chunks_embedded: int = 0
+    chunks_stored: int = 0
+    file_path: str | None = None
+    error: str | None = None
+
+
+ProgressCallback = Callable[[IngestionProgress], Awaitable[None] | None]
+
+
+@dataclass
+class _PendingFile:
+    """A loaded file whose manifest entry is committed once its chunks are stored."""
+
+    entry: ManifestEntry | None
+    remaining: int
+    # False while a streamed file is still being read
+    sealed: bool = True
+
+
+@dataclass
+class _LoadedFile:
+    """Result of reading and splitting one file."""
+
+    path: str
+    chunks: list[dict[str, Any]]
+    entities: list[Entity]
+    entry: ManifestEntry | None = None
+    stale_chunk_ids: list[str] = field(default_factory=list)
+    stale_entity_names: list[str] = field(default_factory=list)
+    # Lazily produced chunks of a large file; the fields above are filled in
+    # once it is exhausted
+    stream: Iterator[dict[str, Any]] | None = None
+    unchanged: bool = False
+
+
+@dataclass
+class _ChunkBatch:
+    """Chunks travelling between the embed and store stages."""
+
+    chunks: list[dict[str, Any]] = field(default_factory=list)
+    owners: list[_PendingFile] = field(default_factory=list)
+    entities: list[Entity] = field(default_factory=list)
+    embeddings: np.ndarray | None = None
+
+
+# Queue sentinel marking the end of a stage's input
+_DONE = object()
+
+
+async def iterate_in_thread(
+    iterator: Iterator[T],
+    executor: ThreadPoolExecutor | None = None,
+) -> AsyncIterator[T]:
+    """
+    Adapt a blocking iterator (e.g. a directory walk) to an async generator.
+
+    Items are pulled in small batches on a worker thread so the event loop
+    never blocks on filesystem calls.
+
+    Args:
+        iterator: Blocking iterator
+        executor: Executor to run it on (defaults to the loop's executor)
+
+    Yields:
+        Items of the iterator
+
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await loop.run_in_executor(executor, lambda: list(islice(iterator, _PATH_BATCH)))
+        if not batch:
+            return
+        for item in batch:
+            yield item
+
+
+class StreamingIngestion:
+    """
+    Bounded-memory, staged ingestion of a stream of files.
+
+    Stages and their concurrency:
+    - load + split: ``load_workers`` tasks reading files on a thread pool
+    - embed: one task batching up to ``embed_batch_size`` chunks per model call
+    - store: ``write_workers`` tasks doing bulk vector and graph writes
+    """
+
+    def __init__(
+        self,
+        pipeline: "IngestionPipeline",
+        load_workers: int = 4,
+        embed_batch_size: int = 256,
+        write_workers: int = 2,
+        queue_size: int = 8,
+        progress_callback: ProgressCallback | None = None,
+        manifest: IngestionManifest | None = None,
+        run_id: int | None = None,
+        stream_threshold: int = 16 * 1024 * 1024,
+    ) -> None:
+        """
+        Initialize the streaming ingestion.
+
+        Args:
+            pipeline: Ingestion pipeline providing loaders, splitting and storage
+            load_workers: Concurrent file reads
+            embed_batch_size: Maximum chunks per embedding call
+            write_workers: Concurrent bulk writes
+            queue_size: Capacity of each inter-stage queue (in items/batches)
+            progress_callback: Optional callable (sync or async) receiving
+                IngestionProgress events
+            manifest: Optional manifest enabling incremental ingestion
+            run_id: Run ID stamped on manifest entries (required with a manifest)
+            stream_threshold: File size in bytes from which files are split
+                as a stream instead of being read into memory
+
+        """
+        self._pipeline = pipeline
+        self._load_workers = load_workers
+        self._embed_batch_size = embed_batch_size
+        self._write_workers = write_workers
+        self._queue_size = queue_size
+        self._progress_callback = progress_callback
+        self._manifest = manifest
+        self._run_id = run_id if run_id is not None else IngestionManifest.new_run_id()
+        self._stream_threshold = stream_threshold
+
+        self._files_loaded = 0
+        self._files_unchanged = 0
+        self._files_failed = 0
+        self._chunks_embedded = 0
+        self._chunks_stored = 0
+        self._chunks_deleted = 0
+        self._failed_files: list[dict[str, str]] = []
+
+    async def _emit(
+        self,
+        event: IngestionEvent,
+        file_path: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Send a progress event to the callback, if any."""
+        if self._progress_callback is None:
+            return
+
+        progress = IngestionProgress(
+            event=event,
+            files_loaded=self._files_loaded,
+            files_unchanged=self._files_unchanged,
+            files_failed=self._files_failed,
+            chunks_embedded=self._chunks_embedded,
+            chunks_stored=self._chunks_stored,
+            file_path=file_path,
+            error=error,
+        )
+        try:
+            result = self._progress_callback(progress)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+    async def run(
+        self,
+        file_paths: AsyncIterator[str | os.DirEntry],
+        metadata: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Ingest a stream of files.
+
+        Args:
+            file_paths: Async iterator of file paths or directory entries
+            metadata: Optional metadata for all documents
+
+        Returns:
+            Dict: Ingestion summary
+
+        """
+        path_queue: asyncio.Queue[Any] = asyncio.Queue(self._queue_size)
+        chunk_queue: asyncio.Queue[Any] = asyncio.Queue(self._queue_size)
+        store_queue: asyncio.Queue[Any] = asyncio.Queue(self._queue_size)
+
+        with ThreadPoolExecutor(
+            max_workers=self._load_workers,
+            thread_name_prefix="emvr-ingest-read",
+        ) as read_pool:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._produce(file_paths, path_queue))
+                loaders = [
+                    group.create_task(
+                        self._load(path_queue, chunk_queue, read_pool, metadata),
+                    )
+                    for _ in range(self._load_workers)
+                ]
+                group.create_task(self._embed(chunk_queue, store_queue))
+                writers = [
+                    group.create_task(self._store(store_queue))
+                    for _ in range(self._write_workers)
+                ]
+
+                await asyncio.gather(*loaders)
+                await chunk_queue.put(_DONE)
+                await asyncio.gather(*writers)
+
+        if self._manifest is not None:
+            self._manifest.flush()
+
+        await self._emit("completed")
+
+        return {
+            "success": True,
+            "files_processed": self._files_loaded,
+            "files_unchanged": self._files_unchanged,
+            "files_failed": self._files_failed,
+            "total_chunks": self._chunks_stored,
+            "chunks_deleted": self._chunks_deleted,
+            "failed_files": self._failed_files,
+        }
+
+    async def _produce(
+        self,
+        file_paths: AsyncIterator[str | os.DirEntry],
+        path_queue: asyncio.Queue[Any],
+    ) -> None:
+        """Feed file paths into the load stage."""
+        async for path in file_paths:
+            await path_queue.put(path)
+
+        for _ in range(self._load_workers):
+            await path_queue.put(_DONE)
+
+    def _read_and_split(
+        self,
+        item: str | os.DirEntry,
+        metadata: dict[str, Any] | None,
+    ) -> _LoadedFile | None:
+        """
+        Read and split a file, diffing it against the manifest.
+
+        Runs on the read thread pool.
+
+        Args:
+            item: File path, or a directory entry whose cached stat is reused
+            metadata: Optional metadata for the documents
+
+        Returns:
+            The loaded file (with a chunk stream for large files), or None if
+            it is unchanged since the last run
+
+        Raises:
+            ValueError: If the file yields no content
+
+        """
+        path = os.fspath(item)
+        manifest = self._manifest
+        previous = None
+        stat = item.stat() if isinstance(item, os.DirEntry) else os.stat(path)
+
+        if manifest is not None:
+            manifest.touch(path, self._run_id)
+            previous = manifest.get(path)
+            if (
+                previous is not None
+                and previous.mtime_ns == stat.st_mtime_ns
+                and previous.size == stat.st_size
+            ):
+                return None
+
+        if stat.st_size >= self._stream_threshold:
+            loaded = _LoadedFile(path=path, chunks=[], entities=[])
+            loaded.stream = self._stream_file(loaded, stat, metadata, previous)
+            return loaded
+
+        documents = self._pipeline._file_loader.load_file(path, metadata)
+        if not documents:
+            msg = "No content loaded"
+            raise ValueError(msg)
+
+        content_hash = hashlib.blake2b(digest_size=16)
+        for doc in documents:
+            content_hash.update(doc["text"].encode("utf-8", errors="surrogatepass"))
+
+        if (
+            manifest is not None
+            and previous is not None
+            and previous.content_hash == content_hash.hexdigest()
+        ):
+            # Touched but not modified: refresh the stat info only
+            previous.mtime_ns = stat.st_mtime_ns
+            previous.size = stat.st_size
+            manifest.put(previous, self._run_id)
+            return None
+
+        chunks: list[dict[str, Any]] = []
+        entities: list[Entity] = []
+        for doc in documents:
+            _, entity_name, doc_chunks = self._pipeline._prepare_chunks(
+                doc["text"],
+                doc["metadata"],
+                f"File: {doc['metadata'].get('file_name', path)}",
+            )
+            chunks.extend(doc_chunks)
+            entities.append(
+                self._pipeline._document_entity(entity_name, doc["text"], len(doc_chunks)),
+            )
+
+        loaded = _LoadedFile(path=path, chunks=chunks, entities=entities)
+
+        if manifest is not None:
+            chunk_ids = [chunk["id"] for chunk in chunks]
+            loaded.entry = ManifestEntry(
+                path=path,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                content_hash=content_hash.hexdigest(),
+                chunk_ids=chunk_ids,
+                entity_names=[entity.name for entity in entities],
+            )
+
+            if previous is not None:
+                # Only chunks that did not exist before need embedding
+                old_ids = set(previous.chunk_ids)
+                new_ids = set(chunk_ids)
+                loaded.chunks = [chunk for chunk in chunks if chunk["id"] not in old_ids]
+                loaded.stale_chunk_ids = [i for i in previous.chunk_ids if i not in new_ids]
+                loaded.stale_entity_names = self._unshared_entity_names(previous)
+
+        return loaded
+
+    def _stream_file(
+        self,
+        loaded: _LoadedFile,
+        stat: os.stat_result,
+        metadata: dict[str, Any] | None,
+        previous: ManifestEntry | None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Lazily decode and split a large file, diffing it against the manifest.
+
+        Pulled on the read thread pool. Only chunks that are new since the
+        previous run are yielded; once exhausted, the file's entity, manifest
+        entry and stale chunks are filled into ``loaded``.
+
+        Args:
+            loaded: File being streamed
+            stat: Stat result of the file
+            metadata: Optional metadata for the document
+            previous: Manifest entry from the previous run, if any
+
+        Yields:
+            Chunk dictionaries
+
+        Raises:
+            ValueError: If the file yields no content
+
+        """
+        file_loader = self._pipeline._file_loader
+        content_hash = hashlib.blake2b(digest_size=16)
+        preview: list[str] = []
+
+        def segments() -> Iterator[str]:
+            for segment in file_loader.iter_segments(loaded.path):
+                content_hash.update(segment.encode("utf-8", errors="surrogatepass"))
+                if not preview:
+                    preview.append(segment[:100])
+                yield segment
+
+        doc_metadata = file_loader.file_metadata(loaded.path, stat.st_size, metadata)
+        _, entity_name, chunks = self._pipeline._prepare_chunk_stream(
+            segments(),
+            doc_metadata,
+            f"File: {doc_metadata['file_name']}",
+        )
+
+        old_ids = set(previous.chunk_ids) if previous is not None else set()
+        chunk_ids: list[str] = []
+        for chunk in chunks:
+            chunk_ids.append(chunk["id"])
+            if chunk["id"] not in old_ids:
+                yield chunk
+
+        if not chunk_ids:
+            msg = "No content loaded"
+            raise ValueError(msg)
+
+        if (
+            previous is not None
+            and previous.content_hash == content_hash.hexdigest()
+            and previous.chunk_ids == chunk_ids
+        ):
+            # Touched but not modified: refresh the stat info only
+            previous.mtime_ns = stat.st_mtime_ns
+            previous.size = stat.st_size
+            loaded.entry = previous
+            loaded.unchanged = True
+            return
+
+        loaded.entities = [
+            self._pipeline._document_entity(entity_name, "".join(preview), len(chunk_ids)),
+        ]
+        if self._manifest is not None:
+            loaded.entry = ManifestEntry(
+                path=loaded.path,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                content_hash=content_hash.hexdigest(),
+                chunk_ids=chunk_ids,
+                entity_names=[entity_name],
+            )
+        if previous is not None:
+            new_ids = set(chunk_ids)
+            loaded.stale_chunk_ids = [i for i in previous.chunk_ids if i not in new_ids]
+            loaded.stale_entity_names = self._unshared_entity_names(previous)
+
+    def _unshared_entity_names(self, previous: ManifestEntry) -> list[str]:
+        """Entity names of a file's previous version that no other file uses."""
+        if self._manifest is None:
+            return list(previous.entity_names)
+        in_use = self._manifest.entity_names_in_use(previous.entity_names, [previous.path])
+        return [name for name in previous.entity_names if name not in in_use]
+
+    async def _load_stream(
+        self,
+        loaded: _LoadedFile,
+        chunk_queue: asyncio.Queue[Any],
+        read_pool: ThreadPoolExecutor,
+    ) -> None:
+        """Forward the chunks of a streamed file in batches, then finish the file."""
+        if loaded.stream is None:
+            msg = f"{loaded.path} is not being streamed"
+            raise ValueError(msg)
+
+        memory_manager = self._pipeline._memory_manager
+        owner = _PendingFile(entry=None, remaining=0, sealed=False)
+        batch: list[dict[str, Any]] = []
+
+        async for chunk in iterate_in_thread(loaded.stream, read_pool):
+            batch.append(chunk)
+            if len(batch) >= self._embed_batch_size:
+                owner.remaining += len(batch)
+                await chunk_queue.put((batch, [], owner))
+                batch = []
+
+        if batch:
+            owner.remaining += len(batch)
+            await chunk_queue.put((batch, [], owner))
+
+        if loaded.stale_chunk_ids:
+            await memory_manager.vector_store.delete(loaded.stale_chunk_ids)
+            self._chunks_deleted += len(loaded.stale_chunk_ids)
+        if loaded.stale_entity_names:
+            await memory_manager.delete_entities(loaded.stale_entity_names)
+        if loaded.entities:
+            await memory_manager.create_entities(loaded.entities)
+
+        owner.entry = loaded.entry
+        owner.sealed = True
+        if owner.remaining == 0:
+            self._commit(owner)
+
+    async def _load(
+        self,
+        path_queue: asyncio.Queue[Any],
+        chunk_queue: asyncio.Queue[Any],
+        read_pool: ThreadPoolExecutor,
+        metadata: dict[str, Any] | None,
+    ) -> None:
+        """Read and split files, forwarding their chunks to the embed stage."""
+        loop = asyncio.get_running_loop()
+        memory_manager = self._pipeline._memory_manager
+
+        while (item := await path_queue.get()) is not _DONE:
+            path = os.fspath(item)
+            try:
+                loaded = await loop.run_in_executor(
+                    read_pool,
+                    self._read_and_split,
+                    item,
+                    metadata,
+                )
+                if loaded is None:
+                    self._files_unchanged += 1
+                    await self._emit("file_unchanged", file_path=path)
+                    continue
+
+                if loaded.stream is not None:
+                    await self._load_stream(loaded, chunk_queue, read_pool)
+                    if loaded.unchanged:
+                        self._files_unchanged += 1
+                        await self._emit("file_unchanged", file_path=path)
+                    else:
+                        self._files_loaded += 1
+                        await self._emit("file_loaded", file_path=path)
+                    continue
+
+                if loaded.stale_chunk_ids:
+                    await memory_manager.vector_store.delete(loaded.stale_chunk_ids)
+                    self._chunks_deleted += len(loaded.stale_chunk_ids)
+                if loaded.stale_entity_names:
+                    # Document entities are recreated with the new content
+                    await memory_manager.delete_entities(loaded.stale_entity_names)
+
+                owner = _PendingFile(entry=loaded.entry, remaining=len(loaded.chunks))
+                if loaded.chunks:
+                    await chunk_queue.put((loaded.chunks, loaded.entities, owner))
+                else:
+                    # Nothing to embed (e.g. only chunks were removed)
+                    if loaded.entities:
+                        await memory_manager.create_entities(loaded.entities)
+                    self._commit(owner)
+
+                self._files_loaded += 1
+                await self._emit("file_loaded", file_path=path)
+
+            except Exception as e:
+                logger.exception(f"Failed to load {path}: {e}")
+                self._files_failed += 1
+                self._failed_files.append({"file_path": path, "error": str(e)})
+                await self._emit("file_failed", file_path=path, error=str(e))
+
+    async def _embed(
+        self,
+        chunk_queue: asyncio.Queue[Any],
+        store_queue: asyncio.Queue[Any],
+    ) -> None:
+        """Group chunks into batches, embed them and forward them to storage."""
+        batch = _ChunkBatch()
+        done = False
+
+        while not done:
+            item = await chunk_queue.get()
+            if item is _DONE:
+                done = True
+            else:
+                chunks, entities, owner = item
+                batch.chunks.extend(chunks)
+                batch.owners.extend([owner] * len(chunks))
+                batch.entities.extend(entities)
+
+            if batch.chunks and (done or len(batch.chunks) >= self._embed_batch_size):
+                batch.embeddings = await self._pipeline._embedding_manager.get_embeddings(
+                    [chunk["text"] for chunk in batch.chunks]
+                )
+                self._chunks_embedded += len(batch.chunks)
+                await self._emit("chunks_embedded")
+                await store_queue.put(batch)
+                batch = _ChunkBatch()
+
+        for _ in range(self._write_workers):
+            await store_queue.put(_DONE)
+
+    async def _store(self, store_queue: asyncio.Queue[Any]) -> None:
+        """Write embedded batches to vector memory and their documents to the graph."""
+        memory_manager = self._pipeline._memory_manager
+
+        while (batch := await store_queue.get()) is not _DONE:
+            try:
+                await self._pipeline._store_chunks(batch.chunks, batch.embeddings)
+                if batch.entities:
+                    await memory_manager.create_entities(batch.entities)
+
+                self._chunks_stored += len(batch.chunks)
+                for owner in batch.owners:
+                    owner.remaining -= 1
+                    if owner.remaining == 0 and owner.sealed:
+                        self._commit(owner)
+                await self._emit("chunks_stored")
+
+            except Exception as e:
+                # Manifest entries stay uncommitted, so these files are retried next run
+                logger.exception(f"Failed to store batch of {len(batch.chunks)} chunks: {e}")
+                sources = {chunk["metadata"].get("source", "unknown") for chunk in batch.chunks}
+                for source in sources:
+                    self._failed_files.append({"file_path": source, "error": str(e)})
+                await self._emit("file_failed", error=str(e))
+
+    def _commit(self, owner: _PendingFile) -> None:
+        """Record a fully stored file in the manifest."""
+        if self._manifest is not None and owner.entry is not None:
+            self._manifest.put(owner.entry, self._run_id)
@@ -184,20 +184,31 @@ async def register_endpoints(mcp: MCPServer) -> None:
 
     @mcp.tool()
     async def memory_read_graph(
+        cursor: Annotated[
+            str | None, Field(description="Cursor of the previous page, to read the next one")
+        ] = None,
+        limit: Annotated[
+            int | None, Field(description="Maximum number of entities per page")
+        ] = None,
         ctx: Context = None,
     ) -> dict[str, Any]:
         """
-        Read the entire knowledge graph.
+        Read the knowledge graph.
 
-        Returns the complete graph structure with entities and relationships.
+        Returns the complete graph structure with entities and relationships,
+        or one page of it when a limit or cursor is given. Pass a page's
+        next_cursor to read the following page.
         """
         try:
-            await ctx.info("Reading entire graph")
-
             # Initialize memory manager
             await memory_manager.initialize()
 
             # Process the request
+            if limit is not None or cursor is not None:
+                await ctx.info(f"Reading graph page after {cursor!r}")
+                return await memory_manager.read_graph_page(cursor, limit)
+
+            await ctx.info("Reading entire graph")
             return await memory_manager.read_graph()
 
         except Exception as e:
@@ -205,6 +216,68 @@ async def register_endpoints(mcp: MCPServer) -> None:
             await ctx.error(f"Failed to read graph: {e}")
             raise
 
+    @mcp.tool()
+    async def memory_sample_graph(
+        limit: Annotated[int, Field(description="Maximum number of entities")] = 50,
+        center: Annotated[
+            str | None, Field(description="Optional entity to sample around")
+        ] = None,
+        max_depth: Annotated[int, Field(description="Maximum hops from the center")] = 2,
+        ctx: Context = None,
+    ) -> dict[str, Any]:
+        """
+        Read a small connected sample of the knowledge graph.
+
+        Use this for an overview of a large graph instead of reading all of it.
+        """
+        try:
+            await ctx.info(f"Sampling {limit} entities of the graph")
+
+            # Initialize memory manager
+            await memory_manager.initialize()
+
+            # Process the request
+            return await memory_manager.sample_graph(limit, center, max_depth)
+
+        except Exception as e:
+            logger.exception(f"Sampling graph failed: {e}")
+            await ctx.error(f"Failed to sample graph: {e}")
+            raise
+
+    @mcp.tool()
+    async def memory_expand_entities(
+        names: Annotated[list[str], Field(description="Entity names to expand")],
+        hops: Annotated[int, Field(description="Maximum hops from each entity")] = 1,
+        relation_types: Annotated[
+            list[str] | None, Field(description="Only follow relations of these types")
+        ] = None,
+        limit_per_entity: Annotated[
+            int, Field(description="Maximum entities reached per expanded entity")
+        ] = 25,
+        ctx: Context = None,
+    ) -> dict[str, Any]:
+        """
+        Expand several entities into the subgraph around them, in one call.
+
+        Use this instead of opening and searching around entities one by one.
+        Each returned entity lists the requested entities it was reached from.
+        """
+        try:
+            await ctx.info(f"Expanding {len(names)} entities by {hops} hops")
+
+            # Initialize memory manager
+            await memory_manager.initialize()
+
+            # Process the request
+            return await memory_manager.expand_entities(
+                names, hops, relation_types, limit_per_entity
+            )
+
+        except Exception as e:
+            logger.exception(f"Expanding entities failed: {e}")
+            await ctx.error(f"Failed to expand entities: {e}")
+            raise
+
     @mcp.tool()
     async def memory_delete_entities(
         entityNames: Annotated[list[str], Field(description="List of entity names to delete")],
@@ -466,9 +539,23 @@ async def register_resources(mcp: MCPServer) -> None:
         ```
 
         ### memory_read_graph
-        Get the complete knowledge graph:
+        Get the complete knowledge graph, or page through a large one:
         ```python
         graph = await memory.read_graph()
+        page = await memory.read_graph(limit=1000)
+        page = await memory.read_graph(cursor=page["next_cursor"], limit=1000)
+        ```
+
+        ### memory_sample_graph
+        Get a small connected sample, optionally around an entity:
+        ```python
+        sample = await memory.sample_graph(limit=50, center="EntityName")
+        ```
+
+        ### memory_expand_entities
+        Get the subgraph around several entities in one call:
+        ```python
+        subgraph = await memory.expand_entities(["Entity1", "Entity2"], hops=2)
         ```
 
         ### memory_delete_entities
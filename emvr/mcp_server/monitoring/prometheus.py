@@ -7,6 +7,9 @@ from fastapi import FastAPI
 from prometheus_client import Counter, Gauge, Histogram
 from prometheus_client.openmetrics.exposition import generate_latest
 
+# Storage and cache metrics live in emvr.core.metrics (no server dependencies)
+from emvr.core.metrics import update_vector_count  # noqa: F401
+
 # Type variables
 F = TypeVar("F", bound=Callable[..., Any])
 
@@ -30,12 +33,6 @@ REQUEST_LATENCY = Histogram(
     buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0, 25.0, 50.0, 75.0, 100.0, float("inf")),
 )
 
-VECTOR_COUNT = Gauge(
-    "emvr_qdrant_vector_count",
-    "Number of vectors stored in Qdrant",
-    ["collection"],
-)
-
 GRAPH_NODE_COUNT = Gauge(
     "emvr_neo4j_node_count",
     "Number of nodes in Neo4j graph",
@@ -141,11 +138,6 @@ def track_memory_operation(operation: str) -> Callable[[F], F]:
     return decorator
 
 
-def update_vector_count(collection: str, count: int) -> None:
-    """Update the vector count metric for a collection."""
-    VECTOR_COUNT.labels(collection=collection).set(count)
-
-
 def update_graph_counts(node_counts: dict[str, int], relation_counts: dict[str, int]) -> None:
     """Update Neo4j graph count metrics."""
     for label, count in node_counts.items():
@@ -60,7 +60,7 @@ class MemoryMCPServer:
             logger.info("Initializing MCP server")
 
             # Initialize database connections
-            initialize_connections()
+            await initialize_connections()
 
             # Initialize memory manager
             await memory_manager.initialize()
@@ -103,8 +103,14 @@ class MemoryMCPServer:
 
         def handle_exit_signal(sig, frame) -> None:
             logger.info(f"Received signal {sig}, shutting down...")
-            self.cleanup()
-            sys.exit(0)
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                asyncio.run(self.cleanup())
+                sys.exit(0)
+            # Inside the server's loop: clean up there, then exit
+            task = loop.create_task(self.cleanup())
+            task.add_done_callback(lambda _: sys.exit(0))
 
         # Register signal handlers
         signal.signal(signal.SIGINT, handle_exit_signal)
@@ -118,7 +124,7 @@ class MemoryMCPServer:
             await self._mcp_server.start_stdio()
         except Exception as e:
             logger.exception(f"Error running MCP server in stdio mode: {e}")
-            self.cleanup()
+            await self.cleanup()
             raise
 
     async def run_http(self, host: str | None = None, port: int | None = None) -> None:
@@ -140,23 +146,23 @@ class MemoryMCPServer:
             await self._mcp_server.start_http(host=host, port=port)
         except Exception as e:
             logger.exception(f"Error running MCP server in HTTP mode: {e}")
-            self.cleanup()
+            await self.cleanup()
             raise
 
-    def cleanup(self) -> None:
+    async def cleanup(self) -> None:
         """Clean up resources before shutdown."""
         logger.info("Cleaning up resources...")
 
         # Shutdown agent orchestration if initialized
         orchestrator = get_orchestrator()
         if orchestrator:
-            asyncio.run(orchestrator.shutdown())
+            await orchestrator.shutdown()
 
-        # Close memory manager connections
-        memory_manager.close()
+        # Close memory manager connections (flushes buffered vector writes)
+        await memory_manager.close()
 
-        # Close database connections
-        close_connections()
+        # Close database connections, once in-flight work has drained
+        await close_connections()
 
         logger.info("Cleanup complete")
 
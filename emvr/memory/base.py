@@ -58,7 +58,7 @@ class MemoryInterface(ABC):
         """Read the entire knowledge graph."""
 
     @abstractmethod
-    async def search_nodes(self, query: str) -> dict[str, Any]:
+    async def search_nodes(self, query: str, limit: int = 10) -> dict[str, Any]:
         """Search for nodes in the knowledge graph based on a query."""
 
     @abstractmethod
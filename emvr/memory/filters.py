@@ -0,0 +1,319 @@
+"""
+Metadata filter language for vector search.
+
+Filters are small typed expression trees (``Eq``, ``In``, ``Range``,
+``Prefix``, ``And``, ``Or``, ``Not``) over payload fields addressed by dotted
+paths, e.g. ``metadata.source``. Retrievers keep passing plain dicts, which
+``parse_filter`` turns into expressions:
+
+    {"source": "docs"}                                  # equality
+    {"source_type": {"$in": ["file", "text"]}}          # membership
+    {"ingestion_time": {"$gte": "2024-01-01"}}          # range ($gt/$gte/$lt/$lte)
+    {"file_path": {"$prefix": "/data/tenant-a/"}}       # string prefix
+    {"$or": [{...}, {...}], "$not": {...}}              # boolean logic
+
+Several keys in one dict are combined with AND. Expressions are evaluated
+directly (``matches``), compiled to payload-index bitmaps by the local
+vector index, or translated to Qdrant ``Filter`` objects (``to_qdrant``).
+A field holding a list matches if any of its elements does.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+_RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+
+@dataclass(frozen=True, slots=True)
+class Eq:
+    """Field equals a value."""
+
+    field: str
+    value: Any
+
+
+@dataclass(frozen=True, slots=True)
+class In:
+    """Field equals one of several values."""
+
+    field: str
+    values: tuple[Any, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Range:
+    """Field lies within (open or closed) bounds; None leaves a side unbounded."""
+
+    field: str
+    gt: Any = None
+    gte: Any = None
+    lt: Any = None
+    lte: Any = None
+
+    def contains(self, value: Any) -> bool:
+        """Whether a value lies within the bounds (False if incomparable)."""
+        try:
+            return (
+                (self.gt is None or value > self.gt)
+                and (self.gte is None or value >= self.gte)
+                and (self.lt is None or value < self.lt)
+                and (self.lte is None or value <= self.lte)
+            )
+        except TypeError:
+            return False
+
+
+@dataclass(frozen=True, slots=True)
+class Prefix:
+    """String field starts with a prefix."""
+
+    field: str
+    prefix: str
+
+
+@dataclass(frozen=True, slots=True)
+class And:
+    """All clauses match."""
+
+    clauses: tuple["Filter", ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Or:
+    """At least one clause matches."""
+
+    clauses: tuple["Filter", ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Not:
+    """The clause does not match."""
+
+    clause: "Filter"
+
+
+Filter = Eq | In | Range | Prefix | And | Or | Not
+
+
+def parse_filter(spec: dict[str, Any] | Filter | None, prefix: str = "") -> Filter | None:
+    """
+    Parse a filter dict into an expression.
+
+    Args:
+        spec: Filter dict, an already parsed expression, or None
+        prefix: Path prepended to every field name of a dict (e.g. "metadata.")
+
+    Returns:
+        The expression, or None for an empty filter
+
+    Raises:
+        ValueError: If the dict uses an unknown operator or malformed operand
+
+    """
+    if spec is None or isinstance(spec, Filter):
+        return spec
+    if not isinstance(spec, dict):
+        msg = f"Filter must be a dict, got {type(spec).__name__}"
+        raise ValueError(msg)
+
+    clauses: list[Filter] = []
+    for key, value in spec.items():
+        if key in ("$and", "$or"):
+            if not isinstance(value, list | tuple):
+                msg = f"{key} expects a list of filters"
+                raise ValueError(msg)
+            parts = tuple(p for p in (parse_filter(v, prefix) for v in value) if p is not None)
+            clauses.append(And(parts) if key == "$and" else Or(parts))
+        elif key == "$not":
+            clause = parse_filter(value, prefix)
+            if clause is not None:
+                clauses.append(Not(clause))
+        elif key.startswith("$"):
+            msg = f"Unknown filter operator: {key}"
+            raise ValueError(msg)
+        else:
+            clauses.append(_parse_condition(prefix + key, value))
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else And(tuple(clauses))
+
+
+def _parse_condition(field: str, value: Any) -> Filter:
+    """Parse the condition on one field."""
+    if not isinstance(value, dict):
+        return Eq(field, value)
+
+    unknown = set(value) - {"$eq", "$in", "$prefix", "$ne", "$nin", *_RANGE_OPERATORS}
+    if unknown:
+        msg = f"Unknown operators for field {field}: {sorted(unknown)}"
+        raise ValueError(msg)
+
+    clauses: list[Filter] = []
+    if "$eq" in value:
+        clauses.append(Eq(field, value["$eq"]))
+    if "$ne" in value:
+        clauses.append(Not(Eq(field, value["$ne"])))
+    if "$in" in value:
+        clauses.append(In(field, tuple(value["$in"])))
+    if "$nin" in value:
+        clauses.append(Not(In(field, tuple(value["$nin"]))))
+    if "$prefix" in value:
+        if not isinstance(value["$prefix"], str):
+            msg = f"$prefix expects a string for field {field}"
+            raise ValueError(msg)
+        clauses.append(Prefix(field, value["$prefix"]))
+    if any(op in value for op in _RANGE_OPERATORS):
+        clauses.append(Range(field, *(value.get(op) for op in _RANGE_OPERATORS)))
+
+    if not clauses:
+        msg = f"Empty condition for field {field}"
+        raise ValueError(msg)
+    return clauses[0] if len(clauses) == 1 else And(tuple(clauses))
+
+
+def filter_fields(expression: Filter) -> set[str]:
+    """
+    Collect the fields an expression refers to.
+
+    Args:
+        expression: Filter expression
+
+    Returns:
+        Set of dotted field paths
+
+    """
+    if isinstance(expression, And | Or):
+        return set().union(*(filter_fields(c) for c in expression.clauses))
+    if isinstance(expression, Not):
+        return filter_fields(expression.clause)
+    return {expression.field}
+
+
+def field_values(payload: dict[str, Any], path: str) -> list[Any]:
+    """
+    Read the values of a dotted path from a nested payload.
+
+    Args:
+        payload: Payload dict
+        path: Dotted field path
+
+    Returns:
+        The elements of a list value, a scalar value as a one-element list,
+        or an empty list if the path is missing or null
+
+    """
+    value: Any = payload
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return []
+        value = value[part]
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def matches(expression: Filter | None, payload: dict[str, Any]) -> bool:
+    """
+    Evaluate an expression against one payload.
+
+    Args:
+        expression: Filter expression (None matches everything)
+        payload: Payload dict
+
+    Returns:
+        bool: Whether the payload matches
+
+    """
+    if expression is None:
+        return True
+    if isinstance(expression, And):
+        return all(matches(c, payload) for c in expression.clauses)
+    if isinstance(expression, Or):
+        return any(matches(c, payload) for c in expression.clauses)
+    if isinstance(expression, Not):
+        return not matches(expression.clause, payload)
+
+    return any(_matches_value(expression, v) for v in field_values(payload, expression.field))
+
+
+def _matches_value(expression: Eq | In | Range | Prefix, value: Any) -> bool:
+    """Evaluate a field condition against one scalar value."""
+    if isinstance(expression, Eq):
+        return value == expression.value
+    if isinstance(expression, In):
+        return value in expression.values
+    if isinstance(expression, Range):
+        return expression.contains(value)
+    return isinstance(value, str) and value.startswith(expression.prefix)
+
+
+def to_qdrant(expression: Filter | None) -> Any:
+    """
+    Translate an expression into a Qdrant ``Filter``.
+
+    ``Range`` bounds that are strings become ``DatetimeRange`` (ISO 8601
+    timestamps). Equality on a float becomes a closed range, as Qdrant only
+    matches exact str, int and bool values. ``Prefix`` has no Qdrant
+    equivalent (``MatchText`` matches full-text tokens anywhere in the
+    value), so it is rejected.
+
+    Args:
+        expression: Filter expression
+
+    Returns:
+        ``qdrant_client.models.Filter``, or None for no filter
+
+    Raises:
+        ValueError: If the expression uses a ``Prefix`` condition
+
+    """
+    from qdrant_client import models
+
+    if expression is None:
+        return None
+    if isinstance(expression, And):
+        return models.Filter(must=[_to_qdrant_condition(c) for c in expression.clauses])
+    if isinstance(expression, Or):
+        return models.Filter(should=[_to_qdrant_condition(c) for c in expression.clauses])
+    if isinstance(expression, Not):
+        return models.Filter(must_not=[_to_qdrant_condition(expression.clause)])
+    return models.Filter(must=[_to_qdrant_condition(expression)])
+
+
+def _to_qdrant_condition(expression: Filter) -> Any:
+    """Translate one clause into a Qdrant condition (or nested filter)."""
+    from qdrant_client import models
+
+    if isinstance(expression, And | Or | Not):
+        return to_qdrant(expression)
+    if isinstance(expression, Eq):
+        if isinstance(expression.value, float):
+            return models.FieldCondition(
+                key=expression.field,
+                range=models.Range(gte=expression.value, lte=expression.value),
+            )
+        return models.FieldCondition(
+            key=expression.field, match=models.MatchValue(value=expression.value)
+        )
+    if isinstance(expression, In):
+        if any(isinstance(value, float) for value in expression.values):
+            return models.Filter(
+                should=[_to_qdrant_condition(Eq(expression.field, v)) for v in expression.values]
+            )
+        return models.FieldCondition(
+            key=expression.field, match=models.MatchAny(any=list(expression.values))
+        )
+    if isinstance(expression, Prefix):
+        msg = f"$prefix filters are not supported by a Qdrant server (field {expression.field})"
+        raise ValueError(msg)
+
+    bounds = {
+        "gt": expression.gt,
+        "gte": expression.gte,
+        "lt": expression.lt,
+        "lte": expression.lte,
+    }
+    if any(isinstance(b, str) for b in bounds.values()):
+        return models.FieldCondition(key=expression.field, range=models.DatetimeRange(**bounds))
+    return models.FieldCondition(key=expression.field, range=models.Range(**bounds))
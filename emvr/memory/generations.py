@@ -0,0 +1,55 @@
+"""
+Write generations of the memory stores.
+
+Every store mutation bumps the generation of its scope ("vector" or
+"graph"). Caches of derived data (e.g. retrieval results) record the
+generations of the scopes they read when computing an entry and drop it
+once any of them has moved on, so a write invalidates exactly the entries
+that could have seen it.
+"""
+
+import threading
+
+SCOPES = ("vector", "graph")
+
+
+class WriteGenerations:
+    """Monotonic per-scope write counters. All methods are thread-safe."""
+
+    def __init__(self) -> None:
+        """Initialize every scope at generation 0."""
+        self._generations = dict.fromkeys(SCOPES, 0)
+        self._lock = threading.Lock()
+
+    def bump(self, scope: str) -> int:
+        """
+        Record a write to a scope.
+
+        Args:
+            scope: "vector" or "graph"
+
+        Returns:
+            int: The scope's new generation
+
+        """
+        with self._lock:
+            self._generations[scope] += 1
+            return self._generations[scope]
+
+    def snapshot(self, scopes: tuple[str, ...]) -> tuple[int, ...]:
+        """
+        Read the current generations of several scopes.
+
+        Args:
+            scopes: Scope names
+
+        Returns:
+            Their generations, in the same order
+
+        """
+        with self._lock:
+            return tuple(self._generations[scope] for scope in scopes)
+
+
+# Singleton instance
+write_generations = WriteGenerations()
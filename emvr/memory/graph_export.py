@@ -0,0 +1,136 @@
+"""
+Streaming export of the knowledge graph.
+
+Writes the pages of ``Neo4jMemoryStore.iter_graph`` to a file as they are
+read, so exporting holds one page in memory regardless of the graph size.
+
+Formats:
+
+- ``ndjson``: one JSON object per line, ``{"type": "entity", "name": ...,
+  "entity_type": ..., "observations": [...]}`` or ``{"type": "relation",
+  "from": ..., "relation": ..., "to": ...}``
+- ``arrow``: an Arrow IPC file with one record batch per page and the
+  columns ``type``, ``name``, ``entity_type``, ``observations``, ``from``,
+  ``relation`` and ``to`` (null where they do not apply); requires pyarrow
+
+The export is written to a temporary file next to ``path`` and renamed into
+place once complete.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections.abc import AsyncIterable
+from typing import Any
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "arrow")
+
+
+class _NdjsonWriter:
+    """Writes pages as JSON Lines."""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "w", encoding="utf-8")  # noqa: SIM115
+
+    def write_page(self, entities: list[dict[str, Any]], relations: list[dict[str, Any]]) -> None:
+        lines = [json.dumps({"type": "entity", **entity}) + "\n" for entity in entities]
+        lines.extend(json.dumps({"type": "relation", **relation}) + "\n" for relation in relations)
+        self._file.writelines(lines)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ArrowWriter:
+    """Writes pages as record batches of an Arrow IPC file."""
+
+    def __init__(self, path: str) -> None:
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            msg = (
+                "pyarrow is required for Arrow exports: "
+                "pip install 'enhanced-mem-vector-rag[arrow]'"
+            )
+            raise ImportError(msg) from e
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("type", pa.string()),
+                ("name", pa.string()),
+                ("entity_type", pa.string()),
+                ("observations", pa.list_(pa.string())),
+                ("from", pa.string()),
+                ("relation", pa.string()),
+                ("to", pa.string()),
+            ]
+        )
+        self._writer = pa.ipc.new_file(path, self._schema)
+
+    def write_page(self, entities: list[dict[str, Any]], relations: list[dict[str, Any]]) -> None:
+        rows = [{"type": "entity", **entity} for entity in entities]
+        rows.extend({"type": "relation", **relation} for relation in relations)
+        self._writer.write_batch(self._pa.RecordBatch.from_pylist(rows, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+async def export_graph(
+    pages: AsyncIterable[dict[str, Any]],
+    path: str,
+    fmt: str = "ndjson",
+) -> dict[str, Any]:
+    """
+    Write graph pages to a file as they arrive.
+
+    Args:
+        pages: Pages with "entities" and "relations", e.g. from
+            ``Neo4jMemoryStore.iter_graph``
+        path: Output file
+        fmt: "ndjson" or "arrow"
+
+    Returns:
+        Dictionary with the path, format and exported counts
+
+    Raises:
+        ValueError: If the format is unknown
+        ImportError: If the format needs a package that is not installed
+
+    """
+    if fmt not in EXPORT_FORMATS:
+        msg = f"Unknown export format: {fmt}. Must be one of {list(EXPORT_FORMATS)}"
+        raise ValueError(msg)
+
+    tmp_path = f"{path}.tmp"
+    writer = _NdjsonWriter(tmp_path) if fmt == "ndjson" else _ArrowWriter(tmp_path)
+    entity_count = 0
+    relation_count = 0
+    try:
+        async for page in pages:
+            # Serializing and writing a page blocks; keep it off the event loop
+            await asyncio.to_thread(writer.write_page, page["entities"], page["relations"])
+            entity_count += len(page["entities"])
+            relation_count += len(page["relations"])
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+
+    writer.close()
+    os.replace(tmp_path, path)
+    logger.info(
+        f"Exported {entity_count} entities and {relation_count} relations to {path} ({fmt})"
+    )
+
+    return {
+        "path": path,
+        "format": fmt,
+        "entities": entity_count,
+        "relations": relation_count,
+    }
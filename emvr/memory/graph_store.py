@@ -1,18 +1,97 @@
 """Graph store implementation using Neo4j and Graphiti."""
 
-import os
+import logging
+import re
+from collections.abc import AsyncIterator
 from typing import Any
 
 from dotenv import load_dotenv
 # Temporarily comment out LlamaIndex import
 # from llama_index.core.graph_stores import Neo4jGraphStore
-from neo4j import AsyncGraphDatabase
+from neo4j import AsyncManagedTransaction
+from neo4j.exceptions import Neo4jError
 
+from emvr.config import get_settings
+from emvr.core.db_connections import connection_registry
 from emvr.memory.base import Entity, Relation
+from emvr.memory.neighborhood_cache import Edge, NeighborhoodCache, shared_neighborhood_cache
 
 # Load environment variables
 load_dotenv()
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ENTITY_FULLTEXT_INDEX = "entity_name_fulltext"
+OBSERVATION_FULLTEXT_INDEX = "observation_text_fulltext"
+
+# Idempotent schema bootstrap, run in order
+SCHEMA_STATEMENTS = (
+    """
+    CREATE CONSTRAINT entity_name_unique IF NOT EXISTS
+    FOR (e:`Entity`) REQUIRE e.name IS UNIQUE
+    """,
+    """
+    CREATE INDEX entity_type_index IF NOT EXISTS
+    FOR (e:`Entity`) ON (e.entity_type)
+    """,
+    f"""
+    CREATE FULLTEXT INDEX {ENTITY_FULLTEXT_INDEX} IF NOT EXISTS
+    FOR (e:`Entity`) ON EACH [e.name, e.entity_type]
+    """,
+    f"""
+    CREATE FULLTEXT INDEX {OBSERVATION_FULLTEXT_INDEX} IF NOT EXISTS
+    FOR (o:`Observation`) ON EACH [o.text]
+    """,
+)
+
+# Characters with a meaning in Lucene query syntax
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+_LUCENE_OPERATORS = re.compile(r"\b(?:AND|OR|NOT|TO)\b")
+
+# Entities with their observations and outgoing relations, for the entities
+# selected by the ``{match}`` clause (which binds ``e``). Relations can be
+# restricted to targets in ``$targets``; pass null for all.
+_ENTITY_ROWS_QUERY = """
+{match}
+CALL {{
+    WITH e
+    MATCH (e)-[:`HAS_OBSERVATION`]->(o:`Observation`)
+    RETURN COLLECT(o.text) AS observations
+}}
+CALL {{
+    WITH e
+    MATCH (e)-[r:`RELATION`]->(to:`Entity`)
+    WHERE $targets IS NULL OR to.name IN $targets
+    RETURN COLLECT({{relation: r.type, to: to.name}}) AS relations
+}}
+RETURN e.name AS name, e.entity_type AS entity_type, observations, relations
+ORDER BY name
+"""
+
+
+def escape_fulltext(text: str) -> str:
+    """
+    Escape a user query for a full-text index lookup.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        str: Lucene query matching any of the query's terms
+
+    """
+    escaped = _LUCENE_SPECIAL.sub(r"\\\1", text.strip())
+    # Boolean operators are only recognized in upper case
+    return _LUCENE_OPERATORS.sub(lambda match: match.group().lower(), escaped)
+
+
+def _endpoints(relations: list[Relation]) -> list[str]:
+    """Names of the entities connected by relations."""
+    return [
+        name for relation in relations for name in (relation.from_entity, relation.to_entity)
+    ]
+
 
 class Neo4jMemoryStore:
     """Graph memory store implementation using Neo4j."""
@@ -23,26 +102,38 @@ class Neo4jMemoryStore:
         username: str | None = None,
         password: str | None = None,
         database: str = "neo4j",
+        batch_size: int | None = None,
+        page_size: int | None = None,
+        neighborhood_cache: NeighborhoodCache | None = None,
     ) -> None:
         """
         Initialize the Neo4j memory store.
 
         Args:
-            uri: URI of the Neo4j server (defaults to env var NEO4J_URI)
-            username: Username for the Neo4j server (defaults to env var NEO4J_USERNAME)
-            password: Password for the Neo4j server (defaults to env var NEO4J_PASSWORD)
+            uri: URI of the Neo4j server (defaults to setting neo4j_uri)
+            username: Username for the Neo4j server (defaults to setting neo4j_username)
+            password: Password for the Neo4j server (defaults to setting neo4j_password)
             database: Neo4j database name
-
-        """
-        self.uri = uri or os.environ.get("NEO4J_URI", "neo4j://localhost:7687")
-        self.username = username or os.environ.get("NEO4J_USERNAME", "neo4j")
-        self.password = password or os.environ.get("NEO4J_PASSWORD", "password")
+            batch_size: Rows per bulk write transaction (defaults to setting
+                neo4j_batch_size)
+            page_size: Entities per page when reading the graph (defaults to
+                setting neo4j_page_size)
+            neighborhood_cache: Adjacency cache for neighborhood expansion
+                (defaults to the one shared by all stores of this database)
+
+        """
+        settings = get_settings()
+        self.uri = uri or settings.neo4j_uri
+        self.username = username or settings.neo4j_username
+        self.password = password or settings.neo4j_password
         self.database = database
+        self.batch_size = batch_size or settings.neo4j_batch_size
+        self.page_size = page_size or settings.neo4j_page_size
 
-        # Initialize Neo4j driver
-        self.driver = AsyncGraphDatabase.driver(
-            self.uri,
-            auth=(self.username, self.password),
+        # Driver shared with every other component using this server
+        self.driver = connection_registry.neo4j_driver(self.uri, self.username, self.password)
+        self.neighborhood_cache = neighborhood_cache or shared_neighborhood_cache(
+            self.uri, self.database
         )
 
         # Temporarily comment out LlamaIndex graph store
@@ -64,34 +155,17 @@ class Neo4jMemoryStore:
             Created entity information
 
         """
-        query = """
-        CREATE (e:`Entity` {name: $name, entity_type: $entity_type})
-        RETURN e
-        """
-
-        async with self.driver.session(database=self.database) as session:
-            result = await session.run(
-                query,
-                name=entity.name,
-                entity_type=entity.entity_type,
-            )
-            record = await result.single()
-            entity_node = record["e"]
-
-            # Create observations
-            for observation in entity.observations:
-                await self._add_observation(entity.name, observation)
-
-            return {
-                "id": entity_node.id,
-                "name": entity_node["name"],
-                "entity_type": entity_node["entity_type"],
-            }
+        result = await self.create_entities([entity])
+        return result["created"][0]
 
     async def create_entities(self, entities: list[Entity]) -> dict[str, Any]:
         """
         Create multiple new entities in the knowledge graph.
 
+        Entities and their observations are merged in batched ``UNWIND``
+        transactions, so existing entities are updated rather than duplicated
+        and repeated observations are stored once.
+
         Args:
             entities: List of entities to create
 
@@ -99,12 +173,26 @@ class Neo4jMemoryStore:
             Dictionary with created entities information
 
         """
-        created = []
-        for entity in entities:
-            result = await self.create_entity(entity)
-            created.append(result)
+        query = """
+        UNWIND $rows AS row
+        MERGE (e:`Entity` {name: row.name})
+        SET e.entity_type = row.entity_type
+        FOREACH (text IN row.observations |
+            MERGE (e)-[:`HAS_OBSERVATION`]->(:`Observation` {text: text})
+        )
+        RETURN elementId(e) AS id, e.name AS name, e.entity_type AS entity_type
+        """
+
+        rows = [
+            {
+                "name": entity.name,
+                "entity_type": entity.entity_type,
+                "observations": entity.observations,
+            }
+            for entity in entities
+        ]
 
-        return {"created": created}
+        return {"created": await self._write_batches(query, rows)}
 
     async def create_relation(self, relation: Relation) -> dict[str, Any]:
         """
@@ -116,68 +204,54 @@ class Neo4jMemoryStore:
         Returns:
             Created relation information
 
-        """
-        query = """
-        MATCH (from:`Entity` {name: $from_entity})
-        MATCH (to:`Entity` {name: $to_entity})
-        CREATE (from)-[r:`RELATION` {type: $relation_type}]->(to)
-        RETURN from, r, to
-        """
+        Raises:
+            ValueError: If either entity does not exist
 
-        async with self.driver.session(database=self.database) as session:
-            result = await session.run(
-                query,
-                from_entity=relation.from_entity,
-                to_entity=relation.to_entity,
-                relation_type=relation.relation_type,
+        """
+        result = await self.create_relations([relation])
+        if not result["created"]:
+            msg = (
+                f"Cannot create relation {relation.from_entity} -[{relation.relation_type}]-> "
+                f"{relation.to_entity}: entity not found"
             )
-            record = await result.single()
-
-            return {
-                "from": record["from"]["name"],
-                "relation": record["r"]["type"],
-                "to": record["to"]["name"],
-            }
+            raise ValueError(msg)
+        return result["created"][0]
 
     async def create_relations(self, relations: list[Relation]) -> dict[str, Any]:
         """
         Create multiple new relations between entities in the knowledge graph.
 
+        Relations are merged in batched ``UNWIND`` transactions. Relations
+        whose entities do not exist are skipped.
+
         Args:
             relations: List of relations to create
 
         Returns:
             Dictionary with created relations information
 
-        """
-        created = []
-        for relation in relations:
-            result = await self.create_relation(relation)
-            created.append(result)
-
-        return {"created": created}
-
-    async def _add_observation(self, entity_name: str, observation: str) -> None:
-        """
-        Add an observation to an entity.
-
-        Args:
-            entity_name: Name of the entity
-            observation: Observation text
-
         """
         query = """
-        MATCH (e:`Entity` {name: $entity_name})
-        CREATE (o:`Observation` {text: $observation})
-        CREATE (e)-[r:`HAS_OBSERVATION`]->(o)
+        UNWIND $rows AS row
+        MATCH (from:`Entity` {name: row.from_entity})
+        MATCH (to:`Entity` {name: row.to_entity})
+        MERGE (from)-[r:`RELATION` {type: row.relation_type}]->(to)
+        RETURN from.name AS from, r.type AS relation, to.name AS to
         """
 
-        async with self.driver.session(database=self.database) as session:
-            await session.run(
-                query,
-                entity_name=entity_name,
-                observation=observation,
-            )
+        rows = [
+            {
+                "from_entity": relation.from_entity,
+                "relation_type": relation.relation_type,
+                "to_entity": relation.to_entity,
+            }
+            for relation in relations
+        ]
+
+        try:
+            return {"created": await self._write_batches(query, rows)}
+        finally:
+            self.neighborhood_cache.invalidate(_endpoints(relations))
 
     async def add_observations(
         self,
@@ -195,14 +269,65 @@ class Neo4jMemoryStore:
             Dictionary with operation result
 
         """
-        for observation in observations:
-            await self._add_observation(entity_name, observation)
+        query = """
+        MATCH (e:`Entity` {name: $entity_name})
+        UNWIND $rows AS text
+        MERGE (e)-[:`HAS_OBSERVATION`]->(o:`Observation` {text: text})
+        RETURN count(o) AS added
+        """
+
+        records = await self._write_batches(query, observations, entity_name=entity_name)
 
         return {
             "entity": entity_name,
-            "added_observations": len(observations),
+            "added_observations": sum(record["added"] for record in records),
         }
 
+    async def _write_batches(
+        self,
+        query: str,
+        rows: list[Any],
+        **parameters: Any,
+    ) -> list[dict[str, Any]]:
+        """
+        Run an ``UNWIND $rows`` write query over rows in fixed-size batches.
+
+        Each batch is sent as one parameter list and committed in its own
+        managed (retried) write transaction.
+
+        Args:
+            query: Cypher query unwinding ``$rows``
+            rows: Row parameters
+            **parameters: Additional query parameters
+
+        Returns:
+            List of result records of all batches
+
+        """
+        records: list[dict[str, Any]] = []
+        if not rows:
+            return records
+
+        async with self.driver.session(database=self.database) as session:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start : start + self.batch_size]
+                records.extend(
+                    await session.execute_write(self._run_batch, query, batch, parameters),
+                )
+
+        return records
+
+    @staticmethod
+    async def _run_batch(
+        tx: AsyncManagedTransaction,
+        query: str,
+        rows: list[Any],
+        parameters: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Run one batch inside a write transaction and collect its records."""
+        result = await tx.run(query, parameters, rows=rows)
+        return await result.data()
+
     async def delete_entities(self, entity_names: list[str]) -> dict[str, Any]:
         """
         Delete multiple entities and their associated relations from the knowledge graph.
@@ -221,11 +346,14 @@ class Neo4jMemoryStore:
         DELETE r, e
         """
 
-        async with self.driver.session(database=self.database) as session:
-            await session.run(
-                query,
-                entity_names=entity_names,
-            )
+        try:
+            async with self.driver.session(database=self.database) as session:
+                await session.run(
+                    query,
+                    entity_names=entity_names,
+                )
+        finally:
+            self.neighborhood_cache.invalidate_entities(entity_names)
 
         return {
             "deleted": entity_names,
@@ -293,11 +421,14 @@ class Neo4jMemoryStore:
             for r in relations
         ]
 
-        async with self.driver.session(database=self.database) as session:
-            await session.run(
-                query,
-                relations=relation_data,
-            )
+        try:
+            async with self.driver.session(database=self.database) as session:
+                await session.run(
+                    query,
+                    relations=relation_data,
+                )
+        finally:
+            self.neighborhood_cache.invalidate(_endpoints(relations))
 
         return {
             "deleted": len(relations),
@@ -307,29 +438,330 @@ class Neo4jMemoryStore:
         """
         Read the entire knowledge graph.
 
+        Holds the whole graph in memory; use ``iter_graph`` to process large
+        graphs page by page, or ``sample_graph`` for an overview.
+
         Returns:
             Dictionary with entities and relations
 
         """
-        entities_query = """
+        entities = []
+        relations = []
+        async for page in self.iter_graph():
+            entities.extend(page["entities"])
+            relations.extend(page["relations"])
+
+        return {
+            "entities": entities,
+            "relations": relations,
+        }
+
+    async def iter_graph(
+        self,
+        page_size: int | None = None,
+        after: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate over the knowledge graph page by page.
+
+        Args:
+            page_size: Entities per page (defaults to the store's page size)
+            after: Start after the entity with this name
+
+        Yields:
+            Pages as returned by ``read_graph_page``
+
+        """
+        while True:
+            page = await self.read_graph_page(after, page_size)
+            if page["entities"]:
+                yield page
+            after = page["next_cursor"]
+            if after is None:
+                return
+
+    async def read_graph_page(
+        self,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Read one page of the knowledge graph, in entity name order.
+
+        Pages are keyset-paginated on the entity name: each page seeks past
+        the previous page's last name through the uniqueness constraint's
+        index, so reading a page costs the same at any depth and needs no
+        open cursor between pages. Each relation is returned once, in the
+        page of its source entity.
+
+        Args:
+            after: Cursor of the previous page (None for the first page)
+            limit: Maximum number of entities (defaults to the store's page size)
+
+        Returns:
+            Dictionary with the page's entities and relations, and the
+            ``next_cursor`` to pass as ``after`` (None after the last page)
+
+        """
+        limit = limit or self.page_size
+        where = "" if after is None else "WHERE e.name > $after"
+        match = f"""
         MATCH (e:`Entity`)
-        OPTIONAL MATCH (e)-[r:`HAS_OBSERVATION`]->(o:`Observation`)
-        RETURN e.name AS name, e.entity_type AS entity_type,
-               COLLECT(o.text) AS observations
+        {where}
+        WITH e ORDER BY e.name LIMIT $limit
+        """
+        entities, relations = await self._read_entity_rows(match, after=after, limit=limit)
+
+        return {
+            "entities": entities,
+            "relations": relations,
+            "next_cursor": entities[-1]["name"] if len(entities) == limit else None,
+        }
+
+    async def sample_graph(
+        self,
+        limit: int = 50,
+        center: str | None = None,
+        max_depth: int = 2,
+    ) -> dict[str, Any]:
+        """
+        Read a small connected sample of the knowledge graph.
+
+        Entities are selected on the server. Without a center, random seed
+        entities are picked together with some of their neighbors; with a
+        center, its neighborhood is walked breadth-first up to ``max_depth``
+        hops through the neighborhood cache. Only relations between sampled
+        entities are returned.
+
+        Args:
+            limit: Maximum number of entities
+            center: Optional entity to sample around
+            max_depth: Maximum number of hops from the center
+
+        Returns:
+            Dictionary with entities and relations
+
+        """
+        if center is not None:
+            depths, _ = await self.neighborhood_cache.expand(
+                [center], max_depth, self._fetch_adjacency, limit=limit
+            )
+            names = list(depths)
+        else:
+            names = await self._random_sample_names(limit)
+
+        match = """
+        UNWIND $names AS name
+        MATCH (e:`Entity` {name: name})
+        """
+        entities, relations = await self._read_entity_rows(match, names=names, targets=names)
+
+        return {
+            "entities": entities,
+            "relations": relations,
+        }
+
+    async def _random_sample_names(self, limit: int) -> list[str]:
+        """Names of random seed entities and some of their neighbors."""
+        seeds = max(1, limit // 10)
+        count_query = "MATCH (e:`Entity`) RETURN count(e) AS count"
+        sample_query = """
+        MATCH (e:`Entity`)
+        WHERE rand() < $probability
+        WITH e LIMIT $seeds
+        CALL {
+            WITH e
+            MATCH (e)-[:`RELATION`]-(n:`Entity`)
+            WITH n LIMIT $fanout
+            RETURN COLLECT(n.name) AS neighbors
+        }
+        RETURN e.name AS name, neighbors
+        """
+
+        names: dict[str, None] = {}
+        async with self.driver.session(database=self.database) as session:
+            # Served from the count store, without a scan
+            result = await session.run(count_query)
+            record = await result.single()
+            count = record["count"] if record else 0
+            if not count:
+                return []
+
+            result = await session.run(
+                sample_query,
+                # Oversample so that the scan rarely ends before enough seeds
+                probability=min(1.0, 2 * seeds / count),
+                seeds=seeds,
+                fanout=max(1, limit // seeds),
+            )
+            async for record in result:
+                names[record["name"]] = None
+                names.update(dict.fromkeys(record["neighbors"]))
+
+        return list(names)[:limit]
+
+    async def neighborhood(
+        self,
+        names: list[str],
+        max_hops: int = 1,
+        limit: int | None = None,
+        relation_types: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Expand entities to their multi-hop neighborhood.
+
+        The expansion is a breadth-first search over the in-process
+        neighborhood cache; only entities whose neighbors are not cached are
+        read from the database, in one query per hop. Relations are followed
+        in both directions.
+
+        Args:
+            names: Entity names to start from
+            max_hops: Maximum number of hops
+            limit: Maximum number of entities, starting ones included; the
+                nearest are kept
+            relation_types: Only follow relations of these types
+
+        Returns:
+            Dictionary with the entities reached (name and hops from the
+            nearest starting entity, nearest first) and the relations
+            traversed
+
+        """
+        depths, edges = await self.neighborhood_cache.expand(
+            names, max_hops, self._fetch_adjacency, limit=limit, relation_types=relation_types
+        )
+
+        return {
+            "entities": [{"name": name, "depth": depth} for name, depth in depths.items()],
+            "relations": [
+                {"from": source, "relation": relation, "to": target}
+                for source, relation, target in edges
+            ],
+        }
+
+    async def expand_entities(
+        self,
+        names: list[str],
+        hops: int = 1,
+        relation_types: list[str] | None = None,
+        limit_per_entity: int = 25,
+    ) -> dict[str, Any]:
+        """
+        Expand several entities at once into one subgraph.
+
+        Each seed is expanded breadth-first on its own, keeping its
+        ``limit_per_entity`` nearest entities, over the neighborhood cache:
+        the seeds advance in lockstep, so every hop reads the uncached
+        entities of all of them in one batched query. The union is then read
+        back with observations and the relations between its entities.
+        Relations are followed in both directions.
+
+        Args:
+            names: Seed entity names
+            hops: Maximum number of hops from a seed
+            relation_types: Only follow relations of these types
+            limit_per_entity: Maximum number of entities reached per seed
+
+        Returns:
+            Dictionary with the deduplicated entities (each with
+            ``reached_from``: the seeds that reached it and at how many hops),
+            the relations between them, and the seeds that do not exist
+
+        Raises:
+            ValueError: If ``hops`` is less than 1
+
         """
+        if hops < 1:
+            msg = f"hops must be at least 1, got {hops}"
+            raise ValueError(msg)
+
+        seeds = list(dict.fromkeys(names))
+        if not seeds:
+            return {"entities": [], "relations": [], "missing": []}
+
+        expansions = await self.neighborhood_cache.expand_each(
+            seeds,
+            hops,
+            self._fetch_adjacency,
+            limit=limit_per_entity + 1,
+            relation_types=relation_types,
+        )
 
-        relations_query = """
-        MATCH (from:`Entity`)-[r:`RELATION`]->(to:`Entity`)
-        RETURN from.name AS from_entity, r.type AS relation_type,
-               to.name AS to_entity
+        # Provenance: which seeds reached each entity, and how far away
+        reached_from: dict[str, list[dict[str, Any]]] = {}
+        for seed, (depths, _) in zip(seeds, expansions, strict=True):
+            for name, depth in depths.items():
+                reached_from.setdefault(name, []).append({"seed": seed, "depth": depth})
+
+        match = """
+        UNWIND $names AS name
+        MATCH (e:`Entity` {name: name})
         """
+        subgraph = list(reached_from)
+        entities, relations = await self._read_entity_rows(
+            match, names=subgraph, targets=subgraph
+        )
+        if relation_types is not None:
+            relations = [r for r in relations if r["relation"] in relation_types]
+
+        entities = [{**entity, "reached_from": reached_from[entity["name"]]} for entity in entities]
+        # Seeds first, then nearest first
+        entities.sort(key=lambda entity: min(r["depth"] for r in entity["reached_from"]))
+        found = {entity["name"] for entity in entities}
+
+        return {
+            "entities": entities,
+            "relations": relations,
+            "missing": [seed for seed in seeds if seed not in found],
+        }
+
+    async def _fetch_adjacency(self, names: list[str]) -> dict[str, list[Edge]]:
+        """All relations of the given entities, as (relation, neighbor, outgoing)."""
+        query = """
+        UNWIND $names AS name
+        MATCH (e:`Entity` {name: name})
+        CALL {
+            WITH e
+            MATCH (e)-[r:`RELATION`]-(n:`Entity`)
+            RETURN COLLECT([r.type, n.name, startNode(r) = e]) AS edges
+        }
+        RETURN e.name AS name, edges
+        """
+
+        adjacency: dict[str, list[Edge]] = {}
+        async with self.driver.session(database=self.database) as session:
+            result = await session.run(query, names=names)
+            async for record in result:
+                adjacency[record["name"]] = [tuple(edge) for edge in record["edges"]]
+
+        return adjacency
+
+    async def _read_entity_rows(
+        self,
+        match: str,
+        targets: list[str] | None = None,
+        **parameters: Any,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """
+        Read entities with their observations and outgoing relations.
+
+        Args:
+            match: Cypher clause binding the entities as ``e``
+            targets: Only return relations to these entities (None for all)
+            **parameters: Parameters of the match clause
+
+        Returns:
+            Tuple: (entities, relations)
+
+        """
+        query = _ENTITY_ROWS_QUERY.format(match=match)
 
         entities = []
         relations = []
 
         async with self.driver.session(database=self.database) as session:
-            # Get entities
-            result = await session.run(entities_query)
+            result = await session.run(query, parameters, targets=targets)
             async for record in result:
                 entities.append(
                     {
@@ -338,58 +770,94 @@ class Neo4jMemoryStore:
                         "observations": record["observations"],
                     }
                 )
-
-            # Get relations
-            result = await session.run(relations_query)
-            async for record in result:
-                relations.append(
+                relations.extend(
                     {
-                        "from": record["from_entity"],
-                        "relation": record["relation_type"],
-                        "to": record["to_entity"],
+                        "from": record["name"],
+                        "relation": relation["relation"],
+                        "to": relation["to"],
                     }
+                    for relation in record["relations"]
                 )
 
-        return {
-            "entities": entities,
-            "relations": relations,
-        }
+        return entities, relations
 
-    async def search_nodes(self, query: str) -> dict[str, Any]:
+    async def ensure_schema(self) -> None:
+        """
+        Create the constraints and indexes the queries rely on.
+
+        Idempotent: every statement uses ``IF NOT EXISTS``. A statement that
+        fails (e.g. the uniqueness constraint on a graph that already holds
+        duplicate entity names) is logged and skipped, so the other indexes
+        are still created.
+
+        Raises:
+            neo4j.exceptions.DriverError: If the server cannot be reached
+
+        """
+        async with self.driver.session(database=self.database) as session:
+            for statement in SCHEMA_STATEMENTS:
+                try:
+                    result = await session.run(statement)
+                    await result.consume()
+                except Neo4jError as e:
+                    logger.warning(f"Schema statement failed ({e.code}): {statement.strip()}")
+
+    async def search_nodes(self, query: str, limit: int = 10) -> dict[str, Any]:
         """
         Search for nodes in the knowledge graph based on a query.
 
+        Entity names/types and observation texts are searched through their
+        full-text indexes. An entity's score is the best score of its name or
+        any of its observations.
+
         Args:
             query: Search query string
+            limit: Maximum number of entities to return
 
         Returns:
-            Dictionary with matching entities
+            Dictionary with matching entities, best match first
 
         """
-        search_query = """
-        MATCH (e:`Entity`)
-        WHERE e.name CONTAINS $query OR e.entity_type CONTAINS $query
-        OPTIONAL MATCH (e)-[r:`HAS_OBSERVATION`]->(o:`Observation`)
-        WHERE o.text CONTAINS $query
-        WITH e, COLLECT(DISTINCT o.text) AS matching_observations
-        OPTIONAL MATCH (e)-[r2:`HAS_OBSERVATION`]->(o2:`Observation`)
-        RETURN e.name AS name, e.entity_type AS entity_type,
+        search_query = f"""
+        CALL {{
+            CALL db.index.fulltext.queryNodes('{ENTITY_FULLTEXT_INDEX}', $search, {{limit: $limit}})
+            YIELD node, score
+            RETURN node AS e, score, null AS observation
+            UNION ALL
+            CALL db.index.fulltext.queryNodes(
+                '{OBSERVATION_FULLTEXT_INDEX}', $search, {{limit: $limit}}
+            )
+            YIELD node, score
+            MATCH (e:`Entity`)-[:`HAS_OBSERVATION`]->(node)
+            RETURN e, score, node.text AS observation
+        }}
+        WITH e, max(score) AS score, COLLECT(DISTINCT observation) AS matching_observations
+        ORDER BY score DESC
+        LIMIT $limit
+        OPTIONAL MATCH (e)-[:`HAS_OBSERVATION`]->(o:`Observation`)
+        RETURN e.name AS name, e.entity_type AS entity_type, score,
                matching_observations,
-               COLLECT(DISTINCT o2.text) AS all_observations
-        """
+               COLLECT(o.text) AS all_observations
+        ORDER BY score DESC
+        """  # noqa: S608
 
         entities = []
+        search = escape_fulltext(query)
+        if not search:
+            return {"query": query, "entities": entities}
 
         async with self.driver.session(database=self.database) as session:
             result = await session.run(
                 search_query,
-                query=query,
+                search=search,
+                limit=limit,
             )
             async for record in result:
                 entities.append(
                     {
                         "name": record["name"],
                         "entity_type": record["entity_type"],
+                        "score": record["score"],
                         "matching_observations": record["matching_observations"],
                         "all_observations": record["all_observations"],
                     }
@@ -0,0 +1,419 @@
+"""
+HNSW graph for approximate nearest-neighbour search.
+
+A hierarchical navigable small world graph (Malkov & Yashunin) over the
+rows of a vector matrix owned by the caller. Vectors are expected to be
+L2-normalized, so similarity is the dot product. Layer 0 adjacency is a
+fixed-width int32 matrix that can be memory-mapped; the sparse upper layers
+and per-node levels are saved next to it.
+"""
+
+import heapq
+import logging
+import math
+import os
+from collections.abc import Callable
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_LAYER0_FILE = "hnsw_layer0.i32"
+_GRAPH_FILE = "hnsw_graph.npz"
+_MIN_CAPACITY = 1024
+
+
+class HNSWGraph:
+    """
+    Incremental HNSW graph with tombstone deletes.
+
+    Node IDs are row numbers of the caller's vector matrix and must be added
+    in order (0, 1, 2, ...). Deleted nodes stay in the graph for routing but
+    are never returned. Not thread-safe; the owning index serializes access.
+    """
+
+    def __init__(
+        self,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        path: str | None = None,
+        seed: int = 0,
+    ) -> None:
+        """
+        Initialize the graph, loading it from ``path`` if it was saved there.
+
+        Args:
+            m: Links per node on the upper layers (2 * m on layer 0)
+            ef_construction: Candidate list size while inserting
+            ef_search: Default candidate list size while searching
+            path: Directory to persist the graph in (None keeps it in memory)
+            seed: Seed for the level generator
+
+        Raises:
+            ValueError: If the parameters are out of range
+
+        """
+        if m < 2:
+            msg = f"m must be at least 2, got {m}"
+            raise ValueError(msg)
+        if ef_construction < 1 or ef_search < 1:
+            msg = "ef_construction and ef_search must be positive"
+            raise ValueError(msg)
+
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.path = path
+        self._level_mult = 1 / math.log(m)
+        self._rng = np.random.default_rng(seed)
+
+        self.count = 0
+        self.entry_point = -1
+        self.max_level = -1
+        self._levels = np.zeros(_MIN_CAPACITY, dtype=np.int8)
+        self._deleted = np.zeros(_MIN_CAPACITY, dtype=bool)
+        # node -> neighbour lists for layers 1..level
+        self._upper: dict[int, list[list[int]]] = {}
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+        else:
+            self._layer0 = np.full((_MIN_CAPACITY, self.m0), -1, dtype=np.int32)
+
+    @property
+    def deleted_count(self) -> int:
+        """Number of tombstoned nodes."""
+        return int(self._deleted[: self.count].sum())
+
+    def add(self, node: int, vectors: np.ndarray) -> None:
+        """
+        Insert the next node.
+
+        Args:
+            node: Row of ``vectors`` to insert (must equal ``self.count``)
+            vectors: Normalized vector matrix holding the node's row
+
+        Raises:
+            ValueError: If nodes are added out of order
+
+        """
+        if node != self.count:
+            msg = f"Expected node {self.count}, got {node}"
+            raise ValueError(msg)
+
+        self._ensure_capacity(node + 1)
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self._levels[node] = level
+        self._deleted[node] = False
+        if level > 0:
+            self._upper[node] = [[] for _ in range(level)]
+        self.count += 1
+
+        if self.entry_point < 0:
+            self.entry_point = node
+            self.max_level = level
+            return
+
+        query = vectors[node]
+        entry = self.entry_point
+        for layer in range(self.max_level, level, -1):
+            entry = self._greedy(query, entry, layer, vectors)
+
+        for layer in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(query, [entry], self.ef_construction, layer, vectors)
+            found.sort(reverse=True)
+            max_links = self.m0 if layer == 0 else self.m
+            selected = self._select(query, found, self.m, vectors)
+            self._set_links(node, layer, selected)
+
+            for neighbour in selected:
+                links = [*self._links(neighbour, layer), node]
+                if len(links) > max_links:
+                    base = vectors[neighbour]
+                    sims = vectors[links] @ base
+                    ranked = sorted(zip(sims.tolist(), links, strict=True), reverse=True)
+                    links = self._select(base, ranked, max_links, vectors)
+                self._set_links(neighbour, layer, links)
+
+            entry = found[0][1]
+
+        if level > self.max_level:
+            self.entry_point = node
+            self.max_level = level
+
+    def delete(self, node: int) -> None:
+        """
+        Tombstone a node: it keeps routing searches but is never returned.
+
+        Args:
+            node: Node to delete
+
+        """
+        if 0 <= node < self.count:
+            self._deleted[node] = True
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        vectors: np.ndarray,
+        ef: int | None = None,
+        accept: Callable[[int], bool] | None = None,
+    ) -> list[tuple[int, float]]:
+        """
+        Find approximately the ``k`` most similar live nodes.
+
+        Args:
+            query: Normalized query vector
+            k: Number of results
+            vectors: Normalized vector matrix the graph was built over
+            ef: Candidate list size (defaults to ``ef_search``; at least ``k``)
+            accept: Optional predicate restricting which nodes are returned
+
+        Returns:
+            List of (node, similarity), best first
+
+        """
+        if self.entry_point < 0 or k <= 0:
+            return []
+
+        entry = self.entry_point
+        for layer in range(self.max_level, 0, -1):
+            entry = self._greedy(query, entry, layer, vectors)
+
+        ef = max(ef or self.ef_search, k)
+        deleted = self._deleted
+        if accept is None:
+            keep = lambda node: not deleted[node]  # noqa: E731
+        else:
+            keep = lambda node: not deleted[node] and accept(node)  # noqa: E731
+
+        found = self._search_layer(query, [entry], ef, 0, vectors, keep)
+        found.sort(reverse=True)
+        return [(node, sim) for sim, node in found[:k]]
+
+    def save(self) -> None:
+        """Write the graph to its directory (layer 0 is flushed in place)."""
+        if self.path is None:
+            return
+
+        if isinstance(self._layer0, np.memmap):
+            self._layer0.flush()
+
+        nodes = sorted(self._upper)
+        offsets = [0]
+        links: list[int] = []
+        for node in nodes:
+            for layer_links in self._upper[node]:
+                links.extend(layer_links)
+                offsets.append(len(links))
+
+        tmp_path = os.path.join(self.path, _GRAPH_FILE + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            header=np.array(
+                [self.count, self.entry_point, self.max_level, self.m, self.ef_construction],
+                dtype=np.int64,
+            ),
+            levels=self._levels[: self.count],
+            deleted=self._deleted[: self.count],
+            upper_nodes=np.array(nodes, dtype=np.int32),
+            upper_offsets=np.array(offsets, dtype=np.int64),
+            upper_links=np.array(links, dtype=np.int32),
+        )
+        os.replace(tmp_path, os.path.join(self.path, _GRAPH_FILE))
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the graph structure."""
+        upper = sum(len(links) for lists in self._upper.values() for links in lists)
+        return self.count * (self.m0 * 4 + 2) + upper * 28
+
+    def _greedy(self, query: np.ndarray, entry: int, layer: int, vectors: np.ndarray) -> int:
+        """Walk greedily towards the query on one layer."""
+        best = entry
+        best_sim = float(vectors[entry] @ query)
+        improved = True
+        while improved:
+            improved = False
+            links = self._links(best, layer)
+            if not len(links):
+                break
+            sims = vectors[links] @ query
+            i = int(np.argmax(sims))
+            if sims[i] > best_sim:
+                best, best_sim = int(links[i]), float(sims[i])
+                improved = True
+        return best
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entries: list[int],
+        ef: int,
+        layer: int,
+        vectors: np.ndarray,
+        keep: Callable[[int], bool] | None = None,
+    ) -> list[tuple[float, int]]:
+        """
+        Best-first search of one layer.
+
+        Returns up to ``ef`` (similarity, node) pairs, unordered. With
+        ``keep``, rejected nodes are traversed but not returned.
+        """
+        visited = set(entries)
+        entry_sims = (vectors[entries] @ query).tolist()
+        candidates = [(-sim, node) for sim, node in zip(entry_sims, entries, strict=True)]
+        heapq.heapify(candidates)
+        results = [
+            (sim, node)
+            for sim, node in zip(entry_sims, entries, strict=True)
+            if keep is None or keep(node)
+        ]
+        heapq.heapify(results)
+        # Lower bound to beat; rejected nodes do not enter results, so track it separately
+        bound = min(entry_sims)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if -neg_sim < bound and len(results) >= ef:
+                break
+
+            fresh = [n for n in self._links(node, layer).tolist() if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+
+            for sim, neighbour in zip((vectors[fresh] @ query).tolist(), fresh, strict=True):
+                if len(results) < ef or sim > bound:
+                    heapq.heappush(candidates, (-sim, neighbour))
+                    if keep is None or keep(neighbour):
+                        heapq.heappush(results, (sim, neighbour))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+                    if len(results) >= ef:
+                        bound = results[0][0]
+
+        return results
+
+    def _select(
+        self,
+        base: np.ndarray,
+        ranked: list[tuple[float, int]],
+        m: int,
+        vectors: np.ndarray,
+    ) -> list[int]:
+        """
+        Pick up to ``m`` diverse neighbours (the HNSW heuristic).
+
+        A candidate is kept only if it is closer to ``base`` than to every
+        neighbour kept so far, which preserves long-range links.
+        """
+        if len(ranked) <= m:
+            return [node for _, node in ranked]
+
+        ids = [node for _, node in ranked]
+        pairwise = vectors[ids] @ vectors[ids].T
+        selected: list[int] = []
+        for i, (sim, _) in enumerate(ranked):
+            if len(selected) >= m:
+                break
+            if not selected or pairwise[i, selected].max() < sim:
+                selected.append(i)
+        return [ids[i] for i in selected]
+
+    def _links(self, node: int, layer: int) -> np.ndarray:
+        """Neighbours of a node on a layer."""
+        if layer == 0:
+            row = self._layer0[node]
+            return row[row >= 0]
+        return np.asarray(self._upper[node][layer - 1], dtype=np.int64)
+
+    def _set_links(self, node: int, layer: int, links: list[int]) -> None:
+        """Replace the neighbours of a node on a layer."""
+        if layer == 0:
+            row = self._layer0[node]
+            row[:] = -1
+            row[: len(links)] = links
+        else:
+            self._upper[node][layer - 1] = list(links)
+
+    def _ensure_capacity(self, count: int) -> None:
+        """Grow the per-node arrays (doubling) to hold ``count`` nodes."""
+        size = self._levels.shape[0]
+        if count > size:
+            new_size = max(count, size * 2)
+            levels = np.zeros(new_size, dtype=np.int8)
+            levels[:size] = self._levels
+            deleted = np.zeros(new_size, dtype=bool)
+            deleted[:size] = self._deleted
+            self._levels, self._deleted = levels, deleted
+
+        capacity = self._layer0.shape[0]
+        if count <= capacity:
+            return
+
+        new_capacity = max(count, capacity * 2)
+        if isinstance(self._layer0, np.memmap):
+            self._layer0.flush()
+            self._layer0 = self._open_layer0(new_capacity)
+        else:
+            grown = np.full((new_capacity, self.m0), -1, dtype=np.int32)
+            grown[:capacity] = self._layer0
+            self._layer0 = grown
+
+    def _open_layer0(self, capacity: int) -> np.memmap:
+        """Map the layer 0 adjacency file with room for ``capacity`` nodes."""
+        file_path = os.path.join(self.path, _LAYER0_FILE)
+        row_bytes = self.m0 * np.dtype(np.int32).itemsize
+        with open(file_path, "ab") as f:
+            size = f.tell()
+            if size < capacity * row_bytes:
+                # Pad new rows with -1 (no link)
+                f.write(b"\xff" * (capacity * row_bytes - size))
+            else:
+                capacity = size // row_bytes
+        return np.memmap(file_path, dtype=np.int32, mode="r+", shape=(capacity, self.m0))
+
+    def _load(self) -> None:
+        """Load a saved graph, or start an empty one, from ``self.path``."""
+        graph_path = os.path.join(self.path, _GRAPH_FILE)
+        if not os.path.exists(graph_path):
+            # Discard adjacency left behind without a saved graph
+            layer0_path = os.path.join(self.path, _LAYER0_FILE)
+            if os.path.exists(layer0_path):
+                os.remove(layer0_path)
+            self._layer0 = self._open_layer0(_MIN_CAPACITY)
+            return
+
+        with np.load(graph_path) as saved:
+            count, entry_point, max_level, m, ef_construction = saved["header"].tolist()
+            if m != self.m:
+                logger.warning(f"HNSW graph at {self.path} was built with m={m}; keeping it")
+                self.m, self.m0 = m, 2 * m
+                self._level_mult = 1 / math.log(m)
+            self.ef_construction = ef_construction
+            self.count = count
+            self.entry_point = entry_point
+            self.max_level = max_level
+
+            capacity = max(_MIN_CAPACITY, count)
+            self._levels = np.zeros(capacity, dtype=np.int8)
+            self._levels[:count] = saved["levels"]
+            self._deleted = np.zeros(capacity, dtype=bool)
+            self._deleted[:count] = saved["deleted"]
+
+            offsets = saved["upper_offsets"].tolist()
+            links = saved["upper_links"].tolist()
+            position = 0
+            for node in saved["upper_nodes"].tolist():
+                lists = []
+                for _ in range(int(self._levels[node])):
+                    lists.append(links[offsets[position] : offsets[position + 1]])
+                    position += 1
+                self._upper[node] = lists
+
+        self._layer0 = self._open_layer0(capacity)
@@ -0,0 +1,507 @@
+"""
+BM25 keyword index for hybrid search.
+
+An inverted index over chunk text that complements the embedded vector
+index: exact terms such as error codes, identifiers and function names,
+which embeddings tend to blur, still find the chunks that contain them.
+
+Posting lists hold delta-encoded document numbers and term frequencies,
+each packed at the narrowest of 8, 16 or 32 bits that fits the list.
+Documents are numbered in insertion order, so new postings are appended to
+a small uncompressed tail that is merged into the packed lists in bulk.
+Queries are scored term-at-a-time with MaxScore pruning: once the k-th best
+score exceeds what the remaining low-impact terms could add, those terms
+only score the surviving candidates instead of their whole posting lists.
+"""
+
+import functools
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from collections.abc import Sequence
+from itertools import chain
+
+import numpy as np
+
+from emvr.memory.local_vector_index import top_k_indices
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_INDEX_FILE = "bm25.npz"
+_FORMAT_VERSION = 1
+_MIN_CAPACITY = 1024
+# Tail postings buffered before they are merged into the packed lists
+_TAIL_LIMIT = 65536
+# Share of dead documents at which a flush renumbers the index
+_COMPACT_RATIO = 0.25
+
+# Words, keeping dotted, dashed and path-like compounds (os.path, E-1042)
+_TOKEN_RE = re.compile(r"\w+(?:[.\-:/]\w+)*")
+_SEPARATOR_RE = re.compile(r"[_.\-:/]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_tokens(word: str) -> tuple[str, ...]:
+    """A word and, for compound identifiers, its parts (lowercased)."""
+    lowered = word.lower()
+    parts = [
+        part.lower()
+        for piece in _SEPARATOR_RE.split(word)
+        for part in _CAMEL_RE.findall(piece)
+        if len(part) > 1
+    ]
+    if len(parts) > 1 or (parts and parts[0] != lowered):
+        return (lowered, *parts)
+    return (lowered,)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase terms.
+
+    Compound identifiers are kept whole and also split into their parts, so
+    ``getUserId`` matches both ``getuserid`` and ``user``, and
+    ``ERR_CONN_RESET`` matches ``err_conn_reset`` and ``conn``.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms, in order, with repeats
+
+    """
+    return [token for word in _TOKEN_RE.findall(text) for token in _word_tokens(word)]
+
+
+def _narrowest(maximum: int) -> type[np.unsignedinteger]:
+    """Smallest unsigned dtype holding ``maximum``."""
+    if maximum < 1 << 8:
+        return np.uint8
+    if maximum < 1 << 16:
+        return np.uint16
+    return np.uint32
+
+
+def _pack(docs: np.ndarray, tfs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Delta-encode sorted document numbers and pack both arrays."""
+    deltas = np.diff(docs, prepend=0)
+    return deltas.astype(_narrowest(int(deltas.max()))), tfs.astype(_narrowest(int(tfs.max())))
+
+
+def _pack_strings(strings: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate UTF-8 strings into one byte array with offsets."""
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    """Inverse of ``_pack_strings``."""
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[start:stop].decode() for start, stop in zip(bounds, bounds[1:], strict=False)]
+
+
+class BM25Index:
+    """
+    Incremental BM25 index keyed by document ID.
+
+    Replacing or deleting a document only marks its number dead; dead
+    postings are skipped at query time and dropped when a flush finds enough
+    of them. All methods are thread-safe.
+    """
+
+    def __init__(self, path: str | None = None, k1: float = 1.2, b: float = 0.75) -> None:
+        """
+        Initialize the index, loading it from ``path`` if it was saved there.
+
+        Args:
+            path: Directory to persist the index in (None keeps it in memory)
+            k1: Term frequency saturation
+            b: Document length normalization
+
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+
+        # Document number -> ID; None marks a dead document
+        self._ids: list[str | None] = []
+        self._docs: dict[str, int] = {}
+        self._lengths = np.zeros(_MIN_CAPACITY, dtype=np.uint32)
+        self._live = np.zeros(_MIN_CAPACITY, dtype=bool)
+        self._total_length = 0
+
+        # term -> (packed doc deltas, packed tfs)
+        self._packed: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        # term -> (doc chunks, tf chunks) appended since the last merge
+        self._tail: dict[str, tuple[list[np.ndarray], list[np.ndarray]]] = {}
+        self._tail_size = 0
+        # term -> (max tf, min document length) over its postings, for score bounds
+        self._bounds: dict[str, tuple[int, int]] = {}
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        """Number of live documents."""
+        return len(self._docs)
+
+    def __contains__(self, doc_id: object) -> bool:
+        """Whether a document ID is in the index."""
+        return doc_id in self._docs
+
+    def upsert(self, ids: Sequence[str], texts: Sequence[str]) -> None:
+        """
+        Index or re-index documents.
+
+        Args:
+            ids: Document IDs
+            texts: Text per document
+
+        Raises:
+            ValueError: If the lengths do not match
+
+        """
+        if len(ids) != len(texts):
+            msg = f"Got {len(texts)} texts for {len(ids)} ids"
+            raise ValueError(msg)
+
+        if not ids:
+            return
+
+        counted = [Counter(tokenize(text)) for text in texts]
+        # Group the batch's postings by term, docs ascending within each term
+        batch_terms: dict[str, int] = {}
+        term_numbers = np.array(
+            [batch_terms.setdefault(term, len(batch_terms)) for term in chain(*counted)],
+            dtype=np.intp,
+        )
+        tfs = np.fromiter(chain.from_iterable(c.values() for c in counted), np.uint32)
+        order = np.argsort(term_numbers, kind="stable")
+        starts = np.searchsorted(term_numbers[order], np.arange(len(batch_terms) + 1))
+        doc_lengths = np.array([c.total() for c in counted], dtype=np.uint32)
+
+        with self._lock:
+            first = len(self._ids)
+            self._ensure_capacity(first + len(ids))
+            for doc, doc_id in enumerate(ids, first):
+                self._remove(doc_id)
+                self._ids.append(doc_id)
+                self._docs[doc_id] = doc
+            self._lengths[first : len(self._ids)] = doc_lengths
+            self._live[first : len(self._ids)] = True
+            # Re-inserted IDs within the batch leave their earlier copies dead
+            self._live[first : len(self._ids)] &= [
+                self._docs[doc_id] == doc for doc, doc_id in enumerate(ids, first)
+            ]
+            self._total_length += int(doc_lengths[self._live[first : len(self._ids)]].sum())
+
+            docs = np.repeat(np.arange(first, len(self._ids)), [len(c) for c in counted])[order]
+            tfs = tfs[order]
+            lengths = self._lengths[docs]
+            for term, start, stop in zip(batch_terms, starts[:-1], starts[1:], strict=True):
+                term_docs, term_tfs = docs[start:stop], tfs[start:stop]
+                tail = self._tail.get(term)
+                if tail is None:
+                    tail = self._tail[term] = ([], [])
+                tail[0].append(term_docs)
+                tail[1].append(term_tfs)
+                max_tf, min_length = self._bounds.get(term, (0, 1 << 32))
+                self._bounds[term] = (
+                    max(max_tf, int(term_tfs.max())),
+                    min(min_length, int(lengths[start:stop].min())),
+                )
+            self._tail_size += len(tfs)
+
+            if self._tail_size >= _TAIL_LIMIT:
+                self._merge_tail()
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """
+        Delete documents by ID.
+
+        Args:
+            ids: Document IDs (unknown IDs are ignored)
+
+        Returns:
+            int: Number of documents deleted
+
+        """
+        with self._lock:
+            return sum(self._remove(doc_id) for doc_id in ids)
+
+    def clear(self) -> None:
+        """Remove every document."""
+        with self._lock:
+            self._ids = []
+            self._docs = {}
+            self._lengths[:] = 0
+            self._live[:] = False
+            self._total_length = 0
+            self._packed = {}
+            self._tail = {}
+            self._tail_size = 0
+            self._bounds = {}
+
+    def search(self, query: str, top_k: int = 10) -> list[tuple[str, float]]:
+        """
+        Find the documents scoring highest for a query under BM25.
+
+        Args:
+            query: Query text
+            top_k: Number of results to return
+
+        Returns:
+            List of (document ID, BM25 score), best first
+
+        """
+        query_counts = Counter(tokenize(query))
+
+        with self._lock:
+            live_count = len(self._docs)
+            if live_count == 0 or top_k <= 0:
+                return []
+            average_length = max(self._total_length / live_count, 1.0)
+
+            terms = []
+            for term, weight in query_counts.items():
+                if term not in self._bounds:
+                    continue
+                docs, tfs = self._postings(term)
+                df = min(len(docs), live_count)
+                idf = math.log(1 + (live_count - df + 0.5) / (df + 0.5))
+                max_tf, min_length = self._bounds[term]
+                bound = weight * idf * self._saturation(max_tf, min_length, average_length)
+                terms.append((bound, weight * idf, docs, tfs))
+            if not terms:
+                return []
+
+            # Highest-impact terms first; the rest may become non-essential
+            terms.sort(key=lambda t: t[0], reverse=True)
+            scores = np.zeros(len(self._ids), dtype=np.float32)
+            threshold = 0.0
+            candidates: np.ndarray | None = None
+
+            for i, (_, weight, docs, tfs) in enumerate(terms):
+                # Most the terms after this one can add to a document's score
+                remaining = sum(t[0] for t in terms[i + 1 :])
+                if candidates is None:
+                    live = self._live[docs]
+                    docs, tfs = docs[live], tfs[live]
+                    scores[docs] += weight * self._saturation(
+                        tfs, self._lengths[docs], average_length
+                    )
+                    touched = np.flatnonzero(scores)
+                    if len(touched) >= top_k:
+                        threshold = float(np.partition(scores[touched], -top_k)[-top_k])
+                        if remaining < threshold:
+                            # Documents not seen yet can no longer reach the top k
+                            candidates = touched
+                else:
+                    positions = np.searchsorted(docs, candidates)
+                    found = positions < len(docs)
+                    found[found] = docs[positions[found]] == candidates[found]
+                    hits = candidates[found]
+                    scores[hits] += weight * self._saturation(
+                        tfs[positions[found]], self._lengths[hits], average_length
+                    )
+
+                if candidates is not None:
+                    candidates = candidates[scores[candidates] + remaining >= threshold]
+                    if len(candidates) >= top_k:
+                        threshold = float(np.partition(scores[candidates], -top_k)[-top_k])
+
+            if candidates is None:
+                candidates = np.flatnonzero(scores)
+            candidate_scores = scores[candidates]
+            return [
+                (self._ids[candidates[i]], float(candidate_scores[i]))
+                for i in top_k_indices(candidate_scores, top_k)
+            ]
+
+    def flush(self) -> None:
+        """Merge buffered postings and write the index to disk."""
+        with self._lock:
+            self._merge_tail()
+            if len(self._ids) - len(self._docs) > _COMPACT_RATIO * len(self._ids):
+                self._compact()
+            if self.path is not None:
+                self._save()
+
+    def close(self) -> None:
+        """Flush and release the index."""
+        with self._lock:
+            self.flush()
+            self._packed = {}
+            self._bounds = {}
+
+    def _saturation(
+        self,
+        tf: np.ndarray | int,
+        length: np.ndarray | int,
+        average_length: float,
+    ) -> np.ndarray | float:
+        """BM25 term frequency component, ``tf * (k1 + 1) / (tf + k1 * norm)``."""
+        norm = self.k1 * (1 - self.b + self.b * np.asarray(length, np.float32) / average_length)
+        tf = np.asarray(tf, np.float32)
+        return tf * (self.k1 + 1) / (tf + norm)
+
+    def _remove(self, doc_id: str) -> bool:
+        """Mark a document dead (lock held)."""
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        self._ids[doc] = None
+        self._live[doc] = False
+        self._total_length -= int(self._lengths[doc])
+        return True
+
+    def _postings(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        """Decoded (docs, tfs) of a term, including the tail (lock held)."""
+        packed = self._packed.get(term)
+        tail = self._tail.get(term)
+        docs = np.cumsum(packed[0], dtype=np.int64) if packed is not None else None
+        if tail is None:
+            return docs, packed[1]
+        tail_docs = np.concatenate(tail[0]).astype(np.int64)
+        tail_tfs = np.concatenate(tail[1])
+        if packed is None:
+            return tail_docs, tail_tfs
+        return np.concatenate([docs, tail_docs]), np.concatenate([packed[1], tail_tfs])
+
+    def _merge_tail(self) -> None:
+        """Pack the tail postings into the compressed lists (lock held)."""
+        for term in self._tail:
+            self._packed[term] = _pack(*self._postings(term))
+        self._tail = {}
+        self._tail_size = 0
+
+    def _compact(self) -> None:
+        """Drop dead documents and renumber the live ones (lock held)."""
+        count = len(self._ids)
+        live = self._live[:count]
+        numbers = np.cumsum(live, dtype=np.int64) - 1
+        lengths = self._lengths[:count][live]
+
+        packed: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        bounds: dict[str, tuple[int, int]] = {}
+        for term in self._packed:
+            docs, tfs = self._postings(term)
+            keep = live[docs]
+            if not keep.any():
+                continue
+            docs, tfs = numbers[docs[keep]], tfs[keep]
+            packed[term] = _pack(docs, tfs)
+            bounds[term] = (int(tfs.max()), int(lengths[docs].min()))
+
+        self._ids = [doc_id for doc_id in self._ids if doc_id is not None]
+        self._docs = {doc_id: doc for doc, doc_id in enumerate(self._ids)}
+        capacity = max(_MIN_CAPACITY, len(self._ids))
+        self._lengths = np.zeros(capacity, dtype=np.uint32)
+        self._lengths[: len(lengths)] = lengths
+        self._live = np.zeros(capacity, dtype=bool)
+        self._live[: len(self._ids)] = True
+        self._packed = packed
+        self._bounds = bounds
+        logger.info(f"Compacted keyword index: {count - len(self._ids)} dead documents dropped")
+
+    def _ensure_capacity(self, count: int) -> None:
+        """Grow the per-document arrays (doubling) to hold ``count`` documents."""
+        capacity = len(self._live)
+        if count <= capacity:
+            return
+        capacity = max(count, capacity * 2)
+        for name in ("_lengths", "_live"):
+            current = getattr(self, name)
+            grown = np.zeros(capacity, dtype=current.dtype)
+            grown[: len(current)] = current
+            setattr(self, name, grown)
+
+    def _save(self) -> None:
+        """Write the merged index atomically (lock held)."""
+        count = len(self._ids)
+        terms = list(self._packed)
+        term_blob, term_offsets = _pack_strings(terms)
+        id_blob, id_offsets = _pack_strings([doc_id or "" for doc_id in self._ids])
+
+        arrays = {}
+        for kind, column in (("doc", 0), ("tf", 1)):
+            parts = [self._packed[term][column] for term in terms]
+            offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+            np.cumsum([p.nbytes for p in parts], out=offsets[1:])
+            arrays[f"{kind}_blob"] = np.frombuffer(b"".join(p.tobytes() for p in parts), np.uint8)
+            arrays[f"{kind}_offsets"] = offsets
+            arrays[f"{kind}_widths"] = np.array([p.itemsize for p in parts], dtype=np.uint8)
+
+        tmp_path = os.path.join(self.path, _INDEX_FILE + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            header=np.array([_FORMAT_VERSION, count], dtype=np.int64),
+            id_blob=id_blob,
+            id_offsets=id_offsets,
+            lengths=self._lengths[:count],
+            live=self._live[:count],
+            term_blob=term_blob,
+            term_offsets=term_offsets,
+            bounds=np.array([self._bounds[term] for term in terms], dtype=np.uint32).reshape(
+                -1, 2
+            ),
+            **arrays,
+        )
+        os.replace(tmp_path, os.path.join(self.path, _INDEX_FILE))
+
+    def _load(self) -> None:
+        """Load a saved index from ``self.path``, if there is one."""
+        index_path = os.path.join(self.path, _INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+
+        with np.load(index_path) as saved:
+            version, count = saved["header"].tolist()
+            if version != _FORMAT_VERSION:
+                logger.warning(f"Ignoring keyword index {index_path} of format {version}")
+                return
+
+            ids = _unpack_strings(saved["id_blob"], saved["id_offsets"])
+            live = saved["live"]
+            self._ensure_capacity(count)
+            self._lengths[:count] = saved["lengths"]
+            self._live[:count] = live
+            self._ids = [
+                doc_id if alive else None
+                for doc_id, alive in zip(ids, live.tolist(), strict=True)
+            ]
+            self._docs = {doc_id: doc for doc, doc_id in enumerate(self._ids) if doc_id is not None}
+            self._total_length = int(self._lengths[:count][live].sum())
+
+            terms = _unpack_strings(saved["term_blob"], saved["term_offsets"])
+            columns = []
+            for kind in ("doc", "tf"):
+                blob = saved[f"{kind}_blob"].tobytes()
+                offsets = saved[f"{kind}_offsets"].tolist()
+                widths = saved[f"{kind}_widths"].tolist()
+                columns.append(
+                    [
+                        np.frombuffer(
+                            blob,
+                            dtype=f"u{width}",
+                            count=(offsets[i + 1] - offsets[i]) // width,
+                            offset=offsets[i],
+                        )
+                        for i, width in enumerate(widths)
+                    ]
+                )
+            self._packed = dict(zip(terms, zip(*columns, strict=True), strict=True))
+            self._bounds = {
+                term: (int(max_tf), int(min_length))
+                for term, (max_tf, min_length) in zip(terms, saved["bounds"].tolist(), strict=True)
+            }
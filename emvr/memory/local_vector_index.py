@@ -0,0 +1,779 @@
+"""
+Embedded vector index for single-node deployments.
+
+Vectors are L2-normalized and kept in one contiguous float32 matrix, so a
+cosine-similarity query is a single matrix-vector product followed by an
+``argpartition`` top-k. IDs are kept in memory; payloads live in a small
+SQLite table and are only read for the hits. With a path, the matrix is a
+memory-mapped file and restarts only reload the ID table.
+
+For large collections the index can instead be backed by an HNSW graph
+(``index_type="hnsw"``), trading exactness for sub-linear query time. A flat
+index can also scan quantized codes instead of the full matrix
+(``quantization="int8"`` or ``"pq"``), rescoring a shortlist against the
+memory-mapped full vectors, so only the codes need to stay in RAM.
+
+Searches can be restricted by a filter expression (``emvr.memory.filters``),
+which compiles to a row mask through payload indexes on selected fields.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from emvr.memory.filters import And, Filter, matches
+from emvr.memory.hnsw import HNSWGraph
+from emvr.memory.payload_index import PayloadIndex
+from emvr.memory.quantization import (
+    QUANTIZATION_MODES,
+    ProductQuantizer,
+    ScalarQuantizer,
+    create_quantizer,
+    load_quantizer,
+    save_quantizer,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_VECTORS_FILE = "vectors.f32"
+_POINTS_FILE = "points.sqlite3"
+_CODES_FILE = "codes.u8"
+_QUANTIZER_FILE = "quantizer.npz"
+_MIN_CAPACITY = 1024
+INDEX_TYPES = ("flat", "hnsw")
+# Rows needed before a quantizer is trained, and the training sample cap
+_QUANTIZER_MIN_ROWS = 1024
+_QUANTIZER_SAMPLE = 25000
+# Default shortlist size per result; PQ codes are coarser, so it rescores more
+_RESCORE_MULTIPLIERS = {"int8": 4, "pq": 16}
+# Filters matching at most this share of a flat index (or this many rows of an
+# HNSW index) are searched exactly over the matching rows only
+_PREFILTER_SELECTIVITY = 0.25
+_PREFILTER_MAX_ROWS = 20000
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize the rows of a matrix (zero rows are left as zeros).
+
+    Args:
+        vectors: Matrix of shape (n, dimension)
+
+    Returns:
+        float32 matrix of unit-length rows
+
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    np.maximum(norms, np.finfo(np.float32).tiny, out=norms)
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the ``k`` highest scores, best first.
+
+    Uses ``argpartition`` so only the top k are sorted.
+
+    Args:
+        scores: 1-D score array
+        k: Number of indices to return
+
+    Returns:
+        Array of at most ``k`` indices
+
+    """
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < scores.shape[0]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[0])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class LocalVectorIndex:
+    """
+    Cosine-similarity index over a contiguous, normalized matrix.
+
+    The ``flat`` index type scans the matrix exactly. Its deletes move the
+    last row into the freed slot, so live rows are always ``[0, len(self))``
+    and searches never skip tombstones. The ``hnsw`` index type searches an
+    HNSW graph over the rows instead; rows are append-only there, and
+    deletes and replacements leave tombstoned rows behind. A quantized flat
+    index trains its quantizer once it holds enough rows and is exact until
+    then. All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        dimension: int | None,
+        path: str | None = None,
+        index_type: str | None = None,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64,
+        quantization: str | None = None,
+        pq_subvectors: int | None = None,
+        rescore_multiplier: int | None = None,
+        indexed_fields: Sequence[str] = (),
+    ) -> None:
+        """
+        Initialize the index, loading it from ``path`` if it exists.
+
+        Args:
+            dimension: Vector dimension (None to use the persisted index's)
+            path: Directory to persist the index in (None keeps it in memory)
+            index_type: "flat" or "hnsw" (None to use the persisted index's,
+                or "flat" for a new one)
+            hnsw_m: HNSW links per node
+            hnsw_ef_construction: HNSW candidate list size while inserting
+            hnsw_ef_search: HNSW candidate list size while searching
+            quantization: "none", "int8" or "pq" (None to use the persisted
+                index's, or "none" for a new one)
+            pq_subvectors: PQ subvectors (defaults to dimension / 4)
+            rescore_multiplier: Quantized candidates rescored per result
+                (defaults to 4 for int8 and 16 for pq)
+            indexed_fields: Dotted payload paths with a payload index for
+                filtering (other fields are filtered by reading payloads)
+
+        Raises:
+            ValueError: If the dimension is unknown or differs from the
+                persisted index's, the index type or quantization mode is
+                unknown, or an HNSW index is quantized
+
+        """
+        if index_type is not None and index_type not in INDEX_TYPES:
+            msg = f"Unknown index type: {index_type}"
+            raise ValueError(msg)
+        if quantization is not None and quantization not in QUANTIZATION_MODES:
+            msg = f"Unknown quantization mode: {quantization}"
+            raise ValueError(msg)
+
+        self.dimension = dimension
+        self.path = path
+        self.indexed_fields = tuple(indexed_fields)
+        # Built from the payloads on the first filtered search
+        self._payload_index: PayloadIndex | None = None
+        self._lock = threading.RLock()
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(path, _POINTS_FILE) if path is not None else ":memory:",
+            check_same_thread=False,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS points "
+            "(row INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, payload TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._check_dimension()
+        self.index_type = self._persisted_setting("index_type", index_type, "flat")
+        self.quantization = self._persisted_setting("quantization", quantization, "none")
+        if self.index_type == "hnsw" and self.quantization != "none":
+            msg = "Quantization is only supported by the flat index type"
+            raise ValueError(msg)
+        self.rescore_multiplier = max(
+            1, rescore_multiplier or _RESCORE_MULTIPLIERS.get(self.quantization, 1)
+        )
+
+        # Row -> ID; None marks a tombstoned row of an HNSW index
+        self._ids: list[str | None] = []
+        self._rows: dict[str, int] = {}
+        for row, point_id in self._db.execute("SELECT row, id FROM points ORDER BY row"):
+            self._ids.extend([None] * (row - len(self._ids)))
+            self._ids.append(point_id)
+            self._rows[point_id] = row
+        self._vectors = self._open_vectors(max(_MIN_CAPACITY, len(self._ids)))
+
+        self._graph: HNSWGraph | None = None
+        if self.index_type == "hnsw":
+            self._graph = HNSWGraph(
+                m=hnsw_m,
+                ef_construction=hnsw_ef_construction,
+                ef_search=hnsw_ef_search,
+                path=os.path.join(path, "hnsw") if path is not None else None,
+            )
+            self._sync_graph()
+            for row, point_id in enumerate(self._ids):
+                if point_id is None:
+                    self._graph.delete(row)
+
+        self._quantizer: ScalarQuantizer | ProductQuantizer | None = None
+        self._codes: np.ndarray | None = None
+        if self.quantization != "none":
+            if self.quantization == "pq":
+                pq_subvectors = int(
+                    self._persisted_setting(
+                        "pq_subvectors",
+                        str(pq_subvectors) if pq_subvectors else None,
+                        str(max(1, self.dimension // 4)),
+                    )
+                )
+            self._quantizer = create_quantizer(self.quantization, self.dimension, pq_subvectors)
+            if path is not None and load_quantizer(
+                self._quantizer, os.path.join(path, _QUANTIZER_FILE)
+            ):
+                self._codes = self._open_matrix(
+                    _CODES_FILE, self._vectors.shape[0], self._quantizer.code_size, np.uint8
+                )
+            else:
+                self._maybe_train_quantizer()
+
+    def __len__(self) -> int:
+        """Number of vectors in the index."""
+        return len(self._rows)
+
+    def __contains__(self, point_id: object) -> bool:
+        """Whether an ID is in the index."""
+        return point_id in self._rows
+
+    @property
+    def bytes_per_vector(self) -> float:
+        """
+        Bytes per vector held for search: codes when quantized, otherwise the
+        float32 vector, plus the HNSW links. Full vectors that are only read
+        to rescore a shortlist are not counted.
+        """
+        with self._lock:
+            if self._codes is not None:
+                size = float(self._quantizer.code_size)
+            else:
+                size = float(self.dimension * np.dtype(np.float32).itemsize)
+            if self._graph is not None and self._graph.count:
+                size += self._graph.nbytes() / self._graph.count
+            return size
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[dict[str, Any]] | None = None,
+    ) -> None:
+        """
+        Insert or replace vectors and their payloads.
+
+        Args:
+            ids: Point IDs
+            vectors: Matrix of shape (len(ids), dimension)
+            payloads: Optional JSON-serializable payload per point
+
+        Raises:
+            ValueError: If the shapes do not match
+
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape != (len(ids), self.dimension):
+            msg = f"Expected vectors of shape ({len(ids)}, {self.dimension}), got {vectors.shape}"
+            raise ValueError(msg)
+        if payloads is not None and len(payloads) != len(ids):
+            msg = f"Got {len(payloads)} payloads for {len(ids)} ids"
+            raise ValueError(msg)
+
+        normalized = normalize_rows(vectors)
+
+        with self._lock:
+            rows = np.empty(len(ids), dtype=np.intp)
+            records = []
+            for i, point_id in enumerate(ids):
+                row = self._rows.get(point_id)
+                if row is not None and self._graph is not None:
+                    # Graph rows are immutable: tombstone the old one, append anew
+                    self._ids[row] = None
+                    self._graph.delete(row)
+                    if self._payload_index is not None:
+                        self._payload_index.remove(row)
+                    row = None
+                if row is None:
+                    row = len(self._ids)
+                    self._ids.append(point_id)
+                    self._rows[point_id] = row
+                rows[i] = row
+                payload = payloads[i] if payloads is not None else {}
+                records.append((row, point_id, json.dumps(payload, default=str)))
+
+            self._ensure_capacity(len(self._ids))
+            self._vectors[rows] = normalized
+            if self._codes is not None:
+                self._codes[rows] = self._quantizer.encode(normalized)
+            # REPLACE also drops the old row of a re-inserted HNSW point (unique id)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO points (row, id, payload) VALUES (?, ?, ?)",
+                records,
+            )
+            self._db.commit()
+
+            if self._payload_index is not None:
+                # Index the stored (JSON round-tripped) payloads, as a rebuild would
+                for (row, _, payload), live_id in zip(
+                    records, (self._ids[row] for row, _, _ in records), strict=True
+                ):
+                    self._payload_index.remove(row)
+                    if live_id is not None:
+                        self._payload_index.add(row, json.loads(payload))
+
+            if self._graph is not None:
+                self._sync_graph()
+            elif self._quantizer is not None and self._codes is None:
+                self._maybe_train_quantizer()
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """
+        Delete points by ID.
+
+        Args:
+            ids: Point IDs (unknown IDs are ignored)
+
+        Returns:
+            int: Number of points deleted
+
+        """
+        deleted = 0
+        with self._lock:
+            for point_id in ids:
+                row = self._rows.pop(point_id, None)
+                if row is None:
+                    continue
+
+                if self._payload_index is not None:
+                    self._payload_index.remove(row)
+
+                if self._graph is not None:
+                    self._db.execute("DELETE FROM points WHERE row = ?", (row,))
+                    self._ids[row] = None
+                    self._graph.delete(row)
+                    deleted += 1
+                    continue
+
+                last = len(self._ids) - 1
+                self._db.execute("DELETE FROM points WHERE row = ?", (row,))
+                if row != last:
+                    # Keep the matrix dense: move the last point into the hole
+                    moved_id = self._ids[last]
+                    self._vectors[row] = self._vectors[last]
+                    if self._codes is not None:
+                        self._codes[row] = self._codes[last]
+                    self._ids[row] = moved_id
+                    self._rows[moved_id] = row
+                    if self._payload_index is not None:
+                        self._payload_index.move(last, row)
+                    self._db.execute("UPDATE points SET row = ? WHERE row = ?", (row, last))
+                self._ids.pop()
+                deleted += 1
+
+            if deleted:
+                self._db.commit()
+
+        return deleted
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 5,
+        ef: int | None = None,
+        filter: Filter | None = None,  # noqa: A002
+    ) -> list[tuple[str, float]]:
+        """
+        Find the points most similar to a query vector.
+
+        Args:
+            query: Query vector of shape (dimension,)
+            top_k: Number of results to return
+            ef: HNSW candidate list size (defaults to the index's ef_search)
+            filter: Optional filter expression over the payloads
+
+        Returns:
+            List of (point ID, cosine similarity), best first
+
+        """
+        query = np.asarray(query, dtype=np.float32)[None, :]
+        return self.search_batch(query, top_k, ef, filter)[0]
+
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        top_k: int = 5,
+        ef: int | None = None,
+        filter: Filter | None = None,  # noqa: A002
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Find the points most similar to each of several query vectors.
+
+        Args:
+            queries: Matrix of shape (n_queries, dimension)
+            top_k: Number of results per query
+            ef: HNSW candidate list size (defaults to the index's ef_search)
+            filter: Optional filter expression over the payloads
+
+        Returns:
+            One list of (point ID, cosine similarity) per query, best first
+
+        """
+        queries = normalize_rows(queries)
+
+        with self._lock:
+            if filter is not None:
+                return self._search_filtered(queries, top_k, ef, self._filter_mask(filter))
+
+            if self._graph is not None:
+                return [
+                    [
+                        (self._ids[row], score)
+                        for row, score in self._graph.search(query, top_k, self._vectors, ef)
+                    ]
+                    for query in queries
+                ]
+
+            count = len(self._ids)
+            if count == 0:
+                return [[] for _ in range(queries.shape[0])]
+
+            if self._codes is not None:
+                return self._search_quantized(queries, top_k)
+
+            scores = queries @ self._vectors[:count].T
+            results = []
+            for row_scores in scores:
+                top = top_k_indices(row_scores, top_k)
+                results.append([(self._ids[i], float(row_scores[i])) for i in top])
+            return results
+
+    def get_payloads(self, ids: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """
+        Read the payloads of points.
+
+        Args:
+            ids: Point IDs
+
+        Returns:
+            Dict mapping each found ID to its payload
+
+        """
+        payloads: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                batch = list(ids[start : start + 500])
+                placeholders = ",".join("?" * len(batch))
+                for point_id, payload in self._db.execute(
+                    f"SELECT id, payload FROM points WHERE id IN ({placeholders})",  # noqa: S608
+                    batch,
+                ):
+                    payloads[point_id] = json.loads(payload)
+        return payloads
+
+    def scan_payloads(self, batch_size: int = 1000) -> Iterator[list[tuple[str, dict[str, Any]]]]:
+        """
+        Iterate over all payloads in row order, in batches.
+
+        The lock is only held while a batch is read, so writes may interleave.
+
+        Args:
+            batch_size: Points per batch
+
+        Yields:
+            Lists of (point ID, payload)
+
+        """
+        after = -1
+        while True:
+            with self._lock:
+                batch = self._db.execute(
+                    "SELECT row, id, payload FROM points WHERE row > ? ORDER BY row LIMIT ?",
+                    (after, batch_size),
+                ).fetchall()
+            if not batch:
+                return
+            after = batch[-1][0]
+            yield [(point_id, json.loads(payload)) for _, point_id, payload in batch]
+
+    def get_vectors(self, ids: Sequence[str]) -> np.ndarray:
+        """
+        Read the (normalized) vectors of points.
+
+        Args:
+            ids: Point IDs, all of which must exist
+
+        Returns:
+            float32 matrix of shape (len(ids), dimension)
+
+        """
+        with self._lock:
+            rows = [self._rows[point_id] for point_id in ids]
+            return np.array(self._vectors[rows], dtype=np.float32)
+
+    def flush(self) -> None:
+        """Write the vectors, payloads and graph to disk."""
+        with self._lock:
+            for matrix in (self._vectors, self._codes):
+                if isinstance(matrix, np.memmap):
+                    matrix.flush()
+            self._db.commit()
+            if self._graph is not None:
+                self._graph.save()
+
+    def close(self) -> None:
+        """Flush and release the index."""
+        with self._lock:
+            self.flush()
+            self._db.close()
+            self._vectors = np.empty((0, self.dimension), dtype=np.float32)
+            self._graph = None
+            self._codes = None
+
+    def _check_dimension(self) -> None:
+        """Record the dimension of a new index, or validate a persisted one."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'dimension'").fetchone()
+        if self.dimension is None:
+            if row is None:
+                msg = "Dimension is required to create a new index"
+                raise ValueError(msg)
+            self.dimension = int(row[0])
+        elif row is None:
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('dimension', ?)",
+                (str(self.dimension),),
+            )
+            self._db.commit()
+        elif int(row[0]) != self.dimension:
+            msg = f"Index at {self.path} has dimension {row[0]}, expected {self.dimension}"
+            raise ValueError(msg)
+
+    def _persisted_setting(self, key: str, value: str | None, default: str) -> str:
+        """
+        Resolve a setting that is fixed when the index is created.
+
+        A new index records ``value`` (or ``default``); a persisted index
+        keeps its recorded value and a different ``value`` is ignored.
+        """
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            if value is not None and row[0] != value:
+                logger.warning(f"Index at {self.path} has {key}={row[0]!r}, ignoring {value!r}")
+            return row[0]
+
+        value = value or default
+        self._db.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, value))
+        self._db.commit()
+        return value
+
+    def _maybe_train_quantizer(self) -> None:
+        """
+        Train the quantizer and encode every row once there are enough rows
+        (lock held).
+        """
+        count = len(self._ids)
+        if count < _QUANTIZER_MIN_ROWS:
+            return
+
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(count, min(count, _QUANTIZER_SAMPLE), replace=False))
+        self._quantizer.train(np.asarray(self._vectors[sample]))
+
+        codes = self._open_matrix(
+            _CODES_FILE, self._vectors.shape[0], self._quantizer.code_size, np.uint8
+        )
+        for start in range(0, count, _QUANTIZER_SAMPLE):
+            stop = min(count, start + _QUANTIZER_SAMPLE)
+            codes[start:stop] = self._quantizer.encode(self._vectors[start:stop])
+        self._codes = codes
+        if self.path is not None:
+            if isinstance(codes, np.memmap):
+                codes.flush()
+            save_quantizer(self._quantizer, os.path.join(self.path, _QUANTIZER_FILE))
+        logger.info(
+            f"Trained {self.quantization} quantizer on {len(sample)} of {count} vectors "
+            f"({self._quantizer.code_size} bytes per vector)"
+        )
+
+    def _search_quantized(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        rows: np.ndarray | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Shortlist by approximate scores on the codes, then rescore the
+        shortlist exactly against the full vectors (lock held). ``rows``
+        (sorted) restricts the search to those rows.
+        """
+        codes = self._codes[: len(self._ids)] if rows is None else self._codes[rows]
+        approximate = self._quantizer.scores(queries, codes)
+        results = []
+        for query, row_scores in zip(queries, approximate, strict=True):
+            # Sorted rows keep the reads of the memory-mapped vectors sequential
+            shortlist = np.sort(top_k_indices(row_scores, top_k * self.rescore_multiplier))
+            if rows is not None:
+                shortlist = rows[shortlist]
+            exact = self._vectors[shortlist] @ query
+            top = top_k_indices(exact, top_k)
+            results.append([(self._ids[shortlist[i]], float(exact[i])) for i in top])
+        return results
+
+    def _get_payload_index(self) -> PayloadIndex:
+        """Return the payload index, building it from the stored payloads (lock held)."""
+        if self._payload_index is None:
+            index = PayloadIndex(self.indexed_fields)
+            for row, payload in self._db.execute("SELECT row, payload FROM points"):
+                index.add(row, json.loads(payload))
+            self._payload_index = index
+            logger.info(
+                f"Built payload index on {list(self.indexed_fields)} for {len(self._rows)} points"
+            )
+        return self._payload_index
+
+    def _filter_mask(self, expression: Filter) -> np.ndarray:
+        """
+        Mask of the rows matching a filter expression (lock held).
+
+        Conditions on indexed fields are resolved through the payload index;
+        the payloads of the remaining candidates are read and checked for the
+        others.
+        """
+        index = self._get_payload_index()
+        size = len(self._ids)
+        if index.covers(expression):
+            return index.mask(expression, size)
+
+        clauses = expression.clauses if isinstance(expression, And) else (expression,)
+        indexed = tuple(c for c in clauses if index.covers(c))
+        residual = And(tuple(c for c in clauses if not index.covers(c)))
+        mask = index.mask(And(indexed), size)
+
+        candidates = np.flatnonzero(mask).tolist()
+        for start in range(0, len(candidates), 500):
+            batch = candidates[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for row, payload in self._db.execute(
+                f"SELECT row, payload FROM points WHERE row IN ({placeholders})",  # noqa: S608
+                batch,
+            ):
+                if not matches(residual, json.loads(payload)):
+                    mask[row] = False
+        return mask
+
+    def _search_filtered(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        ef: int | None,
+        mask: np.ndarray,
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Search the rows of a filter mask (lock held).
+
+        The strategy follows the filter's selectivity: few matching rows are
+        scored exactly (pre-filtering), while broad filters scan the whole
+        matrix with the other rows masked out or, on an HNSW index, restrict
+        the graph traversal to matching nodes with a candidate list widened
+        by the inverse selectivity.
+        """
+        rows = np.flatnonzero(mask)
+        matching = len(rows)
+        if matching == 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        if self._graph is not None and matching > _PREFILTER_MAX_ROWS:
+            selectivity = matching / max(1, len(self._rows))
+            ef = max(ef or self._graph.ef_search, min(int(top_k / selectivity), matching))
+            return [
+                [
+                    (self._ids[row], score)
+                    for row, score in self._graph.search(
+                        query, top_k, self._vectors, ef, accept=lambda row: bool(mask[row])
+                    )
+                ]
+                for query in queries
+            ]
+
+        if self._codes is not None and matching > top_k * self.rescore_multiplier:
+            return self._search_quantized(queries, top_k, rows)
+
+        results = []
+        if self._graph is None and matching > _PREFILTER_SELECTIVITY * len(self._ids):
+            # Scanning the contiguous matrix beats gathering most of its rows
+            scores = queries @ self._vectors[: len(self._ids)].T
+            scores[:, ~mask] = -np.inf
+            for row_scores in scores:
+                top = top_k_indices(row_scores, min(top_k, matching))
+                results.append([(self._ids[i], float(row_scores[i])) for i in top])
+            return results
+
+        scores = queries @ self._vectors[rows].T
+        for row_scores in scores:
+            top = top_k_indices(row_scores, top_k)
+            results.append([(self._ids[rows[i]], float(row_scores[i])) for i in top])
+        return results
+
+    def _sync_graph(self) -> None:
+        """
+        Bring the graph up to date with the rows (lock held).
+
+        Adds the rows the graph has not seen yet: new rows after an upsert,
+        or rows whose graph updates were not saved before a restart.
+        """
+        graph = self._graph
+        if graph.count > len(self._ids):
+            # Trailing rows that were deleted before the restart
+            self._ids.extend([None] * (graph.count - len(self._ids)))
+
+        for row in range(graph.count, len(self._ids)):
+            graph.add(row, self._vectors)
+            if self._ids[row] is None:
+                graph.delete(row)
+
+    def _open_vectors(self, capacity: int) -> np.ndarray:
+        """Allocate (or map) the vector matrix with room for ``capacity`` rows."""
+        return self._open_matrix(_VECTORS_FILE, capacity, self.dimension, np.float32)
+
+    def _open_matrix(
+        self,
+        file_name: str,
+        capacity: int,
+        width: int,
+        dtype: DTypeLike,
+    ) -> np.ndarray:
+        """Allocate (or map) a per-row matrix with room for ``capacity`` rows."""
+        if self.path is None:
+            return np.zeros((capacity, width), dtype=dtype)
+
+        file_path = os.path.join(self.path, file_name)
+        row_size = width * np.dtype(dtype).itemsize
+        with open(file_path, "ab") as f:
+            if f.tell() < capacity * row_size:
+                f.truncate(capacity * row_size)
+            else:
+                capacity = f.tell() // row_size
+        return np.memmap(file_path, dtype=dtype, mode="r+", shape=(capacity, width))
+
+    def _ensure_capacity(self, count: int) -> None:
+        """Grow the matrices (doubling) so that they hold ``count`` rows."""
+        capacity = self._vectors.shape[0]
+        if count <= capacity:
+            return
+
+        new_capacity = max(count, capacity * 2)
+        self._vectors = self._grow(self._vectors, _VECTORS_FILE, new_capacity)
+        if self._codes is not None:
+            self._codes = self._grow(self._codes, _CODES_FILE, new_capacity)
+
+    def _grow(self, matrix: np.ndarray, file_name: str, capacity: int) -> np.ndarray:
+        """Return ``matrix`` grown to ``capacity`` rows."""
+        if isinstance(matrix, np.memmap):
+            matrix.flush()
+            return self._open_matrix(file_name, capacity, matrix.shape[1], matrix.dtype)
+
+        grown = np.zeros((capacity, matrix.shape[1]), dtype=matrix.dtype)
+        grown[: matrix.shape[0]] = matrix
+        return grown
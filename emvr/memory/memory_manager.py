@@ -1,11 +1,18 @@
 """Memory manager implementation integrating vector and graph stores."""
 
+import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 from emvr.memory.base import Entity, MemoryInterface, Relation
+from emvr.memory.generations import write_generations
+from emvr.memory.graph_export import export_graph
 from emvr.memory.graph_store import Neo4jMemoryStore
 from emvr.memory.vector_store import QdrantMemoryStore
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
 
 class MemoryManager(MemoryInterface):
     """Memory manager integrating vector and graph stores."""
@@ -35,21 +42,22 @@ class MemoryManager(MemoryInterface):
         # Initialize vector store
         # In a real implementation, this would properly initialize the vector store
         
-        # Initialize graph store
-        # In a real implementation, this would properly initialize the graph store
+        # Initialize graph store: constraints and indexes backing its queries
+        await self.graph_store.ensure_schema()
+        logger.info("Graph schema ensured")
         
         self._initialized = True
         
-    def close(self) -> None:
-        """Close connections and clean up resources."""
+    async def close(self) -> None:
+        """Close connections and clean up resources, flushing buffered writes."""
         if not self._initialized:
             return
             
-        # Close vector store connections
-        # In a real implementation, this would properly close vector store connections
+        # Close vector store connections (flushes buffered writes and the embedded index)
+        await self.vector_store.close()
         
-        # Close graph store connections
-        # In a real implementation, this would properly close graph store connections
+        # Graph store drivers are shared: core.db_connections.close_connections
+        # drains and closes them
         
         self._initialized = False
 
@@ -73,7 +81,11 @@ class MemoryManager(MemoryInterface):
             for entity in entities
         ]
 
-        return await self.graph_store.create_entities(entities_data)
+        try:
+            return await self.graph_store.create_entities(entities_data)
+        finally:
+            # Even a failed write may have partly landed
+            write_generations.bump("graph")
 
         # Also index entities in vector store for semantic search
         # This would be implemented based on specific requirements
@@ -98,7 +110,10 @@ class MemoryManager(MemoryInterface):
             for relation in relations
         ]
 
-        return await self.graph_store.create_relations(relations_data)
+        try:
+            return await self.graph_store.create_relations(relations_data)
+        finally:
+            write_generations.bump("graph")
 
     async def add_observations(
         self,
@@ -116,7 +131,10 @@ class MemoryManager(MemoryInterface):
             Dictionary with operation result
 
         """
-        return await self.graph_store.add_observations(entity_name, observations)
+        try:
+            return await self.graph_store.add_observations(entity_name, observations)
+        finally:
+            write_generations.bump("graph")
 
     async def delete_entities(self, entity_names: list[str]) -> dict[str, Any]:
         """
@@ -129,7 +147,10 @@ class MemoryManager(MemoryInterface):
             Dictionary with operation result
 
         """
-        return await self.graph_store.delete_entities(entity_names)
+        try:
+            return await self.graph_store.delete_entities(entity_names)
+        finally:
+            write_generations.bump("graph")
 
     async def delete_observations(
         self,
@@ -147,7 +168,10 @@ class MemoryManager(MemoryInterface):
             Dictionary with operation result
 
         """
-        return await self.graph_store.delete_observations(entity_name, observations)
+        try:
+            return await self.graph_store.delete_observations(entity_name, observations)
+        finally:
+            write_generations.bump("graph")
 
     async def delete_relations(self, relations: list[Relation]) -> dict[str, Any]:
         """
@@ -169,7 +193,10 @@ class MemoryManager(MemoryInterface):
             for relation in relations
         ]
 
-        return await self.graph_store.delete_relations(relations_data)
+        try:
+            return await self.graph_store.delete_relations(relations_data)
+        finally:
+            write_generations.bump("graph")
 
     async def read_graph(self) -> dict[str, Any]:
         """
@@ -181,18 +208,139 @@ class MemoryManager(MemoryInterface):
         """
         return await self.graph_store.read_graph()
 
-    async def search_nodes(self, query: str) -> dict[str, Any]:
+    async def read_graph_page(
+        self,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Read one page of the knowledge graph, in entity name order.
+
+        Args:
+            after: Cursor of the previous page (None for the first page)
+            limit: Maximum number of entities
+
+        Returns:
+            Dictionary with entities, relations and the next page's cursor
+
+        """
+        return await self.graph_store.read_graph_page(after, limit)
+
+    async def iter_graph(self, page_size: int | None = None) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate over the knowledge graph page by page.
+
+        Args:
+            page_size: Entities per page
+
+        Yields:
+            Pages with entities, relations and the next page's cursor
+
+        """
+        async for page in self.graph_store.iter_graph(page_size):
+            yield page
+
+    async def sample_graph(
+        self,
+        limit: int = 50,
+        center: str | None = None,
+        max_depth: int = 2,
+    ) -> dict[str, Any]:
+        """
+        Read a small connected sample of the knowledge graph.
+
+        Args:
+            limit: Maximum number of entities
+            center: Optional entity to sample around
+            max_depth: Maximum number of hops from the center
+
+        Returns:
+            Dictionary with entities and relations
+
+        """
+        return await self.graph_store.sample_graph(limit, center, max_depth)
+
+    async def neighborhood(
+        self,
+        names: list[str],
+        max_hops: int = 1,
+        limit: int | None = None,
+        relation_types: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Expand entities to their multi-hop neighborhood, using the adjacency cache.
+
+        Args:
+            names: Entity names to start from
+            max_hops: Maximum number of hops
+            limit: Maximum number of entities, starting ones included
+            relation_types: Only follow relations of these types
+
+        Returns:
+            Dictionary with the entities reached (with their hop distance)
+            and the relations traversed
+
+        """
+        return await self.graph_store.neighborhood(names, max_hops, limit, relation_types)
+
+    async def expand_entities(
+        self,
+        names: list[str],
+        hops: int = 1,
+        relation_types: list[str] | None = None,
+        limit_per_entity: int = 25,
+    ) -> dict[str, Any]:
+        """
+        Expand several entities at once into one subgraph, one batched query per hop.
+
+        Args:
+            names: Seed entity names
+            hops: Maximum number of hops from a seed
+            relation_types: Only follow relations of these types
+            limit_per_entity: Maximum number of entities reached per seed
+
+        Returns:
+            Dictionary with the deduplicated entities (with the seeds that
+            reached them), the relations between them and the missing seeds
+
+        """
+        return await self.graph_store.expand_entities(
+            names, hops, relation_types, limit_per_entity
+        )
+
+    async def export_graph(
+        self,
+        path: str,
+        fmt: str = "ndjson",
+        page_size: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Export the knowledge graph to a file, page by page.
+
+        Args:
+            path: Output file
+            fmt: "ndjson" or "arrow"
+            page_size: Entities per page
+
+        Returns:
+            Dictionary with the path, format and exported counts
+
+        """
+        return await export_graph(self.graph_store.iter_graph(page_size), path, fmt)
+
+    async def search_nodes(self, query: str, limit: int = 10) -> dict[str, Any]:
         """
         Search for nodes in the knowledge graph based on a query.
 
         Args:
             query: Search query string
+            limit: Maximum number of entities to return
 
         Returns:
-            Dictionary with matching entities
+            Dictionary with matching entities, best match first
 
         """
-        return await self.graph_store.search_nodes(query)
+        return await self.graph_store.search_nodes(query, limit)
 
     async def open_nodes(self, names: list[str]) -> dict[str, Any]:
         """
@@ -0,0 +1,378 @@
+"""
+In-process adjacency cache for graph neighborhoods.
+
+Popular entities are expanded over and over (retrieval, visualization,
+agents walking the graph). This cache keeps their neighbor lists in memory
+so that multi-hop expansions run as breadth-first searches over arrays,
+fetching only the entities not yet cached, in one batched query per hop.
+
+Each cached entity maps to one row of a CSR-style adjacency: a compact
+structured array of (neighbor id, relation id, outgoing) with entity and
+relation names interned to int32 ids, about 9 bytes per edge. Rows are
+evicted least recently used first once the cached edge count exceeds the
+budget.
+
+Writes through the store invalidate the rows they touch: relation writes
+drop both endpoints, entity deletes drop the entity and every row
+referencing it. A generation counter keeps rows fetched concurrently with a
+write from being cached. Writes made by other processes are not seen.
+"""
+
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from emvr.config import get_settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EDGE_DTYPE = np.dtype([("neighbor", "<i4"), ("relation", "<i4"), ("outgoing", "?")])
+
+# (relation type, neighbor name, whether the relation points to the neighbor)
+Edge = tuple[str, str, bool]
+AdjacencyFetcher = Callable[[list[str]], Awaitable[dict[str, list[Edge]]]]
+
+
+class NeighborhoodCache:
+    """LRU adjacency cache bounded by edge count. Not thread-safe."""
+
+    def __init__(self, max_edges: int = 1_000_000) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_edges: Maximum number of cached edges
+
+        """
+        self.max_edges = max_edges
+        self.generation = 0
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._relation_ids: dict[str, int] = {}
+        self._relations: list[str] = []
+        self._rows: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._edges = 0
+        self._expanding = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Number of cached entities."""
+        return len(self._rows)
+
+    @property
+    def edge_count(self) -> int:
+        """Number of cached edges."""
+        return self._edges
+
+    def get(self, name: str) -> list[Edge] | None:
+        """
+        Cached neighbors of an entity.
+
+        Args:
+            name: Entity name
+
+        Returns:
+            List of (relation, neighbor, outgoing), or None if not cached
+
+        """
+        row = self._row(self._ids.get(name))
+        if row is None:
+            return None
+        return [
+            (self._relations[relation], self._names[neighbor], outgoing)
+            for neighbor, relation, outgoing in row.tolist()
+        ]
+
+    def put(self, name: str, edges: Iterable[Edge], generation: int) -> None:
+        """
+        Cache the neighbors of an entity.
+
+        Args:
+            name: Entity name
+            edges: All of its (relation, neighbor, outgoing) edges
+            generation: ``generation`` read before the edges were fetched;
+                the row is dropped if a write happened since
+
+        """
+        if generation == self.generation:
+            self._store(name, self._build(edges))
+
+    def invalidate(self, names: Iterable[str]) -> None:
+        """
+        Drop the rows of entities whose relations changed.
+
+        Args:
+            names: Entity names (both endpoints of each changed relation)
+
+        """
+        self.generation += 1
+        for name in names:
+            entity_id = self._ids.get(name)
+            if entity_id is not None:
+                self._drop(entity_id)
+
+    def invalidate_entities(self, names: Iterable[str]) -> None:
+        """
+        Drop deleted entities and every row listing them as a neighbor.
+
+        Args:
+            names: Deleted entity names
+
+        """
+        names = list(names)
+        self.invalidate(names)
+        deleted = np.array([self._ids[name] for name in names if name in self._ids], np.int32)
+        if len(deleted) == 0:
+            return
+        stale = [
+            entity_id
+            for entity_id, row in self._rows.items()
+            if np.isin(row["neighbor"], deleted).any()
+        ]
+        for entity_id in stale:
+            self._drop(entity_id)
+
+    def clear(self) -> None:
+        """Drop everything, including the interned names."""
+        self.generation += 1
+        self._rows.clear()
+        self._edges = 0
+        self._ids.clear()
+        self._names.clear()
+        self._relation_ids.clear()
+        self._relations.clear()
+
+    async def expand(
+        self,
+        seeds: list[str],
+        max_hops: int,
+        fetch: AdjacencyFetcher,
+        limit: int | None = None,
+        relation_types: list[str] | None = None,
+    ) -> tuple[dict[str, int], list[tuple[str, str, str]]]:
+        """
+        Breadth-first expansion from seed entities.
+
+        Args:
+            seeds: Entity names to start from
+            max_hops: Maximum number of hops
+            fetch: Coroutine function fetching all edges of the given
+                entities, for the ones not cached
+            limit: Maximum number of entities, seeds included; the nearest
+                are kept
+            relation_types: Only follow relations of these types
+
+        Returns:
+            Tuple: ({name: hops from the nearest seed}, traversed edges as
+            (from, relation, to)), both in discovery order
+
+        """
+        ((depths, edges),) = await self._expand([seeds], max_hops, fetch, limit, relation_types)
+        return depths, edges
+
+    async def expand_each(
+        self,
+        seeds: list[str],
+        max_hops: int,
+        fetch: AdjacencyFetcher,
+        limit: int | None = None,
+        relation_types: list[str] | None = None,
+    ) -> list[tuple[dict[str, int], list[tuple[str, str, str]]]]:
+        """
+        Breadth-first expansion of each seed on its own.
+
+        The seeds are expanded in lockstep, so each hop still fetches the
+        uncached entities of all of them in one call.
+
+        Args:
+            seeds: Entity names to start from
+            max_hops: Maximum number of hops
+            fetch: Coroutine function fetching all edges of the given
+                entities, for the ones not cached
+            limit: Maximum number of entities per seed, the seed included
+            relation_types: Only follow relations of these types
+
+        Returns:
+            One result per seed, as returned by ``expand``
+
+        """
+        groups = [[seed] for seed in seeds]
+        return await self._expand(groups, max_hops, fetch, limit, relation_types)
+
+    async def _expand(
+        self,
+        groups: list[list[str]],
+        max_hops: int,
+        fetch: AdjacencyFetcher,
+        limit: int | None,
+        relation_types: list[str] | None,
+    ) -> list[tuple[dict[str, int], list[tuple[str, str, str]]]]:
+        """Expand groups of seeds independently, sharing one fetch per hop."""
+        if self._expanding == 0 and len(self._names) > 4 * self.max_edges:
+            # Interned names of long-evicted rows add up; start over (not
+            # while another expansion holds ids)
+            self.clear()
+
+        self._expanding += 1
+        try:
+            expansions = [self._start(seeds, limit) for seeds in groups]
+            wanted = None
+            if relation_types is not None:
+                wanted = np.array([self._intern_relation(t) for t in relation_types], np.int32)
+
+            for hop in range(1, max_hops + 1):
+                active = [
+                    expansion
+                    for expansion in expansions
+                    if expansion.frontier and (limit is None or len(expansion.depths) < limit)
+                ]
+                if not active:
+                    break
+                needed = list(dict.fromkeys(i for e in active for i in e.frontier))
+                loaded = await self._load([self._names[i] for i in needed], fetch)
+                rows = dict(zip(needed, loaded, strict=True))
+                if wanted is not None:
+                    rows = {i: row[np.isin(row["relation"], wanted)] for i, row in rows.items()}
+                for expansion in active:
+                    expansion.advance(hop, rows, limit)
+        finally:
+            self._expanding -= 1
+
+        names = self._names
+        relations = self._relations
+        return [
+            (
+                {names[i]: depth for i, depth in expansion.depths.items()},
+                [(names[a], relations[r], names[b]) for a, r, b in expansion.traversed],
+            )
+            for expansion in expansions
+        ]
+
+    def _start(self, seeds: list[str], limit: int | None) -> "_Expansion":
+        expansion = _Expansion()
+        for seed in seeds:
+            if limit is not None and len(expansion.depths) >= limit:
+                break
+            expansion.depths.setdefault(self._intern(seed), 0)
+        expansion.frontier = list(expansion.depths)
+        return expansion
+
+    async def _load(self, names: list[str], fetch: AdjacencyFetcher) -> list[np.ndarray]:
+        """Rows of entities, fetching the uncached ones in one call."""
+        rows = [self._row(self._ids.get(name)) for name in names]
+        missing = [name for name, row in zip(names, rows, strict=True) if row is None]
+        self.hits += len(names) - len(missing)
+        self.misses += len(missing)
+        if not missing:
+            return rows
+
+        generation = self.generation
+        fetched = await fetch(missing)
+        # Rows are used even when they cannot be cached (too large, or a
+        # write happened meanwhile)
+        built = {name: self._build(fetched.get(name, [])) for name in missing}
+        if generation == self.generation:
+            for name, row in built.items():
+                self._store(name, row)
+        return [built[name] if row is None else row for name, row in zip(names, rows, strict=True)]
+
+    def _store(self, name: str, row: np.ndarray) -> None:
+        if _weight(row) > self.max_edges:
+            return
+        entity_id = self._intern(name)
+        self._drop(entity_id)
+        self._rows[entity_id] = row
+        self._edges += _weight(row)
+        while self._edges > self.max_edges:
+            _, evicted = self._rows.popitem(last=False)
+            self._edges -= _weight(evicted)
+
+    def _build(self, edges: Iterable[Edge]) -> np.ndarray:
+        return np.array(
+            [
+                (self._intern(neighbor), self._intern_relation(relation), outgoing)
+                for relation, neighbor, outgoing in edges
+            ],
+            dtype=EDGE_DTYPE,
+        )
+
+    def _row(self, entity_id: int | None) -> np.ndarray | None:
+        if entity_id is None:
+            return None
+        row = self._rows.get(entity_id)
+        if row is not None:
+            self._rows.move_to_end(entity_id)
+        return row
+
+    def _drop(self, entity_id: int) -> None:
+        row = self._rows.pop(entity_id, None)
+        if row is not None:
+            self._edges -= _weight(row)
+
+    def _intern(self, name: str) -> int:
+        entity_id = self._ids.get(name)
+        if entity_id is None:
+            entity_id = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return entity_id
+
+    def _intern_relation(self, relation: str) -> int:
+        relation_id = self._relation_ids.get(relation)
+        if relation_id is None:
+            relation_id = self._relation_ids[relation] = len(self._relations)
+            self._relations.append(relation)
+        return relation_id
+
+
+@dataclass(slots=True)
+class _Expansion:
+    """State of one breadth-first search, over interned ids."""
+
+    depths: dict[int, int] = field(default_factory=dict)
+    frontier: list[int] = field(default_factory=list)
+    traversed: dict[tuple[int, int, int], None] = field(default_factory=dict)
+
+    def advance(self, hop: int, rows: dict[int, np.ndarray], limit: int | None) -> None:
+        """Visit the neighbors of the frontier."""
+        depths = self.depths
+        traversed = self.traversed
+        next_frontier = []
+        for entity_id in self.frontier:
+            for neighbor, relation, outgoing in rows[entity_id].tolist():
+                if neighbor not in depths:
+                    if limit is not None and len(depths) >= limit:
+                        continue
+                    depths[neighbor] = hop
+                    next_frontier.append(neighbor)
+                if outgoing:
+                    traversed[(entity_id, relation, neighbor)] = None
+                else:
+                    traversed[(neighbor, relation, entity_id)] = None
+        self.frontier = next_frontier
+
+
+def _weight(row: np.ndarray) -> int:
+    """Edge budget taken by a row; entities without edges still cost one."""
+    return max(1, len(row))
+
+
+@lru_cache
+def shared_neighborhood_cache(uri: str, database: str) -> NeighborhoodCache:
+    """
+    Get the neighborhood cache of a graph database, shared by all its stores.
+
+    Args:
+        uri: Neo4j server URI
+        database: Database name
+
+    Returns:
+        NeighborhoodCache: Cache bounded by setting neo4j_neighborhood_cache_edges
+
+    """
+    return NeighborhoodCache(get_settings().neo4j_neighborhood_cache_edges)
@@ -0,0 +1,231 @@
+"""
+Payload indexes for filtered vector search.
+
+An inverted index from the values of selected payload fields to the rows
+holding them. Filter expressions compile into boolean row masks: equality
+and membership are posting-set lookups, while ranges and prefixes are
+resolved by binary search over the sorted distinct values of a field.
+"""
+
+import bisect
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+from emvr.memory.filters import And, Eq, Filter, In, Not, Or, Prefix, Range, field_values
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def _sort_key(value: Any) -> tuple[int, Any]:
+    """Order values by kind (numbers, then strings), then by value."""
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, repr(value))
+
+
+class PayloadIndex:
+    """
+    Inverted index over payload fields.
+
+    Not thread-safe; the owning vector index serializes access.
+    """
+
+    def __init__(self, fields: Iterable[str]) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            fields: Dotted payload paths to index, e.g. "metadata.source"
+
+        """
+        self.fields = tuple(fields)
+        # field -> value -> rows holding it
+        self._postings: dict[str, dict[Any, set[int]]] = {f: {} for f in self.fields}
+        # row -> indexed (field, value) pairs, for removal
+        self._row_values: dict[int, list[tuple[str, Any]]] = {}
+        # Rows present in the index
+        self._present = np.zeros(1024, dtype=bool)
+        # field -> distinct values in _sort_key order, rebuilt on demand
+        self._sorted: dict[str, list[Any] | None] = dict.fromkeys(self.fields)
+        # (field, value) -> posting set as an array, dropped when the set changes
+        self._arrays: dict[tuple[str, Any], np.ndarray] = {}
+
+    def covers(self, expression: Filter) -> bool:
+        """Whether every field of an expression is indexed."""
+        if isinstance(expression, And | Or):
+            return all(self.covers(c) for c in expression.clauses)
+        if isinstance(expression, Not):
+            return self.covers(expression.clause)
+        return expression.field in self._postings
+
+    def add(self, row: int, payload: dict[str, Any]) -> None:
+        """
+        Index the payload of a row.
+
+        Args:
+            row: Row number
+            payload: Payload dict
+
+        """
+        pairs = []
+        for field in self.fields:
+            postings = self._postings[field]
+            for value in field_values(payload, field):
+                try:
+                    rows = postings.get(value)
+                except TypeError:
+                    # Unhashable (nested) values are not indexed
+                    continue
+                if rows is None:
+                    rows = postings[value] = set()
+                    self._sorted[field] = None
+                rows.add(row)
+                self._arrays.pop((field, value), None)
+                pairs.append((field, value))
+
+        self._row_values[row] = pairs
+        self._mark_present(row)
+
+    def remove(self, row: int) -> None:
+        """
+        Drop a row from the index.
+
+        Args:
+            row: Row number (unknown rows are ignored)
+
+        """
+        pairs = self._row_values.pop(row, None)
+        if pairs is None:
+            return
+        for field, value in pairs:
+            rows = self._postings[field][value]
+            rows.discard(row)
+            self._arrays.pop((field, value), None)
+            if not rows:
+                del self._postings[field][value]
+                self._sorted[field] = None
+        self._present[row] = False
+
+    def move(self, source: int, target: int) -> None:
+        """
+        Renumber a row (the target row must be free).
+
+        Args:
+            source: Current row number
+            target: New row number
+
+        """
+        pairs = self._row_values.pop(source, None)
+        if pairs is None:
+            return
+        for field, value in pairs:
+            rows = self._postings[field][value]
+            rows.discard(source)
+            rows.add(target)
+            self._arrays.pop((field, value), None)
+        self._row_values[target] = pairs
+        self._present[source] = False
+        self._mark_present(target)
+
+    def mask(self, expression: Filter, size: int) -> np.ndarray:
+        """
+        Compile an expression into a row mask.
+
+        Args:
+            expression: Filter expression over indexed fields
+            size: Number of rows in the mask
+
+        Returns:
+            Boolean array of shape (size,), True for matching rows
+
+        """
+        if isinstance(expression, And):
+            mask = self.present(size)
+            for clause in expression.clauses:
+                mask &= self.mask(clause, size)
+            return mask
+        if isinstance(expression, Or):
+            mask = np.zeros(size, dtype=bool)
+            for clause in expression.clauses:
+                mask |= self.mask(clause, size)
+            return mask
+        if isinstance(expression, Not):
+            return self.present(size) & ~self.mask(expression.clause, size)
+
+        mask = np.zeros(size, dtype=bool)
+        for rows in self._matching_rows(expression):
+            mask[rows[rows < size]] = True
+        return mask
+
+    def present(self, size: int) -> np.ndarray:
+        """Mask of the rows present in the index."""
+        mask = np.zeros(size, dtype=bool)
+        n = min(size, len(self._present))
+        mask[:n] = self._present[:n]
+        return mask
+
+    def _matching_rows(self, expression: Eq | In | Range | Prefix) -> list[np.ndarray]:
+        """Row arrays of the values matching a field condition."""
+        field = expression.field
+        postings = self._postings[field]
+        if isinstance(expression, Eq | In):
+            values = (expression.value,) if isinstance(expression, Eq) else expression.values
+            return [self._rows_array(field, value) for value in values if value in postings]
+
+        keys = self._sorted_values(field)
+        if isinstance(expression, Prefix):
+            start = bisect.bisect_left(keys, (1, expression.prefix), key=_sort_key)
+            stop = bisect.bisect_left(keys, (1, expression.prefix + "\U0010ffff"), key=_sort_key)
+            return [self._rows_array(field, value) for value in keys[start:stop]]
+
+        bounds = [
+            b
+            for b in (expression.gt, expression.gte, expression.lt, expression.lte)
+            if b is not None
+        ]
+        if not bounds:
+            return [self._rows_array(field, value) for value in keys]
+
+        # Range: only values of the bounds' kind (numbers or strings) compare
+        kind = _sort_key(bounds[0])[0]
+        start = bisect.bisect_left(keys, (kind,), key=_sort_key)
+        stop = bisect.bisect_left(keys, (kind + 1,), key=_sort_key)
+        if expression.gte is not None:
+            start = max(start, bisect.bisect_left(keys, (kind, expression.gte), key=_sort_key))
+        if expression.gt is not None:
+            start = max(start, bisect.bisect_right(keys, (kind, expression.gt), key=_sort_key))
+        if expression.lte is not None:
+            stop = min(stop, bisect.bisect_right(keys, (kind, expression.lte), key=_sort_key))
+        if expression.lt is not None:
+            stop = min(stop, bisect.bisect_left(keys, (kind, expression.lt), key=_sort_key))
+        return [self._rows_array(field, value) for value in keys[start:stop]]
+
+    def _rows_array(self, field: str, value: Any) -> np.ndarray:
+        """The posting set of a value as an array, cached until the set changes."""
+        rows = self._arrays.get((field, value))
+        if rows is None:
+            postings = self._postings[field][value]
+            rows = np.fromiter(postings, np.intp, len(postings))
+            self._arrays[(field, value)] = rows
+        return rows
+
+    def _mark_present(self, row: int) -> None:
+        """Mark a row present, growing the mask (doubling) if needed."""
+        if row >= len(self._present):
+            grown = np.zeros(max(row + 1, 2 * len(self._present)), dtype=bool)
+            grown[: len(self._present)] = self._present
+            self._present = grown
+        self._present[row] = True
+
+    def _sorted_values(self, field: str) -> list[Any]:
+        """Distinct values of a field in ``_sort_key`` order."""
+        keys = self._sorted[field]
+        if keys is None:
+            keys = self._sorted[field] = sorted(self._postings[field], key=_sort_key)
+        return keys
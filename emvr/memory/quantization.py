@@ -0,0 +1,355 @@
+"""
+Vector quantizers for the local vector index.
+
+Quantizers compress normalized float32 vectors into uint8 codes and score
+queries directly against the codes (asymmetric distance computation: the
+query stays in full precision). Scores are approximate, so the index uses
+them to shortlist candidates and rescores those with the full vectors.
+
+- ``int8``: scalar quantization, one byte per dimension (4x smaller)
+- ``pq``: product quantization, one byte per subvector (e.g. 16x smaller
+  with four dimensions per subvector)
+"""
+
+import logging
+import os
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ("none", "int8", "pq")
+
+# Rows scored per block, bounding the float32 temporaries of a scan
+_BLOCK_ROWS = 65536
+_PQ_CENTROIDS = 256
+_PQ_ITERATIONS = 20
+
+
+class ScalarQuantizer:
+    """
+    Per-dimension int8 scalar quantizer.
+
+    Each dimension is mapped linearly from its trained [min, max] range to
+    0..255; values outside the range are clipped.
+    """
+
+    kind = "int8"
+
+    def __init__(self, dimension: int) -> None:
+        """
+        Initialize an untrained quantizer.
+
+        Args:
+            dimension: Vector dimension
+
+        """
+        self.dimension = dimension
+        self.low: np.ndarray | None = None
+        self.scale: np.ndarray | None = None
+
+    @property
+    def trained(self) -> bool:
+        """Whether the quantizer has been trained."""
+        return self.low is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.dimension
+
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Fit the per-dimension ranges.
+
+        Args:
+            vectors: Training sample of shape (n, dimension)
+
+        """
+        low = vectors.min(axis=0).astype(np.float32)
+        high = vectors.max(axis=0).astype(np.float32)
+        self.low = low
+        self.scale = np.maximum(high - low, np.finfo(np.float32).eps) / 255
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Encode vectors.
+
+        Args:
+            vectors: Matrix of shape (n, dimension)
+
+        Returns:
+            uint8 codes of shape (n, code_size)
+
+        """
+        codes = np.rint((vectors - self.low) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Reconstruct approximate vectors from codes.
+
+        Args:
+            codes: uint8 codes of shape (n, code_size)
+
+        Returns:
+            float32 matrix of shape (n, dimension)
+
+        """
+        return codes.astype(np.float32) * self.scale + self.low
+
+    def scores(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Approximate dot products of full-precision queries with encoded vectors.
+
+        ``q . (low + scale * code)`` is computed as ``(q * scale) . code + q . low``,
+        so codes are never decoded into a full matrix.
+
+        Args:
+            queries: Matrix of shape (n_queries, dimension)
+            codes: uint8 codes of shape (n, code_size)
+
+        Returns:
+            float32 matrix of shape (n_queries, n)
+
+        """
+        scaled = (queries * self.scale).astype(np.float32)
+        offsets = queries @ self.low
+        result = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], _BLOCK_ROWS):
+            block = codes[start : start + _BLOCK_ROWS].astype(np.float32)
+            result[:, start : start + block.shape[0]] = scaled @ block.T
+        result += offsets[:, None]
+        return result
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Arrays to persist the trained quantizer."""
+        return {"low": self.low, "scale": self.scale}
+
+    def load_state(self, state: dict[str, np.ndarray]) -> None:
+        """Restore a trained quantizer from ``state()`` output."""
+        self.low = state["low"]
+        self.scale = state["scale"]
+
+
+class ProductQuantizer:
+    """
+    Product quantizer with 256 centroids per subvector.
+
+    The vector is split into ``subvectors`` equal slices and each slice is
+    replaced by the index of its nearest k-means centroid.
+    """
+
+    kind = "pq"
+
+    def __init__(self, dimension: int, subvectors: int | None = None, seed: int = 0) -> None:
+        """
+        Initialize an untrained quantizer.
+
+        Args:
+            dimension: Vector dimension
+            subvectors: Number of subvectors, which must divide the dimension
+                (defaults to one per four dimensions)
+            seed: Seed for k-means initialization
+
+        Raises:
+            ValueError: If the subvectors do not divide the dimension
+
+        """
+        subvectors = subvectors or max(1, dimension // 4)
+        if dimension % subvectors:
+            msg = f"{subvectors} subvectors do not divide dimension {dimension}"
+            raise ValueError(msg)
+
+        self.dimension = dimension
+        self.subvectors = subvectors
+        self.sub_dimension = dimension // subvectors
+        self.seed = seed
+        # Shape (subvectors, 256, sub_dimension)
+        self.centroids: np.ndarray | None = None
+
+    @property
+    def trained(self) -> bool:
+        """Whether the quantizer has been trained."""
+        return self.centroids is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.subvectors
+
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Run k-means on each subvector slice.
+
+        Args:
+            vectors: Training sample of shape (n, dimension)
+
+        """
+        rng = np.random.default_rng(self.seed)
+        slices = self._split(np.asarray(vectors, dtype=np.float32))
+        k = min(_PQ_CENTROIDS, slices.shape[1])
+
+        centroids = np.zeros((self.subvectors, _PQ_CENTROIDS, self.sub_dimension), np.float32)
+        for j, data in enumerate(slices):
+            centres = data[rng.choice(len(data), k, replace=False)].copy()
+            for _ in range(_PQ_ITERATIONS):
+                assignment = self._nearest(data, centres)
+                counts = np.bincount(assignment, minlength=k)
+                sums = np.stack(
+                    [np.bincount(assignment, data[:, d], k) for d in range(self.sub_dimension)],
+                    axis=1,
+                )
+                empty = counts == 0
+                centres[~empty] = sums[~empty] / counts[~empty, None]
+                # Re-seed empty clusters from random points
+                centres[empty] = data[rng.choice(len(data), int(empty.sum()))]
+            centroids[j, :k] = centres
+            centroids[j, k:] = centres[0]
+        self.centroids = centroids
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Encode vectors.
+
+        Args:
+            vectors: Matrix of shape (n, dimension)
+
+        Returns:
+            uint8 codes of shape (n, code_size)
+
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        codes = np.empty((vectors.shape[0], self.subvectors), dtype=np.uint8)
+        for start in range(0, vectors.shape[0], _BLOCK_ROWS):
+            slices = self._split(vectors[start : start + _BLOCK_ROWS])
+            for j, data in enumerate(slices):
+                codes[start : start + data.shape[0], j] = self._nearest(data, self.centroids[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Reconstruct approximate vectors from codes.
+
+        Args:
+            codes: uint8 codes of shape (n, code_size)
+
+        Returns:
+            float32 matrix of shape (n, dimension)
+
+        """
+        parts = self.centroids[np.arange(self.subvectors), codes]
+        return parts.reshape(codes.shape[0], self.dimension)
+
+    def scores(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Approximate dot products of full-precision queries with encoded vectors.
+
+        Each query is scored through a (subvectors, 256) lookup table of its
+        slice-centroid dot products, summed over the codes.
+
+        Args:
+            queries: Matrix of shape (n_queries, dimension)
+            codes: uint8 codes of shape (n, code_size)
+
+        Returns:
+            float32 matrix of shape (n_queries, n)
+
+        """
+        # (n_queries, subvectors, 256)
+        tables = np.einsum(
+            "qsd,skd->qsk",
+            queries.reshape(queries.shape[0], self.subvectors, self.sub_dimension),
+            self.centroids,
+        ).astype(np.float32)
+        # Flat offsets into one table: subvector j's centroid c is j * 256 + c
+        offsets = np.arange(self.subvectors, dtype=np.intp) * _PQ_CENTROIDS
+
+        result = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], _BLOCK_ROWS):
+            flat_codes = codes[start : start + _BLOCK_ROWS].astype(np.intp) + offsets
+            for i, table in enumerate(tables):
+                result[i, start : start + flat_codes.shape[0]] = table.ravel()[flat_codes].sum(1)
+        return result
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Arrays to persist the trained quantizer."""
+        return {"centroids": self.centroids}
+
+    def load_state(self, state: dict[str, np.ndarray]) -> None:
+        """Restore a trained quantizer from ``state()`` output."""
+        self.centroids = state["centroids"]
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        """Reshape (n, dimension) into (subvectors, n, sub_dimension)."""
+        return vectors.reshape(-1, self.subvectors, self.sub_dimension).transpose(1, 0, 2)
+
+    @staticmethod
+    def _nearest(data: np.ndarray, centres: np.ndarray) -> np.ndarray:
+        """Index of the nearest centre (squared L2) for each row."""
+        distances = (centres * centres).sum(1) - 2 * (data @ centres.T)
+        return distances.argmin(1)
+
+
+def create_quantizer(
+    mode: str,
+    dimension: int,
+    subvectors: int | None = None,
+) -> ScalarQuantizer | ProductQuantizer | None:
+    """
+    Create an untrained quantizer.
+
+    Args:
+        mode: "none", "int8" or "pq"
+        dimension: Vector dimension
+        subvectors: PQ subvectors (ignored for other modes)
+
+    Returns:
+        The quantizer, or None for "none"
+
+    Raises:
+        ValueError: If the mode is unknown
+
+    """
+    if mode == "none":
+        return None
+    if mode == "int8":
+        return ScalarQuantizer(dimension)
+    if mode == "pq":
+        return ProductQuantizer(dimension, subvectors)
+    msg = f"Unknown quantization mode: {mode}"
+    raise ValueError(msg)
+
+
+def save_quantizer(quantizer: ScalarQuantizer | ProductQuantizer, file_path: str) -> None:
+    """
+    Persist a trained quantizer atomically.
+
+    Args:
+        quantizer: Trained quantizer
+        file_path: Target ``.npz`` file
+
+    """
+    tmp_path = file_path + ".tmp.npz"
+    np.savez(tmp_path, **quantizer.state())
+    os.replace(tmp_path, file_path)
+
+
+def load_quantizer(quantizer: ScalarQuantizer | ProductQuantizer, file_path: str) -> bool:
+    """
+    Restore a quantizer saved with ``save_quantizer``.
+
+    Args:
+        quantizer: Untrained quantizer of the same mode and shape
+        file_path: ``.npz`` file
+
+    Returns:
+        bool: Whether a saved quantizer was found
+
+    """
+    if not os.path.exists(file_path):
+        return False
+    with np.load(file_path) as saved:
+        quantizer.load_state({key: saved[key] for key in saved.files})
+    return True
@@ -1,10 +1,26 @@
 """Vector store implementation using Qdrant and Mem0."""
 
+import asyncio
+import logging
 import os
+import threading
 from typing import Any, List, Dict
 
+import numpy as np
 import qdrant_client
 from dotenv import load_dotenv
+from qdrant_client.models import Batch, PointIdsList
+
+from emvr.config import get_settings
+from emvr.core.db_connections import connection_registry
+from emvr.core.embedding import embedding_manager
+from emvr.core.metrics import update_vector_count, update_vector_index_memory
+from emvr.memory.filters import Filter, matches, parse_filter, to_qdrant
+from emvr.memory.generations import write_generations
+from emvr.memory.keyword_index import BM25Index
+from emvr.memory.local_vector_index import LocalVectorIndex
+from emvr.memory.write_buffer import VectorWriteBuffer
+from emvr.retrieval.fusion import RankedList, fuse
 
 # Temporarily comment out LlamaIndex imports
 # from llama_index.core import VectorStoreIndex
@@ -13,35 +29,127 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Candidates taken from each side of a hybrid search per requested result
+_HYBRID_CANDIDATES = 4
+
 
 class QdrantMemoryStore:
-    """Vector memory store implementation using Qdrant."""
+    """
+    Vector memory store implementation using Qdrant.
+
+    With ``location="local"`` the collection is served by an embedded
+    LocalVectorIndex persisted under the data directory, so no Qdrant
+    server is needed. ``local_index="hnsw"`` backs it with an HNSW graph
+    instead of an exact scan, for collections too large to scan per query,
+    and ``quantization`` keeps only compressed codes of a flat index in RAM.
+
+    Search filters are dicts over the metadata fields (see
+    ``emvr.memory.filters``), served from payload indexes where indexed.
+    The embedded index is paired with a BM25 keyword index over the chunk
+    text, and ``hybrid_search`` fuses the dense and keyword rankings (local
+    backend only).
+
+    Upserts go through a write buffer that groups them into bulk batches;
+    ``flush`` (or ``close``) makes buffered writes durable.
+    """
 
     def __init__(
         self,
         collection_name: str = "emvr_memory",
         url: str | None = None,
         api_key: str | None = None,
+        location: str | None = None,
+        path: str | None = None,
+        local_index: str | None = None,
+        hnsw_m: int | None = None,
+        hnsw_ef_construction: int | None = None,
+        hnsw_ef_search: int | None = None,
+        quantization: str | None = None,
+        pq_subvectors: int | None = None,
+        rescore_multiplier: int | None = None,
+        write_batch_size: int | None = None,
+        write_flush_ms: float | None = None,
+        write_concurrency: int | None = None,
+        payload_indexes: list[str] | None = None,
     ) -> None:
         """
         Initialize the Qdrant memory store.
 
         Args:
             collection_name: Name of the Qdrant collection
-            url: URL of the Qdrant server (defaults to env var QDRANT_URL)
-            api_key: API key for the Qdrant server (defaults to env var QDRANT_API_KEY)
+            url: URL of the Qdrant server (defaults to setting qdrant_url)
+            api_key: API key for the Qdrant server (defaults to setting qdrant_api_key)
+            location: "local" for the embedded index or "http" for a Qdrant
+                server (defaults to setting qdrant_location)
+            path: Directory of the embedded index (defaults to
+                ``<data_dir>/vectors/<collection_name>``)
+            local_index: "flat" (exact) or "hnsw" for the embedded index
+                (defaults to setting qdrant_local_index, or "flat"); an
+                existing collection keeps the type it was created with
+            hnsw_m: HNSW links per node (defaults to setting hnsw_m)
+            hnsw_ef_construction: HNSW build candidate list size (defaults
+                to setting hnsw_ef_construction)
+            hnsw_ef_search: HNSW query candidate list size (defaults to
+                setting hnsw_ef_search)
+            quantization: "none", "int8" or "pq" for a flat embedded index
+                (defaults to setting qdrant_quantization, or "none"); an
+                existing collection keeps the mode it was created with
+            pq_subvectors: PQ code bytes per vector (defaults to setting
+                qdrant_pq_subvectors, or a quarter of the dimension)
+            rescore_multiplier: Quantized candidates rescored per result
+                (defaults to setting qdrant_rescore_multiplier, or 4 for
+                int8 and 16 for pq)
+            write_batch_size: Points per bulk write (defaults to setting
+                qdrant_write_batch_size)
+            write_flush_ms: Time buffered writes wait for more points
+                (defaults to setting qdrant_write_flush_ms)
+            write_concurrency: Bulk writes in flight at once (defaults to
+                setting qdrant_write_concurrency)
+            payload_indexes: Metadata fields to index for filtering
+                (defaults to the comma-separated setting
+                qdrant_payload_indexes)
 
         """
+        settings = get_settings()
         self.collection_name = collection_name
-        self.url = url or os.environ.get("QDRANT_URL", "http://localhost:6333")
-        self.api_key = api_key or os.environ.get("QDRANT_API_KEY")
-
-        # For development/testing, don't actually connect to Qdrant
-        # Initialize Qdrant client (commented out to avoid connection errors)
-        # self.client = qdrant_client.QdrantClient(
-        #     url=self.url,
-        #     api_key=self.api_key,
-        # )
+        self.url = url or settings.qdrant_url
+        self.api_key = api_key or settings.qdrant_api_key
+        self.location = location or settings.qdrant_location
+        self.path = path or os.path.join(settings.data_dir, "vectors", collection_name)
+        self.local_index = local_index or settings.qdrant_local_index
+        self.hnsw_m = hnsw_m or settings.hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction or settings.hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search or settings.hnsw_ef_search
+        self.quantization = quantization or settings.qdrant_quantization
+        self.pq_subvectors = pq_subvectors or settings.qdrant_pq_subvectors
+        self.rescore_multiplier = rescore_multiplier or settings.qdrant_rescore_multiplier
+
+        if payload_indexes is None:
+            fields = settings.qdrant_payload_indexes.split(",")
+            payload_indexes = [field.strip() for field in fields if field.strip()]
+        self.payload_indexes = payload_indexes
+
+        self._write_buffer = VectorWriteBuffer(
+            self._write_batch,
+            max_batch_size=write_batch_size or settings.qdrant_write_batch_size,
+            flush_interval=(
+                write_flush_ms if write_flush_ms is not None else settings.qdrant_write_flush_ms
+            )
+            / 1000,
+            max_in_flight=write_concurrency or settings.qdrant_write_concurrency,
+        )
+
+        # Embedded index, opened on first use once the vector dimension is known
+        self._local_index: LocalVectorIndex | None = None
+        # Keyword index over the chunk text, opened with the embedded index
+        self._keyword_index: BM25Index | None = None
+        self._local_index_lock = threading.Lock()
+
+        # The Qdrant client is taken from the connection registry on first
+        # remote write (see ``client``), so constructing a store never connects
 
         # Initialize LlamaIndex vector store (commented out to avoid import errors)
         # self.vector_store = QdrantVectorStore(
@@ -56,7 +164,7 @@ class QdrantMemoryStore:
         self,
         query: str,
         top_k: int = 5,
-        filters: dict[str, Any] | None = None,
+        filters: dict[str, Any] | Filter | None = None,
     ) -> list[dict[str, Any]]:
         """
         Perform similarity search against the vector store.
@@ -70,50 +178,14 @@ class QdrantMemoryStore:
             List of matching documents with scores
 
         """
-        # For testing, return mock data
-        results = []
-        for i in range(min(top_k, 3)):  # Return at most 3 mock results
-            results.append(
-                {
-                    "id": f"mock-id-{i}",
-                    "text": f"Mock document {i} matching query: {query}",
-                    "metadata": {
-                        "source": "mock-data",
-                        "relevance": 0.9 - (i * 0.1),
-                    },
-                    "score": 0.9 - (i * 0.1),
-                }
-            )
-
-        # In the real implementation:
-        # Create retriever with filtering
-        # retriever = self.index.as_retriever(
-        #     similarity_top_k=top_k,
-        #     filters=filters,
-        # )
-        #
-        # # Retrieve similar documents
-        # nodes = await retriever.aretrieve(query)
-        #
-        # # Format results
-        # results = []
-        # for node in nodes:
-        #     results.append(
-        #         {
-        #             "id": node.node_id,
-        #             "text": node.text,
-        #             "metadata": node.metadata,
-        #             "score": node.score if hasattr(node, "score") else None,
-        #         }
-        #     )
-
-        return results
+        vector = await embedding_manager.embed(query)
+        return await self.search_by_vector(vector, top_k, filters)
 
     async def hybrid_search(
         self,
         query: str,
         top_k: int = 5,
-        filters: dict[str, Any] | None = None,
+        filters: dict[str, Any] | Filter | None = None,
     ) -> list[dict[str, Any]]:
         """
         Perform hybrid (vector + keyword) search against the vector store.
@@ -124,50 +196,397 @@ class QdrantMemoryStore:
             filters: Optional filters to apply to the search
 
         Returns:
-            List of matching documents with scores
+            List of matching documents with fused scores, best first
+
+        Raises:
+            NotImplementedError: For a Qdrant server, which has no keyword index
+
+        """
+        self._require_local("Hybrid search")
+        expression = parse_filter(filters, prefix="metadata.")
+        if self._local_index is None and not self._has_local_index():
+            return []
+
+        vector = await embedding_manager.embed(query)
+        index = await asyncio.to_thread(self._get_local_index, len(vector))
+        fetch = top_k * _HYBRID_CANDIDATES
+        dense, keyword = await asyncio.gather(
+            asyncio.to_thread(self._search_local, index, vector, fetch, expression),
+            asyncio.to_thread(self._search_keywords, index, query, fetch, expression),
+        )
+        return self._fuse({"dense": dense, "keyword": keyword}, top_k)
+
+    async def keyword_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: dict[str, Any] | Filter | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Perform BM25 keyword search over the chunk text.
+
+        Args:
+            query: The query text
+            top_k: Number of results to return
+            filters: Optional metadata filter dict or expression
+
+        Returns:
+            List of matching documents with BM25 scores, best first
+
+        Raises:
+            NotImplementedError: For a Qdrant server, which has no keyword index
+
+        """
+        self._require_local("Keyword search")
+        if self._local_index is None and not self._has_local_index():
+            return []
+
+        expression = parse_filter(filters, prefix="metadata.")
+        index = await asyncio.to_thread(self._get_local_index)
+        return await asyncio.to_thread(self._search_keywords, index, query, top_k, expression)
+
+    async def delete(self, ids: list[str]) -> dict[str, Any]:
+        """
+        Delete vectors from the store by ID.
+
+        Args:
+            ids: IDs of the vectors to delete
+
+        Returns:
+            Dictionary with operation result
+
+        """
+        # A buffered write landing after the delete would resurrect the point
+        await self._write_buffer.drain()
+
+        if self.is_local:
+            if not ids or (self._local_index is None and not self._has_local_index()):
+                return {"deleted": 0}
+            index = await asyncio.to_thread(self._get_local_index)
+            try:
+                deleted = await asyncio.to_thread(index.delete, ids)
+                await asyncio.to_thread(self._keyword_index.delete, ids)
+            finally:
+                write_generations.bump("vector")
+            self._report_metrics(index)
+            return {"deleted": deleted}
+
+        if not ids:
+            return {"deleted": 0}
+        try:
+            await self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=ids),
+                wait=True,
+            )
+        finally:
+            write_generations.bump("vector")
+        return {"deleted": len(ids)}
+
+    @property
+    def is_local(self) -> bool:
+        """Whether the store is served by the embedded index."""
+        return self.location == "local"
+
+    @property
+    def client(self) -> Any:
+        """Shared async client of the Qdrant server (not used by the embedded index)."""
+        return connection_registry.qdrant_client(self.url, self.api_key)
+
+    async def upsert_many(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        payloads: list[dict[str, Any]],
+        wait: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Insert or replace vectors with their payloads.
+
+        Writes are buffered and grouped with concurrent upserts into bulk
+        batches.
+
+        Args:
+            ids: Point IDs
+            vectors: Matrix of shape (len(ids), dimension)
+            payloads: Payload per point, e.g. {"text": ..., "metadata": ...}
+            wait: Return once the points are written (the default); with
+                False, return once they are buffered and rely on ``flush``
+
+        Returns:
+            Dictionary with operation result
+
+        """
+        if not ids:
+            return {"upserted": 0}
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids) or len(payloads) != len(ids):
+            msg = f"Got {len(ids)} ids, {vectors.shape} vectors and {len(payloads)} payloads"
+            raise ValueError(msg)
+
+        await self._write_buffer.write(ids, vectors, payloads, wait=wait)
+        return {"upserted": len(ids)} if wait else {"buffered": len(ids)}
+
+    async def flush(self) -> None:
+        """
+        Write all buffered upserts.
+
+        Raises:
+            Exception: The first failure of a buffered write nobody waited for
+
+        """
+        await self._write_buffer.flush()
+
+    async def search_by_vector(
+        self,
+        vector: np.ndarray,
+        top_k: int = 5,
+        filters: dict[str, Any] | Filter | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Find the documents most similar to an embedding vector.
+
+        Args:
+            vector: Query embedding
+            top_k: Number of results to return
+            filters: Optional metadata filter dict or expression
+
+        Returns:
+            List of matching documents with cosine-similarity scores, best first
+
+        Raises:
+            ValueError: If the filter is malformed, or uses ``$prefix`` on a
+                Qdrant server
+
+        """
+        expression = parse_filter(filters, prefix="metadata.")
+
+        if not self.is_local:
+            response = await self.client.query_points(
+                collection_name=self.collection_name,
+                query=np.asarray(vector, dtype=np.float32).tolist(),
+                query_filter=to_qdrant(expression),
+                limit=top_k,
+                with_payload=True,
+            )
+            return [
+                {
+                    "id": str(point.id),
+                    "text": (point.payload or {}).get("text", ""),
+                    "metadata": (point.payload or {}).get("metadata", {}),
+                    "score": point.score,
+                }
+                for point in response.points
+            ]
+
+        if self._local_index is None and not self._has_local_index():
+            return []
+
+        index = await asyncio.to_thread(self._get_local_index, len(vector))
+        return await asyncio.to_thread(self._search_local, index, vector, top_k, expression)
+
+    async def close(self) -> None:
+        """Flush buffered writes, then flush and close the embedded index, if open."""
+        try:
+            await self._write_buffer.flush()
+        finally:
+            await asyncio.to_thread(self._close_local_index)
+
+    def _close_local_index(self) -> None:
+        """Flush and close the embedded and keyword indexes, if open."""
+        with self._local_index_lock:
+            if self._local_index is not None:
+                self._local_index.close()
+                self._local_index = None
+            if self._keyword_index is not None:
+                self._keyword_index.close()
+                self._keyword_index = None
+
+    async def _write_batch(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        payloads: list[dict[str, Any]],
+    ) -> None:
+        """
+        Write one bulk batch to the backend.
+
+        Args:
+            ids: Point IDs
+            vectors: Matrix of shape (len(ids), dimension)
+            payloads: Payload per point
 
         """
-        # For testing, return mock data (slightly different from similarity search)
+        if self.is_local:
+            index = await asyncio.to_thread(self._get_local_index, vectors.shape[1])
+            texts = [payload.get("text", "") for payload in payloads]
+            try:
+                await asyncio.gather(
+                    asyncio.to_thread(index.upsert, ids, vectors, payloads),
+                    asyncio.to_thread(self._keyword_index.upsert, ids, texts),
+                )
+            finally:
+                # Bumped once the batch is searchable, not when it is buffered
+                write_generations.bump("vector")
+            self._report_metrics(index)
+            return
+
+        try:
+            await self.client.upsert(
+                collection_name=self.collection_name,
+                points=Batch(ids=ids, vectors=vectors.tolist(), payloads=payloads),
+                wait=True,
+            )
+        finally:
+            write_generations.bump("vector")
+
+    def _search_local(
+        self,
+        index: LocalVectorIndex,
+        vector: np.ndarray,
+        top_k: int,
+        expression: Filter | None,
+    ) -> list[dict[str, Any]]:
+        """Search the embedded index, filtering on metadata inside the index."""
+        hits = index.search(vector, top_k, filter=expression)
+        payloads = index.get_payloads([point_id for point_id, _ in hits])
+
         results = []
-        for i in range(min(top_k, 3)):  # Return at most 3 mock results
+        for point_id, score in hits:
+            payload = payloads.get(point_id, {})
             results.append(
                 {
-                    "id": f"hybrid-mock-id-{i}",
-                    "text": f"Hybrid search result {i} for query: {query}",
-                    "metadata": {
-                        "source": "hybrid-mock-data",
-                        "relevance": 0.95 - (i * 0.1),  # Higher scores for hybrid search
-                    },
-                    "score": 0.95 - (i * 0.1),
+                    "id": point_id,
+                    "text": payload.get("text", ""),
+                    "metadata": payload.get("metadata", {}),
+                    "score": score,
                 }
             )
-            
-        # In the real implementation:
-        # # Use LlamaIndex's hybrid retriever
-        # from llama_index.core import QueryBundle
-        #
-        # vector_retriever = self.index.as_retriever(
-        #     similarity_top_k=top_k * 2,  # Get more candidates for reranking
-        #     filters=filters,
-        # )
-        #
-        # # Create query bundle
-        # query_bundle = QueryBundle(query)
-        #
-        # # Retrieve with vector search
-        # nodes = await vector_retriever.aretrieve(query_bundle)
-        #
-        # # Simple reranking - in a real implementation, you'd use a more sophisticated
-        # # reranking method, potentially with BM25 or a learned reranker
-        # results = []
-        # for node in nodes[:top_k]:
-        #     results.append(
-        #         {
-        #             "id": node.node_id,
-        #             "text": node.text,
-        #             "metadata": node.metadata,
-        #             "score": node.score if hasattr(node, "score") else None,
-        #         }
-        #     )
-
         return results
+
+    def _search_keywords(
+        self,
+        index: LocalVectorIndex,
+        query: str,
+        top_k: int,
+        expression: Filter | None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search the keyword index, post-filtering on metadata.
+
+        With a filter, the candidate pool is widened until enough hits pass
+        or every matching document has been ranked.
+        """
+        fetch = top_k * 4 if expression is not None else top_k
+        while True:
+            hits = self._keyword_index.search(query, fetch)
+            payloads = index.get_payloads([point_id for point_id, _ in hits])
+
+            results = []
+            for point_id, score in hits:
+                payload = payloads.get(point_id)
+                if payload is None or not matches(expression, payload):
+                    continue
+                results.append(
+                    {
+                        "id": point_id,
+                        "text": payload.get("text", ""),
+                        "metadata": payload.get("metadata", {}),
+                        "score": score,
+                    }
+                )
+
+            if len(results) >= top_k or len(hits) < fetch:
+                return results[:top_k]
+            fetch *= 4
+
+    @staticmethod
+    def _fuse(rankings: dict[str, list[dict[str, Any]]], top_k: int) -> list[dict[str, Any]]:
+        """Merge rankings by reciprocal rank fusion, keeping each side's score."""
+        fused = fuse(
+            [
+                RankedList.from_pairs(source, ((r["id"], r["score"]) for r in results))
+                for source, results in rankings.items()
+            ],
+            "rrf",
+            top_k=top_k,
+        )
+
+        by_id: dict[str, dict[str, Any]] = {}
+        for source, results in rankings.items():
+            for result in results:
+                entry = by_id.setdefault(result["id"], {**result, "scores": {}})
+                entry["scores"][source] = result["score"]
+        return [{**by_id[point_id], "score": score} for point_id, score in fused]
+
+    def _require_local(self, operation: str) -> None:
+        """Raise if the store is not served by the embedded index."""
+        if not self.is_local:
+            msg = f"{operation} is only supported by the local backend (qdrant_location=local)"
+            logger.error(msg)
+            raise NotImplementedError(msg)
+
+    def _report_metrics(self, index: LocalVectorIndex) -> None:
+        """Publish the size and memory footprint of the embedded index."""
+        count = len(index)
+        update_vector_count(self.collection_name, count)
+        update_vector_index_memory(
+            self.collection_name, index.quantization, index.bytes_per_vector, count
+        )
+
+    def _has_local_index(self) -> bool:
+        """Whether an embedded index has been persisted for this collection."""
+        return os.path.isdir(self.path)
+
+    def _get_local_index(self, dimension: int | None = None) -> LocalVectorIndex:
+        """
+        Open the embedded index on first use.
+
+        Args:
+            dimension: Vector dimension (read from the persisted index if None)
+
+        Returns:
+            LocalVectorIndex: The collection's index
+
+        """
+        with self._local_index_lock:
+            if self._local_index is None:
+                self._local_index = LocalVectorIndex(
+                    dimension,
+                    self.path,
+                    index_type=self.local_index,
+                    hnsw_m=self.hnsw_m,
+                    hnsw_ef_construction=self.hnsw_ef_construction,
+                    hnsw_ef_search=self.hnsw_ef_search,
+                    quantization=self.quantization,
+                    pq_subvectors=self.pq_subvectors,
+                    rescore_multiplier=self.rescore_multiplier,
+                    indexed_fields=[f"metadata.{field}" for field in self.payload_indexes],
+                )
+                logger.info(
+                    f"Opened {self._local_index.index_type} vector index {self.path} "
+                    f"({len(self._local_index)} vectors, "
+                    f"quantization={self._local_index.quantization})"
+                )
+                self._keyword_index = self._open_keyword_index(self._local_index)
+                self._report_metrics(self._local_index)
+            return self._local_index
+
+    def _open_keyword_index(self, index: LocalVectorIndex) -> BM25Index:
+        """
+        Open the keyword index of the collection, rebuilding it from the
+        stored chunk text if it is missing or out of step with the vectors
+        (e.g. after a crash between flushes).
+        """
+        keyword_index = BM25Index(os.path.join(self.path, "keywords"))
+        if len(keyword_index) != len(index):
+            logger.info(f"Rebuilding keyword index of {self.path} from {len(index)} payloads")
+            keyword_index.clear()
+            for batch in index.scan_payloads():
+                keyword_index.upsert(
+                    [point_id for point_id, _ in batch],
+                    [payload.get("text", "") for _, payload in batch],
+                )
+            keyword_index.flush()
+        return keyword_index
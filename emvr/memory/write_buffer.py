@@ -0,0 +1,207 @@
+"""Write buffering for bulk vector upserts."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+WriteBatch = Callable[[list[str], np.ndarray, list[dict[str, Any]]], Awaitable[None]]
+
+
+class VectorWriteBuffer:
+    """
+    Buffers vector upserts and writes them as bulk batches.
+
+    Writes are collected until ``max_batch_size`` rows are queued or
+    ``flush_interval`` seconds have passed, then split into batches of at
+    most ``max_batch_size`` rows that are written concurrently, with at most
+    ``max_in_flight`` batches outstanding. A batch that rewrites an ID still
+    being written waits for that earlier write, so the last upsert of an ID
+    always wins.
+    """
+
+    def __init__(
+        self,
+        write_batch: WriteBatch,
+        max_batch_size: int = 1024,
+        flush_interval: float = 0.05,
+        max_in_flight: int = 4,
+    ) -> None:
+        """
+        Initialize the buffer.
+
+        Args:
+            write_batch: Coroutine function writing (ids, vectors, payloads)
+            max_batch_size: Rows per batch; reaching it flushes immediately
+            flush_interval: Time to wait for more writes before flushing
+            max_in_flight: Maximum number of batches written concurrently
+
+        """
+        self._write_batch = write_batch
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+
+        self._ids: list[str] = []
+        self._vectors: list[np.ndarray] = []
+        self._payloads: list[dict[str, Any]] = []
+        self._future: asyncio.Future[None] | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        # id -> future of the flush currently writing it
+        self._in_flight: dict[str, asyncio.Future[None]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        # Flushes with a caller waiting on them, which then sees any failure
+        self._awaited: set[asyncio.Future[None]] = set()
+        self._error: Exception | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of rows buffered but not yet dispatched."""
+        return len(self._ids)
+
+    async def write(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        payloads: list[dict[str, Any]],
+        wait: bool = True,
+    ) -> None:
+        """
+        Buffer rows for writing.
+
+        Args:
+            ids: Point IDs
+            vectors: Matrix of shape (len(ids), dimension)
+            payloads: Payload per point
+            wait: Wait until the rows are written (and raise if that fails);
+                otherwise return once they are buffered
+
+        """
+        if not ids:
+            return
+
+        loop = asyncio.get_running_loop()
+        if self._future is None:
+            self._future = loop.create_future()
+        future = self._future
+
+        self._ids.extend(ids)
+        self._vectors.append(np.asarray(vectors, dtype=np.float32))
+        self._payloads.extend(payloads)
+
+        if len(self._ids) >= self._max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._flush_interval, self._dispatch)
+
+        if wait:
+            self._awaited.add(future)
+            # Shield so one cancelled caller does not cancel the shared flush
+            await asyncio.shield(future)
+
+    async def drain(self) -> None:
+        """Dispatch anything still buffered and wait for in-flight batches."""
+        self._dispatch()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def flush(self) -> None:
+        """
+        Write everything buffered and wait for all in-flight batches.
+
+        Raises:
+            Exception: The first failure of a write nobody waited for
+
+        """
+        await self.drain()
+
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _dispatch(self) -> None:
+        """Start writing the buffered rows."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._ids:
+            return
+
+        ids, self._ids = self._ids, []
+        vectors = np.concatenate(self._vectors) if len(self._vectors) > 1 else self._vectors[0]
+        self._vectors = []
+        payloads, self._payloads = self._payloads, []
+        future, self._future = self._future, None
+
+        # Wait for earlier flushes still writing any of these IDs
+        previous = {id(f): f for point_id in ids if (f := self._in_flight.get(point_id))}
+        for point_id in ids:
+            self._in_flight[point_id] = future
+
+        task = asyncio.get_running_loop().create_task(
+            self._run_flush(ids, vectors, payloads, future, list(previous.values()))
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_flush(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        payloads: list[dict[str, Any]],
+        future: asyncio.Future[None],
+        previous: list[asyncio.Future[None]],
+    ) -> None:
+        """Write one flush as concurrent batches and resolve its waiters."""
+        if previous:
+            await asyncio.gather(*previous, return_exceptions=True)
+
+        # Keep only the last write of an ID within the flush
+        last = {point_id: i for i, point_id in enumerate(ids)}
+        if len(last) < len(ids):
+            rows = sorted(last.values())
+            ids = [ids[i] for i in rows]
+            vectors = vectors[rows]
+            payloads = [payloads[i] for i in rows]
+
+        try:
+            await asyncio.gather(
+                *(
+                    self._write_bounded(
+                        ids[start : start + self._max_batch_size],
+                        vectors[start : start + self._max_batch_size],
+                        payloads[start : start + self._max_batch_size],
+                    )
+                    for start in range(0, len(ids), self._max_batch_size)
+                )
+            )
+        except Exception as e:
+            logger.exception(f"Buffered write of {len(ids)} vectors failed: {e}")
+            if future not in self._awaited and self._error is None:
+                self._error = e
+            future.set_exception(e)
+            # Retrieved here so unawaited flushes do not warn; waiters still see it
+            future.exception()
+        else:
+            future.set_result(None)
+        finally:
+            self._awaited.discard(future)
+            for point_id in ids:
+                if self._in_flight.get(point_id) is future:
+                    del self._in_flight[point_id]
+
+    async def _write_bounded(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        payloads: list[dict[str, Any]],
+    ) -> None:
+        """Write one batch once an in-flight slot is free."""
+        async with self._semaphore:
+            await self._write_batch(ids, vectors, payloads)
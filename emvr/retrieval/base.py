@@ -1,10 +1,16 @@
 """Base classes for retrieval."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any
 
 from pydantic import BaseModel
 
+# Sources whose errors were swallowed during the current request (see track_failures)
+_failures: ContextVar[list[str] | None] = ContextVar("retrieval_failures", default=None)
+
 
 class RetrievalResult(BaseModel):
     """Result of a retrieval operation."""
@@ -37,3 +43,36 @@ class BaseRetriever(ABC):
             List of retrieval results
 
         """
+
+
+def record_failure(source: str) -> None:
+    """
+    Note that a retriever swallowed an error and returned incomplete results.
+
+    Args:
+        source: Name of the failed source (e.g. "graph")
+
+    """
+    failures = _failures.get()
+    if failures is not None:
+        failures.append(source)
+
+
+@contextmanager
+def track_failures() -> Iterator[list[str]]:
+    """
+    Collect the failures recorded by retrievers within the block.
+
+    Retrievers called from tasks started in the block (e.g. via
+    ``asyncio.gather``) report into the same list.
+
+    Yields:
+        List of failed source names, filled in as failures are recorded
+
+    """
+    failures: list[str] = []
+    token = _failures.set(failures)
+    try:
+        yield failures
+    finally:
+        _failures.reset(token)
@@ -0,0 +1,165 @@
+"""
+Rank fusion strategies for combining retrieval sources.
+
+Each source contributes a ``RankedList``: its result IDs, best first, with
+their raw scores as an array. Raw scores from different sources are not
+comparable (cosine similarities, BM25 scores, graph heuristics), so every
+strategy either ignores them or calibrates them per list before summing:
+
+- ``rrf``: reciprocal rank fusion, ``sum(w / (k + rank))``; scores ignored
+- ``minmax``: weighted CombSUM of scores min-max scaled to [0, 1]
+- ``zscore``: weighted CombSUM of standardized scores
+- ``dbsf``: distribution-based score fusion, scores scaled to [0, 1] over
+  mean +/- 3 standard deviations of their list, then summed
+"""
+
+import math
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+FUSION_STRATEGIES = ("rrf", "minmax", "zscore", "dbsf")
+
+
+@dataclass(frozen=True, slots=True)
+class RankedList:
+    """One source's ranking: IDs best first, with their raw scores."""
+
+    source: str
+    ids: Sequence[str]
+    # float64 scores parallel to ``ids``; NaN where a result has no score
+    scores: np.ndarray
+    weight: float = 1.0
+
+    @classmethod
+    def from_pairs(
+        cls,
+        source: str,
+        pairs: Iterable[tuple[str, float | None]],
+        weight: float = 1.0,
+    ) -> "RankedList":
+        """
+        Build a ranked list from (ID, score) pairs, best first.
+
+        Args:
+            source: Source name
+            pairs: (ID, score or None) pairs in rank order
+            weight: Weight of the source in the fusion
+
+        Returns:
+            RankedList: The ranking
+
+        """
+        ids: list[str] = []
+        scores: list[float] = []
+        for doc_id, score in pairs:
+            ids.append(doc_id)
+            scores.append(math.nan if score is None else score)
+        return cls(source, ids, np.array(scores, dtype=np.float64), weight)
+
+
+def normalize_scores(scores: np.ndarray, strategy: str) -> np.ndarray:
+    """
+    Calibrate one list's raw scores for a score-based strategy.
+
+    Missing (NaN) scores are ignored by the statistics and normalize to the
+    list's lowest value.
+
+    Args:
+        scores: Raw scores of one list
+        strategy: "minmax", "zscore" or "dbsf"
+
+    Returns:
+        float64 array of normalized scores
+
+    Raises:
+        ValueError: If the strategy is not score-based
+
+    """
+    known = scores[~np.isnan(scores)]
+    if len(known) == 0:
+        return np.zeros(len(scores))
+
+    if strategy == "minmax":
+        low, high = known.min(), known.max()
+        normalized = (scores - low) / (high - low) if high > low else np.ones(len(scores))
+    elif strategy == "zscore":
+        std = known.std()
+        normalized = (scores - known.mean()) / std if std > 0 else np.zeros(len(scores))
+        # Shift so that missing scores (and the weakest hit) contribute nothing
+        normalized = normalized - np.nanmin(normalized)
+    elif strategy == "dbsf":
+        mean, std = known.mean(), known.std()
+        if std > 0:
+            normalized = np.clip((scores - (mean - 3 * std)) / (6 * std), 0.0, 1.0)
+        else:
+            normalized = np.ones(len(scores))
+    else:
+        msg = f"Not a score-based fusion strategy: {strategy}"
+        raise ValueError(msg)
+
+    return np.where(np.isnan(scores), 0.0, normalized)
+
+
+def fuse(
+    rankings: Sequence[RankedList],
+    strategy: str = "rrf",
+    top_k: int | None = None,
+    rrf_k: int = 60,
+    depth: int | None = None,
+) -> list[tuple[str, float]]:
+    """
+    Fuse several rankings into one.
+
+    Args:
+        rankings: One ranked list per source
+        strategy: One of ``FUSION_STRATEGIES``
+        top_k: Number of fused results to return (None for all); only the
+            top k are sorted
+        rrf_k: RRF rank offset; larger values flatten the rank discount
+        depth: Only fuse the first ``depth`` results of each list
+
+    Returns:
+        List of (ID, fused score), best first
+
+    Raises:
+        ValueError: If the strategy is unknown
+
+    """
+    if strategy not in FUSION_STRATEGIES:
+        msg = f"Unknown fusion strategy: {strategy}"
+        raise ValueError(msg)
+
+    positions: dict[str, int] = {}
+    columns = []
+    contributions = []
+    for ranking in rankings:
+        ids = ranking.ids[:depth] if depth is not None else ranking.ids
+        if not len(ids) or ranking.weight == 0:
+            continue
+        columns.append(
+            np.fromiter((positions.setdefault(i, len(positions)) for i in ids), np.intp, len(ids))
+        )
+        if strategy == "rrf":
+            contribution = 1.0 / (rrf_k + np.arange(1, len(ids) + 1))
+        else:
+            contribution = normalize_scores(ranking.scores[: len(ids)], strategy)
+        contributions.append(ranking.weight * contribution)
+
+    if not positions:
+        return []
+
+    totals = np.zeros(len(positions))
+    for column, contribution in zip(columns, contributions, strict=True):
+        # add.at: a source may list the same ID twice
+        np.add.at(totals, column, contribution)
+
+    k = len(totals) if top_k is None else min(top_k, len(totals))
+    if k <= 0:
+        return []
+    top = np.argpartition(-totals, k - 1)[:k] if k < len(totals) else np.arange(len(totals))
+    top = top[np.argsort(-totals[top], kind="stable")]
+
+    ids = list(positions)
+    return [(ids[i], float(totals[i])) for i in top]
@@ -6,7 +6,8 @@ from typing import Any
 
 from emvr.memory.graph_store import Neo4jMemoryStore
 from emvr.memory.vector_store import QdrantMemoryStore
-from emvr.retrieval.base import BaseRetriever, RetrievalResult
+from emvr.retrieval.base import BaseRetriever, RetrievalResult, record_failure
+from emvr.retrieval.fusion import FUSION_STRATEGIES, RankedList, fuse
 from emvr.retrieval.hybrid_retriever import HybridRetriever
 from emvr.retrieval.knowledge_graph_retriever import (
     KnowledgeGraphRetriever as KGRetriever,
@@ -28,6 +29,8 @@ class FusionRetriever(BaseRetriever):
         web_weight: float = 0.2,
         top_k_multiplier: int = 3,
         reranking: bool = True,
+        fusion: str = "rrf",
+        rrf_k: int = 60,
     ) -> None:
         """
         Initialize the fusion retriever.
@@ -40,17 +43,24 @@ class FusionRetriever(BaseRetriever):
             web_weight: Weight for web search results (0.0-1.0)
             top_k_multiplier: Multiplier for initial retrieval (for reranking)
             reranking: Whether to apply reranking to combined results
+            fusion: Fusion strategy, one of ``FUSION_STRATEGIES`` ("rrf",
+                "minmax", "zscore" or "dbsf")
+            rrf_k: Rank offset for reciprocal rank fusion
+
+        Raises:
+            ValueError: If the fusion strategy is unknown
 
         """
+        if fusion not in FUSION_STRATEGIES:
+            msg = f"Unknown fusion strategy: {fusion}"
+            raise ValueError(msg)
+
         # Initialize stores
         self.vector_store = vector_store or QdrantMemoryStore()
         self.graph_store = graph_store or Neo4jMemoryStore()
 
         # Initialize retrievers
-        self.vector_retriever = HybridRetriever(
-            vector_store=self.vector_store,
-            use_reranking=False,  # We'll do our own reranking
-        )
+        self.vector_retriever = HybridRetriever(vector_store=self.vector_store)
 
         self.graph_retriever = KGRetriever(
             graph_store=self.graph_store,
@@ -65,7 +75,9 @@ class FusionRetriever(BaseRetriever):
         self.graph_weight = graph_weight
         self.web_weight = web_weight
 
-        # Reranking settings
+        # Fusion and reranking settings
+        self.fusion = fusion
+        self.rrf_k = rrf_k
         self.top_k_multiplier = top_k_multiplier
         self.reranking = reranking
 
@@ -156,6 +168,7 @@ class FusionRetriever(BaseRetriever):
 
         except Exception as e:
             logger.exception(f"Error in fusion retrieval: {e!s}")
+            record_failure("fusion")
             return []
 
     def _combine_results(
@@ -165,7 +178,7 @@ class FusionRetriever(BaseRetriever):
         top_k: int,
     ) -> list[RetrievalResult]:
         """
-        Combine results from multiple sources with weights.
+        Fuse the rankings of several sources.
 
         Args:
             query: Original query string
@@ -176,96 +189,55 @@ class FusionRetriever(BaseRetriever):
             Combined and reranked list of retrieval results
 
         """
-        # Create a dictionary to track results by ID (to avoid duplicates)
-        combined_dict = {}
-
-        # Process vector results
-        if "vector" in source_results:
-            for result in source_results["vector"]:
-                result_id = result.id
-
-                if result_id not in combined_dict:
-                    # Copy the result and adjust score
-                    combined_dict[result_id] = RetrievalResult(
-                        id=result.id,
-                        text=result.text,
-                        score=(result.score or 0.5) * self.vector_weight,
-                        metadata={
-                            **result.metadata,
-                            "sources": ["vector"],
-                        },
-                    )
-                else:
-                    # Update existing result
-                    existing = combined_dict[result_id]
-                    existing.score += (result.score or 0.5) * self.vector_weight
-                    existing.metadata["sources"].append("vector")
-
-        # Process graph results
-        if "graph" in source_results:
-            for result in source_results["graph"]:
-                result_id = result.id
-
-                if result_id not in combined_dict:
-                    # Copy the result and adjust score
-                    combined_dict[result_id] = RetrievalResult(
-                        id=result.id,
-                        text=result.text,
-                        score=(result.score or 0.5) * self.graph_weight,
-                        metadata={
-                            **result.metadata,
-                            "sources": ["graph"],
-                        },
-                    )
-                else:
-                    # Update existing result
-                    existing = combined_dict[result_id]
-                    existing.score += (result.score or 0.5) * self.graph_weight
-
-                    if "graph" not in existing.metadata["sources"]:
-                        existing.metadata["sources"].append("graph")
-
-                    # Enhance text with graph information if not already included
-                    if "source_entity" in result.metadata and "relation" in result.metadata:
-                        source = result.metadata["source_entity"]
-                        relation = result.metadata["relation"]
-                        target = result.metadata["target_entity"]
-
-                        graph_info = f"\nRelated: {source} --{relation}--> {target}"
-
-                        if graph_info not in existing.text:
-                            existing.text += graph_info
-
-        # Process web results
-        if "web" in source_results:
-            for result in source_results["web"]:
-                result_id = result.id
-
-                if result_id not in combined_dict:
-                    # Copy the result and adjust score
-                    combined_dict[result_id] = RetrievalResult(
-                        id=result.id,
-                        text=result.text,
-                        score=(result.score or 0.5) * self.web_weight,
-                        metadata={
-                            **result.metadata,
-                            "sources": ["web"],
-                        },
+        weights = {"vector": self.vector_weight, "graph": self.graph_weight, "web": self.web_weight}
+        rankings = [
+            RankedList.from_pairs(
+                source,
+                ((result.id, result.score) for result in results),
+                weights.get(source, 1.0),
+            )
+            for source, results in source_results.items()
+        ]
+        # Rerank a wider pool than is returned, like the initial retrieval
+        pool = top_k * self.top_k_multiplier if self.reranking else top_k
+        fused = fuse(rankings, self.fusion, top_k=pool, rrf_k=self.rrf_k)
+
+        # First occurrence of each fused ID, and the sources that returned it
+        wanted = {result_id for result_id, _ in fused}
+        first: dict[str, RetrievalResult] = {}
+        sources: dict[str, list[str]] = {}
+        relations: dict[str, list[str]] = {}
+        for source, results in source_results.items():
+            for result in results:
+                if result.id not in wanted:
+                    continue
+                first.setdefault(result.id, result)
+                if source not in sources.setdefault(result.id, []):
+                    sources[result.id].append(source)
+                if "relation" in result.metadata:
+                    relation = (
+                        f"{result.metadata.get('source_entity')} "
+                        f"--{result.metadata['relation']}--> "
+                        f"{result.metadata.get('target_entity')}"
                     )
-                else:
-                    # Update existing result
-                    existing = combined_dict[result_id]
-                    existing.score += (result.score or 0.5) * self.web_weight
-
-                    if "web" not in existing.metadata["sources"]:
-                        existing.metadata["sources"].append("web")
-
-        # Convert to list and sort by score
-        combined_list = list(combined_dict.values())
-        combined_list.sort(key=lambda x: x.score if x.score is not None else 0, reverse=True)
+                    if relation not in relations.setdefault(result.id, []):
+                        relations[result.id].append(relation)
+
+        combined_list = []
+        for result_id, score in fused:
+            metadata = {**first[result_id].metadata, "sources": sources[result_id]}
+            if result_id in relations:
+                metadata["relations"] = relations[result_id]
+            combined_list.append(
+                first[result_id].model_copy(update={"score": score, "metadata": metadata})
+            )
 
         # Apply reranking if enabled
-        if self.reranking:
+        if self.reranking and combined_list:
+            # Rescale fused scores to [0, 1] so the reranker's bonuses stay in proportion
+            top_score = combined_list[0].score or 1.0
+            for result in combined_list:
+                result.score = result.score / top_score
             combined_list = self._rerank_results(query, combined_list)
 
         # Return top-k results
@@ -8,7 +8,7 @@ from llama_index.core.graph_stores import Neo4jGraphStore
 from llama_index.core.query_engine import KnowledgeGraphQueryEngine
 
 from emvr.memory.graph_store import Neo4jMemoryStore
-from emvr.retrieval.base import BaseRetriever, RetrievalResult
+from emvr.retrieval.base import BaseRetriever, RetrievalResult, record_failure
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -33,13 +33,10 @@ class KnowledgeGraphRetriever(BaseRetriever):
         # Initialize graph store
         self.graph_store = graph_store or Neo4jMemoryStore()
 
-        # LlamaIndex graph store for query engine
-        self.llama_graph_store = Neo4jGraphStore(
-            username=self.graph_store.username,
-            password=self.graph_store.password,
-            url=self.graph_store.uri,
-            database=self.graph_store.database,
-        )
+        # LlamaIndex graph store for the query engine. It opens its own
+        # connection pool, so it is only created if the query engine is used;
+        # retrieval runs on the graph store's shared driver.
+        self._llama_graph_store = None
 
         # Configurable parameters
         self.include_text = include_text
@@ -47,6 +44,18 @@ class KnowledgeGraphRetriever(BaseRetriever):
         # Initialize query engine
         self._query_engine = None
 
+    @property
+    def llama_graph_store(self) -> Neo4jGraphStore:
+        """Get the LlamaIndex graph store, lazy-loading if needed."""
+        if self._llama_graph_store is None:
+            self._llama_graph_store = Neo4jGraphStore(
+                username=self.graph_store.username,
+                password=self.graph_store.password,
+                url=self.graph_store.uri,
+                database=self.graph_store.database,
+            )
+        return self._llama_graph_store
+
     @property
     def query_engine(self):
         """Get the knowledge graph query engine, lazy-loading if needed."""
@@ -107,14 +116,14 @@ class KnowledgeGraphRetriever(BaseRetriever):
                 cypher_query = f"""
                 MATCH (n:Entity)-[r:RELATION]->(m:Entity)
                 WHERE r.type = 'implements' OR r.type = 'uses_framework' {cypher_where_clause}
-                RETURN n, r, m
+                RETURN n.name AS source, r.type AS relation, m.name AS target
                 LIMIT {top_k}
                 """
             elif "related" in query.lower() or "connection" in query.lower():
                 cypher_query = f"""
                 MATCH (n:Entity)-[r:RELATION]->(m:Entity)
                 WHERE n.name CONTAINS $keyword OR m.name CONTAINS $keyword {cypher_where_clause}
-                RETURN n, r, m
+                RETURN n.name AS source, r.type AS relation, m.name AS target
                 LIMIT {top_k}
                 """
                 # Extract likely keyword from query
@@ -138,7 +147,7 @@ class KnowledgeGraphRetriever(BaseRetriever):
                 cypher_query = f"""
                 MATCH (n:Entity)-[r:RELATION]->(m:Entity)
                 WHERE toLower(n.name) CONTAINS toLower($query) OR toLower(m.name) CONTAINS toLower($query) {cypher_where_clause}
-                RETURN n, r, m
+                RETURN n.name AS source, r.type AS relation, m.name AS target
                 LIMIT {top_k}
                 """
                 cypher_params["query"] = query
@@ -148,65 +157,97 @@ class KnowledgeGraphRetriever(BaseRetriever):
                 database=self.graph_store.database
             ) as session:
                 result = await session.run(cypher_query, **cypher_params)
-
-                # Process results
-                retrieval_results = []
-                async for record in result:
-                    source = record["n"]
-                    relation = record["r"]
-                    target = record["m"]
-
-                    result_id = f"{source.id}-{relation.id}-{target.id}"
-                    result_text = f"{source['name']} --{relation['type']}--> {target['name']}"
-
-                    # Get observations for entities if available
-                    source_obs_query = """
-                    MATCH (e:Entity {name: $name})-[:HAS_OBSERVATION]->(o:Observation)
-                    RETURN o.text as text
-                    LIMIT 3
-                    """
-                    target_obs_query = """
-                    MATCH (e:Entity {name: $name})-[:HAS_OBSERVATION]->(o:Observation)
-                    RETURN o.text as text
-                    LIMIT 3
-                    """
-
-                    source_obs_result = await session.run(source_obs_query, name=source["name"])
-                    target_obs_result = await session.run(target_obs_query, name=target["name"])
-
-                    source_obs = []
-                    async for obs_record in source_obs_result:
-                        source_obs.append(obs_record["text"])
-
-                    target_obs = []
-                    async for obs_record in target_obs_result:
-                        target_obs.append(obs_record["text"])
-
-                    # Add observations to result text if available
-                    if source_obs:
-                        result_text += f"\nSource ({source['name']}): {'; '.join(source_obs)}"
-                    if target_obs:
-                        result_text += f"\nTarget ({target['name']}): {'; '.join(target_obs)}"
-
-                    # Create retrieval result
-                    retrieval_results.append(
-                        RetrievalResult(
-                            id=result_id,
-                            text=result_text,
-                            score=1.0,  # No scoring in basic graph retrieval
-                            metadata={
-                                "source_entity": source["name"],
-                                "source_type": source["entity_type"],
-                                "relation": relation["type"],
-                                "target_entity": target["name"],
-                                "target_type": target["entity_type"],
-                            },
-                        ),
-                    )
-
-                logger.info(f"Found {len(retrieval_results)} knowledge graph results")
-                return retrieval_results
+                triples = {
+                    (record["source"], record["relation"], record["target"]): 0
+                    async for record in result
+                }
+
+            # Fill up with the relations around the matched entities, expanded
+            # over the graph store's neighborhood cache
+            seeds = list(dict.fromkeys(name for s, _, t in triples for name in (s, t)))
+            if seeds and len(triples) < top_k:
+                neighborhood = await self.graph_store.neighborhood(
+                    seeds,
+                    max_hops=1,
+                    limit=len(seeds) + top_k,
+                    relation_types=cypher_params.get("relationTypes"),
+                )
+                for relation in neighborhood["relations"]:
+                    triple = (relation["from"], relation["relation"], relation["to"])
+                    triples.setdefault(triple, 1)
+
+            entities = await self._read_entities(
+                list(dict.fromkeys(name for s, _, t in triples for name in (s, t)))
+            )
+            entity_types = cypher_params.get("entityTypes")
+
+            # Process results
+            retrieval_results = []
+            for (source, relation, target), hops in triples.items():
+                if len(retrieval_results) >= top_k:
+                    break
+                source_type, source_obs = entities.get(source, (None, []))
+                target_type, target_obs = entities.get(target, (None, []))
+                if hops and entity_types is not None and source_type not in entity_types:
+                    continue
+
+                result_text = f"{source} --{relation}--> {target}"
+
+                # Add observations to result text if available
+                if source_obs:
+                    result_text += f"\nSource ({source}): {'; '.join(source_obs)}"
+                if target_obs:
+                    result_text += f"\nTarget ({target}): {'; '.join(target_obs)}"
+
+                # Create retrieval result
+                retrieval_results.append(
+                    RetrievalResult(
+                        id=f"{source}-{relation}-{target}",
+                        text=result_text,
+                        # No scoring in basic graph retrieval; neighbors of a
+                        # match rank below the matches
+                        score=1.0 if hops == 0 else 0.5,
+                        metadata={
+                            "source_entity": source,
+                            "source_type": source_type,
+                            "relation": relation,
+                            "target_entity": target,
+                            "target_type": target_type,
+                            "hops": hops,
+                        },
+                    ),
+                )
+
+            logger.info(f"Found {len(retrieval_results)} knowledge graph results")
+            return retrieval_results
 
         except Exception as e:
             logger.exception(f"Error in knowledge graph retrieval: {e!s}")
+            record_failure("graph")
             return []
+
+    async def _read_entities(self, names: list[str]) -> dict[str, tuple[Any, list[str]]]:
+        """
+        Read the type and first observations of entities, in one query.
+
+        Args:
+            names: Entity names
+
+        Returns:
+            Dictionary mapping names to (entity type, up to 3 observations)
+
+        """
+        query = """
+        UNWIND $names AS name
+        MATCH (e:Entity {name: name})
+        OPTIONAL MATCH (e)-[:HAS_OBSERVATION]->(o:Observation)
+        RETURN e.name AS name, e.entity_type AS entity_type, COLLECT(o.text)[..3] AS observations
+        """
+
+        entities = {}
+        async with self.graph_store.driver.session(database=self.graph_store.database) as session:
+            result = await session.run(query, names=names)
+            async for record in result:
+                entities[record["name"]] = (record["entity_type"], record["observations"])
+
+        return entities
@@ -5,13 +5,17 @@ from typing import Any
 
 from dotenv import load_dotenv
 
+from emvr.config import get_settings
+from emvr.core.embedding import embedding_manager
 from emvr.memory.graph_store import Neo4jMemoryStore
 from emvr.memory.memory_manager import MemoryManager
 from emvr.memory.vector_store import QdrantMemoryStore
-from emvr.retrieval.base import BaseRetriever
+from emvr.retrieval.base import BaseRetriever, track_failures
 from emvr.retrieval.fusion_retriever import FusionRetriever
 from emvr.retrieval.hybrid_retriever import HybridRetriever
 from emvr.retrieval.knowledge_graph_retriever import KnowledgeGraphRetriever
+from emvr.retrieval.result_cache import ResultCache
+from emvr.retrieval.semantic_cache import SemanticCache
 
 # Load environment variables
 load_dotenv()
@@ -19,6 +23,21 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
+RETRIEVAL_MODES = ("vector", "graph", "hybrid", "fusion")
+
+# Stores each mode reads, whose writes invalidate its cached results
+_MODE_SCOPES = {
+    "vector": ("vector",),
+    "graph": ("graph",),
+    "hybrid": ("vector",),
+    "fusion": ("vector", "graph"),
+}
+
+
+def _is_complete(response: dict[str, Any]) -> bool:
+    """Whether a response may be cached: no source failed while computing it."""
+    return not response.get("partial")
+
 
 class RetrievalPipeline:
     """Main retrieval pipeline for the EMVR system."""
@@ -29,6 +48,10 @@ class RetrievalPipeline:
         graph_store: Neo4jMemoryStore | None = None,
         memory_manager: MemoryManager | None = None,
         retrieval_mode: str = "fusion",
+        cache_size: int | None = None,
+        cache_ttl: float | None = None,
+        semantic_cache_size: int | None = None,
+        semantic_threshold: float | None = None,
     ) -> None:
         """
         Initialize the retrieval pipeline.
@@ -38,8 +61,20 @@ class RetrievalPipeline:
             graph_store: Graph store for knowledge graph queries
             memory_manager: Memory manager instance
             retrieval_mode: Retrieval mode ("vector", "graph", "hybrid", "fusion")
+            cache_size: Maximum number of cached results; 0 disables the cache
+                (defaults to settings.retrieval_cache_size)
+            cache_ttl: Seconds a cached result stays valid
+                (defaults to settings.retrieval_cache_ttl)
+            semantic_cache_size: Maximum number of results cached for
+                paraphrased queries; 0 disables the semantic cache
+                (defaults to settings.retrieval_semantic_cache_size)
+            semantic_threshold: Cosine similarity above which a cached
+                query answers a new one
+                (defaults to settings.retrieval_semantic_cache_threshold)
 
         """
+        self._settings = get_settings()
+
         # Initialize stores
         self.vector_store = vector_store or QdrantMemoryStore()
         self.graph_store = graph_store or Neo4jMemoryStore()
@@ -59,6 +94,31 @@ class RetrievalPipeline:
 
         # Track active retriever
         self._active_retriever = None
+
+        # Result cache, invalidated by writes to the stores
+        if cache_size is None:
+            cache_size = self._settings.retrieval_cache_size
+        if cache_ttl is None:
+            cache_ttl = self._settings.retrieval_cache_ttl
+        self._result_cache = (
+            ResultCache(max_entries=cache_size, ttl=cache_ttl) if cache_size > 0 else None
+        )
+
+        # Semantic cache behind it, for paraphrases of recent queries
+        if semantic_cache_size is None:
+            semantic_cache_size = self._settings.retrieval_semantic_cache_size
+        if semantic_threshold is None:
+            semantic_threshold = self._settings.retrieval_semantic_cache_threshold
+        self._semantic_cache = (
+            SemanticCache(
+                threshold=semantic_threshold,
+                max_entries=semantic_cache_size,
+                ttl=cache_ttl,
+                admit_after=self._settings.retrieval_semantic_cache_admit_after,
+            )
+            if semantic_cache_size > 0
+            else None
+        )
         
         # Initialization status
         self._initialized = False
@@ -82,7 +142,7 @@ class RetrievalPipeline:
         if self._vector_retriever is None:
             self._vector_retriever = HybridRetriever(
                 vector_store=self.vector_store,
-                use_reranking=True,
+                use_keywords=False,
             )
         return self._vector_retriever
 
@@ -100,10 +160,7 @@ class RetrievalPipeline:
     def hybrid_retriever(self) -> HybridRetriever:
         """Get the hybrid retriever."""
         if self._hybrid_retriever is None:
-            self._hybrid_retriever = HybridRetriever(
-                vector_store=self.vector_store,
-                use_reranking=True,
-            )
+            self._hybrid_retriever = HybridRetriever(vector_store=self.vector_store)
         return self._hybrid_retriever
 
     @property
@@ -117,19 +174,24 @@ class RetrievalPipeline:
                 graph_weight=0.4,
                 web_weight=0.2,
                 reranking=True,
+                fusion=self._settings.retrieval_fusion,
             )
         return self._fusion_retriever
 
     @property
     def active_retriever(self) -> BaseRetriever:
         """Get the active retriever based on the current mode."""
-        if self.retrieval_mode == "vector":
+        return self._retriever_for(self.retrieval_mode)
+
+    def _retriever_for(self, mode: str) -> BaseRetriever:
+        """Get the retriever of a retrieval mode."""
+        if mode == "vector":
             return self.vector_retriever
-        if self.retrieval_mode == "graph":
+        if mode == "graph":
             return self.graph_retriever
-        if self.retrieval_mode == "hybrid":
+        if mode == "hybrid":
             return self.hybrid_retriever
-        if self.retrieval_mode == "fusion":
+        if mode == "fusion":
             return self.fusion_retriever
         # Default to fusion if unknown mode
         return self.fusion_retriever
@@ -145,16 +207,20 @@ class RetrievalPipeline:
             ValueError: If the mode is invalid
 
         """
-        valid_modes = ["vector", "graph", "hybrid", "fusion"]
-        if mode not in valid_modes:
-            msg = f"Invalid retrieval mode: {mode}. Must be one of {valid_modes}"
-            raise ValueError(
-                msg,
-            )
+        self._validate_mode(mode)
 
         self.retrieval_mode = mode
         logger.info(f"Retrieval mode set to {mode}")
 
+    @staticmethod
+    def _validate_mode(mode: str) -> None:
+        """Raise a ValueError for an unknown retrieval mode."""
+        if mode not in RETRIEVAL_MODES:
+            msg = f"Invalid retrieval mode: {mode}. Must be one of {list(RETRIEVAL_MODES)}"
+            raise ValueError(
+                msg,
+            )
+
     async def retrieve(
         self,
         query: str,
@@ -165,6 +231,11 @@ class RetrievalPipeline:
         """
         Retrieve documents based on a query.
 
+        Identical requests, and paraphrases of recent ones, are served from
+        the result caches until a store the mode reads is written to or the
+        cache TTL passes. Responses degraded by a failing source are marked
+        ``partial`` (with ``failed_sources``) and never cached.
+
         Args:
             query: Query string
             top_k: Number of results to return
@@ -176,36 +247,66 @@ class RetrievalPipeline:
 
         """
         try:
-            # Set temporary mode if provided
-            original_mode = self.retrieval_mode
+            # The override applies to this query only
             if mode is not None:
-                self.set_retrieval_mode(mode)
+                self._validate_mode(mode)
+            else:
+                mode = self.retrieval_mode
 
             # Get retriever
-            retriever = self.active_retriever
-
-            # Perform retrieval
-            logger.info(
-                f"Retrieving documents for query: '{query}' using {self.retrieval_mode} mode",
-            )
-
-            results = await retriever.retrieve(
-                query=query,
-                top_k=top_k,
-                filters=filters,
-            )
-
-            # Restore original mode
-            if mode is not None:
-                self.retrieval_mode = original_mode
-
-            # Format and return results
-            return {
-                "query": query,
-                "mode": self.retrieval_mode,
-                "count": len(results),
-                "results": [result.dict() for result in results],
-            }
+            retriever = self._retriever_for(mode)
+
+            async def compute() -> dict[str, Any]:
+                # Perform retrieval
+                logger.info(f"Retrieving documents for query: '{query}' using {mode} mode")
+
+                with track_failures() as failures:
+                    results = await retriever.retrieve(
+                        query=query,
+                        top_k=top_k,
+                        filters=filters,
+                    )
+
+                # Format and return results
+                response = {
+                    "query": query,
+                    "mode": mode,
+                    "count": len(results),
+                    "results": [result.dict() for result in results],
+                }
+                if failures:
+                    # Retrievers return what they have when a source fails
+                    response["partial"] = True
+                    response["failed_sources"] = list(dict.fromkeys(failures))
+                return response
+
+            key = ResultCache.make_key(query, mode, top_k, filters)
+            scopes = _MODE_SCOPES.get(mode, _MODE_SCOPES["fusion"])
+
+            async def compute_semantic() -> dict[str, Any]:
+                if self._semantic_cache is None:
+                    return await compute()
+                try:
+                    # The retrievers embed the query too; the embedding cache serves them
+                    vector = await embedding_manager.embed(query)
+                except Exception as e:
+                    logger.warning(f"Semantic cache skipped, query not embedded: {e!s}")
+                    return await compute()
+                # Everything but the query text
+                context = key[1:]
+                return await self._semantic_cache.get_or_compute(
+                    vector, context, scopes, compute, cacheable=_is_complete
+                )
+
+            if self._result_cache is None:
+                response = await compute_semantic()
+            else:
+                response = await self._result_cache.get_or_compute(
+                    key, scopes, compute_semantic, cacheable=_is_complete
+                )
+            # Cached results may have been retrieved for a differently worded query
+            response["query"] = query
+            return response
 
         except Exception as e:
             logger.exception(f"Error in retrieval pipeline: {e!s}")
@@ -0,0 +1,205 @@
+"""
+Result cache for the retrieval pipeline.
+
+Entries are keyed on the normalized request (query, mode, top_k, filters),
+expire after a TTL and are evicted least recently used first. Each entry
+also records the write generations of the stores its mode reads (see
+``emvr.memory.generations``); a write to any of them invalidates it, so the
+TTL only bounds staleness from sources that do not report writes (e.g. web
+search).
+
+Concurrent lookups of a key that is being computed wait for that
+computation instead of starting their own (singleflight).
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from emvr.core.embedding_cache import normalize_text
+from emvr.core.metrics import record_retrieval_cache_request
+from emvr.memory.generations import WriteGenerations, write_generations
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CacheKey = tuple[str, str, int, str]
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    generations: tuple[int, ...]
+    expires_at: float
+
+
+@dataclass(slots=True)
+class _Flight:
+    future: asyncio.Future
+    generations: tuple[int, ...]
+
+
+class ResultCache:
+    """
+    TTL + LRU cache of retrieval results with write-aware invalidation.
+
+    Not thread-safe: use it from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 30.0,
+        generations: WriteGenerations = write_generations,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl: Seconds a result stays valid
+            generations: Write generations to validate entries against
+
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._generations = generations
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._in_flight: dict[CacheKey, _Flight] = {}
+        self._hits = 0
+        self._requests = 0
+
+    def __len__(self) -> int:
+        """Number of cached results, including expired ones not yet dropped."""
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(
+        query: str,
+        mode: str,
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+    ) -> CacheKey:
+        """
+        Build the cache key of a retrieval request.
+
+        Args:
+            query: Query string
+            mode: Retrieval mode
+            top_k: Number of results
+            filters: Optional filters
+
+        Returns:
+            Key that is equal for requests differing only in query
+            whitespace or filter key order
+
+        """
+        filter_key = json.dumps(filters or {}, sort_keys=True, default=str)
+        return (normalize_text(query), mode, top_k, filter_key)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served without a new computation."""
+        return self._hits / self._requests if self._requests else 0.0
+
+    async def get_or_compute(
+        self,
+        key: CacheKey,
+        scopes: tuple[str, ...],
+        compute: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool] | None = None,
+    ) -> T:
+        """
+        Return the cached result for a key, computing it on a miss.
+
+        Callers get their own deep copy of a cached or shared result.
+        Exceptions are propagated to every waiter and never cached.
+
+        Args:
+            key: Key from ``make_key``
+            scopes: Store scopes the computation reads ("vector", "graph")
+            compute: Coroutine function producing the result
+            cacheable: Whether a result may be cached (e.g. False for results
+                degraded by a failure); concurrent waiters still share it
+
+        Returns:
+            The result
+
+        """
+        while True:
+            generations = self._generations.snapshot(scopes)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.generations == generations and entry.expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._record("hit")
+                    return copy.deepcopy(entry.value)
+                del self._entries[key]
+
+            flight = self._in_flight.get(key)
+            if flight is None or flight.generations != generations:
+                break
+
+            # Shielded: a cancelled waiter must not cancel the shared computation
+            try:
+                value = await asyncio.shield(flight.future)
+            except asyncio.CancelledError:
+                if not flight.future.cancelled():
+                    raise
+                # The computing task was cancelled; look again
+                continue
+            self._record("shared")
+            return copy.deepcopy(value)
+
+        flight = _Flight(asyncio.get_running_loop().create_future(), generations)
+        self._in_flight[key] = flight
+        self._record("miss")
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            flight.future.cancel()
+            raise
+        except BaseException as e:
+            flight.future.set_exception(e)
+            # Mark retrieved so that an exception nobody waited for is not logged
+            flight.future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+
+        # Waiters and the cache get a copy the caller cannot mutate
+        shared = copy.deepcopy(value)
+        flight.future.set_result(shared)
+        if cacheable is not None and not cacheable(value):
+            return value
+        # A write that landed during the computation may not be reflected in it
+        if self._generations.snapshot(scopes) == generations:
+            self._store(key, _Entry(shared, generations, time.monotonic() + self.ttl))
+        return value
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+
+    def _store(self, key: CacheKey, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _record(self, result: str) -> None:
+        self._requests += 1
+        if result != "miss":
+            self._hits += 1
+        logger.debug(f"Retrieval cache {result}")
+        record_retrieval_cache_request("exact", result, self.hit_ratio, len(self._entries))
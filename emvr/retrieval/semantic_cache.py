@@ -0,0 +1,230 @@
+"""
+Semantic cache for the retrieval pipeline.
+
+Paraphrased queries ("how do I reset my password" / "password reset steps")
+miss the exact-match result cache but usually retrieve the same documents.
+This cache keeps the embeddings of recent queries and serves a query from
+the results of a cached one whose embedding is within a cosine similarity
+threshold, as long as both were asked with the same mode, top_k and
+filters.
+
+The index is a flat matrix of unit-length query embeddings: at a few
+hundred entries one matrix-vector product is exact and faster than any
+graph index. Slots are split in two regions:
+
+- *candidates*: queries seen fewer than ``admit_after`` times, kept
+  without results so that one-off queries do not evict popular ones
+- *admitted*: queries (or their paraphrases) seen at least
+  ``admit_after`` times, with their results
+
+Both regions are LRU. Admitted results are invalidated by writes to the
+stores they read (see ``emvr.memory.generations``) and expire after a TTL.
+"""
+
+import copy
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import numpy as np
+
+from emvr.core.metrics import record_retrieval_cache_request
+from emvr.memory.generations import WriteGenerations, write_generations
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _Slot:
+    context: Hashable
+    seen: int = 1
+    value: Any = None
+    generations: tuple[int, ...] = ()
+    expires_at: float = 0.0
+
+
+class SemanticCache:
+    """
+    Similarity-keyed cache of retrieval results with admission control.
+
+    Not thread-safe: use it from a single event loop.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 256,
+        ttl: float = 30.0,
+        admit_after: int = 2,
+        generations: WriteGenerations = write_generations,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cached query to answer
+                a new one
+            max_entries: Maximum number of cached results (and of candidates)
+            ttl: Seconds a result stays valid
+            admit_after: Number of times a query or its paraphrases must be
+                seen before its results are cached
+            generations: Write generations to validate entries against
+
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.admit_after = max(1, admit_after)
+        self._generations = generations
+
+        capacity = 2 * max_entries
+        # Allocated on the first insert, once the embedding dimension is known
+        self._vectors: np.ndarray | None = None
+        # Hash of each slot's context; matches are confirmed on the slot
+        self._context_hashes = np.zeros(capacity, dtype=np.int64)
+        self._occupied = np.zeros(capacity, dtype=bool)
+        self._slots: list[_Slot | None] = [None] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+        self._candidates: OrderedDict[int, None] = OrderedDict()
+        self._admitted: OrderedDict[int, None] = OrderedDict()
+        self._hits = 0
+        self._requests = 0
+
+    def __len__(self) -> int:
+        """Number of cached results."""
+        return sum(1 for i in self._admitted if self._slots[i].value is not None)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from a cached result."""
+        return self._hits / self._requests if self._requests else 0.0
+
+    async def get_or_compute(
+        self,
+        vector: np.ndarray,
+        context: Hashable,
+        scopes: tuple[str, ...],
+        compute: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool] | None = None,
+    ) -> T:
+        """
+        Return the results of a similar cached query, computing them on a miss.
+
+        Args:
+            vector: Query embedding
+            context: Everything but the query that determines the results
+                (mode, top_k, filters)
+            scopes: Store scopes the computation reads ("vector", "graph")
+            compute: Coroutine function producing the result
+            cacheable: Whether a result may be cached (e.g. False for results
+                degraded by a failure)
+
+        Returns:
+            The result; a deep copy when served from the cache
+
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm > 0:
+            query = query / norm
+
+        generations = self._generations.snapshot(scopes)
+        index = self._nearest(query, context)
+        slot = self._slots[index] if index is not None else None
+
+        if slot is not None and slot.value is not None:
+            if slot.generations == generations and slot.expires_at > time.monotonic():
+                self._admitted.move_to_end(index)
+                self._record("hit")
+                return copy.deepcopy(slot.value)
+            slot.value = None
+
+        self._record("miss")
+        value = await compute()
+        if cacheable is not None and not cacheable(value):
+            return value
+
+        # The slot may have been evicted (and reused) while computing
+        if slot is None or self._slots[index] is not slot:
+            index, slot = self._insert(query, context)
+        else:
+            slot.seen += 1
+        if slot.seen >= self.admit_after:
+            if index in self._candidates:
+                self._admit(index)
+            else:
+                self._admitted.move_to_end(index)
+            # A write that landed during the computation may not be reflected in it
+            if self._generations.snapshot(scopes) == generations:
+                slot.value = copy.deepcopy(value)
+                slot.generations = generations
+                slot.expires_at = time.monotonic() + self.ttl
+        elif index in self._candidates:
+            self._candidates.move_to_end(index)
+        return value
+
+    def clear(self) -> None:
+        """Drop all cached queries and results."""
+        for index in [*self._candidates, *self._admitted]:
+            self._release(index)
+        self._candidates.clear()
+        self._admitted.clear()
+
+    def _nearest(self, query: np.ndarray, context: Hashable) -> int | None:
+        """Slot of the most similar query with the same context above the threshold."""
+        if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+            return None
+        candidates = np.flatnonzero(self._occupied & (self._context_hashes == hash(context)))
+        if len(candidates) == 0:
+            return None
+        similarities = self._vectors[candidates] @ query
+        for position in np.argsort(-similarities, kind="stable"):
+            if similarities[position] < self.threshold:
+                break
+            index = int(candidates[position])
+            if self._slots[index].context == context:
+                return index
+        return None
+
+    def _insert(self, query: np.ndarray, context: Hashable) -> tuple[int, _Slot]:
+        """Add a query as a new candidate, evicting the least recently seen one."""
+        if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+            # A new embedding model makes every cached vector meaningless
+            self.clear()
+            self._vectors = np.zeros((len(self._slots), query.shape[0]), dtype=np.float32)
+        if len(self._candidates) >= self.max_entries:
+            self._release(self._candidates.popitem(last=False)[0])
+
+        index = self._free.pop()
+        slot = _Slot(context)
+        self._slots[index] = slot
+        self._vectors[index] = query
+        self._context_hashes[index] = hash(context)
+        self._occupied[index] = True
+        self._candidates[index] = None
+        return index, slot
+
+    def _admit(self, index: int) -> None:
+        """Move a candidate to the admitted region, evicting its LRU entry if full."""
+        del self._candidates[index]
+        if len(self._admitted) >= self.max_entries:
+            self._release(self._admitted.popitem(last=False)[0])
+        self._admitted[index] = None
+
+    def _release(self, index: int) -> None:
+        self._slots[index] = None
+        self._occupied[index] = False
+        self._free.append(index)
+
+    def _record(self, result: str) -> None:
+        self._requests += 1
+        if result == "hit":
+            self._hits += 1
+        logger.debug(f"Semantic retrieval cache {result}")
+        record_retrieval_cache_request("semantic", result, self.hit_ratio, len(self._admitted))
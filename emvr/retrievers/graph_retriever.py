@@ -10,6 +10,8 @@ It uses LlamaIndex to integrate with Neo4j and enhance the retrieval pipeline.
 
 import json
 import logging
+import re
+from functools import lru_cache
 from typing import Any
 
 # Will use LlamaIndex for Neo4j integration
@@ -17,11 +19,69 @@ from typing import Any
 # from llama_index.graph_stores import Neo4jGraphStore
 # from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
 from emvr.config import get_settings
+from emvr.memory.graph_store import ENTITY_FULLTEXT_INDEX, escape_fulltext
 from emvr.memory.interfaces.graphiti_interface import graphiti
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Cypher templates for the query shapes the retriever generates. User text is
+# only ever passed as a parameter, so every query of one shape has the same
+# text and the server plans it once and reuses the cached plan. The
+# ``{relation_filter}`` slot takes an optional WHERE clause on relation types.
+CYPHER_TEMPLATES = {
+    "related_to": """
+        MATCH (n:`Entity` {{name: $entity}})-[r:`RELATION`]-(m:`Entity`)
+        {relation_filter}
+        RETURN n.name AS source, r.type AS relation, m.name AS target,
+               m.entity_type AS targetType
+        LIMIT $limit
+    """,
+    "who_is": """
+        MATCH (n:`Entity` {{name: $entity}})
+        OPTIONAL MATCH (n)-[r:`RELATION`]-(m:`Entity`)
+        {relation_filter}
+        RETURN n.name AS name, n.entity_type AS type,
+               COLLECT({{relation: r.type, target: m.name}}) AS connections
+    """,
+    "name_search": f"""
+        CALL db.index.fulltext.queryNodes('{ENTITY_FULLTEXT_INDEX}', $search, {{{{limit: $limit}}}})
+        YIELD node, score
+        RETURN node.name AS name, node.entity_type AS type, score
+    """,
+}
+
+_RELATED_TO = re.compile(r"related to\s+(.+)", re.IGNORECASE | re.DOTALL)
+_WHO_IS = re.compile(r"\b(?:who|what) is\s+(.+)", re.IGNORECASE | re.DOTALL)
+
+
+@lru_cache(maxsize=64)
+def compile_template(name: str, filter_relations: bool = False) -> str:
+    """
+    Get the query text of a Cypher template.
+
+    Compiled texts are cached, so every query of one shape sends the exact
+    same string and hits the server's plan cache.
+
+    Args:
+        name: Template name (a key of ``CYPHER_TEMPLATES``)
+        filter_relations: Restrict relations to the types in ``$relation_types``
+
+    Returns:
+        str: Cypher query text
+
+    Raises:
+        ValueError: If the template is unknown
+
+    """
+    template = CYPHER_TEMPLATES.get(name)
+    if template is None:
+        msg = f"Unknown Cypher template: {name}. Must be one of {list(CYPHER_TEMPLATES)}"
+        raise ValueError(msg)
+    relation_filter = "WHERE r.type IN $relation_types" if filter_relations else ""
+    # Normalize whitespace so that equivalent shapes share one plan cache entry
+    return " ".join(template.format(relation_filter=relation_filter).split())
+
 
 class GraphRetriever:
     """
@@ -82,56 +142,44 @@ class GraphRetriever:
         if not self._initialized:
             await self.initialize()
 
-    async def _generate_graph_query(self, query: str) -> str:
+    async def _generate_graph_query(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> tuple[str, str, dict[str, Any]] | None:
         """
-        Generate a Cypher query from a natural language query.
+        Generate a parameterized Cypher query from a natural language query.
 
         This is a placeholder for a more sophisticated query generation method.
-        In practice, this would use an LLM to generate the Cypher query.
+        In practice, this would use an LLM to pick the template and extract
+        its parameters.
 
         Args:
             query: Natural language query
+            limit: Maximum number of records
 
         Returns:
-            str: Cypher query
+            Tuple: (template name, Cypher query, parameters), or None if the
+            query has nothing to search for
 
         """
-        # Placeholder implementation
-        # In practice, this would use an LLM to generate the Cypher query
-
         # Some basic patterns for simple queries
-        query_lower = query.lower()
-
-        if "related to" in query_lower:
-            entity = query_lower.split("related to")[1].strip().strip("?")
-            return f"""
-            MATCH (n {{name: "{entity}"}})-[r]-(m)
-            RETURN n.name AS source, type(r) AS relation, m.name AS target
-            LIMIT 10
-            """
-
-        if "who is" in query_lower or "what is" in query_lower:
-            entity = (
-                query_lower.replace("who is", "")
-                .replace("what is", "")
-                .strip()
-                .strip("?")
-            )
-            return f"""
-            MATCH (n {{name: "{entity}"}})
-            OPTIONAL MATCH (n)-[r]-(m)
-            RETURN n.name AS name, n.entityType AS type, 
-                   collect({{relation: type(r), target: m.name}}) AS connections
-            LIMIT 1
-            """
-
-        # Default query: search for nodes matching the query string
-        return f"""
-        MATCH (n)
-        WHERE n.name CONTAINS "{query}" OR n.entityType CONTAINS "{query}"
-        RETURN n.name AS name, n.entityType AS type
-        LIMIT 10
-        """
+        match = _RELATED_TO.search(query)
+        if match:
+            name = "related_to"
+            parameters = {"entity": _entity_name(match.group(1)), "limit": limit}
+        elif match := _WHO_IS.search(query):
+            name = "who_is"
+            parameters = {"entity": _entity_name(match.group(1))}
+        else:
+            # Default query: search entity names and types through the full-text index
+            search = escape_fulltext(query)
+            if not search:
+                return None
+            name = "name_search"
+            parameters = {"search": search, "limit": limit}
+
+        return name, compile_template(name), parameters
 
     async def retrieve(
         self,
@@ -157,11 +205,18 @@ class GraphRetriever:
             logger.info("Performing graph retrieval for query: %s", query)
 
             # Generate Cypher query from natural language
-            cypher_query = await self._generate_graph_query(query)
-            logger.info("Generated Cypher query: %s", cypher_query)
+            generated = await self._generate_graph_query(query, limit=max(top_k, 10))
+            if generated is None:
+                return {
+                    "success": True,
+                    "query": query,
+                    "results": [],
+                }
+            template, cypher_query, parameters = generated
+            logger.info("Generated Cypher query from template %s: %s", template, parameters)
 
             # Execute the query
-            query_result = await self._graphiti.execute_cypher(cypher_query)
+            query_result = await self._graphiti.execute_cypher(cypher_query, parameters)
 
             # Process the results
             if not query_result.get("success", False):
@@ -184,6 +239,7 @@ class GraphRetriever:
                     "source": "knowledge_graph",
                     "metadata": {
                         "retrieval_method": "graph",
+                        "cypher_template": template,
                         "cypher_query": cypher_query,
                     },
                 }
@@ -243,29 +299,13 @@ class GraphRetriever:
         try:
             logger.info("Finding relationships for entity: %s", entity)
 
-            # Build the Cypher query
-            if relationship_types:
-                # Filter by relationship types
-                rel_types = "|".join([f":{r_type}" for r_type in relationship_types])
-                query = f"""
-                MATCH (n {{name: $entity}})-[r {rel_types}]-(m)
-                RETURN n.name AS source, type(r) AS relation, m.name AS target, 
-                       m.entityType AS targetType
-                LIMIT 100
-                """
-            else:
-                # All relationship types
-                query = """
-                MATCH (n {name: $entity})-[r]-(m)
-                RETURN n.name AS source, type(r) AS relation, m.name AS target, 
-                       m.entityType AS targetType
-                LIMIT 100
-                """
+            # Relationship types are passed as a parameter, not spliced into the pattern
+            query = compile_template("related_to", filter_relations=bool(relationship_types))
 
             # Execute the query
             query_result = await self._graphiti.execute_cypher(
                 query,
-                {"entity": entity},
+                {"entity": entity, "relation_types": relationship_types, "limit": 100},
             )
 
             # Process the results
@@ -391,5 +431,10 @@ class GraphRetriever:
             }
 
 
+def _entity_name(text: str) -> str:
+    """Entity name from the tail of a question."""
+    return text.strip().strip("?!.").strip().strip("\"'")
+
+
 # Create a singleton instance for import
 graph_retriever = GraphRetriever()
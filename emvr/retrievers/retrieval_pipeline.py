@@ -9,7 +9,10 @@ This module implements the main retrieval pipeline that combines:
 It orchestrates the complete retrieval process from query to results.
 """
 
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime
 from typing import Any
 
@@ -35,6 +38,12 @@ class RetrievalPipeline:
     2. Parallel retrieval from multiple sources
     3. Result fusion, ranking, and post-processing
     4. (Optional) Response generation
+
+    Each source runs as its own task with a deadline, so a slow backend
+    only costs its own results: the response is flagged as partial and
+    names the sources that timed out or failed. A source that has not
+    answered after its hedge delay gets a second, identical request and the
+    first successful answer wins.
     """
 
     def __init__(self):
@@ -117,6 +126,104 @@ class RetrievalPipeline:
             "entities": entity_result.get("entities", []),
         }
 
+    async def _run_source(
+        self,
+        name: str,
+        request: Callable[[], Awaitable[list[dict[str, Any]]]],
+        timeout: float,
+        hedge_delay: float | None,
+    ) -> tuple[list[dict[str, Any]], str, float]:
+        """
+        Run one retrieval source under its deadline.
+
+        Args:
+            name: Source name, for logging
+            request: Coroutine function returning the source's results
+            timeout: Deadline in seconds
+            hedge_delay: Seconds before a hedged request is sent (None to
+                never hedge)
+
+        Returns:
+            Tuple: (results, status, elapsed seconds); status is "ok",
+            "timeout" or "error", with no results unless "ok"
+
+        """
+        start = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(self._hedged(request, hedge_delay), timeout)
+            status = "ok"
+        except TimeoutError:
+            logger.warning("%s retrieval timed out after %.2fs", name, timeout)
+            results, status = [], "timeout"
+        except Exception as e:
+            logger.warning("%s retrieval failed: %s", name, e)
+            results, status = [], "error"
+        return results, status, time.perf_counter() - start
+
+    @staticmethod
+    async def _hedged(
+        request: Callable[[], Awaitable[list[dict[str, Any]]]],
+        hedge_delay: float | None,
+    ) -> list[dict[str, Any]]:
+        """
+        Run a request, sending a second copy if the first is slow.
+
+        Args:
+            request: Coroutine function to run; must be idempotent
+            hedge_delay: Seconds to wait before sending the copy (None to
+                never send one)
+
+        Returns:
+            List[Dict]: Results of the first request to succeed
+
+        Raises:
+            Exception: The last error, if every request failed
+
+        """
+        tasks = {asyncio.create_task(request())}
+        hedged = hedge_delay is None
+        error: BaseException | None = None
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks,
+                    timeout=None if hedged else hedge_delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedged = True
+                    tasks.add(asyncio.create_task(request()))
+                    continue
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The loser, or both requests when the deadline cancels us
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _source_results(response: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Results of a retriever response, raising if the retriever failed.
+
+        Args:
+            response: Retriever response
+
+        Returns:
+            List[Dict]: The response's results
+
+        Raises:
+            RuntimeError: If the response reports a failure
+
+        """
+        if not response.get("success", True):
+            msg = response.get("error", "Unknown error")
+            raise RuntimeError(msg)
+        return response.get("results", [])
+
     def _fuse_results(
         self,
         vector_results: list[dict[str, Any]],
@@ -204,29 +311,79 @@ class RetrievalPipeline:
             # Preprocess query
             processed_query = self._preprocess_query(query)
 
-            # Augment with entity information
-            augmented_query = await self._augment_with_entities(processed_query)
-            entities = augmented_query.get("entities", [])
-
-            # Perform retrievals in parallel
-            vector_results = []
-            graph_results = []
-
-            if use_vector:
-                vector_response = await self._hybrid_retriever.retrieve(
+            # Entities are extracted once, alongside the vector search; the
+            # graph source waits for them and only its query is hedged. The
+            # extraction counts toward the graph deadline.
+            graph_timeout = self._settings.retrieval_graph_timeout
+
+            async def extract_entities() -> tuple[list[dict[str, Any]], str]:
+                try:
+                    augmented_query = await asyncio.wait_for(
+                        self._augment_with_entities(processed_query),
+                        graph_timeout,
+                    )
+                except TimeoutError:
+                    logger.warning("Entity extraction timed out after %.2fs", graph_timeout)
+                    return [], "timeout"
+                except Exception as e:
+                    logger.warning("Entity extraction failed: %s", e)
+                    return [], "error"
+                return augmented_query.get("entities", []), "ok"
+
+            extraction = asyncio.create_task(extract_entities())
+
+            async def retrieve_vector() -> list[dict[str, Any]]:
+                response = await self._hybrid_retriever.retrieve(
                     processed_query,
                     top_k=top_k,
                     filters=filters,
                 )
-                vector_results = vector_response.get("results", [])
+                return self._source_results(response)
 
-            if use_graph and entities:
-                # Only use graph retrieval if we found entities
-                graph_response = await self._graph_retriever.retrieve(
+            async def retrieve_graph() -> list[dict[str, Any]]:
+                response = await self._graph_retriever.retrieve(
                     processed_query,
                     top_k=top_k,
                 )
-                graph_results = graph_response.get("results", [])
+                return self._source_results(response)
+
+            async def graph_source() -> tuple[list[dict[str, Any]], str, float]:
+                start = time.perf_counter()
+                found, status = await extraction
+                if status != "ok" or not found:
+                    # Only use graph retrieval if we found entities
+                    return [], status, time.perf_counter() - start
+                results, status, _ = await self._run_source(
+                    "graph",
+                    retrieve_graph,
+                    max(graph_timeout - (time.perf_counter() - start), 0),
+                    self._settings.retrieval_graph_hedge_delay,
+                )
+                return results, status, time.perf_counter() - start
+
+            # Perform retrievals in parallel, each under its own deadline
+            sources = {}
+            if use_vector:
+                sources["vector"] = self._run_source(
+                    "vector",
+                    retrieve_vector,
+                    self._settings.retrieval_vector_timeout,
+                    self._settings.retrieval_vector_hedge_delay,
+                )
+            if use_graph:
+                sources["graph"] = graph_source()
+            try:
+                outcomes = dict(
+                    zip(sources, await asyncio.gather(*sources.values()), strict=True)
+                )
+                entities, _ = await extraction
+            finally:
+                extraction.cancel()
+
+            vector_results = outcomes["vector"][0] if "vector" in outcomes else []
+            graph_results = outcomes["graph"][0] if "graph" in outcomes else []
+            timed_out = [name for name, (_, status, _) in outcomes.items() if status == "timeout"]
+            failed = [name for name, (_, status, _) in outcomes.items() if status == "error"]
 
             # Fuse results
             fused_results = self._fuse_results(
@@ -251,6 +408,10 @@ class RetrievalPipeline:
                 "graph_result_count": len(graph_results),
                 "total_result_count": len(fused_results),
                 "processing_time": processing_time,
+                "partial": bool(timed_out or failed),
+                "timed_out_sources": timed_out,
+                "failed_sources": failed,
+                "source_times": {name: elapsed for name, (_, _, elapsed) in outcomes.items()},
             }
 
         except Exception as e:
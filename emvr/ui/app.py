@@ -44,7 +44,7 @@ except ImportError:
     ingestion_pipeline.ingest_file = AsyncMock(return_value={"status": "success", "chunks": 5})
     memory_manager = MagicMock()
     memory_manager.initialize = AsyncMock()
-    memory_manager.close = MagicMock()
+    memory_manager.close = AsyncMock()
     retrieval_pipeline = MagicMock()
     retrieval_pipeline.initialize = AsyncMock()
 
@@ -499,7 +499,7 @@ async def shutdown() -> None:
 
         # Close other connections as needed
         try:
-            memory_manager.close()
+            await memory_manager.close()
         except Exception as inner_e:
             logger.warning(f"Error closing memory manager: {inner_e}")
 
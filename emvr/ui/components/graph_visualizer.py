@@ -40,58 +40,42 @@ async def prepare_graph_data(
         # Initialize memory manager if needed
         await memory_manager.initialize()
 
-        # Get the graph data
-        if center_entity:
-            # If a center entity is specified, get the local graph around it
-            graph_result = await memory_manager._graphiti.execute_cypher(
-                f"""
-                MATCH path = (center {{name: $name}})-[*1..{max_depth}]-(related)
-                WITH nodes(path) AS nodes, relationships(path) AS rels
-                UNWIND nodes AS node
-                WITH COLLECT(DISTINCT node) AS allNodes, rels
-                UNWIND rels AS rel
-                WITH allNodes, COLLECT(DISTINCT rel) AS allRels
-                RETURN allNodes, allRels
-                LIMIT {max_nodes}
-                """,
-                {"name": center_entity},
-            )
-        else:
-            # Otherwise, get a sample of the full graph
-            graph_result = await memory_manager.read_graph()
+        # Get a sample of the graph, sized and selected by the server
+        graph_result = await memory_manager.sample_graph(
+            limit=max_nodes,
+            center=center_entity,
+            max_depth=max_depth,
+        )
 
         # Process nodes and relationships for visualization
         nodes = []
         edges = []
 
         # Process nodes
-        for node in graph_result.get("nodes", []):
-            if len(nodes) >= max_nodes:
-                break
-
+        for node in graph_result.get("entities", []):
             nodes.append(
                 {
                     "id": node.get("name", ""),
                     "label": node.get("name", ""),
-                    "title": node.get("entityType", "Entity"),
-                    "group": node.get("entityType", "Entity"),
+                    "title": node.get("entity_type") or "Entity",
+                    "group": node.get("entity_type") or "Entity",
                     "properties": {
-                        "type": node.get("entityType", "Entity"),
+                        "type": node.get("entity_type") or "Entity",
                         "observations": node.get("observations", []),
                     },
                 }
             )
 
         # Process relationships
-        for rel in graph_result.get("relationships", []):
+        for rel in graph_result.get("relations", []):
             edges.append(
                 {
                     "from": rel.get("from", ""),
                     "to": rel.get("to", ""),
-                    "label": rel.get("relationType", "related"),
-                    "title": rel.get("relationType", "related"),
+                    "label": rel.get("relation") or "related",
+                    "title": rel.get("relation") or "related",
                     "properties": {
-                        "type": rel.get("relationType", "related"),
+                        "type": rel.get("relation") or "related",
                     },
                 }
             )
@@ -354,7 +338,7 @@ async def show_graph_visualization(
                         const nodeId = params.nodes[0];
                         const node = nodes.get(nodeId);
 
-                        alert(`Node: ${node.label}\\nType: ${node.properties.type}\\nObservations: ${node.properties.observations.join("\\n- ")}`);
+                        alert(`Node: ${{node.label}}\\nType: ${{node.properties.type}}\\nObservations: ${{node.properties.observations.join("\\n- ")}}`);
                     }}
                 }});
             </script>
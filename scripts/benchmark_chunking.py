@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Benchmark the EMVR text chunker against LlamaIndex's SentenceSplitter.
+
+Generates a synthetic multi-megabyte corpus of sentences and paragraphs and
+reports throughput and chunk statistics for each splitter. LlamaIndex is
+optional; its row is skipped when it is not installed.
+
+Usage:
+    python scripts/benchmark_chunking.py --size-mb 8 --chunk-size 512 --chunk-overlap 50
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from emvr.ingestion.chunking import TextChunker  # noqa: E402
+
+WORDS = (
+    "memory vector graph retrieval embedding index query entity relation observation "
+    "pipeline chunk token document server agent search hybrid fusion cache latency "
+    "throughput neo4j qdrant ingestion schema cluster replica shard segment payload"
+).split()
+
+
+def build_corpus(size_bytes: int, seed: int = 7) -> str:
+    """
+    Build a synthetic corpus of roughly ``size_bytes`` characters.
+
+    Args:
+        size_bytes: Target corpus size
+        seed: Random seed
+
+    Returns:
+        Corpus text
+
+    """
+    rng = random.Random(seed)
+    parts: list[str] = []
+    total = 0
+    while total < size_bytes:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(WORDS, k=rng.randint(6, 28))
+            words[0] = words[0].capitalize()
+            sentence = " ".join(words) + rng.choice([".", ".", ".", "?", "!"])
+            if rng.random() < 0.1:
+                sentence += f" Error E{rng.randint(1000, 9999)}: value={rng.random():.4f}."
+            sentences.append(sentence)
+        paragraph = " ".join(sentences)
+        parts.append(paragraph)
+        total += len(paragraph) + 2
+    return "\n\n".join(parts)
+
+
+def run(name: str, split: Callable[[str], list[str]], corpus: str, repeat: int) -> None:
+    """Time a splitter and print one result row."""
+    timings = []
+    chunks: list[str] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = split(corpus)
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    lengths = [len(c) for c in chunks] or [0]
+    print(
+        f"{name:<28} {best * 1000:>10.1f} {len(corpus) / best / 1e6:>10.2f} "
+        f"{len(chunks):>8} {statistics.mean(lengths):>10.0f}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = build_corpus(int(args.size_mb * 1024 * 1024))
+    print(
+        f"Corpus: {len(corpus) / 1e6:.1f} MB, chunk_size={args.chunk_size}, "
+        f"chunk_overlap={args.chunk_overlap}\n"
+    )
+    print(f"{'splitter':<28} {'best ms':>10} {'MB/s':>10} {'chunks':>8} {'avg chars':>10}")
+
+    chunker = TextChunker(args.chunk_size, args.chunk_overlap)
+    run("emvr TextChunker.split", lambda t: [c.text for c in chunker.split(t)], corpus, args.repeat)
+
+    try:
+        from llama_index.core.node_parser import SentenceSplitter
+    except ImportError:
+        print("llama_index SentenceSplitter     (not installed, skipped)")
+        return
+
+    splitter = SentenceSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    run("llama_index SentenceSplitter", splitter.split_text, corpus, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
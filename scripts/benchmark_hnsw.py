@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Benchmark HNSW and quantized indexes against the exact scan of the local vector index.
+
+Builds one HNSW index per (M, ef_construction) pair over a synthetic clustered
+dataset, or over embeddings loaded from a ``.npy`` file, and reports recall@k
+and query latency for each ef_search next to the flat (exact) index, and for
+quantized flat indexes. Use it to pick HNSW_M / HNSW_EF_CONSTRUCTION /
+HNSW_EF_SEARCH or QDRANT_QUANTIZATION for a collection.
+
+Usage:
+    python scripts/benchmark_hnsw.py --count 20000 --dimension 384 --m 8 16 --ef-search 32 64 128
+    python scripts/benchmark_hnsw.py --vectors embeddings.npy --queries 500
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from emvr.memory.local_vector_index import LocalVectorIndex  # noqa: E402
+
+
+def build_dataset(count: int, dimension: int, clusters: int, seed: int = 7) -> np.ndarray:
+    """
+    Build a synthetic dataset of Gaussian clusters, which resembles embeddings
+    better than uniform noise.
+
+    Args:
+        count: Number of vectors
+        dimension: Vector dimension
+        clusters: Number of cluster centres
+        seed: Random seed
+
+    Returns:
+        float32 matrix of shape (count, dimension)
+
+    """
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dimension))
+    assignment = rng.integers(0, clusters, size=count)
+    noise = rng.normal(scale=0.6, size=(count, dimension))
+    return (centres[assignment] + noise).astype(np.float32)
+
+
+def time_queries(
+    index: LocalVectorIndex,
+    queries: np.ndarray,
+    k: int,
+    ef: int | None = None,
+) -> tuple[list[set[str]], list[float]]:
+    """Run each query once, returning the hit IDs and latencies in ms."""
+    hits = []
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        result = index.search(query, k, ef)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits.append({point_id for point_id, _ in result})
+    return hits, latencies
+
+
+def recall_at_k(hits: list[set[str]], exact: list[set[str]], k: int) -> float:
+    """Fraction of the exact top-k found, averaged over queries."""
+    return sum(len(h & e) for h, e in zip(hits, exact, strict=True)) / (k * len(exact))
+
+
+def row(name: str, recall: float, latencies: list[float], extra: str = "") -> None:
+    """Print one result row."""
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    print(
+        f"{name:<30} {recall:>8.4f} {statistics.mean(latencies):>9.3f} {p95:>9.3f}  {extra}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vectors", help="Load the dataset from a .npy matrix instead")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--quantization", nargs="*", default=["int8", "pq"])
+    args = parser.parse_args()
+
+    if args.vectors:
+        data = np.load(args.vectors, mmap_mode="r").astype(np.float32)
+    else:
+        data = build_dataset(args.count + args.queries, args.dimension, args.clusters)
+    # Hold out the last rows as queries
+    vectors, queries = data[: -args.queries], data[-args.queries :]
+    ids = [f"p{i}" for i in range(len(vectors))]
+    print(f"Dataset: {len(vectors)} x {vectors.shape[1]}, {len(queries)} queries, k={args.k}\n")
+    print(f"{'index':<30} {'recall':>8} {'mean ms':>9} {'p95 ms':>9}  notes")
+
+    flat = LocalVectorIndex(vectors.shape[1])
+    flat.upsert(ids, vectors)
+    exact, latencies = time_queries(flat, queries, args.k)
+    row("flat (exact)", 1.0, latencies, f"{flat.bytes_per_vector:.0f} B/vector")
+
+    for quantization in args.quantization:
+        index = LocalVectorIndex(vectors.shape[1], quantization=quantization)
+        index.upsert(ids, vectors)
+        hits, latencies = time_queries(index, queries, args.k)
+        row(
+            f"flat {quantization}",
+            recall_at_k(hits, exact, args.k),
+            latencies,
+            f"{index.bytes_per_vector:.0f} B/vector",
+        )
+
+    for m in args.m:
+        for ef_construction in args.ef_construction:
+            index = LocalVectorIndex(
+                vectors.shape[1],
+                index_type="hnsw",
+                hnsw_m=m,
+                hnsw_ef_construction=ef_construction,
+            )
+            started = time.perf_counter()
+            index.upsert(ids, vectors)
+            build = time.perf_counter() - started
+
+            for ef in args.ef_search:
+                hits, latencies = time_queries(index, queries, args.k, ef)
+                row(
+                    f"hnsw M={m} efC={ef_construction} ef={ef}",
+                    recall_at_k(hits, exact, args.k),
+                    latencies,
+                    f"build {build:.1f}s, {index.bytes_per_vector:.0f} B/vector",
+                )
+
+
+if __name__ == "__main__":
+    main()
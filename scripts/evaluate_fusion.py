@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+Evaluate rank fusion strategies on a labelled query set.
+
+Reports nDCG@k and recall@k of every fusion strategy, next to each source
+on its own, so a strategy (RETRIEVAL_FUSION) can be picked per corpus.
+
+Rankings are read from a run file, one JSON object per query and source:
+
+    {"query_id": "q1", "source": "dense", "results": [["doc-1", 0.83], ...]}
+
+or produced from the embedded vector store (dense and BM25 keyword search)
+for a query file, optionally saved as a run file for later comparisons:
+
+    {"query_id": "q1", "query": "what does E-1042 mean", "relevant": {"doc-7": 2}}
+
+Relevance labels map document IDs to graded gains (a plain list of IDs
+counts each as 1) and come from the query file or a separate qrels file
+of ``{"query_id": ..., "relevant": ...}`` lines.
+
+Usage:
+    python scripts/evaluate_fusion.py --queries queries.jsonl --save-runs runs.jsonl
+    python scripts/evaluate_fusion.py --runs runs.jsonl --qrels qrels.jsonl --k 10
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from emvr.retrieval.fusion import FUSION_STRATEGIES, RankedList, fuse  # noqa: E402
+
+# query_id -> source -> ranking
+Runs = dict[str, dict[str, RankedList]]
+
+
+def read_jsonl(path: str) -> list[dict[str, Any]]:
+    """Read a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_labels(records: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    """Relevance labels per query, as graded gains."""
+    labels = {}
+    for record in records:
+        relevant = record.get("relevant") or {}
+        if isinstance(relevant, list):
+            relevant = dict.fromkeys(relevant, 1.0)
+        labels[str(record["query_id"])] = {str(k): float(v) for k, v in relevant.items()}
+    return labels
+
+
+def read_runs(records: list[dict[str, Any]]) -> Runs:
+    """Rankings per query and source from run file records."""
+    runs: Runs = defaultdict(dict)
+    for record in records:
+        runs[str(record["query_id"])][record["source"]] = RankedList.from_pairs(
+            record["source"], ((str(i), s) for i, s in record["results"])
+        )
+    return runs
+
+
+async def retrieve_runs(queries: list[dict[str, Any]], depth: int) -> Runs:
+    """Rank every query with the dense and keyword search of the embedded store."""
+    from emvr.memory.vector_store import QdrantMemoryStore
+
+    store = QdrantMemoryStore()
+    runs: Runs = defaultdict(dict)
+    try:
+        for record in queries:
+            query_id = str(record["query_id"])
+            dense, keyword = await asyncio.gather(
+                store.similarity_search(record["query"], depth),
+                store.keyword_search(record["query"], depth),
+            )
+            for source, results in (("dense", dense), ("keyword", keyword)):
+                runs[query_id][source] = RankedList.from_pairs(
+                    source, ((r["id"], r["score"]) for r in results)
+                )
+    finally:
+        await store.close()
+    return runs
+
+
+def write_runs(runs: Runs, path: str) -> None:
+    """Save rankings as a run file."""
+    with open(path, "w", encoding="utf-8") as f:
+        for query_id, rankings in runs.items():
+            for source, ranking in rankings.items():
+                results = [
+                    [doc_id, None if math.isnan(score) else score]
+                    for doc_id, score in zip(ranking.ids, ranking.scores.tolist(), strict=True)
+                ]
+                f.write(
+                    json.dumps({"query_id": query_id, "source": source, "results": results})
+                    + "\n"
+                )
+
+
+def ndcg_at_k(ranked: list[str], gains: dict[str, float], k: int) -> float:
+    """Normalized discounted cumulative gain of the first k results."""
+    dcg = sum(
+        (2 ** gains.get(doc_id, 0.0) - 1) / math.log2(i + 2) for i, doc_id in enumerate(ranked[:k])
+    )
+    ideal = sorted(gains.values(), reverse=True)[:k]
+    idcg = sum((2**gain - 1) / math.log2(i + 2) for i, gain in enumerate(ideal))
+    return dcg / idcg if idcg > 0 else 0.0
+
+
+def recall_at_k(ranked: list[str], gains: dict[str, float], k: int) -> float:
+    """Fraction of the relevant documents among the first k results."""
+    relevant = {doc_id for doc_id, gain in gains.items() if gain > 0}
+    if not relevant:
+        return 0.0
+    return len(relevant & set(ranked[:k])) / len(relevant)
+
+
+def evaluate(
+    runs: Runs,
+    labels: dict[str, dict[str, float]],
+    k: int,
+    strategies: list[str],
+    weights: dict[str, float],
+) -> dict[str, tuple[float, float]]:
+    """Mean nDCG@k and recall@k per source and per fusion strategy."""
+    totals: dict[str, list[float]] = defaultdict(lambda: [0.0, 0.0])
+    query_ids = [q for q in runs if labels.get(q)]
+    for query_id in query_ids:
+        gains = labels[query_id]
+        rankings = [
+            RankedList(r.source, r.ids, r.scores, weights.get(r.source, 1.0))
+            for r in runs[query_id].values()
+        ]
+        ranked_by = {f"source:{r.source}": list(r.ids) for r in rankings}
+        for strategy in strategies:
+            ranked_by[strategy] = [doc_id for doc_id, _ in fuse(rankings, strategy, top_k=k)]
+        for name, ranked in ranked_by.items():
+            totals[name][0] += ndcg_at_k(ranked, gains, k)
+            totals[name][1] += recall_at_k(ranked, gains, k)
+
+    count = max(1, len(query_ids))
+    return {name: (ndcg / count, recall / count) for name, (ndcg, recall) in totals.items()}
+
+
+def main() -> None:
+    """Run the evaluation."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--runs", help="Run file with per-source rankings")
+    source.add_argument("--queries", help="Query file to rank with the embedded store")
+    parser.add_argument("--qrels", help="Relevance labels (defaults to the query file's)")
+    parser.add_argument("--save-runs", help="Write the retrieved rankings to this run file")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=100, help="Results retrieved per source")
+    parser.add_argument("--strategies", nargs="+", default=list(FUSION_STRATEGIES))
+    parser.add_argument(
+        "--weight",
+        action="append",
+        default=[],
+        metavar="SOURCE=WEIGHT",
+        help="Weight of a source (repeatable, default 1)",
+    )
+    args = parser.parse_args()
+
+    if args.queries:
+        queries = read_jsonl(args.queries)
+        runs = asyncio.run(retrieve_runs(queries, args.depth))
+        labels = read_labels(queries)
+        if args.save_runs:
+            write_runs(runs, args.save_runs)
+    else:
+        runs = read_runs(read_jsonl(args.runs))
+        labels = {}
+    if args.qrels:
+        labels = read_labels(read_jsonl(args.qrels))
+    if not labels:
+        parser.error("No relevance labels: pass --qrels or a query file with 'relevant'")
+
+    weights = {}
+    for item in args.weight:
+        name, _, value = item.partition("=")
+        weights[name] = float(value)
+
+    results = evaluate(runs, labels, args.k, args.strategies, weights)
+    print(f"{len([q for q in runs if labels.get(q)])} labelled queries, k={args.k}\n")
+    print(f"{'ranking':<20} {'nDCG@k':>8} {'recall@k':>9}")
+    for name, (ndcg, recall) in sorted(results.items(), key=lambda item: -item[1][0]):
+        print(f"{name:<20} {ndcg:>8.4f} {recall:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
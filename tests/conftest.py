@@ -46,6 +46,35 @@ class MockSettings:
         self.mcp_host = "localhost"
         self.mcp_port = 8080
         self.openai_model = "gpt-4o"
+        self.neo4j_uri = "bolt://localhost:7687"
+        self.neo4j_username = "neo4j"
+        self.neo4j_password = "password"
+        self.neo4j_batch_size = 1000
+        self.neo4j_page_size = 1000
+        self.neo4j_neighborhood_cache_edges = 1_000_000
+        self.data_dir = "data"
+        self.qdrant_url = "http://localhost:6333"
+        self.qdrant_api_key = None
+        self.qdrant_location = "local"
+        self.qdrant_local_index = None
+        self.hnsw_m = 16
+        self.hnsw_ef_construction = 200
+        self.hnsw_ef_search = 64
+        self.qdrant_quantization = None
+        self.qdrant_pq_subvectors = None
+        self.qdrant_rescore_multiplier = None
+        self.qdrant_payload_indexes = (
+            "source,source_type,file_type,file_path,ingestion_time,tenant_id"
+        )
+        self.qdrant_write_batch_size = 1024
+        self.qdrant_write_flush_ms = 50.0
+        self.qdrant_write_concurrency = 4
+        self.retrieval_cache_size = 1024
+        self.retrieval_cache_ttl = 30.0
+        self.retrieval_semantic_cache_size = 256
+        self.retrieval_semantic_cache_threshold = 0.95
+        self.retrieval_semantic_cache_admit_after = 2
+        self.retrieval_fusion = "rrf"
 
 # Create a mock config module
 fake_config = types.ModuleType('emvr.config')
@@ -83,7 +112,7 @@ retrieval_mock = MagicMock()
 retrieval_mock.initialize = AsyncMock()
 memory_mock = MagicMock()
 memory_mock.initialize = AsyncMock()
-memory_mock.close = MagicMock()
+memory_mock.close = AsyncMock()
 
 # Set up the mocks in their respective modules
 sys.modules['emvr.ingestion.pipeline'].ingestion_pipeline = ingestion_mock
@@ -104,8 +133,8 @@ sys.modules['emvr.agents.tools.ingestion_tools'].get_ingestion_tools = MagicMock
 sys.modules['emvr.agents.tools.memory_tools'].get_memory_tools = MagicMock(return_value=[])
 
 # Database connections
-sys.modules['emvr.core.db_connections'].initialize_connections = MagicMock()
-sys.modules['emvr.core.db_connections'].close_connections = MagicMock()
+sys.modules['emvr.core.db_connections'].initialize_connections = AsyncMock()
+sys.modules['emvr.core.db_connections'].close_connections = AsyncMock()
 
 # Endpoints
 sys.modules['emvr.mcp_server.endpoints'].register_endpoints = AsyncMock()
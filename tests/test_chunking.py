@@ -0,0 +1,64 @@
+"""Tests for the sentence/token-aware text chunker."""
+
+import pytest
+
+from emvr.ingestion.chunking import TextChunker
+
+
+def test_short_text_is_a_single_chunk_with_offsets():
+    """Text under the budget yields one chunk spanning all of its tokens."""
+    text = "  Hello world. How are you?  "
+    chunks = TextChunker(chunk_size=32, chunk_overlap=4).split(text)
+
+    assert len(chunks) == 1
+    assert chunks[0].text == "Hello world. How are you?"
+    assert text[chunks[0].start : chunks[0].end] == chunks[0].text
+
+
+def test_chunks_respect_budget_and_overlap():
+    """Every chunk fits the token budget and consecutive chunks overlap."""
+    text = " ".join(f"word{i}" for i in range(100))
+    chunks = TextChunker(chunk_size=10, chunk_overlap=3).split(text)
+
+    assert all(chunk.token_count <= 10 for chunk in chunks)
+    assert chunks[0].text.split()[-3:] == chunks[1].text.split()[:3]
+    assert chunks[-1].text.endswith("word99")
+    for chunk in chunks:
+        assert text[chunk.start : chunk.end] == chunk.text
+
+
+def test_chunks_prefer_sentence_boundaries():
+    """Chunks close at a sentence end when one falls late enough in the window."""
+    sentence = "alpha beta gamma delta epsilon zeta eta theta."
+    text = " ".join([sentence] * 6)
+    chunks = TextChunker(chunk_size=20, chunk_overlap=0).split(text)
+
+    assert all(chunk.text.endswith(".") for chunk in chunks)
+
+
+def test_invalid_overlap_is_rejected():
+    """Overlap must be smaller than the chunk size."""
+    with pytest.raises(ValueError, match="chunk_overlap"):
+        TextChunker(chunk_size=10, chunk_overlap=10)
+
+
+def test_split_stream_matches_split():
+    """Streaming the text in arbitrary pieces yields the same chunks."""
+    text = "\n\n".join(
+        " ".join(f"Sentence {p}.{s} has a few words in it." for s in range(12)) for p in range(30)
+    )
+    chunker = TextChunker(chunk_size=40, chunk_overlap=5)
+    expected = chunker.split(text)
+
+    for size in (1, 13, 500, len(text)):
+        segments = [text[i : i + size] for i in range(0, len(text), size)]
+        assert list(chunker.split_stream(segments)) == expected
+
+
+def test_split_stream_long_token():
+    """A token spread over many segments is chunked like the whole text."""
+    text = "Start here. " + "x" * 5000 + " and the end."
+    chunker = TextChunker(chunk_size=4, chunk_overlap=1)
+
+    segments = [text[i : i + 7] for i in range(0, len(text), 7)]
+    assert list(chunker.split_stream(segments)) == chunker.split(text)
@@ -0,0 +1,75 @@
+"""Tests for the shared database connection registry."""
+
+import asyncio
+import importlib
+import sys
+
+import pytest
+
+pytest.importorskip("neo4j")
+pytest.importorskip("pydantic_settings")
+
+
+@pytest.fixture
+def db_connections(monkeypatch):
+    """The real module (conftest mocks it and the settings for the server tests)."""
+    monkeypatch.delitem(sys.modules, "emvr.core.db_connections", raising=False)
+    monkeypatch.delitem(sys.modules, "emvr.config", raising=False)
+    return importlib.import_module("emvr.core.db_connections")
+
+
+class _FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def session(self, **kwargs):
+        return _FakeSession()
+
+    async def close(self):
+        self.closed = True
+
+
+def test_drivers_are_shared_per_server(db_connections):
+    """Components asking for the same server get the same pooled driver."""
+    registry = db_connections.ConnectionRegistry()
+    first = registry.neo4j_driver("bolt://graph:7687", "neo4j", "secret")
+    assert registry.neo4j_driver("bolt://graph:7687", "neo4j", "secret") is first
+    assert registry.neo4j_driver("bolt://other:7687", "neo4j", "secret") is not first
+    asyncio.run(registry.close())
+
+
+def test_close_drains_in_flight_sessions(db_connections):
+    """Closing waits for open sessions and refuses new ones."""
+    fake = _FakeDriver()
+    driver = db_connections.TrackedNeo4jDriver(fake)
+    events = []
+
+    async def work():
+        async with driver.session(database="emvr"):
+            await asyncio.sleep(0.05)
+            events.append("work done")
+
+    async def run():
+        task = asyncio.create_task(work())
+        await asyncio.sleep(0)
+        assert driver.in_flight == 1
+        assert await driver.drain(timeout=5)
+        events.append("drained")
+        with pytest.raises(RuntimeError, match="closing"):
+            async with driver.session():
+                pass
+        await driver.close()
+        await task
+
+    asyncio.run(run())
+    assert events == ["work done", "drained"]
+    assert driver.in_flight == 0
+    assert fake.closed
@@ -0,0 +1,97 @@
+"""Tests for the batched embedding engine."""
+
+import asyncio
+import importlib
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydantic_settings")
+
+from emvr.core.embedding_cache import EmbeddingCache  # noqa: E402
+
+
+class _FakeModel:
+    """Stand-in fastembed model recording the batches it embeds."""
+
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts, batch_size):
+        self.batches.append(list(texts))
+        for text in texts:
+            yield _vector(text)
+
+
+def _vector(text):
+    return np.array([len(text), ord(text[0]), 1.0, 2.0], dtype=np.float32)
+
+
+@pytest.fixture
+def make_manager(monkeypatch):
+    """Build real embedding managers over the fake model."""
+    for name in ("emvr.core.embedding", "emvr.config", "emvr.config.settings"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    monkeypatch.setenv("VECTOR_DIMENSION", "4")
+    monkeypatch.setenv("EMBEDDING_CACHE_ENABLED", "false")
+    embedding = importlib.import_module("emvr.core.embedding")
+
+    def make(batch_size=2, cache=None):
+        manager = embedding.EmbeddingManager(model_name="fake", batch_size=batch_size, cache=cache)
+        manager.model = _FakeModel()
+        monkeypatch.setattr(manager, "_load_model", lambda: manager.model)
+        return manager
+
+    return make
+
+
+def test_micro_batches_are_scattered_back_in_order(make_manager):
+    """Texts are embedded in length-sorted batches, yet row i is the vector of texts[i]."""
+    manager = make_manager()
+    texts = ["ccccc", "a", "dddddddd", "bb", "eee"]
+
+    out = asyncio.run(manager.get_embeddings(texts))
+
+    assert out.dtype == np.float32
+    assert out.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(out, np.stack([_vector(text) for text in texts]))
+    assert manager.model.batches == [["a", "bb"], ["eee", "ccccc"], ["dddddddd"]]
+    manager.close()
+
+
+def test_duplicates_and_cache_hits_are_embedded_once(make_manager):
+    """Repeated texts in a request, and texts cached by earlier requests, skip the model."""
+    cache = EmbeddingCache(model_name="fake", memory_budget_bytes=1 << 20)
+    manager = make_manager(cache=cache)
+
+    first = asyncio.run(manager.get_embeddings(["a", "bb", "a"]))
+    second = asyncio.run(manager.get_embeddings(["bb", "ccc", "ccc"]))
+
+    assert sorted(text for batch in manager.model.batches for text in batch) == ["a", "bb", "ccc"]
+    np.testing.assert_array_equal(first[2], _vector("a"))
+    np.testing.assert_array_equal(second, np.stack([_vector(t) for t in ("bb", "ccc", "ccc")]))
+
+    uncached = make_manager()
+    out = asyncio.run(uncached.get_embeddings(["x", "yy", "x"]))
+    assert uncached.model.batches == [["x", "yy"]]
+    np.testing.assert_array_equal(out[2], _vector("x"))
+    uncached.close()
+
+    # The injected cache belongs to the caller and stays open
+    manager.close()
+    assert manager._cache is cache
+    assert cache.key("a") in cache.get_many([cache.key("a")])
+    cache.close()
+
+
+def test_empty_request_returns_an_empty_matrix(make_manager):
+    """No texts give a (0, dimension) matrix without calling the model."""
+    manager = make_manager()
+
+    out = asyncio.run(manager.get_embeddings([]))
+
+    assert out.shape == (0, 4)
+    assert out.dtype == np.float32
+    assert manager.model.batches == []
+    manager.close()
@@ -0,0 +1,68 @@
+"""Tests for the content-addressed embedding cache."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("prometheus_client")
+
+from emvr.core.embedding_cache import EmbeddingCache  # noqa: E402
+
+
+def test_key_normalizes_whitespace_and_includes_model():
+    """Keys ignore whitespace differences but not the model name."""
+    cache = EmbeddingCache("model-a", memory_budget_bytes=1 << 20)
+    other = EmbeddingCache("model-b", memory_budget_bytes=1 << 20)
+
+    assert cache.key("hello   world ") == cache.key("hello world")
+    assert cache.key("hello world") != other.key("hello world")
+
+
+def test_memory_tier_evicts_by_byte_budget():
+    """The LRU tier keeps the most recently used vectors within its budget."""
+    vectors = np.arange(12, dtype=np.float32).reshape(3, 4)
+    keys = [b"a" * 32, b"b" * 32, b"c" * 32]
+    # Room for two 16-byte vectors plus their 32-byte keys
+    cache = EmbeddingCache("model", memory_budget_bytes=2 * (16 + 32))
+
+    cache.put_many(keys, vectors)
+    found = cache.get_many(keys)
+
+    assert set(found) == {keys[1], keys[2]}
+    np.testing.assert_array_equal(found[keys[2]], vectors[2])
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Vectors written to the SQLite tier are served by a new cache instance."""
+    path = str(tmp_path / "cache.sqlite3")
+    vectors = np.ones((2, 4), dtype=np.float32)
+    cache = EmbeddingCache("model", memory_budget_bytes=0, path=path)
+    keys = [cache.key("first"), cache.key("second")]
+    cache.put_many(keys, vectors)
+    cache.close()
+
+    reopened = EmbeddingCache("model", memory_budget_bytes=1 << 20, path=path)
+    found = reopened.get_many(keys)
+
+    assert set(found) == set(keys)
+    np.testing.assert_array_equal(found[keys[0]], vectors[0])
+
+
+def test_disk_tier_evicts_least_recently_used_rows(tmp_path):
+    """The SQLite tier stays within its byte budget, keeping recently read rows."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache("model", memory_budget_bytes=0, path=path, disk_budget_bytes=64 * 1024)
+    rng = np.random.default_rng(0)
+    first = [cache.key("first")]
+    cache.put_many(first, rng.normal(size=(1, 256)).astype(np.float32))
+
+    for batch in range(40):
+        keys = [cache.key(f"{batch}-{i}") for i in range(8)]
+        cache.put_many(keys, rng.normal(size=(8, 256)).astype(np.float32))
+        assert set(cache.get_many(first)) == set(first)
+
+    page_size = cache._db.execute("PRAGMA page_size").fetchone()[0]
+    pages = cache._db.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = cache._db.execute("PRAGMA freelist_count").fetchone()[0]
+    assert (pages - free_pages) * page_size <= 64 * 1024 + 8 * 1024
+    assert cache.get_many([cache.key("0-0")]) == {}
+    cache.close()
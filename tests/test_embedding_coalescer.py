@@ -0,0 +1,52 @@
+"""Tests for the embedding request coalescer."""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emvr.core.embedding_coalescer import EmbeddingCoalescer  # noqa: E402
+
+
+def _recording_embedder(calls: list[list[str]]):
+    async def embed_many(texts: list[str]) -> np.ndarray:
+        calls.append(list(texts))
+        await asyncio.sleep(0)
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    return embed_many
+
+
+def test_concurrent_calls_share_batches_and_deduplicate():
+    """Concurrent callers are batched and identical texts are embedded once."""
+    calls: list[list[str]] = []
+
+    async def run() -> list[np.ndarray]:
+        coalescer = EmbeddingCoalescer(_recording_embedder(calls), max_batch_size=3)
+        texts = ["a", "bb", "a", "ccc", "dddd", "a"]
+        return await asyncio.gather(*(coalescer.embed(text) for text in texts))
+
+    results = asyncio.run(run())
+
+    assert [float(r[0]) for r in results] == [1.0, 2.0, 1.0, 3.0, 4.0, 1.0]
+    assert calls == [["a", "bb", "ccc"], ["dddd"]]
+
+
+def test_batch_failure_propagates_to_every_caller():
+    """An error from the batch function is raised in each waiting caller."""
+
+    async def failing(texts: list[str]) -> np.ndarray:
+        raise RuntimeError("model unavailable")
+
+    async def run() -> list[object]:
+        coalescer = EmbeddingCoalescer(failing)
+        return await asyncio.gather(
+            coalescer.embed("x"),
+            coalescer.embed("y"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,49 @@
+"""Tests for the scandir-based file walker."""
+
+import os
+
+from emvr.ingestion.loaders.file_loaders import FileLoader
+
+
+def _write(path, text: str = "hello") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_scan_files_filters(tmp_path):
+    """Extension, hidden, glob and size filters are all applied."""
+    _write(tmp_path / "a.md")
+    _write(tmp_path / "b.TXT")
+    _write(tmp_path / "big.txt", "x" * 100)
+    _write(tmp_path / "skip.py")
+    _write(tmp_path / ".hidden" / "c.md")
+    _write(tmp_path / "sub" / "d.md")
+    _write(tmp_path / "node_modules" / "e.md")
+
+    loader = FileLoader()
+    found = loader.find_files(
+        str(tmp_path),
+        file_extensions=[".md", "txt"],
+        exclude_patterns=["node_modules"],
+        max_file_size=50,
+    )
+    relative = [os.path.relpath(path, tmp_path) for path in found]
+
+    assert relative == ["a.md", "b.TXT", os.path.join("sub", "d.md")]
+
+    only_sub = loader.find_files(str(tmp_path), include_patterns=["sub/*.md"])
+    assert [os.path.relpath(path, tmp_path) for path in only_sub] == [os.path.join("sub", "d.md")]
+
+
+def test_iter_documents_preserves_order(tmp_path):
+    """Files read concurrently are yielded in input order."""
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"{i:02d}.txt"
+        _write(path, f"doc {i}")
+        paths.append(str(path))
+
+    documents = list(FileLoader().iter_documents(paths, {"tag": "t"}, max_workers=3))
+
+    assert [doc["text"] for doc in documents] == [f"doc {i}" for i in range(20)]
+    assert all(doc["metadata"]["tag"] == "t" for doc in documents)
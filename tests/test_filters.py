@@ -0,0 +1,117 @@
+"""Tests for metadata filters and filtered vector search."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emvr.memory import local_vector_index  # noqa: E402
+from emvr.memory.filters import And, Eq, Not, Prefix, Range, matches, parse_filter  # noqa: E402
+from emvr.memory.local_vector_index import LocalVectorIndex  # noqa: E402
+
+
+def test_parse_and_match():
+    """Dict filters parse into expressions that evaluate against payloads."""
+    expression = parse_filter(
+        {
+            "source": {"$in": ["a", "b"]},
+            "year": {"$gte": 2020, "$lt": 2024},
+            "$not": {"path": {"$prefix": "/tmp/"}},
+        },
+        prefix="metadata.",
+    )
+    assert isinstance(expression, And)
+    assert Range("metadata.year", gte=2020, lt=2024) in expression.clauses
+    assert Not(Prefix("metadata.path", "/tmp/")) in expression.clauses
+
+    payload = {"metadata": {"source": "b", "year": 2021, "path": "/data/x"}}
+    assert matches(expression, payload)
+    assert not matches(expression, {"metadata": {**payload["metadata"], "year": 2024}})
+    assert not matches(expression, {"metadata": {**payload["metadata"], "path": "/tmp/x"}})
+    assert matches(parse_filter({"tags": "x"}), {"tags": ["y", "x"]})
+    assert parse_filter({"tags": "x"}) == Eq("tags", "x")
+
+    with pytest.raises(ValueError, match="Unknown"):
+        parse_filter({"source": {"$regex": "a"}})
+
+
+@pytest.mark.parametrize(
+    ("options", "max_rows"),
+    [({}, 20000), ({"quantization": "int8"}, 20000), ({"index_type": "hnsw"}, 0)],
+)
+def test_filtered_search_matches_brute_force(monkeypatch, options, max_rows):
+    """Filtered top-k equals an exhaustive scan of the matching points."""
+    monkeypatch.setattr(local_vector_index, "_PREFILTER_MAX_ROWS", max_rows)
+    if "index_type" in options:
+        options = {**options, "hnsw_m": 8, "hnsw_ef_construction": 64}
+
+    rng = np.random.default_rng(0)
+    count = 1500
+    vectors = rng.normal(size=(count, 16)).astype(np.float32)
+    ids = [f"p{i}" for i in range(count)]
+    payloads = [
+        {"source": f"s{i % 5}", "year": 2000 + i % 30, "note": "odd" if i % 2 else "even"}
+        for i in range(count)
+    ]
+
+    index = LocalVectorIndex(16, indexed_fields=["source", "year"], **options)
+    index.upsert(ids, vectors, payloads)
+    query = rng.normal(size=16).astype(np.float32)
+    # Build the payload index, then change the data underneath it
+    index.search(query, 5, filter=Eq("source", "s1"))
+    index.delete(ids[:300])
+    payloads[1000] = {"source": "s9", "year": 1990, "note": "odd"}
+    index.upsert([ids[1000]], vectors[1000:1001], [payloads[1000]])
+
+    filters = [
+        {"source": "s1"},
+        {"source": {"$in": ["s2", "s9"]}, "year": {"$lt": 2010}},
+        {"$or": [{"year": {"$gte": 2025}}, {"source": {"$ne": "s0"}}]},
+        {"source": "s3", "note": "odd"},
+        {"note": {"$prefix": "ev"}},
+    ]
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    for spec in filters:
+        expression = parse_filter(spec)
+        live = [i for i in range(300, count) if matches(expression, payloads[i])]
+        exact = [ids[i] for i in sorted(live, key=lambda i: -scores[i])[:10]]
+        hits = [point_id for point_id, _ in index.search(query, 10, filter=expression)]
+        if "index_type" in options:
+            assert len(set(hits) & set(exact)) >= 9
+            assert all(matches(expression, payloads[int(h[1:])]) for h in hits)
+        else:
+            assert hits == exact
+
+
+def test_to_qdrant_translation():
+    """Expressions become Qdrant filters; float equality becomes a closed range."""
+    models = pytest.importorskip("qdrant_client.models")
+    from emvr.memory.filters import to_qdrant
+
+    translated = to_qdrant(
+        parse_filter(
+            {
+                "source": {"$in": ["a", "b"]},
+                "score": {"$eq": 1.5},
+                "ingestion_time": {"$gte": "2024-01-01T00:00:00Z"},
+                "$not": {"page": 3},
+            },
+            prefix="metadata.",
+        )
+    )
+
+    source, score, ingestion_time, negated = translated.must
+    assert source == models.FieldCondition(
+        key="metadata.source", match=models.MatchAny(any=["a", "b"])
+    )
+    assert score == models.FieldCondition(
+        key="metadata.score", range=models.Range(gte=1.5, lte=1.5)
+    )
+    assert isinstance(ingestion_time.range, models.DatetimeRange)
+    assert negated.must_not == [
+        models.FieldCondition(key="metadata.page", match=models.MatchValue(value=3))
+    ]
+    assert to_qdrant(None) is None
+    assert len(to_qdrant(parse_filter({"t": {"$in": [1.5, 2]}})).must[0].should) == 2
+    with pytest.raises(ValueError, match="prefix"):
+        to_qdrant(parse_filter({"path": {"$prefix": "/tmp/"}}))
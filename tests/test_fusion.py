@@ -0,0 +1,34 @@
+"""Tests for rank fusion strategies."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emvr.retrieval.fusion import RankedList, fuse, normalize_scores  # noqa: E402
+
+
+def test_rrf_rewards_agreement_and_respects_weights():
+    """Documents ranked by both sources win; weights shift the rest."""
+    dense = RankedList.from_pairs("dense", [("a", 0.9), ("b", 0.8), ("c", 0.1)])
+    keyword = RankedList.from_pairs("keyword", [("c", 14.0), ("d", 9.0)], weight=2.0)
+
+    fused = fuse([dense, keyword], "rrf", rrf_k=60)
+    assert [doc_id for doc_id, _ in fused] == ["c", "d", "a", "b"]
+    assert fused[0][1] == pytest.approx(1 / 63 + 2 / 61)
+    assert fuse([dense, keyword], "rrf", top_k=2) == fused[:2]
+    assert [doc_id for doc_id, _ in fuse([dense, keyword], "rrf", depth=1)] == ["c", "a"]
+
+
+def test_score_normalizations():
+    """Scores are calibrated per list; missing scores count as the weakest."""
+    scores = np.array([10.0, 5.0, np.nan, 0.0])
+    assert normalize_scores(scores, "minmax").tolist() == [1.0, 0.5, 0.0, 0.0]
+    assert normalize_scores(scores, "zscore")[[0, 2, 3]] == pytest.approx([2.4494897, 0, 0])
+    assert normalize_scores(np.array([3.0, 3.0]), "dbsf").tolist() == [1.0, 1.0]
+
+    dense = RankedList.from_pairs("dense", [("a", 0.9), ("b", 0.8), ("c", 0.1)])
+    keyword = RankedList.from_pairs("keyword", [("b", 40.0), ("c", 10.0), ("d", 5.0)])
+    for strategy in ("minmax", "zscore", "dbsf"):
+        assert fuse([dense, keyword], strategy)[0][0] == "b"
+    with pytest.raises(ValueError, match="Unknown fusion strategy"):
+        fuse([dense], "borda")
@@ -0,0 +1,61 @@
+"""Tests for the parameterized Cypher templates of the graph retriever."""
+
+import asyncio
+import importlib
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+_INJECTION = '"}) DETACH DELETE n //'
+
+
+@pytest.fixture
+def graph_retriever(monkeypatch):
+    """The real graph retriever module (the test configuration mocks it)."""
+    monkeypatch.delitem(sys.modules, "emvr.retrievers.graph_retriever", raising=False)
+    return importlib.import_module("emvr.retrievers.graph_retriever")
+
+
+@pytest.mark.parametrize(
+    ("query", "template"),
+    [
+        (f"What is related to {_INJECTION}", "related_to"),
+        (f"Who is {_INJECTION}", "who_is"),
+        (_INJECTION, "name_search"),
+    ],
+)
+def test_user_text_only_reaches_the_parameters(graph_retriever, query, template):
+    """Injected Cypher is passed as a parameter and never spliced into the query."""
+    retriever = graph_retriever.GraphRetriever()
+    retriever._graphiti = MagicMock()
+    retriever._graphiti.execute_cypher = AsyncMock(return_value={"success": True, "records": []})
+    retriever._initialized = True
+
+    asyncio.run(retriever.retrieve(query))
+
+    cypher, parameters = retriever._graphiti.execute_cypher.await_args.args
+    assert cypher == graph_retriever.compile_template(template)
+    assert "DETACH" not in cypher
+    assert any("DETACH DELETE" in str(value) for value in parameters.values())
+
+
+def test_compiled_templates_are_reused(graph_retriever):
+    """Each shape compiles to one identical string, with or without a relation filter."""
+    compile_template = graph_retriever.compile_template
+
+    for name in graph_retriever.CYPHER_TEMPLATES:
+        assert compile_template(name) is compile_template(name)
+        assert compile_template(name, filter_relations=True) is compile_template(
+            name, filter_relations=True
+        )
+    assert "$relation_types" in compile_template("related_to", filter_relations=True)
+    assert "$relation_types" not in compile_template("related_to")
+
+
+def test_unknown_template_is_rejected(graph_retriever):
+    """Only the known query shapes can be compiled."""
+    with pytest.raises(ValueError, match="Unknown Cypher template"):
+        graph_retriever.compile_template("drop_everything")
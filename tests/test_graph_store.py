@@ -0,0 +1,317 @@
+"""Tests for the Neo4j graph store (writes, schema, search, paging, caching, expansion)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("neo4j")
+pytest.importorskip("dotenv")
+
+from neo4j.exceptions import Neo4jError  # noqa: E402
+
+from emvr.memory.base import Entity, Relation  # noqa: E402
+from emvr.memory.graph_store import Neo4jMemoryStore, escape_fulltext  # noqa: E402
+
+
+class _FakeResult:
+    def __init__(self, records):
+        self._records = records
+
+    async def consume(self):
+        return None
+
+    async def data(self):
+        return self._records
+
+
+class _FakeTransaction:
+    def __init__(self, calls):
+        self._calls = calls
+
+    async def run(self, query, parameters=None, **kwargs):
+        params = {**(parameters or {}), **kwargs}
+        self._calls.append((query, params))
+        rows = params["rows"]
+        if "count(o)" in query:
+            return _FakeResult([{"added": len(rows)}])
+        return _FakeResult([dict(row) for row in rows])
+
+
+class _FakeSession:
+    def __init__(self, calls):
+        self._calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **kwargs):
+        self._calls.append((query, kwargs))
+        if "CONSTRAINT" in query:
+            msg = "duplicate names"
+            raise Neo4jError(msg)
+        return _FakeResult([])
+
+    async def execute_write(self, work, *args):
+        return await work(_FakeTransaction(self._calls), *args)
+
+
+class _FakeDriver:
+    def __init__(self):
+        self.calls = []
+        self.sessions = 0
+
+    def session(self, database=None):
+        self.sessions += 1
+        return _FakeSession(self.calls)
+
+
+def _store(batch_size):
+    store = Neo4jMemoryStore(batch_size=batch_size)
+    store.driver = _FakeDriver()
+    return store
+
+
+def test_create_entities_sends_batched_unwind():
+    """Entities are written in one session with one UNWIND per batch."""
+    store = _store(batch_size=2)
+    entities = [
+        Entity(name=f"e{i}", entity_type="Thing", observations=["a", "b"]) for i in range(5)
+    ]
+
+    result = asyncio.run(store.create_entities(entities))
+
+    assert store.driver.sessions == 1
+    assert [len(params["rows"]) for _, params in store.driver.calls] == [2, 2, 1]
+    assert all("UNWIND $rows" in query for query, _ in store.driver.calls)
+    assert [entity["name"] for entity in result["created"]] == [f"e{i}" for i in range(5)]
+
+
+def test_relations_and_observations_are_batched():
+    """Relations and observations go through the same batched writes."""
+    store = _store(batch_size=3)
+    relations = [
+        Relation(from_entity="a", relation_type="knows", to_entity=f"b{i}") for i in range(4)
+    ]
+
+    asyncio.run(store.create_relations(relations))
+    added = asyncio.run(store.add_observations("a", ["x", "y", "z", "w"]))
+
+    assert [len(params["rows"]) for _, params in store.driver.calls] == [3, 1, 3, 1]
+    assert store.driver.calls[-1][1]["entity_name"] == "a"
+    assert added == {"entity": "a", "added_observations": 4}
+    assert asyncio.run(store.create_entities([])) == {"created": []}
+
+
+def test_ensure_schema_continues_after_failed_statement():
+    """A failing constraint does not stop the indexes from being created."""
+    store = _store(batch_size=10)
+
+    asyncio.run(store.ensure_schema())
+
+    queries = [query for query, _ in store.driver.calls]
+    assert len(queries) == 4
+    assert sum("FULLTEXT" in query for query in queries) == 2
+
+
+def test_fulltext_query_is_escaped():
+    """Lucene syntax in user queries is taken literally."""
+    assert escape_fulltext(' neo4j:5 (beta) AND "x" ') == r'neo4j\:5 \(beta\) and \"x\"'
+    blank = asyncio.run(_store(batch_size=10).search_nodes("   "))
+    assert blank == {"query": "   ", "entities": []}
+
+
+class _FakeRecords:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+
+class _FakeGraphDriver:
+    """Serves entity pages of an in-memory graph, in name order."""
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        self.pages = []
+
+    def session(self, database=None):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, parameters=None, **kwargs):
+        params = {**(parameters or {}), **kwargs}
+        after = params["after"] if "e.name > $after" in query else None
+        self.pages.append(after)
+        names = [name for name in self.names if after is None or name > after]
+        return _FakeRecords(
+            [
+                {
+                    "name": name,
+                    "entity_type": "Thing",
+                    "observations": [f"about {name}"],
+                    "relations": [{"relation": "next", "to": f"{name}+"}],
+                }
+                for name in names[: params["limit"]]
+            ]
+        )
+
+
+def test_read_graph_pages_with_keyset_cursor(tmp_path):
+    """Pages seek past the previous page's last name; exports stream every page."""
+    from emvr.memory.graph_export import export_graph
+
+    store = Neo4jMemoryStore(page_size=2)
+    store.driver = _FakeGraphDriver(["c", "a", "e", "b", "d"])
+
+    page = asyncio.run(store.read_graph_page(limit=2))
+    assert [entity["name"] for entity in page["entities"]] == ["a", "b"]
+    assert page["relations"][0] == {"from": "a", "relation": "next", "to": "a+"}
+    assert page["next_cursor"] == "b"
+
+    graph = asyncio.run(store.read_graph())
+    assert [entity["name"] for entity in graph["entities"]] == ["a", "b", "c", "d", "e"]
+    assert len(graph["relations"]) == 5
+    assert store.driver.pages[1:] == [None, "b", "d"]
+
+    path = tmp_path / "graph.ndjson"
+    result = asyncio.run(export_graph(store.iter_graph(), str(path)))
+    lines = path.read_text().splitlines()
+    assert result["entities"] == 5
+    assert result["relations"] == 5
+    assert len(lines) == 10
+    assert '"type": "relation"' in lines[2]
+    with pytest.raises(ValueError, match="Unknown export format"):
+        asyncio.run(export_graph(store.iter_graph(), str(path), "csv"))
+
+
+def test_relation_writes_invalidate_the_neighborhood_cache():
+    """Writes drop the cached neighbors of the entities they touch."""
+    from emvr.memory.neighborhood_cache import NeighborhoodCache
+
+    store = Neo4jMemoryStore(batch_size=10, neighborhood_cache=NeighborhoodCache())
+    store.driver = _FakeDriver()
+    cache = store.neighborhood_cache
+    for name in ("a", "b", "c"):
+        cache.put(name, [("knows", "d", True)], cache.generation)
+
+    relation = Relation(from_entity="a", to_entity="b", relation_type="x")
+    asyncio.run(store.create_relations([relation]))
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == [("knows", "d", True)]
+
+    asyncio.run(store.delete_entities(["d"]))
+    assert cache.get("c") is None
+
+
+class _FakeAdjacencyDriver:
+    """Serves adjacency and entity rows of an in-memory graph, recording each query."""
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.calls = []
+
+    def session(self, database=None):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, parameters=None, **kwargs):
+        params = {**(parameters or {}), **kwargs}
+        names = [name for name in params["names"] if name != "x"]
+        self.calls.append(sorted(params["names"]))
+        if "startNode(r)" in query:
+            return _FakeRecords(
+                [
+                    {
+                        "name": name,
+                        "edges": [[r, b, True] for a, r, b in self.edges if a == name]
+                        + [[r, a, False] for a, r, b in self.edges if b == name],
+                    }
+                    for name in names
+                ]
+            )
+        return _FakeRecords(
+            [
+                {
+                    "name": name,
+                    "entity_type": "Thing",
+                    "observations": [],
+                    "relations": [
+                        {"relation": r, "to": b}
+                        for a, r, b in self.edges
+                        if a == name and b in params["targets"]
+                    ],
+                }
+                for name in sorted(names)
+            ]
+        )
+
+
+def test_expand_entities_merges_seeds_with_provenance():
+    """Seeds expand per hop in shared batches; shared entities list every seed reaching them."""
+    from emvr.memory.neighborhood_cache import NeighborhoodCache
+
+    store = Neo4jMemoryStore(neighborhood_cache=NeighborhoodCache())
+    # a -> c <- b, c -> d, a -> e
+    store.driver = _FakeAdjacencyDriver(
+        [("a", "knows", "c"), ("b", "knows", "c"), ("c", "likes", "d"), ("a", "knows", "e")]
+    )
+
+    result = asyncio.run(
+        store.expand_entities(["a", "b", "a", "x"], hops=2, limit_per_entity=2)
+    )
+
+    # One adjacency query per hop for all seeds (a is full after one hop),
+    # then one read of the subgraph
+    assert store.driver.calls == [["a", "b", "x"], ["c"], ["a", "b", "c", "d", "e", "x"]]
+    names = [entity["name"] for entity in result["entities"]]
+    assert names == ["a", "b", "c", "e", "d"]
+    by_name = {entity["name"]: entity for entity in result["entities"]}
+    assert by_name["c"]["reached_from"] == [{"seed": "a", "depth": 1}, {"seed": "b", "depth": 1}]
+    assert by_name["d"]["reached_from"] == [{"seed": "b", "depth": 2}]
+    assert {"from": "b", "relation": "knows", "to": "c"} in result["relations"]
+    assert result["missing"] == ["x"]
+
+    liked = asyncio.run(store.expand_entities(["c"], hops=1, relation_types=["likes"]))
+    assert [entity["name"] for entity in liked["entities"]] == ["c", "d"]
+    assert liked["relations"] == [{"from": "c", "relation": "likes", "to": "d"}]
+    with pytest.raises(ValueError, match="hops must be at least 1"):
+        asyncio.run(store.expand_entities(["a"], hops=0))
+
+
+def test_store_reads_its_settings(monkeypatch):
+    """Connection and batching defaults come from the settings, arguments win."""
+    import emvr.memory.graph_store as graph_store
+
+    settings = SimpleNamespace(
+        neo4j_uri="bolt://graph:7687",
+        neo4j_username="reader",
+        neo4j_password="secret",
+        neo4j_batch_size=250,
+        neo4j_page_size=100,
+    )
+    monkeypatch.setattr(graph_store, "get_settings", lambda: settings)
+
+    store = Neo4jMemoryStore()
+    assert (store.uri, store.username, store.password) == ("bolt://graph:7687", "reader", "secret")
+    assert (store.batch_size, store.page_size) == (250, 100)
+    assert Neo4jMemoryStore(batch_size=10).batch_size == 10
@@ -0,0 +1,57 @@
+"""Tests for the HNSW graph index."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emvr.memory.local_vector_index import LocalVectorIndex  # noqa: E402
+
+
+def _recall(index, vectors, ids, queries, k):
+    live = np.array([i for i, point_id in enumerate(ids) if point_id in index])
+    normalized = vectors[live] / np.linalg.norm(vectors[live], axis=1, keepdims=True)
+    found = 0
+    for query in queries:
+        exact = {ids[live[i]] for i in np.argsort(-(normalized @ query))[:k]}
+        found += len(exact & {point_id for point_id, _ in index.search(query, k)})
+    return found / (k * len(queries))
+
+
+def test_hnsw_recall_with_tombstones():
+    """The graph finds nearly all exact neighbours and never returns deleted points."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 16)).astype(np.float32)
+    ids = [f"p{i}" for i in range(2000)]
+    queries = rng.normal(size=(50, 16)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    index = LocalVectorIndex(16, index_type="hnsw", hnsw_m=8, hnsw_ef_construction=64)
+    index.upsert(ids, vectors)
+    index.delete(ids[::3])
+
+    assert len(index) == 2000 - len(ids[::3])
+    assert _recall(index, vectors, ids, queries, 10) >= 0.9
+    deleted = set(ids[::3])
+    assert not any(point_id in deleted for q in queries for point_id, _ in index.search(q, 10))
+
+
+def test_hnsw_persists_and_resumes(tmp_path):
+    """A reopened HNSW index keeps its type and graph and accepts new inserts."""
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(1200, 8)).astype(np.float32)
+    ids = [f"p{i}" for i in range(1200)]
+
+    index = LocalVectorIndex(8, str(tmp_path), index_type="hnsw", hnsw_m=8, hnsw_ef_construction=64)
+    index.upsert(ids[:1000], vectors[:1000])
+    index.upsert(["p0"], vectors[1:2])
+    before = index.search(vectors[7], 5)
+    index.close()
+
+    reopened = LocalVectorIndex(None, str(tmp_path), index_type="flat")
+
+    assert reopened.index_type == "hnsw"
+    assert len(reopened) == 1000
+    assert reopened.search(vectors[7], 5) == before
+
+    reopened.upsert(ids[1000:], vectors[1000:])
+    assert reopened.search(vectors[1100], 1)[0][0] == "p1100"
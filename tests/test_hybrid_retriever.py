@@ -0,0 +1,51 @@
+"""Tests for the hybrid keyword + dense retriever."""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("dotenv")
+
+import emvr.memory.vector_store as vector_store  # noqa: E402
+from emvr.memory.vector_store import QdrantMemoryStore  # noqa: E402
+from emvr.retrieval.hybrid_retriever import HybridRetriever  # noqa: E402
+
+
+class _FakeEmbeddings:
+    """Embeds every query to the same vector, whatever its text."""
+
+    def __init__(self, vector):
+        self.vector = vector
+
+    async def embed(self, text):
+        return self.vector
+
+
+def test_exact_identifier_is_found(monkeypatch, tmp_path):
+    """An error code the dense search ranks last is found by the keyword side."""
+    vectors = np.random.default_rng(0).standard_normal((50, 8)).astype(np.float32)
+    # The matching chunk points away from the query embedding
+    vectors[37] = -vectors[0]
+    monkeypatch.setattr(vector_store, "embedding_manager", _FakeEmbeddings(vectors[0]))
+    store = QdrantMemoryStore(location="local", path=str(tmp_path / "vectors"))
+    texts = [f"Note {i} about deployment and configuration." for i in range(50)]
+    texts[37] = "The upload fails with ERR_4021 when the token has expired."
+    asyncio.run(
+        store.upsert_many(
+            [f"c{i}" for i in range(50)],
+            vectors,
+            [{"text": text, "metadata": {"source": "notes"}} for text in texts],
+        )
+    )
+
+    hybrid = asyncio.run(HybridRetriever(vector_store=store).retrieve("ERR_4021", top_k=3))
+    dense = asyncio.run(
+        HybridRetriever(vector_store=store, use_keywords=False).retrieve("ERR_4021", top_k=3)
+    )
+    asyncio.run(store.close())
+
+    assert "c37" in [result.id for result in hybrid]
+    assert "c37" not in [result.id for result in dense]
+    assert all(result.metadata == {"source": "notes"} for result in hybrid)
@@ -0,0 +1,54 @@
+"""Tests for the incremental ingestion manifest."""
+
+import os
+
+from emvr.ingestion.manifest import IngestionManifest, ManifestEntry
+
+
+def _entry(path: str) -> ManifestEntry:
+    return ManifestEntry(
+        path=path,
+        mtime_ns=1,
+        size=2,
+        content_hash="abc",
+        chunk_ids=["c1", "c2"],
+        entity_names=["File: a.txt"],
+    )
+
+
+def test_entries_round_trip_across_reopen(tmp_path):
+    """Entries are persisted and read back intact."""
+    path = str(tmp_path / "manifest.sqlite3")
+    manifest = IngestionManifest(path)
+    manifest.put(_entry("/docs/a.txt"), run_id=1)
+    manifest.close()
+
+    reopened = IngestionManifest(path)
+
+    assert reopened.get("/docs/a.txt") == _entry("/docs/a.txt")
+    assert reopened.get("/docs/missing.txt") is None
+
+
+def test_unseen_entries_are_scoped_to_directory_and_run(tmp_path):
+    """Only files under the directory that the run did not touch are unseen."""
+    manifest = IngestionManifest(str(tmp_path / "manifest.sqlite3"))
+    for path in ("/docs/a.txt", "/docs/sub/b.txt", "/docs2/c.txt"):
+        manifest.put(_entry(path), run_id=1)
+
+    manifest.touch("/docs/a.txt", run_id=2)
+    unseen = [entry.path for entry in manifest.iter_unseen("/docs", run_id=2)]
+
+    assert unseen == [os.path.join("/docs", "sub", "b.txt")]
+
+
+def test_shared_entity_names_are_found(tmp_path):
+    """An entity name is in use while a file other than the excluded ones references it."""
+    manifest = IngestionManifest(str(tmp_path / "manifest.sqlite3"))
+    manifest.put(_entry("/a/a.txt"), run_id=1)
+    manifest.put(_entry("/b/a.txt"), run_id=1)
+
+    assert manifest.entity_names_in_use(["File: a.txt"], ["/a/a.txt"]) == {"File: a.txt"}
+    assert manifest.entity_names_in_use(["File: a.txt"], ["/a/a.txt", "/b/a.txt"]) == set()
+
+    manifest.delete(["/b/a.txt"])
+    assert manifest.entity_names_in_use(["File: a.txt"], ["/a/a.txt"]) == set()
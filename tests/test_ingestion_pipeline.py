@@ -0,0 +1,135 @@
+"""Tests for incremental directory re-ingestion."""
+
+import asyncio
+import importlib
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("neo4j")
+
+
+class _FakeEmbeddings:
+    """Deterministic embeddings that count the texts embedded."""
+
+    def __init__(self):
+        self.texts = []
+
+    async def get_embeddings(self, texts):
+        self.texts.extend(texts)
+        rng = [np.random.default_rng(abs(hash(text)) % 2**32) for text in texts]
+        return np.array([r.standard_normal(8) for r in rng], dtype=np.float32)
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """The real pipeline over the embedded vector index and a mocked graph store."""
+    for name in ("emvr.ingestion.pipeline", "emvr.memory.memory_manager", "emvr.config"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    pipeline_module = importlib.import_module("emvr.ingestion.pipeline")
+    from emvr.ingestion.manifest import IngestionManifest
+    from emvr.memory.memory_manager import MemoryManager
+    from emvr.memory.vector_store import QdrantMemoryStore
+
+    graph_store = MagicMock()
+    graph_store.create_entities = AsyncMock()
+    graph_store.delete_entities = AsyncMock()
+
+    instance = pipeline_module.IngestionPipeline()
+    instance._embedding_manager = _FakeEmbeddings()
+    instance._memory_manager = MemoryManager(
+        vector_store=QdrantMemoryStore(location="local", path=str(tmp_path / "vectors")),
+        graph_store=graph_store,
+    )
+    instance._manifest = IngestionManifest(str(tmp_path / "manifest.sqlite3"))
+    instance._initialized = True
+    yield instance
+    asyncio.run(instance._memory_manager.vector_store.close())
+    instance._manifest.close()
+
+
+def _vector_count(pipeline):
+    return len(pipeline._memory_manager.vector_store._get_local_index())
+
+
+def _deleted_entities(pipeline):
+    delete = pipeline._memory_manager.graph_store.delete_entities
+    return [name for call in delete.await_args_list for name in call.args[0]]
+
+
+def test_reingest_skips_replaces_and_purges(pipeline, tmp_path):
+    """Unchanged files are skipped, modified ones replaced and deleted ones purged."""
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "a.md").write_text("Alpha document about graphs.")
+    (docs / "b.md").write_text("Beta document about vectors.")
+    (docs / "sub" / "c.txt").write_text("Gamma notes.")
+
+    first = asyncio.run(pipeline.ingest_directory(str(docs)))
+    assert first["files_processed"] == 3
+    assert _vector_count(pipeline) == 3
+
+    embedded = len(pipeline._embedding_manager.texts)
+    again = asyncio.run(pipeline.ingest_directory(str(docs)))
+    assert again["files_unchanged"] == 3
+    assert len(pipeline._embedding_manager.texts) == embedded
+
+    (docs / "a.md").write_text("Alpha document, rewritten.")
+    modified = asyncio.run(pipeline.ingest_directory(str(docs)))
+    assert modified["files_processed"] == 1
+    assert modified["chunks_deleted"] == 1
+    assert _vector_count(pipeline) == 3
+
+    (docs / "b.md").unlink()
+    deleted = asyncio.run(pipeline.ingest_directory(str(docs)))
+    assert deleted["files_deleted"] == 1
+    assert _vector_count(pipeline) == 2
+    assert "File: b.md" in _deleted_entities(pipeline)
+
+
+def test_narrower_selection_keeps_unselected_files(pipeline, tmp_path):
+    """Files left out by a filtered re-run still exist, so their data is kept."""
+    docs = tmp_path / "docs"
+    (docs / "sub").mkdir(parents=True)
+    (docs / "a.md").write_text("Alpha document.")
+    (docs / "b.md").write_text("Beta document.")
+    (docs / "sub" / "c.txt").write_text("Gamma notes.")
+    asyncio.run(pipeline.ingest_directory(str(docs)))
+
+    for options in (
+        {"file_extensions": [".txt"]},
+        {"recursive": False},
+        {"exclude_patterns": ["*.md"]},
+        {"max_file_size": 1},
+    ):
+        result = asyncio.run(pipeline.ingest_directory(str(docs), **options))
+        assert result.get("files_deleted", 0) == 0, options
+
+    assert _vector_count(pipeline) == 3
+    assert _deleted_entities(pipeline) == []
+
+
+def test_same_named_files_share_their_entity(pipeline, tmp_path):
+    """Removing one of two same-named files keeps the entity the other still uses."""
+    docs = tmp_path / "docs"
+    for folder in ("a", "b"):
+        (docs / folder).mkdir(parents=True)
+        (docs / folder / "README.md").write_text(f"Readme of {folder}.")
+    asyncio.run(pipeline.ingest_directory(str(docs)))
+
+    (docs / "a" / "README.md").write_text("Readme of a, rewritten.")
+    asyncio.run(pipeline.ingest_directory(str(docs)))
+    (docs / "a" / "README.md").unlink()
+    result = asyncio.run(pipeline.ingest_directory(str(docs)))
+
+    assert result["files_deleted"] == 1
+    assert _vector_count(pipeline) == 1
+    assert _deleted_entities(pipeline) == []
+
+    (docs / "b" / "README.md").unlink()
+    asyncio.run(pipeline.ingest_directory(str(docs)))
+    assert _deleted_entities(pipeline) == ["File: README.md"]
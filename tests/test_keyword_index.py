@@ -0,0 +1,57 @@
+"""Tests for the BM25 keyword index."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emvr.memory.keyword_index import BM25Index, tokenize  # noqa: E402
+
+
+def test_tokenize_splits_identifiers():
+    """Compound identifiers match whole and by their parts."""
+    tokens = tokenize("getUserId raised ERR_CONN_RESET in os.path")
+    assert tokens == [
+        "getuserid",
+        "get",
+        "user",
+        "id",
+        "raised",
+        "err_conn_reset",
+        "err",
+        "conn",
+        "reset",
+        "in",
+        "os.path",
+        "os",
+        "path",
+    ]
+
+
+def test_pruned_search_matches_exhaustive_ranking(tmp_path):
+    """MaxScore top-k equals the head of the full ranking, across updates and reopen."""
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"w{i}" for i in range(500)])
+    weights = 1 / np.arange(1, 501)
+    words = rng.choice(vocabulary, size=(3000, 40), p=weights / weights.sum())
+    texts = [" ".join(row) for row in words]
+    ids = [f"d{i}" for i in range(3000)]
+
+    index = BM25Index(str(tmp_path))
+    index.upsert(ids, texts)
+    index.flush()
+    index.delete(ids[:500])
+    index.upsert(ids[500:600], texts[1000:1100])
+
+    queries = [" ".join(rng.choice(vocabulary[:200], size=4)) for _ in range(20)]
+    for query in queries:
+        full = index.search(query, 3000)
+        top = index.search(query, 10)
+        assert [s for _, s in top] == pytest.approx([s for _, s in full[:10]])
+        assert not {d for d, _ in full} & set(ids[:500])
+
+    expected = index.search(queries[0], 10)
+    index.close()
+    reopened = BM25Index(str(tmp_path))
+    assert len(reopened) == 2500
+    assert reopened.search(queries[0], 10) == expected
+    assert reopened.search("ERR_CONN_RESET", 5) == []
@@ -0,0 +1,104 @@
+"""Tests for the knowledge graph retriever."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+KnowledgeGraphRetriever = pytest.importorskip(
+    "emvr.retrieval.knowledge_graph_retriever", exc_type=ImportError
+).KnowledgeGraphRetriever
+
+
+class _FakeRecords:
+    def __init__(self, records):
+        self._records = iter(records)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._records)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class _FakeDriver:
+    """Answers the match query and the entity read, recording each query."""
+
+    def __init__(self, matches, entities):
+        self.matches = matches
+        self.entities = entities
+        self.calls = []
+
+    def session(self, database=None):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        self.calls.append(params)
+        if "names" in params:
+            return _FakeRecords(
+                [
+                    {"name": name, "entity_type": entity_type, "observations": observations}
+                    for name, (entity_type, observations) in self.entities.items()
+                    if name in params["names"]
+                ]
+            )
+        return _FakeRecords(
+            [{"source": s, "relation": r, "target": t} for s, r, t in self.matches]
+        )
+
+
+def test_matches_are_expanded_over_the_neighborhood_cache():
+    """Matches come first, neighbors fill up top_k, observations are read in one query."""
+    graph_store = MagicMock()
+    graph_store.driver = _FakeDriver(
+        [("EMVR", "uses_framework", "Neo4j")],
+        {
+            "EMVR": ("Project", ["Memory server"]),
+            "Neo4j": ("Database", ["Graph database", "Cypher"]),
+            "Qdrant": ("Database", []),
+            "Alice": ("Person", []),
+        },
+    )
+    graph_store.neighborhood = AsyncMock(
+        return_value={
+            "entities": [],
+            "relations": [
+                {"from": "EMVR", "relation": "uses_framework", "to": "Neo4j"},
+                {"from": "EMVR", "relation": "uses_framework", "to": "Qdrant"},
+                {"from": "Alice", "relation": "maintains", "to": "EMVR"},
+            ],
+        }
+    )
+    retriever = KnowledgeGraphRetriever(graph_store=graph_store)
+
+    results = asyncio.run(retriever.retrieve("how to build it", top_k=3))
+
+    graph_store.neighborhood.assert_awaited_once_with(
+        ["EMVR", "Neo4j"], max_hops=1, limit=5, relation_types=None
+    )
+    assert [result.id for result in results] == [
+        "EMVR-uses_framework-Neo4j",
+        "EMVR-uses_framework-Qdrant",
+        "Alice-maintains-EMVR",
+    ]
+    assert [result.score for result in results] == [1.0, 0.5, 0.5]
+    assert "Target (Neo4j): Graph database; Cypher" in results[0].text
+    assert results[2].metadata["source_type"] == "Person"
+    assert len(graph_store.driver.calls) == 2
+
+    filtered = asyncio.run(
+        retriever.retrieve("how to build it", top_k=3, filters={"entity_types": ["Project"]})
+    )
+    assert [result.id for result in filtered] == [
+        "EMVR-uses_framework-Neo4j",
+        "EMVR-uses_framework-Qdrant",
+    ]
@@ -0,0 +1,84 @@
+"""Tests for the embedded vector index."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emvr.memory.local_vector_index import LocalVectorIndex  # noqa: E402
+
+
+def _brute_force(vectors, ids, query, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    return [ids[i] for i in np.argsort(-scores)[:k]]
+
+
+def test_search_matches_brute_force_after_deletes():
+    """Top-k equals an exhaustive scan, including after swap-deletes."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 16)).astype(np.float32)
+    ids = [f"p{i}" for i in range(500)]
+
+    index = LocalVectorIndex(16)
+    index.upsert(ids, vectors, [{"i": i} for i in range(500)])
+    assert index.delete(ids[:100] + ["missing"]) == 100
+
+    query = rng.normal(size=16).astype(np.float32)
+    hits = index.search(query, 10)
+
+    assert len(index) == 400
+    assert [point_id for point_id, _ in hits] == _brute_force(vectors[100:], ids[100:], query, 10)
+    assert index.get_payloads([hits[0][0]]) == {hits[0][0]: {"i": int(hits[0][0][1:])}}
+
+
+def test_persists_across_reopen(tmp_path):
+    """A reopened index serves the same vectors, payloads and dimension."""
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(1500, 8)).astype(np.float32)
+    ids = [f"p{i}" for i in range(1500)]
+
+    index = LocalVectorIndex(8, str(tmp_path))
+    index.upsert(ids, vectors, [{"text": f"t{i}"} for i in range(1500)])
+    index.upsert(["p0"], vectors[1:2], [{"text": "replaced"}])
+    index.delete(["p5"])
+    before = index.search(vectors[7], 5)
+    index.close()
+
+    reopened = LocalVectorIndex(None, str(tmp_path))
+
+    assert reopened.dimension == 8
+    assert len(reopened) == 1499
+    assert reopened.search(vectors[7], 5) == before
+    assert reopened.get_payloads(["p0", "p5"]) == {"p0": {"text": "replaced"}}
+    with pytest.raises(ValueError):
+        LocalVectorIndex(4, str(tmp_path))
+
+
+@pytest.mark.parametrize(("quantization", "code_size"), [("int8", 32), ("pq", 8)])
+def test_quantized_search_rescores_to_exact(tmp_path, quantization, code_size):
+    """Quantized scans shortlist well enough that rescoring recovers the exact top-k."""
+    rng = np.random.default_rng(2)
+    centres = rng.normal(size=(20, 32))
+    vectors = (centres[rng.integers(0, 20, 3000)] + rng.normal(size=(3000, 32))).astype(
+        np.float32
+    )
+    ids = [f"p{i}" for i in range(3000)]
+    queries = rng.normal(size=(20, 32)).astype(np.float32)
+
+    index = LocalVectorIndex(32, str(tmp_path), quantization=quantization)
+    index.upsert(ids[:500], vectors[:500])
+    assert index.bytes_per_vector == 32 * 4  # untrained: exact scan of float32
+    index.upsert(ids[500:], vectors[500:])
+    index.delete(ids[:10])
+
+    assert index.bytes_per_vector == code_size
+    found = sum(
+        len({p for p, _ in index.search(q, 10)} & set(_brute_force(vectors[10:], ids[10:], q, 10)))
+        for q in queries
+    )
+    assert found / 200 >= 0.98
+    index.close()
+
+    reopened = LocalVectorIndex(None, str(tmp_path))
+    assert reopened.quantization == quantization
+    assert reopened.bytes_per_vector == code_size
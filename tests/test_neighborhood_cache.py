@@ -0,0 +1,110 @@
+"""Tests for the in-process graph neighborhood cache."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from emvr.memory.neighborhood_cache import NeighborhoodCache  # noqa: E402
+
+# a -knows-> b -knows-> c -likes-> d, and e -knows-> a
+_GRAPH = [("a", "knows", "b"), ("b", "knows", "c"), ("c", "likes", "d"), ("e", "knows", "a")]
+
+
+class _Fetcher:
+    """Serves the adjacency of an in-memory graph and records what was fetched."""
+
+    def __init__(self, graph):
+        self.graph = list(graph)
+        self.calls = []
+
+    async def __call__(self, names):
+        self.calls.append(sorted(names))
+        adjacency = {}
+        for source, relation, target in self.graph:
+            if source in names:
+                adjacency.setdefault(source, []).append((relation, target, True))
+            if target in names:
+                adjacency.setdefault(target, []).append((relation, source, False))
+        return adjacency
+
+
+def test_expansion_fetches_each_entity_once():
+    """Hops are fetched in one batch each; cached entities are not fetched again."""
+    cache = NeighborhoodCache()
+    fetch = _Fetcher(_GRAPH)
+
+    depths, edges = asyncio.run(cache.expand(["a"], 2, fetch))
+    assert depths == {"a": 0, "b": 1, "e": 1, "c": 2}
+    assert edges == [("a", "knows", "b"), ("e", "knows", "a"), ("b", "knows", "c")]
+    assert fetch.calls == [["a"], ["b", "e"]]
+
+    depths, _ = asyncio.run(cache.expand(["a"], 3, fetch))
+    assert depths["d"] == 3
+    assert fetch.calls[2:] == [["c"]]
+
+    depths, edges = asyncio.run(cache.expand(["a"], 3, fetch, relation_types=["likes"]))
+    assert depths == {"a": 0}
+    assert edges == []
+    depths, _ = asyncio.run(cache.expand(["a"], 2, fetch, limit=2))
+    assert list(depths) == ["a", "b"]
+    assert len(fetch.calls) == 3
+
+
+def test_expand_each_keeps_seeds_apart_and_shares_fetches():
+    """Each seed gets its own depths and limit; a hop fetches for all seeds at once."""
+    cache = NeighborhoodCache()
+    fetch = _Fetcher(_GRAPH)
+
+    (a_depths, a_edges), (d_depths, _) = asyncio.run(cache.expand_each(["a", "d"], 2, fetch))
+    assert a_depths == {"a": 0, "b": 1, "e": 1, "c": 2}
+    assert ("b", "knows", "c") in a_edges
+    assert d_depths == {"d": 0, "c": 1, "b": 2}
+    assert fetch.calls == [["a", "d"], ["b", "c", "e"]]
+
+    limited = asyncio.run(cache.expand_each(["a", "c"], 2, fetch, limit=2))
+    assert [list(depths) for depths, _ in limited] == [["a", "b"], ["c", "b"]]
+
+
+def test_writes_invalidate_and_lru_is_bounded_by_edges():
+    """Changed endpoints and deleted entities are dropped; eviction counts edges."""
+    cache = NeighborhoodCache(max_edges=4)
+    fetch = _Fetcher(_GRAPH)
+    asyncio.run(cache.expand(["a"], 1, fetch))  # a: 2 edges
+    asyncio.run(cache.expand(["c"], 1, fetch))  # c: 2 edges
+    assert cache.edge_count == 4
+
+    fetch.graph.append(("a", "likes", "c"))
+    cache.invalidate(["a", "c"])
+    depths, _ = asyncio.run(cache.expand(["a"], 1, fetch))
+    assert depths == {"a": 0, "b": 1, "e": 1, "c": 1}
+    assert cache.get("c") is None
+
+    asyncio.run(cache.expand(["d"], 1, fetch))  # d: 1 edge, evicts nothing yet
+    asyncio.run(cache.expand(["b"], 1, fetch))  # b: 2 edges, evicts a
+    assert cache.get("a") is None
+    assert cache.edge_count <= 4
+
+    fetch.graph = [edge for edge in fetch.graph if "c" not in (edge[0], edge[2])]
+    cache.invalidate_entities(["c"])
+    assert cache.get("b") is None  # listed c as a neighbor
+    assert cache.get("d") is None
+    depths, _ = asyncio.run(cache.expand(["b"], 1, fetch))
+    assert depths == {"b": 0, "a": 1}
+
+
+def test_fetch_racing_a_write_is_not_cached():
+    """Adjacency read while a write lands is used but not cached."""
+    cache = NeighborhoodCache()
+    fetch = _Fetcher(_GRAPH)
+
+    async def racing(names):
+        result = await fetch(names)
+        cache.invalidate(["z"])
+        return result
+
+    depths, _ = asyncio.run(cache.expand(["a"], 1, racing))
+    assert depths == {"a": 0, "b": 1, "e": 1}
+    assert cache.get("a") is None
+    assert len(cache) == 0
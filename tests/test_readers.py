@@ -0,0 +1,43 @@
+"""Tests for the streaming file readers."""
+
+from emvr.ingestion.loaders.readers import get_reader, iter_decoded, iter_lines
+
+
+def test_iter_decoded_tolerates_invalid_and_split_characters(tmp_path):
+    """Invalid bytes are replaced and characters split across blocks survive."""
+    path = tmp_path / "mixed.txt"
+    path.write_bytes("\ufeffcafé ".encode() + b"\xff" + "naïve".encode())
+
+    text = "".join(iter_decoded(str(path), block_size=4))
+
+    assert text == "café \ufffdnaïve"
+
+
+def test_iter_lines_rejoins_segments():
+    """Lines split across segments are reassembled."""
+    assert list(iter_lines(["a\nb", "c\n", "d"])) == ["a\n", "bc\n", "d"]
+    assert list(iter_lines(["x"] * 1000 + ["\ny", "", "z\n", ""])) == ["x" * 1000 + "\n", "yz\n"]
+
+
+def test_structured_readers(tmp_path):
+    """JSONL, CSV and Markdown files are rendered record by record."""
+    jsonl = tmp_path / "data.jsonl"
+    jsonl.write_text('{"text": "first"}\n{"id": 2}\nbroken\n', encoding="utf-8")
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text('name,note\nbob,"a, b"\nal,\n', encoding="utf-8")
+    markdown = tmp_path / "doc.md"
+    markdown.write_text(
+        "---\ntitle: x\n---\n# One\nbody\n```\n# code\n```\n# Two\n",
+        encoding="utf-8",
+    )
+
+    assert "".join(get_reader(str(jsonl)).iter_text(str(jsonl))) == (
+        'first\n\n{"id": 2}\n\nbroken\n\n'
+    )
+    assert "".join(get_reader(str(csv_file)).iter_text(str(csv_file))) == (
+        "name: bob\nnote: a, b\n\nname: al\n\n"
+    )
+    assert list(get_reader(str(markdown)).iter_text(str(markdown))) == [
+        "# One\nbody\n```\n# code\n```\n\n",
+        "# Two\n",
+    ]
@@ -0,0 +1,133 @@
+"""Tests for the retrieval result cache."""
+
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("prometheus_client")
+
+from emvr.memory.generations import WriteGenerations  # noqa: E402
+from emvr.retrieval.base import record_failure, track_failures  # noqa: E402
+from emvr.retrieval.result_cache import ResultCache  # noqa: E402
+
+
+def test_ttl_lru_and_write_invalidation(monkeypatch):
+    """Entries expire, are evicted LRU first and drop on writes to their scopes only."""
+    generations = WriteGenerations()
+    cache = ResultCache(max_entries=2, ttl=10.0, generations=generations)
+    calls = []
+
+    def lookup(key, scopes=("vector",)):
+        async def compute():
+            calls.append(key)
+            return {"results": [key]}
+
+        return asyncio.run(cache.get_or_compute(key, scopes, compute))
+
+    now = [100.0]
+    monkeypatch.setattr("emvr.retrieval.result_cache.time.monotonic", lambda: now[0])
+
+    assert ResultCache.make_key(" a  b ", "fusion", 5, {"y": 1, "x": 2}) == ResultCache.make_key(
+        "a b", "fusion", 5, {"x": 2, "y": 1}
+    )
+
+    lookup("a")
+    result = lookup("a")
+    result["results"].append("mutated")
+    assert lookup("a") == {"results": ["a"]}
+    assert calls == ["a"]
+
+    lookup("b")
+    lookup("a")
+    lookup("c")  # evicts "b", the least recently used
+    lookup("a")
+    lookup("b")
+    assert calls == ["a", "b", "c", "b"]
+
+    generations.bump("graph")
+    lookup("b")
+    generations.bump("vector")
+    lookup("b")
+    now[0] += 11
+    lookup("b")
+    assert calls == ["a", "b", "c", "b", "b", "b"]
+    assert cache.hit_ratio == pytest.approx(5 / 11)
+
+
+def test_singleflight_shares_one_computation():
+    """Concurrent identical lookups share a computation; errors are shared, not cached."""
+    cache = ResultCache(generations=WriteGenerations())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"results": [1]}
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    async def run():
+        results = await asyncio.gather(
+            *(cache.get_or_compute(("q",), ("vector",), compute) for _ in range(5))
+        )
+        errors = await asyncio.gather(
+            *(cache.get_or_compute(("e",), ("vector",), failing) for _ in range(3)),
+            return_exceptions=True,
+        )
+        return results, errors
+
+    results, errors = asyncio.run(run())
+    assert results == [{"results": [1]}] * 5
+    assert len({id(result) for result in results}) == 5
+    assert [str(error) for error in errors] == ["backend down"] * 3
+    assert len(calls) == 2
+    assert len(cache) == 1
+
+
+def test_results_degraded_by_a_failure_are_not_cached():
+    """Failures recorded by retrievers, even in gathered tasks, keep the result out."""
+    cache = ResultCache(generations=WriteGenerations())
+    graph_up = [False]
+    calls = []
+
+    async def graph_retriever():
+        if not graph_up[0]:
+            record_failure("graph")
+            return []
+        return ["g"]
+
+    async def compute():
+        calls.append(1)
+        with track_failures() as failures:
+            (results,) = await asyncio.gather(graph_retriever())
+        return {"results": results, "partial": bool(failures)}
+
+    def lookup():
+        return asyncio.run(
+            cache.get_or_compute(
+                ("q", "graph", 5, "{}"), ("graph",), compute, cacheable=lambda r: not r["partial"]
+            )
+        )
+
+    assert lookup() == {"results": [], "partial": True}
+    assert lookup() == {"results": [], "partial": True}
+    assert len(calls) == 2 and len(cache) == 0
+
+    graph_up[0] = True
+    assert lookup() == {"results": ["g"], "partial": False}
+    assert lookup() == {"results": ["g"], "partial": False}
+    assert len(calls) == 3
+
+
+def test_imports_without_the_server_stack():
+    """The cache only needs prometheus_client, not the MCP server's dependencies."""
+    code = "import sys; sys.modules['fastapi'] = None; import emvr.retrieval.result_cache"
+    root = Path(__file__).resolve().parent.parent
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
@@ -0,0 +1,93 @@
+"""Tests for the unified retrieval pipeline's per-source deadlines."""
+
+import asyncio
+import importlib
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+
+class _Source:
+    """Stand-in retriever answering after a delay, or failing."""
+
+    def __init__(self, delay=0.0, error=None, entities=()):
+        self.delay = delay
+        self.error = error
+        self.entities = list(entities)
+        self.retrieve_calls = 0
+        self.extract_calls = 0
+
+    async def retrieve(self, query, top_k=10, filters=None):
+        self.retrieve_calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"success": True, "results": [{"id": "doc", "text": query, "score": 1.0}]}
+
+    async def extract_entities(self, query):
+        self.extract_calls += 1
+        return {"success": True, "entities": self.entities}
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch):
+    """Build the real pipeline over stand-in retrievers."""
+    monkeypatch.delitem(sys.modules, "emvr.retrievers.retrieval_pipeline", raising=False)
+    module = importlib.import_module("emvr.retrievers.retrieval_pipeline")
+
+    def make(vector, graph, timeout=0.2, hedge_delay=None):
+        pipeline = module.RetrievalPipeline()
+        pipeline._settings = SimpleNamespace(
+            retrieval_vector_timeout=timeout,
+            retrieval_graph_timeout=timeout,
+            retrieval_vector_hedge_delay=hedge_delay,
+            retrieval_graph_hedge_delay=hedge_delay,
+        )
+        pipeline._hybrid_retriever = vector
+        pipeline._graph_retriever = graph
+        pipeline._initialized = True
+        return pipeline
+
+    return make
+
+
+def test_slow_and_failing_sources_are_reported(make_pipeline):
+    """A timed out and a failed source each cost only their own results."""
+    vector = _Source(delay=1.0)
+    graph = _Source(error=RuntimeError("graph down"), entities=[{"name": "EMVR"}])
+
+    response = asyncio.run(make_pipeline(vector, graph).retrieve("what is emvr"))
+
+    assert response["success"]
+    assert response["partial"]
+    assert response["timed_out_sources"] == ["vector"]
+    assert response["failed_sources"] == ["graph"]
+    assert response["results"] == []
+    assert response["entities"] == [{"name": "EMVR"}]
+
+
+def test_hedged_graph_request_extracts_entities_once(make_pipeline):
+    """A hedge only repeats the graph query, not the entity extraction."""
+    vector = _Source()
+    graph = _Source(delay=0.05, entities=[{"name": "EMVR"}])
+
+    response = asyncio.run(make_pipeline(vector, graph, hedge_delay=0.01).retrieve("emvr"))
+
+    assert not response["partial"]
+    assert graph.retrieve_calls == 2
+    assert graph.extract_calls == 1
+    assert response["graph_result_count"] == 1
+
+
+def test_entities_are_returned_without_graph_retrieval(make_pipeline):
+    """Skipping graph retrieval still reports the entities found in the query."""
+    vector = _Source()
+    graph = _Source(entities=[{"name": "EMVR"}])
+
+    response = asyncio.run(make_pipeline(vector, graph).retrieve("emvr", use_graph=False))
+
+    assert not response["partial"]
+    assert response["entities"] == [{"name": "EMVR"}]
+    assert graph.retrieve_calls == 0
+    assert response["vector_result_count"] == 1
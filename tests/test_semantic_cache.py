@@ -0,0 +1,76 @@
+"""Tests for the semantic retrieval cache."""
+
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("prometheus_client")
+
+from emvr.memory.generations import WriteGenerations  # noqa: E402
+from emvr.retrieval.semantic_cache import SemanticCache  # noqa: E402
+
+
+def test_paraphrases_share_results_after_admission():
+    """Near-duplicate queries reuse results once admitted, within the same context only."""
+    generations = WriteGenerations()
+    cache = SemanticCache(threshold=0.9, max_entries=2, admit_after=2, generations=generations)
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=16).astype(np.float32)
+    paraphrase = base + 0.05 * rng.normal(size=16).astype(np.float32)
+    calls = []
+
+    def lookup(vector, context=("fusion", 5, "{}"), name="q"):
+        async def compute():
+            calls.append(name)
+            return {"results": [name]}
+
+        return asyncio.run(cache.get_or_compute(vector, context, ("vector",), compute))
+
+    lookup(base, name="first")
+    lookup(paraphrase, name="second")  # seen twice: admitted with these results
+    assert lookup(base) == {"results": ["second"]}
+    assert lookup(paraphrase * 3) == {"results": ["second"]}
+    lookup(base, context=("graph", 5, "{}"), name="graph")
+    assert calls == ["first", "second", "graph"]
+
+    # One-off queries fill the candidates without evicting admitted results
+    for _ in range(5):
+        lookup(rng.normal(size=16), name="one-off")
+    assert lookup(base) == {"results": ["second"]}
+
+    generations.bump("vector")
+    lookup(base, name="after write")
+    assert lookup(paraphrase) == {"results": ["after write"]}
+    assert calls.count("after write") == 1
+    assert len(cache) == 1
+
+
+def test_uncacheable_results_are_not_admitted():
+    """Results the caller marks as uncacheable are recomputed every time."""
+    cache = SemanticCache(threshold=0.9, admit_after=1, generations=WriteGenerations())
+    vector = np.ones(8, dtype=np.float32)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"results": [], "partial": True}
+
+    for _ in range(3):
+        asyncio.run(
+            cache.get_or_compute(
+                vector, ("graph",), ("graph",), compute, cacheable=lambda r: not r["partial"]
+            )
+        )
+    assert len(calls) == 3
+    assert len(cache) == 0
+
+
+def test_imports_without_the_server_stack():
+    """The cache only needs prometheus_client, not the MCP server's dependencies."""
+    code = "import sys; sys.modules['fastapi'] = None; import emvr.retrieval.semantic_cache"
+    root = Path(__file__).resolve().parent.parent
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
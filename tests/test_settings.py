@@ -0,0 +1,28 @@
+"""Tests for settings validation."""
+
+import importlib
+import sys
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+
+@pytest.fixture
+def settings_class(monkeypatch):
+    """The real Settings class (the test configuration mocks emvr.config)."""
+    monkeypatch.delitem(sys.modules, "emvr.config", raising=False)
+    monkeypatch.delitem(sys.modules, "emvr.config.settings", raising=False)
+    return importlib.import_module("emvr.config.settings").Settings
+
+
+def test_fusion_strategy_is_validated_on_load(settings_class, monkeypatch):
+    """An unknown fusion strategy fails when settings load, not at the first query."""
+    assert settings_class().retrieval_fusion == "rrf"
+
+    monkeypatch.setenv("RETRIEVAL_FUSION", "zscore")
+    assert settings_class().retrieval_fusion == "zscore"
+
+    monkeypatch.setenv("RETRIEVAL_FUSION", "borda")
+    with pytest.raises(ValueError, match="retrieval_fusion"):
+        settings_class()
@@ -0,0 +1,167 @@
+"""Tests for the staged streaming ingestion."""
+
+import asyncio
+import importlib
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("neo4j")
+
+
+class _FakeEmbeddings:
+    """Deterministic embeddings, optionally held back or failing."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.batches = []
+        self.release = None
+
+    async def get_embeddings(self, texts):
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        self.batches.append(list(texts))
+        return np.ones((len(texts), 8), dtype=np.float32)
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """The real pipeline over the embedded vector index and a mocked graph store."""
+    for name in ("emvr.ingestion.pipeline", "emvr.memory.memory_manager", "emvr.config"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    pipeline_module = importlib.import_module("emvr.ingestion.pipeline")
+    from emvr.memory.memory_manager import MemoryManager
+    from emvr.memory.vector_store import QdrantMemoryStore
+
+    graph_store = MagicMock()
+    graph_store.create_entities = AsyncMock()
+    graph_store.delete_entities = AsyncMock()
+
+    instance = pipeline_module.IngestionPipeline()
+    instance._embedding_manager = _FakeEmbeddings()
+    instance._memory_manager = MemoryManager(
+        vector_store=QdrantMemoryStore(location="local", path=str(tmp_path / "vectors")),
+        graph_store=graph_store,
+    )
+    instance._initialized = True
+    yield instance
+    asyncio.run(instance._memory_manager.vector_store.close())
+
+
+def _write_files(directory, count):
+    directory.mkdir()
+    paths = []
+    for i in range(count):
+        path = directory / f"doc{i}.txt"
+        path.write_text(f"Document number {i}.")
+        paths.append(str(path))
+    return paths
+
+
+async def _paths(paths, pulled=None):
+    for path in paths:
+        if pulled is not None:
+            pulled.append(path)
+        yield path
+
+
+def test_chunks_are_embedded_before_they_are_stored(pipeline, tmp_path):
+    """Every stored batch was embedded first, and completion is reported last."""
+    from emvr.ingestion.streaming import StreamingIngestion
+
+    paths = _write_files(tmp_path / "docs", 6)
+    embedded = pipeline._embedding_manager.batches
+    stored = []
+    store_chunks = pipeline._store_chunks
+
+    async def record_store(chunks, embeddings):
+        texts = [chunk["text"] for chunk in chunks]
+        assert texts in embedded
+        stored.append(texts)
+        return await store_chunks(chunks, embeddings)
+
+    pipeline._store_chunks = record_store
+    events = []
+    streaming = StreamingIngestion(
+        pipeline,
+        load_workers=2,
+        embed_batch_size=2,
+        queue_size=2,
+        progress_callback=lambda progress: events.append(progress.event),
+    )
+
+    result = asyncio.run(streaming.run(_paths(paths)))
+
+    assert result["files_processed"] == 6
+    assert result["total_chunks"] == 6
+    assert sorted(stored) == sorted(embedded)
+    assert all(len(texts) <= 2 for texts in embedded)
+    assert events.count("file_loaded") == 6
+    assert events[-1] == "completed"
+    assert events.index("chunks_embedded") < events.index("chunks_stored")
+    assert len(pipeline._memory_manager.vector_store._get_local_index()) == 6
+
+
+def test_stage_errors_propagate_out_of_the_task_group(pipeline, tmp_path):
+    """A failing embed stage cancels the other stages and fails the run."""
+    from emvr.ingestion.streaming import StreamingIngestion
+
+    paths = _write_files(tmp_path / "docs", 20)
+    pipeline._embedding_manager.error = RuntimeError("model unavailable")
+    streaming = StreamingIngestion(pipeline, embed_batch_size=2, queue_size=1)
+
+    with pytest.raises(ExceptionGroup) as raised:
+        asyncio.run(asyncio.wait_for(streaming.run(_paths(paths)), timeout=10))
+
+    assert raised.group_contains(RuntimeError, match="model unavailable")
+    pipeline._memory_manager.graph_store.create_entities.assert_not_awaited()
+
+
+def test_unreadable_files_do_not_stop_the_run(pipeline, tmp_path):
+    """Load errors are reported per file while the other files are ingested."""
+    from emvr.ingestion.streaming import StreamingIngestion
+
+    paths = _write_files(tmp_path / "docs", 3)
+    missing = str(tmp_path / "docs" / "missing.txt")
+
+    result = asyncio.run(StreamingIngestion(pipeline).run(_paths([*paths, missing])))
+
+    assert result["files_processed"] == 3
+    assert result["files_failed"] == 1
+    assert result["failed_files"][0]["file_path"] == missing
+
+
+def test_queues_bound_the_paths_read_ahead(pipeline, tmp_path):
+    """While embedding is stalled, only a few paths are pulled from the input."""
+    from emvr.ingestion.streaming import StreamingIngestion
+
+    paths = _write_files(tmp_path / "docs", 50)
+    pulled = []
+
+    async def run():
+        pipeline._embedding_manager.release = asyncio.Event()
+        streaming = StreamingIngestion(
+            pipeline,
+            load_workers=1,
+            embed_batch_size=1,
+            write_workers=1,
+            queue_size=1,
+        )
+        task = asyncio.create_task(streaming.run(_paths(paths, pulled)))
+        await asyncio.sleep(0.2)
+        stalled = len(pulled)
+        pipeline._embedding_manager.release.set()
+        return stalled, await task
+
+    stalled, result = asyncio.run(run())
+
+    # One path per queue slot and per stage holding or waiting to put an item
+    assert stalled <= 5
+    assert result["files_processed"] == 50
+    assert len(pulled) == 50
@@ -0,0 +1,158 @@
+"""Tests for the Qdrant vector store."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("dotenv")
+
+import emvr.memory.vector_store as vector_store  # noqa: E402
+from emvr.memory.vector_store import QdrantMemoryStore  # noqa: E402
+
+
+def _settings(**overrides):
+    settings = {
+        "data_dir": "/srv/emvr",
+        "qdrant_url": "http://qdrant:6333",
+        "qdrant_api_key": "key",
+        "qdrant_location": "http",
+        "qdrant_local_index": None,
+        "hnsw_m": 16,
+        "hnsw_ef_construction": 200,
+        "hnsw_ef_search": 64,
+        "qdrant_quantization": None,
+        "qdrant_pq_subvectors": None,
+        "qdrant_rescore_multiplier": None,
+        "qdrant_payload_indexes": "source,file_type",
+        "qdrant_write_batch_size": 2,
+        "qdrant_write_flush_ms": 0.0,
+        "qdrant_write_concurrency": 1,
+    }
+    return SimpleNamespace(**{**settings, **overrides})
+
+
+def test_store_reads_its_settings(monkeypatch):
+    """Location, server, data directory and indexes come from the settings, arguments win."""
+    monkeypatch.setattr(vector_store, "get_settings", _settings)
+
+    store = QdrantMemoryStore(collection_name="docs")
+    assert (store.url, store.api_key, store.location) == ("http://qdrant:6333", "key", "http")
+    assert not store.is_local
+    assert store.path == "/srv/emvr/vectors/docs"
+    assert store.payload_indexes == ["source", "file_type"]
+    assert QdrantMemoryStore(payload_indexes=[]).payload_indexes == []
+    assert QdrantMemoryStore(location="local").is_local
+
+
+def test_index_settings_reach_the_embedded_index(monkeypatch, tmp_path):
+    """The index type and HNSW parameters configured in the settings are used."""
+    settings = _settings(
+        qdrant_location="local",
+        qdrant_local_index="hnsw",
+        hnsw_m=8,
+        hnsw_ef_construction=40,
+        hnsw_ef_search=20,
+    )
+    monkeypatch.setattr(vector_store, "get_settings", lambda: settings)
+
+    store = QdrantMemoryStore(path=str(tmp_path / "vectors"))
+    index = store._get_local_index(dimension=4)
+    assert index.index_type == "hnsw"
+    assert (store.hnsw_m, store.hnsw_ef_construction, store.hnsw_ef_search) == (8, 40, 20)
+    asyncio.run(store.close())
+
+
+def test_quantization_settings_reach_the_embedded_index(monkeypatch, tmp_path):
+    """The quantization mode and rescoring configured in the settings are used."""
+    settings = _settings(
+        qdrant_location="local",
+        qdrant_quantization="pq",
+        qdrant_pq_subvectors=2,
+        qdrant_rescore_multiplier=3,
+    )
+    monkeypatch.setattr(vector_store, "get_settings", lambda: settings)
+
+    store = QdrantMemoryStore(path=str(tmp_path / "vectors"))
+    index = store._get_local_index(dimension=8)
+    assert index.quantization == "pq"
+    assert index.rescore_multiplier == 3
+    assert store.pq_subvectors == 2
+    asyncio.run(store.close())
+
+
+def test_remote_writes_go_to_the_qdrant_client(monkeypatch):
+    """With a Qdrant server, upserts are sent in bulk batches and deletes are sent too."""
+    monkeypatch.setattr(vector_store, "get_settings", _settings)
+    client = MagicMock()
+    client.upsert = AsyncMock()
+    client.delete = AsyncMock()
+    registry = MagicMock()
+    registry.qdrant_client.return_value = client
+    monkeypatch.setattr(vector_store, "connection_registry", registry)
+
+    store = QdrantMemoryStore(collection_name="docs")
+    vectors = np.eye(3, 4, dtype=np.float32)
+    payloads = [{"text": str(i)} for i in range(3)]
+    ids = ["a", "b", "c"]
+
+    assert asyncio.run(store.upsert_many(ids, vectors, payloads)) == {"upserted": 3}
+    registry.qdrant_client.assert_called_with("http://qdrant:6333", "key")
+    batches = [call.kwargs["points"] for call in client.upsert.await_args_list]
+    assert [batch.ids for batch in batches] == [["a", "b"], ["c"]]
+    assert batches[1].vectors == [[0.0, 0.0, 1.0, 0.0]]
+    assert batches[1].payloads == [{"text": "2"}]
+    assert all(call.kwargs["collection_name"] == "docs" for call in client.upsert.await_args_list)
+
+    assert asyncio.run(store.delete(["a"])) == {"deleted": 1}
+    assert client.delete.await_args.kwargs["points_selector"].points == ["a"]
+
+    client.upsert.side_effect = RuntimeError("unavailable")
+    with pytest.raises(RuntimeError, match="unavailable"):
+        asyncio.run(store.upsert_many(ids[:1], vectors[:1], payloads[:1]))
+
+
+def test_keyword_search_needs_the_local_backend(monkeypatch):
+    """Keyword and hybrid search on a Qdrant server raise instead of returning no hits."""
+    monkeypatch.setattr(vector_store, "get_settings", _settings)
+    store = QdrantMemoryStore(collection_name="docs")
+
+    with pytest.raises(NotImplementedError, match="local backend"):
+        asyncio.run(store.hybrid_search("ERR_4021"))
+    with pytest.raises(NotImplementedError, match="local backend"):
+        asyncio.run(store.keyword_search("ERR_4021"))
+
+
+def test_remote_search_sends_a_native_filter(monkeypatch):
+    """Searches on a Qdrant server pass the translated filter to the client."""
+    models = pytest.importorskip("qdrant_client.models")
+    monkeypatch.setattr(vector_store, "get_settings", _settings)
+    client = MagicMock()
+    client.query_points = AsyncMock(
+        return_value=SimpleNamespace(
+            points=[
+                SimpleNamespace(
+                    id="a", score=0.9, payload={"text": "x", "metadata": {"source": "docs"}}
+                )
+            ]
+        )
+    )
+    registry = MagicMock()
+    registry.qdrant_client.return_value = client
+    monkeypatch.setattr(vector_store, "connection_registry", registry)
+
+    store = QdrantMemoryStore(collection_name="docs")
+    results = asyncio.run(
+        store.search_by_vector(np.ones(4, dtype=np.float32), 3, filters={"source": "docs"})
+    )
+
+    assert results == [{"id": "a", "text": "x", "metadata": {"source": "docs"}, "score": 0.9}]
+    kwargs = client.query_points.await_args.kwargs
+    assert kwargs["collection_name"] == "docs"
+    assert kwargs["limit"] == 3
+    assert kwargs["query_filter"] == models.Filter(
+        must=[models.FieldCondition(key="metadata.source", match=models.MatchValue(value="docs"))]
+    )
@@ -0,0 +1,57 @@
+"""Tests for the vector write buffer."""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from emvr.memory.write_buffer import VectorWriteBuffer  # noqa: E402
+
+
+def _rows(ids: list[str]) -> tuple[np.ndarray, list[dict]]:
+    vectors = np.array([[float(i)] for i in range(len(ids))], dtype=np.float32)
+    return vectors, [{"id": point_id} for point_id in ids]
+
+
+def test_concurrent_writes_are_batched_and_last_write_wins():
+    """Concurrent upserts share bulk batches, and a re-written ID keeps its latest row."""
+    batches: list[list[str]] = []
+    stored: dict[str, float] = {}
+
+    async def write_batch(ids, vectors, payloads):
+        batches.append(list(ids))
+        await asyncio.sleep(0)
+        stored.update(zip(ids, vectors[:, 0].tolist(), strict=True))
+
+    async def run() -> None:
+        buffer = VectorWriteBuffer(write_batch, max_batch_size=4, flush_interval=10)
+        first, second = ["a", "b", "c"], ["c", "d", "e", "f", "g"]
+        await asyncio.gather(
+            buffer.write(first, *_rows(first)),
+            buffer.write(second, np.full((5, 1), 9, np.float32), _rows(second)[1]),
+        )
+        await buffer.write(["h"], *_rows(["h"]), wait=False)
+        assert buffer.pending == 1
+        await buffer.flush()
+
+    asyncio.run(run())
+
+    assert batches == [["a", "b", "c", "d"], ["e", "f", "g"], ["h"]]
+    assert stored["c"] == 9.0
+
+
+def test_unawaited_failure_is_raised_by_flush():
+    """A failed fire-and-forget write surfaces on the next flush."""
+
+    async def failing(ids, vectors, payloads):
+        raise RuntimeError("backend unavailable")
+
+    async def run() -> None:
+        buffer = VectorWriteBuffer(failing)
+        await buffer.write(["a"], *_rows(["a"]), wait=False)
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+        await buffer.flush()
+
+    asyncio.run(run())